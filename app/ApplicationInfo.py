@@ -15,6 +15,10 @@ Copyright (c) 2025 Shane William Scott
 
 Author(s): Shane Scott (sscott@shanewilliamscott.com), Dmitriy Dubson (d.dubson@gmail.com)
 """
+import re
+from functools import lru_cache
+
+_ANSI_ESCAPE_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 
 applicationInfo = {
     "name": "LEGION",
@@ -38,7 +42,12 @@ def getVersion():
     return f"{applicationInfo['version']}-{applicationInfo['build']}"
 
 
+@lru_cache(maxsize=1)
 def getConsoleLogo():
-    fileObj = open('./app/legionLogo.txt', 'r')
-    allData = fileObj.read()
-    return allData
+    with open('./app/legionLogo.txt', 'r') as fileObj:
+        return fileObj.read()
+
+
+@lru_cache(maxsize=1)
+def getPlainConsoleLogo():
+    return _ANSI_ESCAPE_RE.sub("", getConsoleLogo())
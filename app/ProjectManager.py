@@ -181,6 +181,46 @@ class ProjectManager:
             return project
         return self.openExistingProject(normalizedFileName, projectType)
 
+    # this function moves a temporary project's database and tool output folder to a new location
+    # instead of copying them; the project is disposed afterwards and must not be used again.
+    # returns False (leaving the project untouched) when a rename is not possible, so callers can
+    # fall back to saveProjectAs
+    def moveTemporaryProjectTo(self, project: Project, fileName: str, projectType="legion") -> bool:
+        if not project.properties.isTemporary:
+            return False
+        toolOutputFolder, normalizedFileName = self.__determineOutputFolder(fileName, projectType)
+        sourceProjectName = str(project.properties.projectName or "")
+        sourceOutputFolder = str(project.properties.outputFolder or "")
+        if not sourceProjectName or not os.path.isfile(sourceProjectName):
+            return False
+
+        destinationDirectory = os.path.dirname(os.path.abspath(normalizedFileName))
+        try:
+            os.makedirs(destinationDirectory, exist_ok=True)
+            if os.stat(sourceProjectName).st_dev != os.stat(destinationDirectory).st_dev:
+                return False
+        except OSError:
+            return False
+
+        try:
+            project.database.verify_integrity()
+        except DatabaseIntegrityError as exc:
+            self.logger.error(f"Aborting save: integrity check failed for {project.properties.projectName}: {exc}")
+            raise
+
+        self.logger.info(f"Moving project {sourceProjectName} to {normalizedFileName}...")
+        project.database.commit()
+        project.database.dispose()
+        os.replace(sourceProjectName, normalizedFileName)
+
+        if sourceOutputFolder and os.path.isdir(sourceOutputFolder):
+            if os.path.exists(toolOutputFolder):
+                shutil.rmtree(toolOutputFolder, ignore_errors=True)
+            os.replace(sourceOutputFolder, toolOutputFolder)
+
+        self.logger.info(f"Project saved as {normalizedFileName}.")
+        return True
+
     @staticmethod
     def _same_path(path_a: str, path_b: str) -> bool:
         if not path_a or not path_b:
@@ -19,7 +19,9 @@ Author(s): Shane Scott (sscott@shanewilliamscott.com), Dmitriy Dubson (d.dubson@
 import os
 import sys
 import subprocess
-from typing import Iterable, List
+import threading
+from concurrent.futures import Future
+from typing import Iterable, List, Optional
 from urllib.parse import urlparse
 
 from app.hostsfile import normalize_hostname_alias
@@ -39,78 +41,99 @@ def _normalize_import_target(raw_target: str) -> str:
     return str(normalized or candidate or "").strip().rstrip(".")
 
 
+def _host_row_for_target(target: str) -> dict:
+    host = hostObj(
+        ip=target,
+        ipv4=target,
+        ipv6='',
+        macaddr='',
+        status='',
+        hostname=target,
+        vendor='',
+        uptime='',
+        lastboot='',
+        distance='',
+        state='',
+        count='',
+    )
+    return {
+        column.name: getattr(host, column.name)
+        for column in hostObj.__table__.columns
+        if not column.primary_key
+    }
+
+
 def import_targets(session, hostRepository, targets: Iterable[str]) -> List[str]:
     """
     Import targets (hostnames, subnets, IPs, etc.) from an iterable into the database.
+    New hosts are written with batched multi-row inserts and a single commit.
     Returns the list of newly-added targets.
     """
-    added_targets: List[str] = []
+    candidates: List[str] = []
     seen = set()
     for raw_target in list(targets or []):
         target = _normalize_import_target(raw_target)
         if not target or target in seen:
             continue
         seen.add(target)
-        try:
-            db_host = hostRepository.getHostInformation(target)
-        except Exception as repo_exc:
-            print(
-                f"Warning: unable to check existing host '{target}': {repo_exc}",
-                file=sys.stderr
-            )
-            continue
-        if db_host:
-            continue
-        try:
-            existing_hostname = hostRepository.getHostByHostname(target)
-        except Exception:
-            existing_hostname = None
-        if existing_hostname:
-            continue
-        hid = hostObj(
-            ip=target,
-            ipv4=target,
-            ipv6='',
-            macaddr='',
-            status='',
-            hostname=target,
-            vendor='',
-            uptime='',
-            lastboot='',
-            distance='',
-            state='',
-            count='',
+        candidates.append(target)
+    if not candidates:
+        return []
+
+    try:
+        existing = hostRepository.getExistingHostKeys(candidates)
+    except Exception as repo_exc:
+        print(
+            f"Warning: unable to check existing hosts: {repo_exc}",
+            file=sys.stderr
         )
-        try:
-            session.add(hid)
-            session.commit()
-            added_targets.append(target)
-        except Exception as db_exc:
-            session.rollback()
-            print(
-                f"Error importing target '{target}': {db_exc}",
-                file=sys.stderr
-            )
+        return []
+
+    added_targets = [target for target in candidates if target not in existing]
+    if not added_targets:
+        return []
+    try:
+        hostRepository.addHostsBulk([_host_row_for_target(target) for target in added_targets])
+    except Exception as db_exc:
+        session.rollback()
+        print(
+            f"Error importing {len(added_targets)} target(s): {db_exc}",
+            file=sys.stderr
+        )
+        return []
     return added_targets
 
 
-def import_targets_from_textfile(session, hostRepository, filename):
+def read_targets_from_textfile(filename) -> Optional[List[str]]:
     """
-    Import targets (hostnames, subnets, IPs, etc.) from a text file into the database.
-    Each line is treated as a target.
+    Read targets from a text file, one per line, skipping blank lines and '#' comments.
+    Returns None (after reporting the error) if the file cannot be read.
     """
-    raw_targets = []
+    targets: List[str] = []
     try:
         with open(filename, "r", encoding="utf-8", errors="ignore") as f:
             for line in f:
-                raw_targets.append(line)
+                target = line.strip()
+                if target and not target.startswith("#"):
+                    targets.append(target)
     except FileNotFoundError:
         print(f"Error: input file '{filename}' not found.", file=sys.stderr)
-        return 0
+        return None
     except OSError as exc:
         print(f"Error opening input file '{filename}': {exc}", file=sys.stderr)
+        return None
+    return targets
+
+
+def import_targets_from_textfile(session, hostRepository, filename):
+    """
+    Import targets (hostnames, subnets, IPs, etc.) from a text file into the database.
+    Each line is treated as a target.
+    """
+    targets = read_targets_from_textfile(filename)
+    if targets is None:
         return 0
-    return len(import_targets(session, hostRepository, raw_targets))
+    return len(import_targets(session, hostRepository, targets))
 
 def is_wsl():
     try:
@@ -182,3 +205,28 @@ def run_nmap_scan(targets, output_prefix, discovery=True, staged=False, nmap_pat
             print(f"Error running nmap: {e}", file=sys.stderr)
             return None
         return output_prefix + ".xml"
+
+
+def start_nmap_scan(targets, output_prefix, discovery=True, staged=False, nmap_path="nmap") -> Future:
+    """
+    Start run_nmap_scan() on a background thread so the caller can keep working (e.g. ingesting
+    targets) while nmap runs. Returns a Future resolving to the XML output path (or None on failure).
+    """
+    future: Future = Future()
+
+    def _worker():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(run_nmap_scan(
+                targets,
+                output_prefix,
+                discovery=discovery,
+                staged=staged,
+                nmap_path=nmap_path,
+            ))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=_worker, name="legion-cli-nmap", daemon=True).start()
+    return future
@@ -8,7 +8,44 @@ import configparser
 import csv
 import io
 import os
-from typing import Iterable, Optional
+from typing import Dict, Iterable, Optional, Tuple
+
+# path -> ((st_mtime_ns, st_size), parsed sections); only flat files that took the fast path are cached.
+_PARSED_FILE_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict[str, str]]]] = {}
+
+
+def _parse_simple_ini(text: str) -> Optional[Dict[str, Dict[str, str]]]:
+    """Parse flat ``[section]`` / ``key=value`` INI text in a single pass.
+
+    Returns ``None`` for anything outside that subset (continuation lines, keys before the first
+    section, duplicates, ``DEFAULT``) so the caller can defer to configparser and its errors.
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    current = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        if line[0].isspace():
+            return None
+        if stripped[0] == "[":
+            name = stripped[1:-1]
+            if stripped[-1] != "]" or not name or name in sections or name == configparser.DEFAULTSECT:
+                return None
+            current = sections[name] = {}
+            continue
+        if current is None:
+            return None
+        # configparser splits on whichever delimiter comes first.
+        delimiter = stripped.find("=")
+        colon = stripped.find(":", 0, delimiter if delimiter >= 0 else len(stripped))
+        if colon >= 0:
+            delimiter = colon
+        key = stripped[:delimiter].rstrip() if delimiter > 0 else ""
+        if not key or key in current:
+            return None
+        current[key] = stripped[delimiter + 1:].lstrip()
+    return sections
 
 
 class IniSettingsStore:
@@ -26,7 +63,28 @@ class IniSettingsStore:
         self._parser = configparser.ConfigParser(interpolation=None)
         self._parser.optionxform = str
         if os.path.exists(self._file_path):
-            self._parser.read(self._file_path, encoding="utf-8")
+            try:
+                self._read_file()
+            except OSError:
+                # Like ConfigParser.read(), treat an unreadable or vanished file as empty.
+                pass
+
+    def _read_file(self):
+        stat = os.stat(self._file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _PARSED_FILE_CACHE.get(self._file_path)
+        if cached is not None and cached[0] == signature:
+            self._parser.read_dict(cached[1])
+            return
+        with open(self._file_path, "r", encoding="utf-8") as handle:
+            text = handle.read()
+        parsed = _parse_simple_ini(text)
+        if parsed is None:
+            _PARSED_FILE_CACHE.pop(self._file_path, None)
+            self._parser.read_string(text, source=self._file_path)
+            return
+        _PARSED_FILE_CACHE[self._file_path] = (signature, parsed)
+        self._parser.read_dict(parsed)
 
     def fileName(self) -> str:
         return self._file_path
@@ -89,6 +147,7 @@ class IniSettingsStore:
             os.makedirs(parent, exist_ok=True)
         with open(self._file_path, "w", encoding="utf-8") as handle:
             self._parser.write(handle, space_around_delimiters=False)
+        _PARSED_FILE_CACHE.pop(self._file_path, None)
 
     def _current_section(self) -> str:
         if not self._groups:
@@ -0,0 +1,300 @@
+"""
+LEGION (https://shanewilliamscott.com)
+Copyright (c) 2025 Shane William Scott
+
+    This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later
+    version.
+
+    This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+    details.
+
+    You should have received a copy of the GNU General Public License along with this program.
+    If not, see <http://www.gnu.org/licenses/>.
+
+Author(s): Shane Scott (sscott@shanewilliamscott.com), Dmitriy Dubson (d.dubson@gmail.com)
+"""
+
+import binascii
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency path
+    orjson = None
+
+from db.entities.host import hostObj
+from db.entities.l1script import l1ScriptObj
+from db.entities.note import note
+from db.entities.port import portObj
+from db.entities.service import serviceObj
+
+_CVE_EXPORT_QUERY = text(
+    'SELECT hosts.ip AS hostIP, cves.name, cves.severity, cves.product, cves.version, cves.url, cves.source, '
+    'cves.exploitId, cves.exploit, cves.exploitUrl FROM cve AS cves '
+    'INNER JOIN hostObj AS hosts ON hosts.id = cves.hostId'
+)
+
+
+def _entity_columns(entity_cls) -> Tuple[str, ...]:
+    return tuple(column.key for column in entity_cls.__table__.columns)
+
+
+# Column names used to serialize ORM rows for export, resolved once at import.
+HOST_EXPORT_COLUMNS = _entity_columns(hostObj)
+PORT_EXPORT_COLUMNS = _entity_columns(portObj)
+SERVICE_EXPORT_COLUMNS = _entity_columns(serviceObj)
+SCRIPT_EXPORT_COLUMNS = _entity_columns(l1ScriptObj)
+
+
+def entity_to_export_dict(entity, columns: Tuple[str, ...]) -> dict:
+    """
+    Build a plain dict of an ORM row's column values (no relationships, no SQLAlchemy state).
+    """
+    return {name: getattr(entity, name, None) for name in columns}
+
+
+def _group_rows(rows: List[dict], key: str) -> Dict[str, List[dict]]:
+    grouped: Dict[str, List[dict]] = {}
+    for row in rows:
+        grouped.setdefault(str(row[key]), []).append(row)
+    return grouped
+
+
+def _query_export_rows(session, entity_cls, columns: Tuple[str, ...]) -> List[dict]:
+    try:
+        return [entity_to_export_dict(entity, columns) for entity in session.query(entity_cls).all()]
+    except Exception:
+        return []
+
+
+def build_host_payload(
+        host: dict,
+        ports_by_host: Dict[str, List[dict]],
+        services_by_id: Dict[str, dict],
+        scripts_by_port: Dict[str, List[dict]],
+        notes_by_host: Dict[str, str],
+        cves_by_ip: Dict[str, List[dict]],
+) -> dict:
+    """
+    Assemble one host's export dict from the prefetched lookup tables.
+    """
+    host_dict = dict(host)
+    ports_data = []
+    for port in ports_by_host.get(str(host['id']), []):
+        port_dict = dict(port)
+        service = services_by_id.get(str(port['serviceId'])) if port['serviceId'] else None
+        if service:
+            port_dict['service'] = dict(service)
+        port_dict['scripts'] = [dict(script) for script in scripts_by_port.get(str(port['id']), [])]
+        ports_data.append(port_dict)
+    host_dict['ports'] = ports_data
+    host_dict['note'] = notes_by_host.get(str(host['id']), "")
+    host_dict['cves'] = [dict(cve) for cve in cves_by_ip.get(str(host['ip']), [])]
+    return host_dict
+
+
+def iter_export_hosts(database) -> Iterator[Dict[str, Any]]:
+    """
+    Prefetch hosts, ports, services, scripts, notes and CVEs with one query per table inside a single
+    read transaction, then yield the per-host export dicts one at a time.
+    """
+    session = Session(bind=database.engine)
+    try:
+        with session.begin():
+            hosts = _query_export_rows(session, hostObj, HOST_EXPORT_COLUMNS)
+            ports_by_host = _group_rows(_query_export_rows(session, portObj, PORT_EXPORT_COLUMNS), 'hostId')
+            services_by_id = {
+                str(service['id']): service
+                for service in _query_export_rows(session, serviceObj, SERVICE_EXPORT_COLUMNS)
+            }
+            scripts_by_port = _group_rows(
+                _query_export_rows(session, l1ScriptObj, SCRIPT_EXPORT_COLUMNS),
+                'portId',
+            )
+            notes_by_host: Dict[str, str] = {}
+            try:
+                for host_note in session.query(note).all():
+                    notes_by_host.setdefault(str(host_note.hostId), host_note.text)
+            except Exception:
+                pass
+            cves_by_ip: Dict[str, List[dict]] = {}
+            try:
+                for row in session.execute(_CVE_EXPORT_QUERY).mappings():
+                    cve_dict = dict(row)
+                    cves_by_ip.setdefault(str(cve_dict.pop('hostIP')), []).append(cve_dict)
+            except Exception:
+                pass
+    finally:
+        session.close()
+
+    for host in hosts:
+        yield build_host_payload(host, ports_by_host, services_by_id, scripts_by_port, notes_by_host, cves_by_ip)
+
+
+# Screenshooter writes lowercase .png; tuple endswith avoids a lowercased copy of every name.
+_SCREENSHOT_SUFFIXES = (".png", ".PNG")
+
+# Multiple of 3 bytes so chunk encodings concatenate without padding in between.
+_BASE64_READ_CHUNK = 3 * 32768
+
+
+def encode_file_base64(path: str) -> str:
+    """
+    Base64-encode a file in fixed-size chunks rather than reading it into memory whole.
+    """
+    encoded = bytearray()
+    with open(path, "rb") as f:
+        while chunk := f.read(_BASE64_READ_CHUNK):
+            encoded += binascii.b2a_base64(chunk, newline=False)
+    return encoded.decode("ascii")
+
+
+def _iter_screenshot_files(screenshots_dir: str) -> Iterator[Tuple[str, str]]:
+    try:
+        entries = os.scandir(screenshots_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    with entries:
+        for entry in entries:
+            if entry.name.endswith(_SCREENSHOT_SUFFIXES) and entry.is_file():
+                yield entry.name, entry.path
+
+
+def _encode_screenshot(path: str) -> str:
+    try:
+        return encode_file_base64(path)
+    except Exception as e:
+        return f"ERROR: {e}"
+
+
+# Bounded buffers between the export stages so a slow stage applies back-pressure instead of
+# letting the others run ahead and hold the whole export in memory.
+_EXPORT_QUEUE_SIZE = 16
+_PIPELINE_DONE = object()
+
+
+def _encode_json(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+def _encode_export_item(item: Tuple[str, Any]) -> Tuple[str, bytes]:
+    kind, value = item
+    if kind == "screenshot":
+        name, path = value
+        return kind, _encode_json(name) + b": " + _encode_json(_encode_screenshot(path))
+    return kind, _encode_json(value)
+
+
+def _drain(source: queue.Queue):
+    while source.get() is not _PIPELINE_DONE:
+        pass
+
+
+def _produce_export_items(project, sink: queue.Queue, cancelled: threading.Event, errors: list):
+    try:
+        for host in iter_export_hosts(project.database):
+            if cancelled.is_set():
+                return
+            sink.put(("host", host))
+        screenshots_dir = os.path.join(project.properties.outputFolder, "screenshots")
+        for screenshot in _iter_screenshot_files(screenshots_dir):
+            if cancelled.is_set():
+                return
+            sink.put(("screenshot", screenshot))
+    except Exception as exc:
+        errors.append(exc)
+        cancelled.set()
+    finally:
+        sink.put(_PIPELINE_DONE)
+
+
+def _encode_export_items(source: queue.Queue, sink: queue.Queue, cancelled: threading.Event, errors: list):
+    try:
+        while (item := source.get()) is not _PIPELINE_DONE:
+            if cancelled.is_set():
+                continue
+            try:
+                sink.put(_encode_export_item(item))
+            except Exception as exc:
+                errors.append(exc)
+                cancelled.set()
+    finally:
+        sink.put(_PIPELINE_DONE)
+
+
+def _write_export_chunks(source: queue.Queue, output_file: str, cancelled: threading.Event):
+    finished = False
+    try:
+        with open(output_file, "wb") as f:
+            f.write(b'{\n"hosts": [')
+            section, first = "host", True
+            while (item := source.get()) is not _PIPELINE_DONE:
+                kind, chunk = item
+                if kind != section:
+                    f.write(b'\n],\n"screenshots": {')
+                    section, first = kind, True
+                f.write(b"\n" if first else b",\n")
+                f.write(chunk)
+                first = False
+            finished = True
+            if section == "host":
+                f.write(b'\n],\n"screenshots": {')
+            f.write(b"\n}\n}\n")
+    finally:
+        if not finished:
+            cancelled.set()
+            _drain(source)
+
+
+def export_project_json(project, output_file: str):
+    """
+    Write the project's hosts and screenshots to output_file as one JSON object, with each host and
+    screenshot entry serialized compactly on its own line.
+
+    Reading rows, encoding (JSON and base64) and writing run as three stages connected by bounded
+    queues: a producer thread, an encoder thread and the calling thread as the single writer.
+    """
+    items: queue.Queue = queue.Queue(_EXPORT_QUEUE_SIZE)
+    chunks: queue.Queue = queue.Queue(_EXPORT_QUEUE_SIZE)
+    cancelled = threading.Event()
+    errors: list = []
+    stages = [
+        threading.Thread(target=_produce_export_items, args=(project, items, cancelled, errors), daemon=True),
+        threading.Thread(target=_encode_export_items, args=(items, chunks, cancelled, errors), daemon=True),
+    ]
+    for stage in stages:
+        stage.start()
+    try:
+        _write_export_chunks(chunks, output_file, cancelled)
+    finally:
+        for stage in reversed(stages):
+            stage.join()
+    if errors:
+        raise errors[0]
+
+
+def export_project_legion(logic, output_file: str, *, keep_open: bool = False):
+    """
+    Save logic's temporary project as a .legion file, renaming it into place when possible.
+
+    Either path removes the temporary database. With keep_open, logic.activeProject is left on the saved
+    file, so a runtime sharing logic (the in-process MCP server) keeps reading the exported hosts.
+    """
+    project_manager = logic.projectManager
+    project = logic.activeProject
+    if project_manager.moveTemporaryProjectTo(project, output_file, projectType="legion"):
+        if keep_open:
+            logic.openExistingProject(output_file, projectType="legion")
+        return
+    logic.activeProject = project_manager.saveProjectAs(project, output_file, replace=1, projectType="legion")
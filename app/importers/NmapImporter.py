@@ -88,6 +88,9 @@ from time import time
 
 appLog = getAppLogger()
 
+# New hosts are committed in batches rather than one transaction per host.
+HOST_COMMIT_BATCH_SIZE = 500
+
 class NmapImporter(QtCore.QThread):
     tick = QtCore.pyqtSignal(int, name="changed")  # New style signal
     done = QtCore.pyqtSignal(name="done")  # New style signal
@@ -255,8 +258,11 @@ class NmapImporter(QtCore.QThread):
 
             last_update_time = time()
             update_interval = 1.0
+            pending_hosts = 0
             for h in allHosts:  # create all the hosts that need to be created
                 if self._cancel_requested:
+                    if pending_hosts:
+                        session.commit()
                     self.tsLog("Import canceled by user.")
                     if self.updateProgressObservable is not None:
                         self.updateProgressObservable.finished()
@@ -273,10 +279,11 @@ class NmapImporter(QtCore.QThread):
                     )
                     self.tsLog("Adding db_host")
                     session.add(hid)
-                    session.commit()
-                    t_note = note(h.ip, 'Added by nmap')
-                    session.add(t_note)
-                    session.commit()
+                    session.add(note(h.ip, 'Added by nmap'))
+                    pending_hosts += 1
+                    if pending_hosts >= HOST_COMMIT_BATCH_SIZE:
+                        session.commit()
+                        pending_hosts = 0
                 else:
                     self.tsLog("Found db_host already in db")
 
@@ -293,6 +300,9 @@ class NmapImporter(QtCore.QThread):
                     self.progressUpdated.emit(int(createProgress), 'Adding hosts...')
                     last_update_time = now
 
+            if pending_hosts:
+                session.commit()
+
             if self.updateProgressObservable is not None:
                 self.updateProgressObservable.updateProgress(
                     int(createOsNodesProgress), 'Creating Service, Port and OS children...'
@@ -1,8 +1,10 @@
 import asyncio
 import json
 import os
+import stat
 import sys
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Optional, TextIO
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -650,26 +652,102 @@ class MCPServer:
             "error": {"code": -32601, "message": "Method not found"},
         }
 
-    async def run(self):
+    async def handle_line(self, line: bytes) -> Dict[str, Any]:
+        request = None
+        try:
+            request = json.loads(line.decode())
+            return await self.handle_request(request)
+        except Exception as exc:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id") if isinstance(request, dict) else None,
+                "error": {"code": -32000, "message": str(exc)},
+            }
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve newline-delimited JSON-RPC requests for one stream connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_line(line)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def run(self, output: Optional[TextIO] = None):
+        """Serve newline-delimited JSON-RPC over stdin and ``output`` (stdout by default)."""
+        stream = output if output is not None else sys.stdout
         reader = asyncio.StreamReader()
         protocol = asyncio.StreamReaderProtocol(reader)
-        await asyncio.get_event_loop().connect_read_pipe(lambda: protocol, sys.stdin)
+        await asyncio.get_running_loop().connect_read_pipe(lambda: protocol, sys.stdin)
 
         while True:
             line = await reader.readline()
             if not line:
                 break
-            try:
-                request = json.loads(line.decode())
-                response = await self.handle_request(request)
-                print(json.dumps(response), flush=True)
-            except Exception as exc:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": request.get("id") if "request" in locals() else None,
-                    "error": {"code": -32000, "message": str(exc)},
-                }
-                print(json.dumps(error_response), flush=True)
+            response = await self.handle_line(line)
+            stream.write(json.dumps(response) + "\n")
+            stream.flush()
+
+    async def serve_unix_socket(self, path: str):
+        """Serve MCP on a unix socket that only the current user can connect to."""
+        socket_dir = os.path.dirname(os.path.abspath(path))
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise FileExistsError(f"MCP socket path exists and is not a socket: {path}")
+            os.remove(path)
+        # Bind under a restrictive umask so the socket is never reachable by other users, even briefly.
+        previous_umask = os.umask(0o177)
+        try:
+            unix_server = await asyncio.start_unix_server(self.serve, path=path)
+        finally:
+            os.umask(previous_umask)
+        os.chmod(path, 0o600)
+        try:
+            async with unix_server:
+                await unix_server.serve_forever()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def claim_stdout() -> TextIO:
+    """Reserve the real stdout for MCP responses and route other in-process prints to stderr."""
+    protocol_stream = sys.stdout
+    sys.stdout = sys.stderr
+    return protocol_stream
+
+
+async def main(runtime=None, socket_path: Optional[str] = None, output: Optional[TextIO] = None):
+    """Serve MCP inside the caller's event loop, over stdio unless a unix socket path is given."""
+    server = MCPServer(runtime=runtime)
+    if socket_path:
+        await server.serve_unix_socket(socket_path)
+    else:
+        await server.run(output=output)
+
+
+def start_in_thread(
+    runtime=None,
+    socket_path: Optional[str] = None,
+    output: Optional[TextIO] = None,
+) -> threading.Thread:
+    """Serve MCP on a daemon thread for modes without an asyncio loop (web, headless)."""
+    from app.logging.legionLog import getAppLogger
+
+    def _serve():
+        try:
+            asyncio.run(main(runtime=runtime, socket_path=socket_path, output=output))
+        except Exception:
+            getAppLogger().exception("MCP server stopped unexpectedly")
+
+    thread = threading.Thread(target=_serve, name="legion-mcp-server", daemon=True)
+    thread.start()
+    return thread
 
 
 if __name__ == "__main__":
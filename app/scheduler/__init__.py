@@ -41,6 +41,7 @@ from app.scheduler.policy import (
 )
 from app.scheduler.providers import (
     ProviderError,
+    rank_actions_batch,
     rank_actions_with_provider,
     select_web_followup_with_provider,
     test_provider_connection,
@@ -135,6 +136,7 @@ __all__ = [
     "ProviderError",
     "preset_from_legacy_goal_profile",
     "query_evidence_graph",
+    "rank_actions_batch",
     "rank_actions_with_provider",
     "render_host_report_markdown",
     "render_project_report_markdown",
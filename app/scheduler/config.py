@@ -1,10 +1,19 @@
+import copy
 import json
 import os
+import tempfile
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency path
+    orjson = None
 
 from app.device_categories import normalize_custom_device_category_rules
-from app.paths import ensure_legion_home, get_scheduler_config_path
+from app.paths import ensure_legion_home, get_legion_home, get_scheduler_config_path
 from app.scheduler.policy_engine import VALID_FAMILY_POLICY_STATES
 from app.scheduler.policy import (
     legacy_goal_profile_from_policy,
@@ -64,6 +73,57 @@ DEFAULT_INTEGRATIONS = {
     }
 }
 DEFAULT_DEVICE_CATEGORIES: List[Dict[str, Any]] = []
+DEFAULT_AI_FEEDBACK = {
+    "enabled": True,
+    "max_rounds_per_target": 5,
+    "max_actions_per_round": 6,
+    "recent_output_chars": 900,
+    "reflection_enabled": True,
+    "stall_rounds_without_progress": 2,
+    "stall_repeat_selection_threshold": 2,
+    "max_reflections_per_target": 1,
+}
+DEFAULT_PROJECT_REPORT_DELIVERY = {
+    "provider_name": "",
+    "endpoint": "",
+    "method": "POST",
+    "format": "json",
+    "headers": {},
+    "timeout_seconds": 30,
+    "mtls": {
+        "enabled": False,
+        "client_cert_path": "",
+        "client_key_path": "",
+        "ca_cert_path": "",
+    },
+}
+VALID_DELIVERY_METHODS = {"POST", "PUT", "PATCH"}
+VALID_DELIVERY_FORMATS = {"json", "md"}
+DELIVERY_FORMAT_ALIASES = {"markdown": "md"}
+
+# (key, fallback, minimum, maximum) for the integer settings clamped by _normalize_config.
+TOP_LEVEL_INT_LIMITS = (
+    ("max_concurrency", 1, 1, 16),
+    ("max_host_concurrency", 1, 1, 8),
+    ("max_jobs", 200, 20, 2000),
+)
+AI_FEEDBACK_INT_LIMITS = (
+    ("max_rounds_per_target", 4, 1, 12),
+    ("max_actions_per_round", 2, 1, 8),
+    ("recent_output_chars", 900, 320, 4000),
+    ("stall_rounds_without_progress", 2, 1, 6),
+    ("stall_repeat_selection_threshold", 2, 1, 8),
+    ("max_reflections_per_target", 1, 0, 4),
+)
+DELIVERY_TIMEOUT_LIMITS = (30, 5, 300)
+
+
+def _clamped_int(value: Any, fallback: int, minimum: int, maximum: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = fallback
+    return max(minimum, min(number, maximum))
 
 
 def normalize_feature_flags(raw: Any) -> Dict[str, bool]:
@@ -167,7 +227,88 @@ def normalize_device_categories(raw: Any) -> List[Dict[str, Any]]:
     return normalize_custom_device_category_rules(raw)
 
 
-DEFAULT_SCHEDULER_CONFIG = {
+def normalize_ai_feedback(raw: Any) -> Dict[str, Any]:
+    source = dict(DEFAULT_AI_FEEDBACK)
+    if isinstance(raw, dict):
+        source.update(raw)
+
+    feedback = {
+        "enabled": bool(source.get("enabled", True)),
+        "reflection_enabled": bool(source.get("reflection_enabled", True)),
+    }
+    for key, fallback, minimum, maximum in AI_FEEDBACK_INT_LIMITS:
+        feedback[key] = _clamped_int(source.get(key, fallback), fallback, minimum, maximum)
+    return feedback
+
+
+def normalize_project_report_delivery(raw: Any) -> Dict[str, Any]:
+    source = dict(DEFAULT_PROJECT_REPORT_DELIVERY)
+    if isinstance(raw, dict):
+        source.update(raw)
+
+    method = str(source.get("method", "POST")).strip().upper()
+    if method not in VALID_DELIVERY_METHODS:
+        method = "POST"
+
+    delivery_format = str(source.get("format", "json")).strip().lower()
+    delivery_format = DELIVERY_FORMAT_ALIASES.get(delivery_format, delivery_format)
+    if delivery_format not in VALID_DELIVERY_FORMATS:
+        delivery_format = "json"
+
+    headers_raw = source.get("headers", {})
+    if isinstance(headers_raw, str):
+        try:
+            headers_raw = json.loads(headers_raw)
+        except Exception:
+            headers_raw = {}
+    if not isinstance(headers_raw, dict):
+        headers_raw = {}
+    headers = {}
+    for header_name, header_value in headers_raw.items():
+        label = str(header_name or "").strip()
+        if not label:
+            continue
+        headers[label] = str(header_value or "")
+
+    mtls_source = dict(DEFAULT_PROJECT_REPORT_DELIVERY["mtls"])
+    mtls_raw = source.get("mtls", {})
+    if isinstance(mtls_raw, dict):
+        mtls_source.update(mtls_raw)
+
+    return {
+        "provider_name": str(source.get("provider_name", "") or ""),
+        "endpoint": str(source.get("endpoint", "") or ""),
+        "method": method,
+        "format": delivery_format,
+        "headers": headers,
+        "timeout_seconds": _clamped_int(source.get("timeout_seconds", 30), *DELIVERY_TIMEOUT_LIMITS),
+        "mtls": {
+            "enabled": bool(mtls_source.get("enabled", False)),
+            "client_cert_path": str(mtls_source.get("client_cert_path", "") or ""),
+            "client_key_path": str(mtls_source.get("client_key_path", "") or ""),
+            "ca_cert_path": str(mtls_source.get("ca_cert_path", "") or ""),
+        },
+    }
+
+
+def _freeze_config(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze_config(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze_config(item) for item in value)
+    return value
+
+
+def _thaw_config(value: Any) -> Any:
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw_config(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw_config(item) for item in value]
+    return value
+
+
+# Read-only template; get_default_scheduler_config() hands out mutable copies.
+DEFAULT_SCHEDULER_CONFIG = _freeze_config({
     "mode": "deterministic",
     "goal_profile": "internal_asset_discovery",
     "engagement_policy": normalize_engagement_policy(
@@ -214,40 +355,78 @@ DEFAULT_SCHEDULER_CONFIG = {
         "destructive_write_actions",
     ],
     "preapproved_command_families": [],
-    "ai_feedback": {
-        "enabled": True,
-        "max_rounds_per_target": 5,
-        "max_actions_per_round": 6,
-        "recent_output_chars": 900,
-        "reflection_enabled": True,
-        "stall_rounds_without_progress": 2,
-        "stall_repeat_selection_threshold": 2,
-        "max_reflections_per_target": 1,
-    },
+    "ai_feedback": DEFAULT_AI_FEEDBACK,
     "runners": normalize_runner_settings({}),
-    "project_report_delivery": {
-        "provider_name": "",
-        "endpoint": "",
-        "method": "POST",
-        "format": "json",
-        "headers": {},
-        "timeout_seconds": 30,
-        "mtls": {
-            "enabled": False,
-            "client_cert_path": "",
-            "client_key_path": "",
-            "ca_cert_path": "",
-        },
-    },
-}
+    "project_report_delivery": DEFAULT_PROJECT_REPORT_DELIVERY,
+})
 
 VALID_MODES = {"deterministic", "ai"}
 VALID_GOAL_PROFILES = {"internal_asset_discovery", "external_pentest"}
+# Normalized configs by absolute path, tagged with the (st_mtime_ns, st_size) of the file they
+# were read from or written to, so new managers in the same process can skip the read/normalize/save cycle.
+_LOAD_CACHE: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+
+def _config_file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_default_scheduler_config() -> Dict[str, Any]:
+    return _thaw_config(DEFAULT_SCHEDULER_CONFIG)
+
+
+def _encode_config(config: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(config, indent=2, sort_keys=True).encode("utf-8")
+
+
+def _write_config_atomically(path: str, data: bytes):
+    # Write to a sibling temp file, fsync once, then rename over the target so readers never
+    # observe a partially written config. The directory is re-created here because the memoized
+    # default path outlives a LEGION_HOME that was removed after it was first resolved.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".scheduler-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@lru_cache(maxsize=1)
+def _default_config_json() -> bytes:
+    return _encode_config(SchedulerConfigManager._normalize_config(get_default_scheduler_config()))
+
+
+# Resolved LEGION_HOME -> scheduler config path; the home directory is created only the first
+# time each home is seen.
+_DEFAULT_CONFIG_PATHS: Dict[str, str] = {}
 
 
 def get_default_scheduler_config_path() -> str:
-    ensure_legion_home()
-    return get_scheduler_config_path("scheduler-ai.json")
+    home = get_legion_home()
+    path = _DEFAULT_CONFIG_PATHS.get(home)
+    if path is None:
+        ensure_legion_home()
+        path = get_scheduler_config_path("scheduler-ai.json")
+        _DEFAULT_CONFIG_PATHS[home] = path
+    return path
 
 
 class SchedulerConfigManager:
@@ -259,26 +438,41 @@ class SchedulerConfigManager:
         if self._cache is not None:
             return self._cache
 
-        if not os.path.exists(self.config_path):
-            self._cache = self._normalize_config(dict(DEFAULT_SCHEDULER_CONFIG))
-            self.save(self._cache)
+        signature = _config_file_signature(self.config_path)
+        cached = _LOAD_CACHE.get(os.path.abspath(self.config_path))
+        if signature is not None and cached is not None and cached[:2] == signature:
+            self._cache = copy.deepcopy(cached[2])
+            return self._cache
+
+        if signature is None:
+            default_json = _default_config_json()
+            self._cache = json.loads(default_json)
+            _write_config_atomically(self.config_path, default_json)
+            self._remember(self._cache)
             return self._cache
 
         try:
             with open(self.config_path, "r", encoding="utf-8") as handle:
                 parsed = json.load(handle)
         except Exception:
-            parsed = dict(DEFAULT_SCHEDULER_CONFIG)
+            parsed = get_default_scheduler_config()
 
         self._cache = self._normalize_config(parsed)
         self.save(self._cache)
         return self._cache
 
     def save(self, config: Dict[str, Any]):
-        normalized = self._normalize_config(config)
-        with open(self.config_path, "w", encoding="utf-8") as handle:
-            json.dump(normalized, handle, indent=2, sort_keys=True)
+        self._save_normalized(self._normalize_config(config))
+
+    def _save_normalized(self, normalized: Dict[str, Any]):
+        _write_config_atomically(self.config_path, _encode_config(normalized))
         self._cache = normalized
+        self._remember(normalized)
+
+    def _remember(self, config: Dict[str, Any]):
+        signature = _config_file_signature(self.config_path)
+        if signature is not None:
+            _LOAD_CACHE[os.path.abspath(self.config_path)] = (*signature, copy.deepcopy(config))
 
     def merge_preferences(self, updates: Dict[str, Any]) -> Dict[str, Any]:
         current = self.load()
@@ -365,8 +559,10 @@ class SchedulerConfigManager:
         return self._normalize_config(merged)
 
     def update_preferences(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+        # merge_preferences already returns a normalized config; normalizing is idempotent, so
+        # write it as-is rather than running the full defaults overlay a second time.
         normalized = self.merge_preferences(updates)
-        self.save(normalized)
+        self._save_normalized(normalized)
         return self.load()
 
     def get_mode(self) -> str:
@@ -487,7 +683,8 @@ class SchedulerConfigManager:
 
     @staticmethod
     def _normalize_config(raw: Dict[str, Any]) -> Dict[str, Any]:
-        config = dict(DEFAULT_SCHEDULER_CONFIG)
+        defaults = get_default_scheduler_config()
+        config = dict(defaults)
         config.update({k: v for k, v in raw.items() if k in config})
 
         mode = str(config.get("mode", "deterministic")).strip().lower()
@@ -514,25 +711,10 @@ class SchedulerConfigManager:
         provider = str(config.get("provider", "none")).strip().lower()
         config["provider"] = provider
 
-        try:
-            max_concurrency = int(raw.get("max_concurrency", config.get("max_concurrency", 1)))
-        except (TypeError, ValueError):
-            max_concurrency = 1
-        config["max_concurrency"] = max(1, min(max_concurrency, 16))
-
-        try:
-            max_host_concurrency = int(raw.get("max_host_concurrency", config.get("max_host_concurrency", 1)))
-        except (TypeError, ValueError):
-            max_host_concurrency = 1
-        config["max_host_concurrency"] = max(1, min(max_host_concurrency, 8))
+        for key, fallback, minimum, maximum in TOP_LEVEL_INT_LIMITS:
+            config[key] = _clamped_int(raw.get(key, config.get(key, fallback)), fallback, minimum, maximum)
 
-        try:
-            max_jobs = int(raw.get("max_jobs", config.get("max_jobs", 200)))
-        except (TypeError, ValueError):
-            max_jobs = 200
-        config["max_jobs"] = max(20, min(max_jobs, 2000))
-
-        providers = dict(DEFAULT_SCHEDULER_CONFIG["providers"])
+        providers = defaults["providers"]
         user_providers = raw.get("providers", {}) if isinstance(raw, dict) else {}
         if isinstance(user_providers, dict):
             for provider_name, provider_cfg in user_providers.items():
@@ -562,7 +744,7 @@ class SchedulerConfigManager:
 
         dangerous_categories = raw.get("dangerous_categories", config["dangerous_categories"])
         if not isinstance(dangerous_categories, list):
-            dangerous_categories = list(DEFAULT_SCHEDULER_CONFIG["dangerous_categories"])
+            dangerous_categories = defaults["dangerous_categories"]
         config["dangerous_categories"] = [str(item) for item in dangerous_categories if item]
 
         families = raw.get("preapproved_command_families", [])
@@ -592,96 +774,6 @@ class SchedulerConfigManager:
             })
         config["preapproved_command_families"] = normalized_families
 
-        feedback_defaults = dict(DEFAULT_SCHEDULER_CONFIG["ai_feedback"])
-        feedback_raw = raw.get("ai_feedback", {})
-        if isinstance(feedback_raw, dict):
-            feedback_defaults.update(feedback_raw)
-
-        feedback = {
-            "enabled": bool(feedback_defaults.get("enabled", True)),
-            "max_rounds_per_target": 4,
-            "max_actions_per_round": 2,
-            "recent_output_chars": 900,
-            "reflection_enabled": bool(feedback_defaults.get("reflection_enabled", True)),
-            "stall_rounds_without_progress": 2,
-            "stall_repeat_selection_threshold": 2,
-            "max_reflections_per_target": 1,
-        }
-        for key in (
-                "max_rounds_per_target",
-                "max_actions_per_round",
-                "recent_output_chars",
-                "stall_rounds_without_progress",
-                "stall_repeat_selection_threshold",
-                "max_reflections_per_target",
-        ):
-            try:
-                feedback[key] = int(feedback_defaults.get(key, feedback[key]))
-            except (TypeError, ValueError):
-                continue
-        feedback["max_rounds_per_target"] = max(1, min(int(feedback["max_rounds_per_target"]), 12))
-        feedback["max_actions_per_round"] = max(1, min(int(feedback["max_actions_per_round"]), 8))
-        feedback["recent_output_chars"] = max(320, min(int(feedback["recent_output_chars"]), 4000))
-        feedback["stall_rounds_without_progress"] = max(1, min(int(feedback["stall_rounds_without_progress"]), 6))
-        feedback["stall_repeat_selection_threshold"] = max(1, min(int(feedback["stall_repeat_selection_threshold"]), 8))
-        feedback["max_reflections_per_target"] = max(0, min(int(feedback["max_reflections_per_target"]), 4))
-        config["ai_feedback"] = feedback
-
-        delivery_defaults = dict(DEFAULT_SCHEDULER_CONFIG["project_report_delivery"])
-        delivery_raw = raw.get("project_report_delivery", {})
-        if isinstance(delivery_raw, dict):
-            delivery_defaults.update(delivery_raw)
-
-        delivery_method = str(delivery_defaults.get("method", "POST")).strip().upper()
-        if delivery_method not in {"POST", "PUT", "PATCH"}:
-            delivery_method = "POST"
-
-        delivery_format = str(delivery_defaults.get("format", "json")).strip().lower()
-        if delivery_format in {"markdown"}:
-            delivery_format = "md"
-        if delivery_format not in {"json", "md"}:
-            delivery_format = "json"
-
-        headers_raw = delivery_defaults.get("headers", {})
-        if isinstance(headers_raw, str):
-            try:
-                parsed_headers = json.loads(headers_raw)
-            except Exception:
-                parsed_headers = {}
-            headers_raw = parsed_headers
-        if not isinstance(headers_raw, dict):
-            headers_raw = {}
-        delivery_headers = {}
-        for header_name, header_value in headers_raw.items():
-            label = str(header_name or "").strip()
-            if not label:
-                continue
-            delivery_headers[label] = str(header_value or "")
-
-        try:
-            timeout_seconds = int(delivery_defaults.get("timeout_seconds", 30))
-        except (TypeError, ValueError):
-            timeout_seconds = 30
-        timeout_seconds = max(5, min(timeout_seconds, 300))
-
-        mtls_defaults = dict(DEFAULT_SCHEDULER_CONFIG["project_report_delivery"]["mtls"])
-        mtls_raw = delivery_defaults.get("mtls", {})
-        if isinstance(mtls_raw, dict):
-            mtls_defaults.update(mtls_raw)
-        delivery_mtls = {
-            "enabled": bool(mtls_defaults.get("enabled", False)),
-            "client_cert_path": str(mtls_defaults.get("client_cert_path", "") or ""),
-            "client_key_path": str(mtls_defaults.get("client_key_path", "") or ""),
-            "ca_cert_path": str(mtls_defaults.get("ca_cert_path", "") or ""),
-        }
-
-        config["project_report_delivery"] = {
-            "provider_name": str(delivery_defaults.get("provider_name", "") or ""),
-            "endpoint": str(delivery_defaults.get("endpoint", "") or ""),
-            "method": delivery_method,
-            "format": delivery_format,
-            "headers": delivery_headers,
-            "timeout_seconds": int(timeout_seconds),
-            "mtls": delivery_mtls,
-        }
+        config["ai_feedback"] = normalize_ai_feedback(raw.get("ai_feedback", {}))
+        config["project_report_delivery"] = normalize_project_report_delivery(raw.get("project_report_delivery", {}))
         return config
@@ -1,9 +1,14 @@
 import datetime
 import json
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy import text
 
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency path
+    orjson = None
+
 from app.scheduler.state import (
     delete_target_state,
     ensure_scheduler_target_state_table,
@@ -67,8 +72,14 @@ def _ensure_table(session):
 
 
 def _as_json(value: Any) -> str:
+    value = value if value is not None else []
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except Exception:
+            pass
     try:
-        return json.dumps(value if value is not None else [], ensure_ascii=False)
+        return json.dumps(value, ensure_ascii=False)
     except Exception:
         return "[]"
 
@@ -77,6 +88,12 @@ def _from_json(value: Any, fallback):
     raw = str(value or "").strip()
     if not raw:
         return fallback
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # stdlib json also accepts NaN/Infinity and arbitrarily large integers.
+            pass
     try:
         parsed = json.loads(raw)
     except Exception:
@@ -127,91 +144,103 @@ def get_host_ai_state(database, host_id: int) -> Optional[Dict[str, Any]]:
         session.close()
 
 
+_UPSERT_HOST_AI_STATE_SQL = text(
+    "INSERT INTO scheduler_host_ai_state ("
+    "host_id, host_ip, updated_at, provider, goal_profile, last_port, last_protocol, last_service, "
+    "hostname, hostname_confidence, os_match, os_confidence, next_phase, technologies_json, findings_json, "
+    "manual_tests_json, raw_json"
+    ") VALUES ("
+    ":host_id, :host_ip, :updated_at, :provider, :goal_profile, :last_port, :last_protocol, :last_service, "
+    ":hostname, :hostname_confidence, :os_match, :os_confidence, :next_phase, :technologies_json, "
+    ":findings_json, :manual_tests_json, :raw_json"
+    ") ON CONFLICT(host_id) DO UPDATE SET "
+    "host_ip = excluded.host_ip, "
+    "updated_at = excluded.updated_at, "
+    "provider = excluded.provider, "
+    "goal_profile = excluded.goal_profile, "
+    "last_port = excluded.last_port, "
+    "last_protocol = excluded.last_protocol, "
+    "last_service = excluded.last_service, "
+    "hostname = excluded.hostname, "
+    "hostname_confidence = excluded.hostname_confidence, "
+    "os_match = excluded.os_match, "
+    "os_confidence = excluded.os_confidence, "
+    "next_phase = excluded.next_phase, "
+    "technologies_json = excluded.technologies_json, "
+    "findings_json = excluded.findings_json, "
+    "manual_tests_json = excluded.manual_tests_json, "
+    "raw_json = excluded.raw_json"
+)
+
+
+def _host_ai_state_row(host_id: int, payload: Dict[str, Any], now: str) -> Dict[str, Any]:
+    return {
+        "host_id": int(host_id),
+        "host_ip": str(payload.get("host_ip", "")),
+        "updated_at": str(payload.get("updated_at", now) or now),
+        "provider": str(payload.get("provider", "")),
+        "goal_profile": str(payload.get("goal_profile", "")),
+        "last_port": str(payload.get("last_port", "")),
+        "last_protocol": str(payload.get("last_protocol", "")),
+        "last_service": str(payload.get("last_service", "")),
+        "hostname": str(payload.get("hostname", "")),
+        "hostname_confidence": float(payload.get("hostname_confidence", 0.0) or 0.0),
+        "os_match": str(payload.get("os_match", "")),
+        "os_confidence": float(payload.get("os_confidence", 0.0) or 0.0),
+        "next_phase": str(payload.get("next_phase", "")),
+        "technologies_json": _as_json(payload.get("technologies", [])),
+        "findings_json": _as_json(payload.get("findings", [])),
+        "manual_tests_json": _as_json(payload.get("manual_tests", [])),
+        "raw_json": _as_json(payload.get("raw", {})),
+    }
+
+
+def _sync_host_target_state(database, host_id: int, payload: Dict[str, Any], updated_at: str):
+    if not bool(payload.get("_sync_target_state", True)):
+        return
+    try:
+        upsert_target_state(
+            database,
+            int(host_id or 0),
+            legacy_ai_payload_to_target_state(int(host_id or 0), {
+                **dict(payload or {}),
+                "updated_at": updated_at,
+            }),
+            merge=True,
+        )
+    except Exception:
+        pass
+
+
 def upsert_host_ai_state(database, host_id: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return upsert_host_ai_states_bulk(database, [(host_id, payload)])[0]
+
+
+def upsert_host_ai_states_bulk(database, items: Iterable[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Upsert several host AI state rows with one executemany and a single commit.
+    Returns the stored row payloads in input order.
+    """
+    items = [(int(host_id), payload or {}) for host_id, payload in (items or [])]
+    if not items:
+        return []
     session = database.session()
     try:
         _ensure_table(session)
         now = _utc_now()
-        sync_target_state = bool(payload.get("_sync_target_state", True))
-        row_payload = {
-            "host_id": int(host_id),
-            "host_ip": str(payload.get("host_ip", "")),
-            "updated_at": str(payload.get("updated_at", now) or now),
-            "provider": str(payload.get("provider", "")),
-            "goal_profile": str(payload.get("goal_profile", "")),
-            "last_port": str(payload.get("last_port", "")),
-            "last_protocol": str(payload.get("last_protocol", "")),
-            "last_service": str(payload.get("last_service", "")),
-            "hostname": str(payload.get("hostname", "")),
-            "hostname_confidence": float(payload.get("hostname_confidence", 0.0) or 0.0),
-            "os_match": str(payload.get("os_match", "")),
-            "os_confidence": float(payload.get("os_confidence", 0.0) or 0.0),
-            "next_phase": str(payload.get("next_phase", "")),
-            "technologies_json": _as_json(payload.get("technologies", [])),
-            "findings_json": _as_json(payload.get("findings", [])),
-            "manual_tests_json": _as_json(payload.get("manual_tests", [])),
-            "raw_json": _as_json(payload.get("raw", {})),
-        }
-
-        existing = session.execute(text(
-            "SELECT host_id FROM scheduler_host_ai_state WHERE host_id = :host_id LIMIT 1"
-        ), {"host_id": int(host_id)}).fetchone()
-
-        if existing is None:
-            session.execute(text(
-                "INSERT INTO scheduler_host_ai_state ("
-                "host_id, host_ip, updated_at, provider, goal_profile, last_port, last_protocol, last_service, "
-                "hostname, hostname_confidence, os_match, os_confidence, next_phase, technologies_json, findings_json, "
-                "manual_tests_json, raw_json"
-                ") VALUES ("
-                ":host_id, :host_ip, :updated_at, :provider, :goal_profile, :last_port, :last_protocol, :last_service, "
-                ":hostname, :hostname_confidence, :os_match, :os_confidence, :next_phase, :technologies_json, "
-                ":findings_json, :manual_tests_json, :raw_json"
-                ")"
-            ), row_payload)
-        else:
-            session.execute(text(
-                "UPDATE scheduler_host_ai_state SET "
-                "host_ip = :host_ip, "
-                "updated_at = :updated_at, "
-                "provider = :provider, "
-                "goal_profile = :goal_profile, "
-                "last_port = :last_port, "
-                "last_protocol = :last_protocol, "
-                "last_service = :last_service, "
-                "hostname = :hostname, "
-                "hostname_confidence = :hostname_confidence, "
-                "os_match = :os_match, "
-                "os_confidence = :os_confidence, "
-                "next_phase = :next_phase, "
-                "technologies_json = :technologies_json, "
-                "findings_json = :findings_json, "
-                "manual_tests_json = :manual_tests_json, "
-                "raw_json = :raw_json "
-                "WHERE host_id = :host_id"
-            ), row_payload)
-
+        rows = [_host_ai_state_row(host_id, payload, now) for host_id, payload in items]
+        session.execute(_UPSERT_HOST_AI_STATE_SQL, rows)
         session.commit()
-        if sync_target_state:
-            try:
-                upsert_target_state(
-                    database,
-                    int(host_id or 0),
-                    legacy_ai_payload_to_target_state(int(host_id or 0), {
-                        **dict(payload or {}),
-                        "updated_at": str(row_payload.get("updated_at", now) or now),
-                    }),
-                    merge=True,
-                )
-            except Exception:
-                pass
-        return row_payload
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
 
+    for (host_id, payload), row_payload in zip(items, rows):
+        _sync_host_target_state(database, host_id, payload, row_payload["updated_at"])
+    return rows
+
 
 def delete_host_ai_state(database, host_id: int) -> int:
     session = database.session()
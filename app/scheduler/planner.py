@@ -1,9 +1,14 @@
 import logging
 import json
+import heapq
 import ipaddress
 import re
 import shlex
+import sys
 import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import compress
 from typing import Any, Dict, List, Optional, Set
 
 from app.hostsfile import normalize_hostname_alias, registrable_root_domain
@@ -26,9 +31,22 @@ logger = logging.getLogger(__name__)
 ScheduledAction = PlanStep
 
 
+def _interned_ids(*values: str) -> frozenset:
+    return frozenset(sys.intern(value) for value in values)
+
+
+@lru_cache(maxsize=None)
+def _compile_token_pattern(tokens: tuple):
+    # One alternation per token set so substring checks run as a single regex scan.
+    cleaned = sorted({str(token or "").strip().lower() for token in tokens}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(token) for token in cleaned)) if cleaned else None
+
+
 class SchedulerPlanner:
-    WEB_SERVICE_IDS = {"http", "https", "ssl", "soap", "http-proxy", "http-alt", "https-alt"}
-    HOST_SCOPED_TOOL_IDS = {"subfinder", "chaos", "grayhatwarfare", "shodan-enrichment", "responder", "ntlmrelayx"}
+    WEB_SERVICE_IDS = frozenset({"http", "https", "ssl", "soap", "http-proxy", "http-alt", "https-alt"})
+    HOST_SCOPED_TOOL_IDS = _interned_ids(
+        "subfinder", "chaos", "grayhatwarfare", "shodan-enrichment", "responder", "ntlmrelayx"
+    )
     WEB_AI_BASELINE_TOOL_IDS = tuple(tool_ids_for_prompt_group("web_baseline"))
     WEB_AI_DEEP_WEB_TOOL_IDS = tuple(tool_ids_for_prompt_group("web_deep"))
     WEB_AI_TARGETED_NUCLEI_TOOL_IDS = tuple(tool_ids_for_prompt_group("web_targeted_nuclei"))
@@ -49,6 +67,27 @@ class SchedulerPlanner:
         "missing_smb_signing_checks",
         "missing_internal_safe_enum",
     }
+    # Coverage-gap groups tested against context["coverage"]["missing"] on every plan call.
+    SCREENSHOT_GAP_IDS = frozenset({"missing_screenshot", "missing_remote_screenshot"})
+    BASELINE_GAP_IDS = frozenset({
+        "missing_discovery",
+        "missing_screenshot",
+        "missing_remote_screenshot",
+        "missing_nmap_vuln",
+        "missing_nuclei_auto",
+        "missing_cpe_cve_enrichment",
+    })
+    WHATWEB_GAP_IDS = frozenset({"missing_whatweb", "missing_technology_fingerprint"})
+    NIKTO_GAP_IDS = frozenset({"missing_nikto", "missing_followup_after_vuln"})
+    WEB_CONTENT_DISCOVERY_GAP_IDS = frozenset({"missing_web_content_discovery", "missing_followup_after_vuln"})
+    DEEP_WEB_GAP_IDS = frozenset({
+        "missing_whatweb",
+        "missing_nikto",
+        "missing_web_content_discovery",
+        "missing_followup_after_vuln",
+    })
+    WEB_FOLLOWUP_GAP_IDS = DEEP_WEB_GAP_IDS | {"missing_http_followup", "missing_cpe_cve_enrichment"}
+    TARGETED_NUCLEI_GAP_IDS = frozenset({"missing_cpe_cve_enrichment", "missing_followup_after_vuln"})
     GENERIC_WEB_TOOL_TOKENS = {
         "http", "https", "ssl", "tls", "web", "proxy", "alt",
         "scan", "scanner", "check", "checker", "test", "testing",
@@ -137,6 +176,9 @@ class SchedulerPlanner:
             "required_signals": ("huawei_detected",),
         },
     )
+    SPECIALIZED_WEB_TOOL_TOKENS = tuple(
+        token for rule in SPECIALIZED_WEB_TOOL_RULES for token in rule["tokens"]
+    )
     RECON_HARD_BLOCK_RISK_TAGS = {
         "credential_bruteforce",
         "password_spray",
@@ -148,6 +190,21 @@ class SchedulerPlanner:
         "persistence_action",
         "data_exfiltration_risk",
     }
+    BASELINE_GAP_VENDOR_TOKENS = ("coldfusion", "vmware", "webdav", "huawei", "drupal", "wordpress", "qnap", "domino")
+    BASELINE_GAP_ALLOWED_TOOL_IDS = _interned_ids(
+        "nmap-vuln.nse",
+        "nuclei-web",
+        "screenshooter",
+        "whatweb",
+        "whatweb-http",
+        "whatweb-https",
+        "nikto",
+        "web-content-discovery",
+        "dirsearch",
+        "ffuf",
+        "banner",
+        "nmap",
+    )
     INTERNAL_QUICK_RECON_PRIORITY_TOKENS = (
         "smb", "netbios", "microsoft-ds", "rpc", "rpcbind", "nfs", "showmount",
         "nbtscan", "ipp", "printer", "jetdirect", "9100", "631", "515",
@@ -159,9 +216,13 @@ class SchedulerPlanner:
         "nuclei-cves", "nuclei-exposures", "wpscan", "nuclei-wordpress",
     )
 
+    ACTION_REGISTRY_CACHE_SIZE = 32
+
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self._thread_state = threading.local()
+        self._registry_cache: "OrderedDict[tuple, ActionRegistry]" = OrderedDict()
+        self._registry_cache_lock = threading.Lock()
 
     def _set_last_provider_payload(self, payload: Optional[Dict[str, Any]] = None):
         try:
@@ -176,33 +237,6 @@ class SchedulerPlanner:
             self._set_last_provider_payload({})
         return result
 
-    def plan_actions(
-            self,
-            service: str,
-            protocol: str,
-            settings,
-            *,
-            context: Optional[Dict[str, Any]] = None,
-            excluded_tool_ids: Optional[List[str]] = None,
-            excluded_family_ids: Optional[List[str]] = None,
-            excluded_command_signatures: Optional[List[str]] = None,
-            limit: Optional[int] = None,
-            engagement_policy: Optional[Dict[str, Any]] = None,
-            mode_override: Optional[str] = None,
-    ) -> List[PlanStep]:
-        return self.plan_steps(
-            service,
-            protocol,
-            settings,
-            context=context,
-            excluded_tool_ids=excluded_tool_ids,
-            excluded_family_ids=excluded_family_ids,
-            excluded_command_signatures=excluded_command_signatures,
-            limit=limit,
-            engagement_policy=engagement_policy,
-            mode_override=mode_override,
-        )
-
     def plan_steps(
             self,
             service: str,
@@ -231,7 +265,7 @@ class SchedulerPlanner:
         excluded.update(self._normalize_tool_id_set(prefs.get("disabled_tool_ids", [])))
         excluded_families = self._normalize_text_token_set(excluded_family_ids)
         excluded_signatures = self._normalize_text_token_set(excluded_command_signatures)
-        registry = self.build_action_registry(settings, dangerous_categories)
+        registry = self._cached_action_registry(settings, dangerous_categories)
 
         if mode == "ai":
             actions = self._plan_ai(
@@ -265,10 +299,40 @@ class SchedulerPlanner:
             limit=limit,
         )
 
+    # plan_actions is the public entry point used by the orchestrator and controller; bind it to
+    # plan_steps directly rather than forwarding every keyword through a wrapper call.
+    plan_actions = plan_steps
+
     @staticmethod
     def build_action_registry(settings, dangerous_categories: Optional[List[str]] = None) -> ActionRegistry:
         return ActionRegistry.from_settings(settings, dangerous_categories=dangerous_categories)
 
+    def _cached_action_registry(self, settings, dangerous_categories: Optional[List[str]] = None) -> ActionRegistry:
+        # Registries are keyed on the contents of the settings action rows, so rows edited in place
+        # (for example from the settings dialog) produce a new key instead of a stale registry.
+        key = (
+            self._action_rows_key(getattr(settings, "portActions", None)),
+            self._action_rows_key(getattr(settings, "automatedAttacks", None)),
+            tuple(dangerous_categories or ()),
+        )
+        with self._registry_cache_lock:
+            cached = self._registry_cache.get(key)
+            if cached is not None:
+                self._registry_cache.move_to_end(key)
+                return cached
+
+        registry = self.build_action_registry(settings, dangerous_categories)
+        with self._registry_cache_lock:
+            self._registry_cache[key] = registry
+            self._registry_cache.move_to_end(key)
+            while len(self._registry_cache) > self.ACTION_REGISTRY_CACHE_SIZE:
+                self._registry_cache.popitem(last=False)
+        return registry
+
+    @staticmethod
+    def _action_rows_key(rows) -> tuple:
+        return tuple(tuple(str(field) for field in row) for row in list(rows or []))
+
     @classmethod
     def _blocked_by_internal_quick_recon(
             cls,
@@ -309,6 +373,9 @@ class SchedulerPlanner:
         for index, action in enumerate(registry.for_deterministic(service_name, protocol_name)):
             tool_id = str(action.tool_id)
             normalized_tool_id = self._normalized_tool_id(tool_id)
+            # Per-call exclusions are a set; test them before building family ids and signatures.
+            if normalized_tool_id in excluded:
+                continue
             action_scope = {
                 str(item or "").strip().lower()
                 for item in list(getattr(action, "service_scope", []) or [])
@@ -326,8 +393,7 @@ class SchedulerPlanner:
             family_id = build_command_family_id(tool_id, protocol_name, action.command_template or tool_id)
             command_signature = self._command_signature(protocol_name, action.command_template or tool_id)
             if (
-                    normalized_tool_id in excluded
-                    or self._normalize_text_token(family_id) in excluded_families
+                    self._normalize_text_token(family_id) in excluded_families
                     or self._normalize_text_token(command_signature) in excluded_signatures
             ):
                 continue
@@ -367,16 +433,24 @@ class SchedulerPlanner:
             )
             self._apply_policy_decision(step, policy)
             ranked_steps.append((index, step))
-        if self._context_has_strategy_signals(context):
-            ranked_steps.sort(key=lambda item: (-float(item[1].score), int(item[0])))
-        decisions = [item[1] for item in ranked_steps]
+        max_items = 0
         if limit is not None:
             try:
                 max_items = int(limit)
             except (TypeError, ValueError):
                 max_items = 0
-            if max_items > 0:
-                return decisions[:max_items]
+        if self._context_has_strategy_signals(context):
+            def _rank_key(item):
+                return -float(item[1].score), int(item[0])
+
+            # Only the top `limit` steps are returned, so avoid a full sort when a small limit is set.
+            if 0 < max_items < len(ranked_steps):
+                ranked_steps = heapq.nsmallest(max_items, ranked_steps, key=_rank_key)
+            else:
+                ranked_steps.sort(key=_rank_key)
+        decisions = [item[1] for item in ranked_steps]
+        if max_items > 0:
+            return decisions[:max_items]
         return decisions
 
     def _plan_ai(self, service: str, protocol: str, registry: ActionRegistry, policy: EngagementPolicy,
@@ -405,6 +479,9 @@ class SchedulerPlanner:
             label = str(action.label)
             tool_id = str(action.tool_id)
             normalized_tool_id = self._normalized_tool_id(tool_id)
+            # Per-call exclusions are a set; test them before building family ids and signatures.
+            if normalized_tool_id in excluded:
+                continue
             action_scope = {
                 str(item or "").strip().lower()
                 for item in list(getattr(action, "service_scope", []) or [])
@@ -422,8 +499,7 @@ class SchedulerPlanner:
             family_id = build_command_family_id(tool_id, protocol_name, action.command_template or tool_id)
             command_signature = self._command_signature(protocol_name, action.command_template or tool_id)
             if (
-                    normalized_tool_id in excluded
-                    or self._normalize_text_token(family_id) in excluded_families
+                    self._normalize_text_token(family_id) in excluded_families
                     or self._normalize_text_token(command_signature) in excluded_signatures
             ):
                 continue
@@ -550,6 +626,9 @@ class SchedulerPlanner:
                     )
 
         decisions = []
+        context_inputs = self._context_scoring_inputs(context) if isinstance(context, dict) else None
+        unavailable_tools = context_inputs["missing_tools"] if context_inputs is not None else set()
+        context_signals = self._active_context_signals(context)
         for candidate in candidates:
             action = candidate["action"]
             tool_id = candidate["tool_id"]
@@ -557,7 +636,6 @@ class SchedulerPlanner:
             command_template = candidate["command_template"]
             family_id = str(candidate.get("family_id", "") or build_command_family_id(tool_id, protocol_name, command_template))
             command_signature = str(candidate.get("command_signature", "") or self._command_signature(protocol_name, command_template))
-            unavailable_tools = self._context_unavailable_tool_ids(context)
             tool_unavailable = (
                 self._normalized_tool_id(tool_id) in unavailable_tools
                 or bool(self._command_tool_tokens(command_template) & unavailable_tools)
@@ -575,6 +653,7 @@ class SchedulerPlanner:
                 label=label,
                 command_template=command_template,
                 context=context,
+                context_inputs=context_inputs,
             )
             strategy_guidance = evaluate_action_strategy(
                 action,
@@ -608,7 +687,7 @@ class SchedulerPlanner:
                 provider_name=provider_name if provider_enabled else "",
                 provider_error=provider_error,
                 provider_returned_rankings=bool(provider_ranked),
-                context_signals=self._active_context_signals(context),
+                context_signals=context_signals,
             )
             rationale = self._append_strategy_context(rationale, strategy_guidance)
             rationale = self._append_specialist_sidecar_context(
@@ -753,6 +832,37 @@ class SchedulerPlanner:
 
         return score
 
+    @classmethod
+    def _context_scoring_inputs(cls, context: Dict[str, Any]) -> Dict[str, Any]:
+        # Everything _score_with_context derives from the context alone; built once per plan call
+        # and shared across candidates instead of being re-normalised for each one.
+        coverage = context.get("coverage", {}) if isinstance(context.get("coverage", {}), dict) else {}
+        return {
+            "attempted": cls._normalize_tool_id_set(context.get("attempted_tool_ids", [])),
+            "attempted_families": cls._normalize_text_token_set(context.get("attempted_family_ids", [])),
+            "attempted_signatures": cls._normalize_text_token_set(context.get("attempted_command_signatures", [])),
+            "signals": context.get("signals", {}) if isinstance(context.get("signals", {}), dict) else {},
+            "missing_tools": cls._context_unavailable_tool_ids(context),
+            "coverage_missing": {
+                str(item or "").strip().lower()
+                for item in (coverage.get("missing", []) if isinstance(coverage.get("missing", []), list) else [])
+                if str(item or "").strip()
+            },
+            "coverage_recommended": cls._normalize_tool_id_set(
+                coverage.get("recommended_tool_ids", []) if isinstance(coverage.get("recommended_tool_ids", []), list) else []
+            ),
+            "analysis_mode": str(
+                coverage.get("analysis_mode", "")
+                or context.get("analysis_mode", "")
+                or "standard"
+            ).strip().lower(),
+            "supports_subdomain_discovery": cls._target_hostname_supports_subdomain_discovery(context),
+            "supports_root_domain_enrichment": cls._target_hostname_supports_root_domain_enrichment(context),
+            "supports_shodan_enrichment": cls._target_hostname_supports_shodan_enrichment(context),
+            "grayhat_enabled": cls._context_grayhatwarfare_enabled(context),
+            "shodan_enabled": cls._context_shodan_enabled(context),
+        }
+
     @classmethod
     def _score_with_context(
             cls,
@@ -764,37 +874,29 @@ class SchedulerPlanner:
             label: str,
             command_template: str,
             context: Optional[Dict[str, Any]],
+            context_inputs: Optional[Dict[str, Any]] = None,
     ) -> float:
         value = float(score)
         if not isinstance(context, dict):
             return max(0.0, min(value, 100.0))
 
+        if context_inputs is None:
+            context_inputs = cls._context_scoring_inputs(context)
         tool_norm = cls._normalized_tool_id(tool_id)
-        attempted = cls._normalize_tool_id_set(context.get("attempted_tool_ids", []))
-        attempted_families = cls._normalize_text_token_set(context.get("attempted_family_ids", []))
-        attempted_signatures = cls._normalize_text_token_set(context.get("attempted_command_signatures", []))
-        signals = context.get("signals", {}) if isinstance(context.get("signals", {}), dict) else {}
-        missing_tools = cls._context_unavailable_tool_ids(context)
+        attempted = context_inputs["attempted"]
+        attempted_families = context_inputs["attempted_families"]
+        attempted_signatures = context_inputs["attempted_signatures"]
+        signals = context_inputs["signals"]
+        missing_tools = context_inputs["missing_tools"]
         command_tools = cls._command_tool_tokens(command_template)
-        coverage = context.get("coverage", {}) if isinstance(context.get("coverage", {}), dict) else {}
-        coverage_missing = {
-            str(item or "").strip().lower()
-            for item in (coverage.get("missing", []) if isinstance(coverage.get("missing", []), list) else [])
-            if str(item or "").strip()
-        }
-        coverage_recommended = cls._normalize_tool_id_set(
-            coverage.get("recommended_tool_ids", []) if isinstance(coverage.get("recommended_tool_ids", []), list) else []
-        )
-        analysis_mode = str(
-            coverage.get("analysis_mode", "")
-            or context.get("analysis_mode", "")
-            or "standard"
-        ).strip().lower()
-        supports_subdomain_discovery = cls._target_hostname_supports_subdomain_discovery(context)
-        supports_root_domain_enrichment = cls._target_hostname_supports_root_domain_enrichment(context)
-        supports_shodan_enrichment = cls._target_hostname_supports_shodan_enrichment(context)
-        grayhat_enabled = cls._context_grayhatwarfare_enabled(context)
-        shodan_enabled = cls._context_shodan_enabled(context)
+        coverage_missing = context_inputs["coverage_missing"]
+        coverage_recommended = context_inputs["coverage_recommended"]
+        analysis_mode = context_inputs["analysis_mode"]
+        supports_subdomain_discovery = context_inputs["supports_subdomain_discovery"]
+        supports_root_domain_enrichment = context_inputs["supports_root_domain_enrichment"]
+        supports_shodan_enrichment = context_inputs["supports_shodan_enrichment"]
+        grayhat_enabled = context_inputs["grayhat_enabled"]
+        shodan_enabled = context_inputs["shodan_enabled"]
 
         text = " ".join([str(tool_id or ""), str(label or ""), str(command_template or "")]).lower()
         if tool_norm in attempted:
@@ -811,7 +913,7 @@ class SchedulerPlanner:
             value += 34.0
         if "missing_banner" in coverage_missing and tool_norm == "banner":
             value += 26.0
-        if {"missing_screenshot", "missing_remote_screenshot"} & coverage_missing and tool_norm == "screenshooter":
+        if not coverage_missing.isdisjoint(cls.SCREENSHOT_GAP_IDS) and tool_norm == "screenshooter":
             value += 34.0
         if "missing_nmap_vuln" in coverage_missing and tool_norm == "nmap-vuln.nse":
             value += 40.0
@@ -1025,14 +1127,7 @@ class SchedulerPlanner:
             for item in (coverage.get("missing", []) if isinstance(coverage.get("missing", []), list) else [])
             if str(item or "").strip()
         }
-        baseline_missing = bool(coverage_missing & {
-            "missing_discovery",
-            "missing_screenshot",
-            "missing_remote_screenshot",
-            "missing_nmap_vuln",
-            "missing_nuclei_auto",
-            "missing_cpe_cve_enrichment",
-        })
+        baseline_missing = not coverage_missing.isdisjoint(cls.BASELINE_GAP_IDS)
         observed_tokens = cls._observed_context_tokens(context)
         web_service = bool(signals.get("web_service"))
         supports_subdomain_discovery = cls._target_hostname_supports_subdomain_discovery(context)
@@ -1050,27 +1145,14 @@ class SchedulerPlanner:
         focus_dict = context_summary.get("focus", {}) if isinstance(context_summary.get("focus", {}), dict) else {}
         target_service = str(target_dict.get("service", "") or focus_dict.get("service", "")).strip().lower()
 
-        filtered: List[Dict[str, str]] = []
-        for candidate in candidates:
-            tool_id = str(candidate.get("tool_id", "") or "")
-            label = str(candidate.get("label", "") or "")
-            command_template = str(candidate.get("command_template", "") or "")
-            candidate_scope = {
-                str(item or "").strip().lower()
-                for item in str(candidate.get("service_scope", "") or "").split(",")
-                if str(item or "").strip()
-            }
-            action = candidate.get("action")
-            risk_tags = {
-                str(item or "").strip().lower()
-                for item in list(getattr(action, "risk_tags", []) or [])
-                if str(item or "").strip()
-            }
-            tool_text = " ".join([
-                tool_id,
-                label,
-                command_template,
-            ]).lower()
+        tool_ids, labels, command_templates, scopes, risk_tag_sets, tool_texts = cls._candidates_to_columns(candidates)
+        keep = [False] * len(tool_ids)
+        for index, tool_id in enumerate(tool_ids):
+            label = labels[index]
+            command_template = command_templates[index]
+            candidate_scope = scopes[index]
+            risk_tags = risk_tag_sets[index]
+            tool_text = tool_texts[index]
             command_tools = cls._command_tool_tokens(command_template)
 
             blocked = False
@@ -1135,26 +1217,11 @@ class SchedulerPlanner:
             ):
                 blocked = True
             if baseline_missing:
-                if cls._matches_any_token(tool_text, ("coldfusion", "vmware", "webdav", "huawei", "drupal", "wordpress", "qnap", "domino")):
-                    if cls._normalized_tool_id(tool_id) not in {
-                        "nmap-vuln.nse",
-                        "nuclei-web",
-                        "screenshooter",
-                        "whatweb",
-                        "whatweb-http",
-                        "whatweb-https",
-                        "nikto",
-                        "web-content-discovery",
-                        "dirsearch",
-                        "ffuf",
-                        "banner",
-                        "nmap",
-                    }:
+                if cls._matches_any_token(tool_text, cls.BASELINE_GAP_VENDOR_TOKENS):
+                    if normalized_tool_id not in cls.BASELINE_GAP_ALLOWED_TOOL_IDS:
                         blocked = True
 
-            for rule in cls.SPECIALIZED_WEB_TOOL_RULES:
-                if not cls._matches_any_token(tool_text, rule.get("tokens", ())):
-                    continue
+            for rule in cls._matching_specialized_rules(tool_text):
                 if not cls._has_any_signal(signals, rule.get("required_signals", ())):
                     blocked = True
                     break
@@ -1184,12 +1251,36 @@ class SchedulerPlanner:
                 if specific_tokens and not (specific_tokens & observed_tokens):
                     blocked = True
 
-            if not blocked:
-                filtered.append(candidate)
+            keep[index] = not blocked
 
+        filtered = list(compress(candidates, keep))
         # Keep original candidates if pruning would remove everything.
         return filtered or candidates
 
+    @staticmethod
+    def _candidates_to_columns(candidates: List[Dict[str, Any]]) -> tuple:
+        """Split candidate dicts into parallel per-field lists for the context filter."""
+        tool_ids, labels, command_templates, scopes, risk_tag_sets, tool_texts = [], [], [], [], [], []
+        for candidate in candidates:
+            tool_id = str(candidate.get("tool_id", "") or "")
+            label = str(candidate.get("label", "") or "")
+            command_template = str(candidate.get("command_template", "") or "")
+            tool_ids.append(tool_id)
+            labels.append(label)
+            command_templates.append(command_template)
+            scopes.append({
+                str(item or "").strip().lower()
+                for item in str(candidate.get("service_scope", "") or "").split(",")
+                if str(item or "").strip()
+            })
+            risk_tag_sets.append({
+                str(item or "").strip().lower()
+                for item in list(getattr(candidate.get("action"), "risk_tags", []) or [])
+                if str(item or "").strip()
+            })
+            tool_texts.append(" ".join([tool_id, label, command_template]).lower())
+        return tool_ids, labels, command_templates, scopes, risk_tag_sets, tool_texts
+
     @classmethod
     def _covered_web_followup_tool_already_satisfied(
             cls,
@@ -1225,16 +1316,12 @@ class SchedulerPlanner:
             return False
 
         if tool_norm in {"whatweb", "whatweb-http", "whatweb-https"}:
-            return bool(coverage_has.get("whatweb")) and not bool(
-                coverage_missing & {"missing_whatweb", "missing_technology_fingerprint"}
-            )
+            return bool(coverage_has.get("whatweb")) and coverage_missing.isdisjoint(cls.WHATWEB_GAP_IDS)
         if tool_norm == "nikto":
-            return bool(coverage_has.get("nikto")) and not bool(
-                coverage_missing & {"missing_nikto", "missing_followup_after_vuln"}
-            )
+            return bool(coverage_has.get("nikto")) and coverage_missing.isdisjoint(cls.NIKTO_GAP_IDS)
         if tool_norm in {"web-content-discovery", "dirsearch", "ffuf", "feroxbuster", "gobuster"}:
-            return bool(coverage_has.get("web_content_discovery")) and not bool(
-                coverage_missing & {"missing_web_content_discovery", "missing_followup_after_vuln"}
+            return bool(coverage_has.get("web_content_discovery")) and coverage_missing.isdisjoint(
+                cls.WEB_CONTENT_DISCOVERY_GAP_IDS
             )
         return False
 
@@ -1247,7 +1334,7 @@ class SchedulerPlanner:
             return True
         if "missing_banner" in coverage_missing and tool_norm == "banner":
             return True
-        if {"missing_screenshot", "missing_remote_screenshot"} & coverage_missing and tool_norm in {"screenshooter", "x11screen"}:
+        if not coverage_missing.isdisjoint(cls.SCREENSHOT_GAP_IDS) and tool_norm in {"screenshooter", "x11screen"}:
             return True
         if "missing_nmap_vuln" in coverage_missing and tool_norm == "nmap-vuln.nse":
             return True
@@ -1383,8 +1470,17 @@ class SchedulerPlanner:
 
     @staticmethod
     def _matches_any_token(text: str, tokens) -> bool:
-        lowered = str(text or "").lower()
-        return any(str(token or "").strip().lower() in lowered for token in list(tokens or []))
+        pattern = _compile_token_pattern(tuple(tokens or ()))
+        return pattern is not None and pattern.search(str(text or "").lower()) is not None
+
+    @classmethod
+    def _matching_specialized_rules(cls, tool_text: str) -> tuple:
+        if not cls._matches_any_token(tool_text, cls.SPECIALIZED_WEB_TOOL_TOKENS):
+            return ()
+        return tuple(
+            rule for rule in cls.SPECIALIZED_WEB_TOOL_RULES
+            if cls._matches_any_token(tool_text, rule.get("tokens", ()))
+        )
 
     @staticmethod
     def _is_ip_literal(value: str) -> bool:
@@ -1626,9 +1722,7 @@ class SchedulerPlanner:
             return 0.0
 
         delta = 0.0
-        for rule in cls.SPECIALIZED_WEB_TOOL_RULES:
-            if not cls._matches_any_token(tool_text, rule.get("tokens", ())):
-                continue
+        for rule in cls._matching_specialized_rules(tool_text):
             if cls._has_any_signal(signals, rule.get("required_signals", ())):
                 delta += 12.0
             else:
@@ -1891,14 +1985,7 @@ class SchedulerPlanner:
         reflection_priority = str(reflection.get("priority_shift", "") or "").strip().lower()
         reflection_promotes = cls._normalize_tool_id_set(reflection.get("promote_tool_ids", []))
 
-        return bool(coverage_missing & {
-            "missing_whatweb",
-            "missing_nikto",
-            "missing_web_content_discovery",
-            "missing_followup_after_vuln",
-            "missing_http_followup",
-            "missing_cpe_cve_enrichment",
-        }) or analysis_mode == "dig_deeper" \
+        return not coverage_missing.isdisjoint(cls.WEB_FOLLOWUP_GAP_IDS) or analysis_mode == "dig_deeper" \
             or int(signals.get("vuln_hits", 0) or 0) > 0 \
             or bool(host_cves) \
             or reflection_priority in {"targeted_followup", "manual_validation"} \
@@ -1955,9 +2042,7 @@ class SchedulerPlanner:
                 ),
             )
             if not include:
-                for rule in cls.SPECIALIZED_WEB_TOOL_RULES:
-                    if not cls._matches_any_token(tool_text, rule.get("tokens", ())):
-                        continue
+                for rule in cls._matching_specialized_rules(tool_text):
                     if cls._has_any_signal(signals, rule.get("required_signals", ())):
                         include = True
                     break
@@ -2041,16 +2126,9 @@ class SchedulerPlanner:
         ).strip().lower()
         host_cves = context.get("host_cves", []) if isinstance(context, dict) and isinstance(context.get("host_cves", []), list) else []
         vuln_hits = int(signals.get("vuln_hits", 0) or 0)
-        needs_deep_web = bool(coverage_missing & {
-            "missing_whatweb",
-            "missing_nikto",
-            "missing_web_content_discovery",
-            "missing_followup_after_vuln",
-        }) or analysis_mode == "dig_deeper" or vuln_hits > 0 or bool(host_cves)
-        needs_targeted_nuclei = bool(coverage_missing & {
-            "missing_cpe_cve_enrichment",
-            "missing_followup_after_vuln",
-        }) or analysis_mode == "dig_deeper" or vuln_hits > 0 or bool(host_cves)
+        escalated = analysis_mode == "dig_deeper" or vuln_hits > 0 or bool(host_cves)
+        needs_deep_web = escalated or not coverage_missing.isdisjoint(cls.DEEP_WEB_GAP_IDS)
+        needs_targeted_nuclei = escalated or not coverage_missing.isdisjoint(cls.TARGETED_NUCLEI_GAP_IDS)
         if needs_deep_web:
             required.extend(cls.WEB_AI_DEEP_WEB_TOOL_IDS)
         if needs_targeted_nuclei:
@@ -2103,7 +2181,7 @@ class SchedulerPlanner:
                 analysis_mode == "dig_deeper"
                 or bool(host_cves)
                 or int(signals.get("vuln_hits", 0) or 0) > 0
-                or bool(coverage_missing & {"missing_followup_after_vuln", "missing_cpe_cve_enrichment"})
+                or not coverage_missing.isdisjoint(cls.TARGETED_NUCLEI_GAP_IDS)
         ):
             return 6
         return 4
@@ -1,13 +1,25 @@
 import datetime
+import email.utils
+import hashlib
+import http.cookiejar
 import json
+import random
 import re
 import shlex
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from collections import deque
+from itertools import islice
+from collections import OrderedDict, deque
 from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency path
+    orjson = None
 
 from app.scheduler.tool_prompt_registry import get_scheduler_tool_prompt_info
 
@@ -24,11 +36,25 @@ MAX_PROVIDER_REFLECTION_RESPONSE_TOKENS = 500
 MAX_PROVIDER_SPECIALIST_RESPONSE_TOKENS = 420
 MAX_PROVIDER_OPENAI_RETRY_ATTEMPTS = 3
 MAX_PROVIDER_OPENAI_RETRY_TOKENS = 1600
+DEFAULT_PROVIDER_MAX_RETRIES = 3
+DEFAULT_PROVIDER_RETRY_BASE_SECONDS = 0.5
+DEFAULT_PROVIDER_RETRY_MAX_SECONDS = 8.0
+MAX_PROVIDER_RETRIES = 5
+MAX_PROVIDER_RETRY_AFTER_SECONDS = 60.0
+DEFAULT_PROVIDER_TIMEOUT_SECONDS = 25.0
+MAX_PROVIDER_TIMEOUT_SECONDS = 120.0
+MAX_PROVIDER_OUTPUT_TOKENS = 4096
+DEFAULT_PROVIDER_BATCH_CONCURRENCY = 4
+MAX_PROVIDER_BATCH_CONCURRENCY = 8
+PROVIDER_TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 DEFAULT_OPENAI_MODEL = "gpt-4.1-mini"
 MAX_PROVIDER_CONTEXT_CHARS = 10000
 MAX_PROVIDER_CONTEXT_ITEMS = 64
 MAX_PROVIDER_LOG_ENTRIES = 600
 MAX_PROVIDER_LOG_TEXT_CHARS = 20000
+PROVIDER_RESPONSE_CACHE_SIZE = 512
+PROVIDER_RESPONSE_CACHE_TTL_SECONDS = 3600.0
+LMSTUDIO_MODEL_CACHE_TTL_SECONDS = 60.0
 SCHEDULER_PROMPT_VERSION = "scheduler-ranking-v2"
 SCHEDULER_REFLECTION_PROMPT_VERSION = "scheduler-reflection-v1"
 SCHEDULER_WEB_FOLLOWUP_PROMPT_VERSION = "scheduler-web-followup-v1"
@@ -72,15 +98,75 @@ _STRICT_COVERAGE_GAP_IDS = {
     "missing_smb_signing_checks",
     "missing_internal_safe_enum",
 }
+# Coverage gaps pin the phase directly; the first matching rule wins.
+_COVERAGE_GAP_PHASE_RULES = (
+    (frozenset({"missing_discovery"}), "initial_discovery"),
+    (frozenset({"missing_screenshot", "missing_remote_screenshot"}), "service_fingerprint"),
+    (frozenset({"missing_nmap_vuln", "missing_nuclei_auto", "missing_cpe_cve_enrichment"}), "broad_vuln"),
+    (frozenset({"missing_smb_signing_checks"}), "protocol_checks"),
+    (frozenset({"missing_whatweb", "missing_nikto", "missing_web_content_discovery"}), "deep_web"),
+    (frozenset({"missing_followup_after_vuln"}), "targeted_checks"),
+)
+_PHASE_DISCOVERY_TOOL_IDS = frozenset({"nmap", "banner", "fingerprint-strings", "http-title", "ssl-cert"})
+_PHASE_BROAD_VULN_TOOL_IDS = frozenset({"nmap-vuln.nse", "nuclei-web"})
+_PHASE_PROTOCOL_CHECK_TOOL_IDS = frozenset({
+    "smb-security-mode",
+    "smb-os-discovery",
+    "rdp-ntlm-info",
+    "ssh-hostkey",
+    "ssh-auth-methods.nse",
+    "snmp-info",
+    "sslscan",
+    "testssl.sh",
+})
+_PHASE_DEEP_WEB_TOOL_IDS = frozenset({
+    "whatweb",
+    "whatweb-http",
+    "whatweb-https",
+    "httpx",
+    "nikto",
+    "web-content-discovery",
+    "nuclei-cves",
+    "nuclei-exposures",
+    "nuclei-wordpress",
+    "curl-headers",
+    "curl-options",
+    "curl-robots",
+    "wafw00f",
+    "wpscan",
+})
+_PHASE_SHODAN_TOOL_IDS = frozenset({"shodan-enrichment", "shodan-host", "pyshodan"})
+
+
+_REDACTED_HEADER_NAMES = frozenset({"authorization", "x-api-key", "api-key"})
+_REDACTED_FIELD_NAMES = frozenset({"api_key", "apikey", "authorization", "x-api-key", "api-key"})
+# Free-form log text (response bodies, transport errors) can echo credentials back; scrub them in one pass.
+_LOG_SECRET_PATTERN = re.compile(
+    r"(?i)(\bbearer\s+|[\"']?(?:x-)?api[_-]?key[\"']?\s*[:=]\s*[\"']?|\bapi\s+key\s+provided:\s*)[^\s\"',}]{8,}"
+    r"|\bsk-[A-Za-z0-9_-]{8,}"
+)
 
 
 class ProviderError(RuntimeError):
     pass
 
 
+class ProviderTransientError(ProviderError):
+    """Rate limiting, 5xx or transport failures that are worth retrying after a delay."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 _provider_log_lock = threading.Lock()
 _provider_logs = deque(maxlen=MAX_PROVIDER_LOG_ENTRIES)
 _provider_thread_state = threading.local()
+_provider_response_cache_lock = threading.Lock()
+_provider_response_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_lmstudio_model_cache: Dict[str, Tuple[float, List[str]]] = {}
+_provider_session_lock = threading.Lock()
+_provider_sessions: Dict[str, Any] = {}
 
 
 def _load_requests_module():
@@ -93,15 +179,50 @@ def _load_requests_module():
     return requests_module
 
 
+def _provider_session(url: Any):
+    """Return a keep-alive session shared by every request to the same scheme and host.
+
+    The session is shared across threads, including the rank_actions_batch workers. That is safe here
+    because provider calls pass headers, payload and timeout per request, and the cookie jar rejects every
+    cookie, so no mutable session state is shared; the adapter's urllib3 pool
+    (pool_maxsize >= MAX_PROVIDER_BATCH_CONCURRENCY) hands each concurrent request its own connection.
+    """
+    parts = urlsplit(str(url or ""))
+    key = f"{parts.scheme}://{parts.netloc}".lower()
+    with _provider_session_lock:
+        session = _provider_sessions.get(key)
+        if session is None:
+            requests_module = _load_requests_module()
+            session = requests_module.Session()
+            session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            # Retries are handled by the provider backoff; urllib3 must not add its own.
+            adapter = requests_module.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _provider_sessions[key] = session
+    return session
+
+
+def close_provider_sessions():
+    with _provider_session_lock:
+        sessions = list(_provider_sessions.values())
+        _provider_sessions.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+
 class _RequestsProxy:
-    def get(self, *args, **kwargs):
-        return _load_requests_module().get(*args, **kwargs)
+    def get(self, url, *args, **kwargs):
+        return _provider_session(url).get(url, *args, **kwargs)
 
-    def post(self, *args, **kwargs):
-        return _load_requests_module().post(*args, **kwargs)
+    def post(self, url, *args, **kwargs):
+        return _provider_session(url).post(url, *args, **kwargs)
 
-    def request(self, *args, **kwargs):
-        return _load_requests_module().request(*args, **kwargs)
+    def request(self, method, url, *args, **kwargs):
+        return _provider_session(url).request(method, url, *args, **kwargs)
 
     def __getattr__(self, item):
         return getattr(_load_requests_module(), str(item))
@@ -139,8 +260,9 @@ def get_provider_logs(limit: int = 200) -> List[Dict[str, Any]]:
         max_items = 200
     max_items = max(1, min(max_items, MAX_PROVIDER_LOG_ENTRIES))
     with _provider_log_lock:
-        items = list(_provider_logs)
-    return items[-max_items:]
+        items = list(islice(reversed(_provider_logs), max_items))
+    items.reverse()
+    return items
 
 
 def clear_provider_logs():
@@ -148,6 +270,60 @@ def clear_provider_logs():
         _provider_logs.clear()
 
 
+def clear_provider_response_cache():
+    with _provider_response_cache_lock:
+        _provider_response_cache.clear()
+        _lmstudio_model_cache.clear()
+
+
+def _provider_response_cache_enabled(provider_cfg: Dict[str, Any]) -> bool:
+    return isinstance(provider_cfg, dict) and bool(provider_cfg.get("cache_enabled", False))
+
+
+def _provider_response_cache_key(
+        provider_name: str,
+        provider_cfg: Dict[str, Any],
+        prompt_package: Dict[str, Any],
+        context: Optional[Dict[str, Any]],
+) -> str:
+    # The parsed ranking depends on the exact prompt plus the unavailable-tool filter applied to it.
+    system_prompt, user_prompt, prompt_metadata = _prompt_package_parts(prompt_package)
+    material = json.dumps({
+        "provider": provider_name,
+        "base_url": str(provider_cfg.get("base_url", "") or ""),
+        "model": str(provider_cfg.get("model", "") or ""),
+        "structured_outputs": bool(provider_cfg.get("structured_outputs", False)),
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "metadata": prompt_metadata,
+        "unavailable_tool_ids": sorted(_prompt_package_unavailable_tool_ids(prompt_package, context or {})),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _get_cached_provider_response(key: str) -> Optional[Dict[str, Any]]:
+    now = time.monotonic()
+    with _provider_response_cache_lock:
+        entry = _provider_response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, payload = entry
+        if now - stored_at > PROVIDER_RESPONSE_CACHE_TTL_SECONDS:
+            del _provider_response_cache[key]
+            return None
+        _provider_response_cache.move_to_end(key)
+    return deepcopy(payload)
+
+
+def _store_cached_provider_response(key: str, payload: Dict[str, Any]):
+    entry = (time.monotonic(), deepcopy(payload))
+    with _provider_response_cache_lock:
+        _provider_response_cache[key] = entry
+        _provider_response_cache.move_to_end(key)
+        while len(_provider_response_cache) > PROVIDER_RESPONSE_CACHE_SIZE:
+            _provider_response_cache.popitem(last=False)
+
+
 def _truncate_log_text(value: Any, max_chars: int = MAX_PROVIDER_LOG_TEXT_CHARS) -> str:
     text = str(value or "")
     if len(text) <= int(max_chars):
@@ -158,7 +334,7 @@ def _truncate_log_text(value: Any, max_chars: int = MAX_PROVIDER_LOG_TEXT_CHARS)
 def _sanitize_header_value(name: str, value: Any) -> str:
     key = str(name or "").strip().lower()
     raw = str(value or "")
-    if key in {"authorization", "x-api-key", "api-key"}:
+    if key in _REDACTED_HEADER_NAMES:
         if key == "authorization" and raw.lower().startswith("bearer "):
             return "Bearer ***redacted***"
         return "***redacted***"
@@ -251,6 +427,13 @@ def _collect_unavailable_tool_ids(context: Optional[Dict[str, Any]]) -> List[str
     return sorted(found)
 
 
+def _prompt_package_unavailable_tool_ids(prompt_package: Any, context: Optional[Dict[str, Any]]) -> List[str]:
+    # Prompt builders resolve the unavailable tools once; reuse that instead of rescanning the context.
+    if isinstance(prompt_package, dict) and isinstance(prompt_package.get("unavailable_tool_ids"), list):
+        return list(prompt_package["unavailable_tool_ids"])
+    return _collect_unavailable_tool_ids(context)
+
+
 def _shell_primary_command_token(command: Any) -> str:
     text = str(command or "").strip()
     if not text:
@@ -418,7 +601,7 @@ def _sanitize_value_for_log(value: Any):
         for key, item in value.items():
             label = str(key or "").strip()
             lowered = label.lower()
-            if lowered in {"api_key", "apikey", "authorization", "x-api-key"}:
+            if lowered in _REDACTED_FIELD_NAMES:
                 safe[label] = "***redacted***"
             else:
                 safe[label] = _sanitize_value_for_log(item)
@@ -441,6 +624,21 @@ def _json_for_log(value: Any) -> str:
     return _truncate_log_text(rendered)
 
 
+def _redact_log_text(value: Any) -> str:
+    return _LOG_SECRET_PATTERN.sub(r"\1***redacted***", _truncate_log_text(value))
+
+
+def _response_json(response: Any) -> Any:
+    # Decode the raw body with orjson when possible; response.json() remains the fallback.
+    content = getattr(response, "content", None)
+    if orjson is not None and isinstance(content, (bytes, bytearray)) and content:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return response.json()
+
+
 def _response_text_for_log(response: Any) -> str:
     try:
         text_value = str(getattr(response, "text", "") or "")
@@ -471,8 +669,8 @@ def _record_provider_log(
         "request_headers": _sanitize_headers_for_log(request_headers),
         "request_body": _json_for_log(request_payload),
         "response_status": int(response_status) if isinstance(response_status, int) else response_status,
-        "response_body": _truncate_log_text(response_body or ""),
-        "error": _truncate_log_text(error or ""),
+        "response_body": _redact_log_text(response_body or ""),
+        "error": _redact_log_text(error or ""),
         "prompt_metadata": _sanitize_value_for_log(prompt_metadata or {}),
     }
     with _provider_log_lock:
@@ -518,24 +716,80 @@ def rank_actions_with_provider(config: Dict[str, Any], goal_profile: str, servic
         _set_last_provider_payload(disabled_payload)
         return []
 
-    if provider_name in {"openai", "lm_studio"}:
+    if provider_name not in {"openai", "lm_studio", "claude"}:
+        raise ProviderError(f"Unsupported provider: {provider_name}")
+
+    cache_key = ""
+    if _provider_response_cache_enabled(provider_cfg):
+        cache_key = _provider_response_cache_key(provider_name, provider_cfg, prompt_package, context)
+        cached = _get_cached_provider_response(cache_key)
+        if cached is not None:
+            _set_last_provider_payload(cached)
+            return cached.get("actions", [])
+
+    if provider_name == "claude":
+        payload = _call_claude(provider_cfg, prompt_package, context=context or {})
+    else:
         payload = _call_openai_compatible(
             provider_name,
             provider_cfg,
             prompt_package,
             context=context or {},
         )
-        payload["provider"] = provider_name
-        payload.update(prompt_metadata)
-        _set_last_provider_payload(payload)
-        return payload.get("actions", [])
-    if provider_name == "claude":
-        payload = _call_claude(provider_cfg, prompt_package, context=context or {})
-        payload["provider"] = provider_name
-        payload.update(prompt_metadata)
-        _set_last_provider_payload(payload)
-        return payload.get("actions", [])
-    raise ProviderError(f"Unsupported provider: {provider_name}")
+    payload["provider"] = provider_name
+    payload.update(prompt_metadata)
+    if cache_key:
+        _store_cached_provider_response(cache_key, payload)
+    _set_last_provider_payload(payload)
+    return payload.get("actions", [])
+
+
+def rank_actions_batch(config: Dict[str, Any], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rank several targets concurrently and return one provider payload per item, in input order.
+
+    Each item carries the ``rank_actions_with_provider`` arguments (``goal_profile``, ``service``,
+    ``protocol``, ``candidates`` and optionally ``context``/``engagement_preset``). Failures are
+    reported per item under ``error`` instead of aborting the batch. Workers share the per-host
+    session from ``_provider_session``.
+    """
+    if not items:
+        return []
+    provider_name = str(config.get("provider", "none") or "none").strip().lower() if isinstance(config, dict) else ""
+    providers_cfg = config.get("providers", {}) if isinstance(config, dict) else {}
+    provider_cfg = providers_cfg.get(provider_name, {}) if isinstance(providers_cfg, dict) else {}
+    try:
+        concurrency = int(provider_cfg.get("max_concurrency", DEFAULT_PROVIDER_BATCH_CONCURRENCY))
+    except (AttributeError, TypeError, ValueError):
+        concurrency = DEFAULT_PROVIDER_BATCH_CONCURRENCY
+    concurrency = max(1, min(concurrency, MAX_PROVIDER_BATCH_CONCURRENCY, len(items)))
+
+    def _rank_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        item = item if isinstance(item, dict) else {}
+        try:
+            actions = rank_actions_with_provider(
+                config,
+                str(item.get("goal_profile", "") or ""),
+                str(item.get("service", "") or ""),
+                str(item.get("protocol", "") or ""),
+                list(item.get("candidates", []) or []),
+                item.get("context") or {},
+                engagement_preset=str(item.get("engagement_preset", "") or ""),
+            )
+            error = ""
+        except Exception as exc:
+            # Any failure, not just ProviderError, must stay with its item so pool.map keeps the rest.
+            actions = []
+            error = str(exc)
+        # The last payload is thread-local, so each worker reads back its own item's metadata.
+        payload = get_last_provider_payload(clear=True)
+        payload["actions"] = actions
+        payload["error"] = error
+        return payload
+
+    if concurrency <= 1:
+        return [_rank_item(item) for item in items]
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="legion-provider") as pool:
+        return list(pool.map(_rank_item, items))
 
 
 def reflect_on_scheduler_progress(
@@ -600,7 +854,7 @@ def reflect_on_scheduler_progress(
 
     payload = _parse_reflection_payload(
         content,
-        unavailable_tool_ids=_collect_unavailable_tool_ids(context or {}),
+        unavailable_tool_ids=_prompt_package_unavailable_tool_ids(prompt_package, context or {}),
     )
     payload["provider"] = provider_name
     payload.update(metadata)
@@ -664,7 +918,7 @@ def select_web_followup_with_provider(
     payload = _parse_web_followup_payload(
         content,
         allowed_tool_ids=list(metadata.get("visible_candidate_tool_ids", []) or []),
-        unavailable_tool_ids=_collect_unavailable_tool_ids(context or {}),
+        unavailable_tool_ids=_prompt_package_unavailable_tool_ids(prompt_package, context or {}),
     )
     payload["provider"] = provider_name
     payload.update(metadata)
@@ -752,59 +1006,18 @@ def _determine_scheduler_phase(
     service_lower = str(service or "").strip().lower()
     is_web = bool(signals.get("web_service")) or service_lower in _WEB_SERVICE_IDS
 
-    if "missing_discovery" in coverage_missing:
-        return "initial_discovery"
-    if "missing_screenshot" in coverage_missing or "missing_remote_screenshot" in coverage_missing:
-        return "service_fingerprint"
-    if {"missing_nmap_vuln", "missing_nuclei_auto"} & coverage_missing:
-        return "broad_vuln"
-    if "missing_cpe_cve_enrichment" in coverage_missing:
-        return "broad_vuln"
-    if "missing_smb_signing_checks" in coverage_missing:
-        return "protocol_checks"
-    if {"missing_whatweb", "missing_nikto", "missing_web_content_discovery"} & coverage_missing:
-        return "deep_web"
-    if "missing_followup_after_vuln" in coverage_missing:
-        return "targeted_checks"
-
-    has_discovery = any(token in attempted for token in {
-        "nmap",
-        "banner",
-        "fingerprint-strings",
-        "http-title",
-        "ssl-cert",
-    })
+    for gap_ids, phase in _COVERAGE_GAP_PHASE_RULES:
+        if not coverage_missing.isdisjoint(gap_ids):
+            return phase
+
+    has_discovery = not attempted.isdisjoint(_PHASE_DISCOVERY_TOOL_IDS)
     has_screenshot = "screenshooter" in attempted
-    has_broad_vuln = bool({"nmap-vuln.nse", "nuclei-web"} & attempted)
-    has_protocol_checks = any(token in attempted for token in {
-        "smb-security-mode",
-        "smb-os-discovery",
-        "rdp-ntlm-info",
-        "ssh-hostkey",
-        "ssh-auth-methods.nse",
-        "snmp-info",
-        "sslscan",
-        "testssl.sh",
-    })
-    has_deep_web = any(token in attempted for token in {
-        "whatweb",
-        "whatweb-http",
-        "whatweb-https",
-        "httpx",
-        "nikto",
-        "web-content-discovery",
-        "nuclei-cves",
-        "nuclei-exposures",
-        "nuclei-wordpress",
-        "curl-headers",
-        "curl-options",
-        "curl-robots",
-        "wafw00f",
-        "wpscan",
-    })
+    has_broad_vuln = not attempted.isdisjoint(_PHASE_BROAD_VULN_TOOL_IDS)
+    has_protocol_checks = not attempted.isdisjoint(_PHASE_PROTOCOL_CHECK_TOOL_IDS)
+    has_deep_web = not attempted.isdisjoint(_PHASE_DEEP_WEB_TOOL_IDS)
 
     shodan_enabled = bool(signals.get("shodan_enabled"))
-    shodan_checked = any(token in attempted for token in {"shodan-enrichment", "shodan-host", "pyshodan"})
+    shodan_checked = not attempted.isdisjoint(_PHASE_SHODAN_TOOL_IDS)
     effective_goal_profile = _effective_prompt_goal_profile(
         goal_profile=goal_profile,
         engagement_preset=engagement_preset,
@@ -887,10 +1100,12 @@ def _build_ranking_prompt_package(
         engagement_preset=engagement_preset,
         context=ctx,
     )
+    unavailable_tool_ids = _collect_unavailable_tool_ids(ctx)
     context_block = _build_context_block(
         ctx,
         current_phase_override=current_phase,
         include_summary=bool(context_summary_enabled),
+        unavailable_tool_ids=unavailable_tool_ids,
     )
     service_profile = _resolve_prompt_profile(service=service, context=ctx) if prompt_profiles_enabled else "generic"
     phase_profile = current_phase if prompt_profiles_enabled and current_phase in {"broad_vuln", "deep_web"} else "default"
@@ -934,6 +1149,7 @@ def _build_ranking_prompt_package(
         "system_prompt": system_prompt,
         "user_prompt": prefix + candidate_block,
         "metadata": metadata,
+        "unavailable_tool_ids": unavailable_tool_ids,
     }
 
 
@@ -1148,7 +1364,8 @@ def _tool_matches_coverage_gap(tool_id: str, coverage_missing: Set[str]) -> bool
 def _candidate_visibility_priority(
         candidate: Dict[str, str],
         *,
-        context: Optional[Dict[str, Any]] = None,
+        coverage_missing: Set[str],
+        coverage_recommended: Set[str],
         prompt_type: str = "",
 ) -> int:
     tool_id = str(candidate.get("tool_id", "") or "")
@@ -1156,8 +1373,6 @@ def _candidate_visibility_priority(
     if not tool_norm:
         return 0
 
-    coverage_missing = _coverage_missing_ids(context)
-    coverage_recommended = _coverage_recommended_tool_ids(context)
     priority = 0
 
     if tool_norm in coverage_recommended:
@@ -1191,10 +1406,20 @@ def _prioritize_candidates_for_prompt(
 ) -> List[Dict[str, str]]:
     if not candidates:
         return []
+    coverage_missing = _coverage_missing_ids(context)
+    coverage_recommended = _coverage_recommended_tool_ids(context)
+    if not coverage_missing and not coverage_recommended:
+        # Every candidate scores zero, so the stable sort would keep the input order.
+        return list(candidates)
     ranked = []
     for index, candidate in enumerate(candidates):
         ranked.append((
-            -int(_candidate_visibility_priority(candidate, context=context, prompt_type=prompt_type)),
+            -int(_candidate_visibility_priority(
+                candidate,
+                coverage_missing=coverage_missing,
+                coverage_recommended=coverage_recommended,
+                prompt_type=prompt_type,
+            )),
             index,
             candidate,
         ))
@@ -1227,14 +1452,21 @@ def _build_candidate_block(
         6 if prompt_type == "web_followup" else 8,
     )
 
-    def _candidate_line(candidate: Dict[str, str], *, detail_level: int) -> Tuple[str, str]:
+    # Detail levels re-render the same leading candidates; resolve each one's prompt info once.
+    prompt_infos: Dict[int, Any] = {}
+
+    def _candidate_line(index: int, *, detail_level: int) -> Tuple[str, str]:
+        candidate = ordered_candidates[index]
         tool_id = str(candidate.get("tool_id", "")).strip()[:120]
-        prompt_info = get_scheduler_tool_prompt_info(
-            tool_id,
-            label=str(candidate.get("label", "")).strip(),
-            command_template=str(candidate.get("command_template", "")),
-            service_scope=str(candidate.get("service_scope", "")).strip(),
-        )
+        prompt_info = prompt_infos.get(index)
+        if prompt_info is None:
+            prompt_info = get_scheduler_tool_prompt_info(
+                tool_id,
+                label=str(candidate.get("label", "")).strip(),
+                command_template=str(candidate.get("command_template", "")),
+                service_scope=str(candidate.get("service_scope", "")).strip(),
+            )
+            prompt_infos[index] = prompt_info
         label_limit = 64 if detail_level <= 1 else MAX_CANDIDATE_LABEL_CHARS
         purpose_limit = 56 if detail_level <= 1 else MAX_CANDIDATE_PURPOSE_CHARS
         when_limit = 64 if detail_level == 2 else 0
@@ -1274,11 +1506,11 @@ def _build_candidate_block(
         current_visible_tool_ids: List[str] = []
         current_used = 0
         current_omitted = 0
-        for index, candidate in enumerate(ordered_candidates):
+        for index in range(len(ordered_candidates)):
             if index >= MAX_PROVIDER_CANDIDATES:
                 current_omitted = len(ordered_candidates) - index
                 break
-            line, tool_id = _candidate_line(candidate, detail_level=detail_level)
+            line, tool_id = _candidate_line(index, detail_level=detail_level)
             projected = current_used + len(line) + 1
             if projected > budget:
                 current_omitted = len(ordered_candidates) - index
@@ -1300,8 +1532,7 @@ def _build_candidate_block(
     omitted = int(best_omitted or 0)
 
     if not candidate_lines:
-        first = ordered_candidates[0]
-        line, tool_id = _candidate_line(first, detail_level=0)
+        line, tool_id = _candidate_line(0, detail_level=0)
         candidate_lines.append(line)
         if tool_id:
             visible_tool_ids.append(tool_id)
@@ -1456,7 +1687,7 @@ def _call_openai_compatible(
     system_prompt, user_prompt, prompt_metadata = _prompt_package_parts(prompt_package)
     allowed_tool_ids = _visible_candidate_tool_ids_from_metadata(prompt_metadata)
     normalized_context = context if isinstance(context, dict) else {}
-    unavailable_tool_ids = _collect_unavailable_tool_ids(normalized_context)
+    unavailable_tool_ids = _prompt_package_unavailable_tool_ids(prompt_package, normalized_context)
     current_phase = str(prompt_metadata.get("current_phase", "") or "").strip().lower() if normalized_context else ""
     structured_outputs_enabled = _openai_structured_outputs_enabled(provider_name, provider_cfg)
     if provider_name == "lm_studio":
@@ -1467,8 +1698,9 @@ def _call_openai_compatible(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=0.2,
-            max_tokens=MAX_PROVIDER_RESPONSE_TOKENS,
+            max_tokens=_provider_output_token_limit(provider_cfg, MAX_PROVIDER_RESPONSE_TOKENS),
             prompt_metadata=prompt_metadata,
+            timeout=_provider_timeout_seconds(provider_cfg),
         )
         content = str(result.get("content", "") or "")
     else:
@@ -1481,7 +1713,11 @@ def _call_openai_compatible(
             ],
         }
         _set_chat_completion_temperature(payload, provider_name=provider_name, temperature=0.2)
-        _set_chat_completion_token_limit(payload, provider_name=provider_name, max_tokens=MAX_PROVIDER_RESPONSE_TOKENS)
+        _set_chat_completion_token_limit(
+            payload,
+            provider_name=provider_name,
+            max_tokens=_provider_output_token_limit(provider_cfg, MAX_PROVIDER_RESPONSE_TOKENS),
+        )
         request_metadata = dict(prompt_metadata)
         request_metadata.update({
             "structured_output_requested": bool(structured_outputs_enabled),
@@ -1498,6 +1734,7 @@ def _call_openai_compatible(
                 headers,
                 payload,
                 prompt_metadata=request_metadata,
+                provider_cfg=provider_cfg,
             )
         except ProviderError as exc:
             if not structured_outputs_enabled or not _should_fallback_from_structured_outputs(exc):
@@ -1513,6 +1750,7 @@ def _call_openai_compatible(
                 headers,
                 fallback_payload,
                 prompt_metadata=fallback_metadata,
+                provider_cfg=provider_cfg,
             )
             request_metadata = fallback_metadata
     parsed = _parse_provider_payload(
@@ -1548,8 +1786,9 @@ def _request_openai_compatible_content(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             temperature=temperature,
-            max_tokens=max_tokens,
+            max_tokens=_provider_output_token_limit(provider_cfg, max_tokens),
             prompt_metadata=prompt_metadata,
+            timeout=_provider_timeout_seconds(provider_cfg),
         )
         return str(result.get("content", "") or "")
 
@@ -1562,13 +1801,18 @@ def _request_openai_compatible_content(
         ],
     }
     _set_chat_completion_temperature(payload, provider_name=provider_name, temperature=temperature)
-    _set_chat_completion_token_limit(payload, provider_name=provider_name, max_tokens=max_tokens)
+    _set_chat_completion_token_limit(
+        payload,
+        provider_name=provider_name,
+        max_tokens=_provider_output_token_limit(provider_cfg, max_tokens),
+    )
     return _post_openai_compatible_chat_with_retry(
         provider_name,
         endpoint,
         headers,
         payload,
         prompt_metadata=prompt_metadata,
+        provider_cfg=provider_cfg,
     )
 
 
@@ -1620,10 +1864,12 @@ def _build_reflection_prompt_package(
         context=ctx,
     )
     service_profile = _resolve_prompt_profile(service=service, context=ctx)
+    unavailable_tool_ids = _collect_unavailable_tool_ids(ctx)
     context_block = _build_context_block(
         ctx,
         current_phase_override=current_phase,
         include_summary=bool(context_summary_enabled),
+        unavailable_tool_ids=unavailable_tool_ids,
     )
     recent_rounds_payload = _build_recent_rounds_block(rounds)
     trigger_block = ""
@@ -1661,6 +1907,7 @@ def _build_reflection_prompt_package(
     return {
         "system_prompt": system_prompt,
         "user_prompt": user_prompt,
+        "unavailable_tool_ids": unavailable_tool_ids,
         "metadata": {
             "prompt_version": SCHEDULER_REFLECTION_PROMPT_VERSION,
             "prompt_type": "reflection",
@@ -1698,10 +1945,12 @@ def _build_web_followup_prompt_package(
         engagement_preset=engagement_preset,
         context=ctx,
     )
+    unavailable_tool_ids = _collect_unavailable_tool_ids(ctx)
     context_block = _build_context_block(
         ctx,
         current_phase_override=current_phase,
         include_summary=bool(context_summary_enabled),
+        unavailable_tool_ids=unavailable_tool_ids,
     )
     system_prompt = (
         "You are a specialist web follow-up advisor operating inside a governed penetration-testing scheduler.\n"
@@ -1741,6 +1990,7 @@ def _build_web_followup_prompt_package(
     return {
         "system_prompt": system_prompt,
         "user_prompt": prefix + candidate_block,
+        "unavailable_tool_ids": unavailable_tool_ids,
         "metadata": {
             "prompt_version": SCHEDULER_WEB_FOLLOWUP_PROMPT_VERSION,
             "prompt_type": "web_followup",
@@ -1901,7 +2151,8 @@ def _probe_openai_compatible(provider_name: str, provider_cfg: Dict[str, Any], s
                 system_prompt="Return strict JSON only.",
                 user_prompt=test_prompt,
                 temperature=0.0,
-                max_tokens=120,
+                max_tokens=_provider_output_token_limit(provider_cfg, 120),
+                timeout=_provider_timeout_seconds(provider_cfg),
             )
             content = str(result.get("content", "") or "")
             endpoint_used = str(result.get("endpoint", "") or "")
@@ -1916,7 +2167,11 @@ def _probe_openai_compatible(provider_name: str, provider_cfg: Dict[str, Any], s
                 ],
             }
             _set_chat_completion_temperature(payload, provider_name=provider_name, temperature=0.0)
-            _set_chat_completion_token_limit(payload, provider_name=provider_name, max_tokens=120)
+            _set_chat_completion_token_limit(
+                payload,
+                provider_name=provider_name,
+                max_tokens=_provider_output_token_limit(provider_cfg, 120),
+            )
             structured_outputs_enabled = _openai_structured_outputs_enabled(provider_name, provider_cfg)
             structured_output_requested = bool(structured_outputs_enabled)
             if structured_outputs_enabled:
@@ -1928,6 +2183,7 @@ def _probe_openai_compatible(provider_name: str, provider_cfg: Dict[str, Any], s
                 "structured_output_used": bool(structured_outputs_enabled),
                 "structured_output_fallback": False,
             }
+            # A connection test should report a rate limit or outage right away, not back off first.
             try:
                 content = _post_openai_compatible_chat_with_retry(
                     provider_name,
@@ -1935,6 +2191,8 @@ def _probe_openai_compatible(provider_name: str, provider_cfg: Dict[str, Any], s
                     headers,
                     payload,
                     prompt_metadata=request_metadata,
+                    provider_cfg=provider_cfg,
+                    max_retries=0,
                 )
             except ProviderError as exc:
                 if not structured_outputs_enabled or not _should_fallback_from_structured_outputs(exc):
@@ -1950,6 +2208,8 @@ def _probe_openai_compatible(provider_name: str, provider_cfg: Dict[str, Any], s
                     headers,
                     fallback_payload,
                     prompt_metadata=request_metadata,
+                    provider_cfg=provider_cfg,
+                    max_retries=0,
                 )
             structured_output_used = bool(structured_outputs_enabled and not structured_output_fallback)
             endpoint_used = endpoint
@@ -2021,7 +2281,10 @@ def _resolve_openai_compatible_model(
     if provider_name != "lm_studio":
         raise ProviderError(f"Model is required for provider {provider_name}.")
 
-    discovered_models = _fetch_lmstudio_models(base_url, headers)
+    if isinstance(provider_cfg, dict) and bool(provider_cfg.get("model_cache_enabled", False)):
+        discovered_models = _fetch_lmstudio_models_cached(base_url, headers)
+    else:
+        discovered_models = _fetch_lmstudio_models(base_url, headers)
     if not discovered_models:
         raise ProviderError(
             "LM Studio model is empty and no models were returned from /models. "
@@ -2031,6 +2294,20 @@ def _resolve_openai_compatible_model(
     return selected, discovered_models, True
 
 
+def _fetch_lmstudio_models_cached(base_url: str, headers: Dict[str, str]) -> List[str]:
+    authorization = str((headers or {}).get("Authorization", "") or "")
+    key = f"{base_url}|{hashlib.sha256(authorization.encode('utf-8')).hexdigest()}"
+    now = time.monotonic()
+    with _provider_response_cache_lock:
+        entry = _lmstudio_model_cache.get(key)
+    if entry is not None and now - entry[0] <= LMSTUDIO_MODEL_CACHE_TTL_SECONDS:
+        return list(entry[1])
+    models = _fetch_lmstudio_models(base_url, headers)
+    with _provider_response_cache_lock:
+        _lmstudio_model_cache[key] = (time.monotonic(), list(models))
+    return models
+
+
 def _fetch_lmstudio_models(base_url: str, headers: Dict[str, str]) -> List[str]:
     requests_module = _get_requests_module()
     auth_state = _auth_state_text(headers)
@@ -2071,7 +2348,7 @@ def _fetch_lmstudio_models(base_url: str, headers: Dict[str, str]) -> List[str]:
             continue
 
         try:
-            payload = response.json()
+            payload = _response_json(response)
         except Exception as exc:
             errors.append(f"{endpoint}: non-JSON response ({exc})")
             continue
@@ -2102,14 +2379,8 @@ def _select_preferred_lmstudio_model(models: List[str]) -> str:
             value += 8
         return value
 
-    best = models[0]
-    best_score = score(best)
-    for model_id in models[1:]:
-        current_score = score(model_id)
-        if current_score > best_score:
-            best = model_id
-            best_score = current_score
-    return best
+    # max() keeps the first of equally scored models, matching the listing order.
+    return max(models, key=score)
 
 
 def _post_openai_compatible_chat_with_retry(
@@ -2119,8 +2390,15 @@ def _post_openai_compatible_chat_with_retry(
         payload: Dict[str, Any],
         *,
         prompt_metadata: Optional[Dict[str, Any]] = None,
+        provider_cfg: Optional[Dict[str, Any]] = None,
+        max_retries: Optional[int] = None,
 ) -> str:
     retriable_provider = str(provider_name or "").strip().lower() == "openai"
+    retry_policy = _provider_retry_policy(provider_cfg)
+    if max_retries is not None:
+        retry_policy = (max(0, int(max_retries)),) + retry_policy[1:]
+    timeout = _provider_timeout_seconds(provider_cfg)
+    max_output_tokens = _provider_output_token_limit(provider_cfg, MAX_PROVIDER_OUTPUT_TOKENS)
     request_payload = dict(payload or {})
     token_limit = _extract_chat_completion_token_limit(request_payload)
     retry_reason = "initial_request"
@@ -2132,12 +2410,14 @@ def _post_openai_compatible_chat_with_retry(
             "retry_reason": str(retry_reason or "initial_request"),
             "effective_max_completion_tokens": int(token_limit),
         })
-        result = _post_openai_compatible_chat_detailed(
+        result = _post_openai_compatible_chat_with_backoff(
             provider_name,
             endpoint,
             headers,
             request_payload,
             prompt_metadata=attempt_prompt_metadata,
+            retry_policy=retry_policy,
+            timeout=timeout,
         )
         content = str(result.get("content", "") or "")
         finish_reason = str(result.get("finish_reason", "")).strip().lower()
@@ -2151,6 +2431,7 @@ def _post_openai_compatible_chat_with_retry(
 
         token_limit = min(
             MAX_PROVIDER_OPENAI_RETRY_TOKENS,
+            max_output_tokens,
             max(token_limit + 200, token_limit * 2),
         )
         _set_chat_completion_token_limit(request_payload, provider_name=provider_name, max_tokens=token_limit)
@@ -2160,6 +2441,117 @@ def _post_openai_compatible_chat_with_retry(
     return ""
 
 
+def _provider_retry_policy(provider_cfg: Optional[Dict[str, Any]]) -> Tuple[int, float, float]:
+    cfg = provider_cfg if isinstance(provider_cfg, dict) else {}
+    try:
+        max_retries = int(cfg.get("max_retries", DEFAULT_PROVIDER_MAX_RETRIES))
+    except (TypeError, ValueError):
+        max_retries = DEFAULT_PROVIDER_MAX_RETRIES
+    try:
+        retry_base = float(cfg.get("retry_base", DEFAULT_PROVIDER_RETRY_BASE_SECONDS))
+    except (TypeError, ValueError):
+        retry_base = DEFAULT_PROVIDER_RETRY_BASE_SECONDS
+    try:
+        retry_max = float(cfg.get("retry_max", DEFAULT_PROVIDER_RETRY_MAX_SECONDS))
+    except (TypeError, ValueError):
+        retry_max = DEFAULT_PROVIDER_RETRY_MAX_SECONDS
+    return (
+        max(0, min(max_retries, MAX_PROVIDER_RETRIES)),
+        max(0.0, retry_base),
+        max(0.0, retry_max),
+    )
+
+
+def _provider_timeout_seconds(provider_cfg: Optional[Dict[str, Any]]) -> float:
+    cfg = provider_cfg if isinstance(provider_cfg, dict) else {}
+    try:
+        timeout = float(cfg.get("timeout_seconds", DEFAULT_PROVIDER_TIMEOUT_SECONDS))
+    except (TypeError, ValueError):
+        timeout = DEFAULT_PROVIDER_TIMEOUT_SECONDS
+    if timeout != timeout or timeout <= 0:
+        timeout = DEFAULT_PROVIDER_TIMEOUT_SECONDS
+    return min(timeout, MAX_PROVIDER_TIMEOUT_SECONDS)
+
+
+def _provider_output_token_limit(provider_cfg: Optional[Dict[str, Any]], max_tokens: int) -> int:
+    cfg = provider_cfg if isinstance(provider_cfg, dict) else {}
+    try:
+        cap = int(cfg.get("max_output_tokens", MAX_PROVIDER_OPENAI_RETRY_TOKENS))
+    except (TypeError, ValueError):
+        cap = MAX_PROVIDER_OPENAI_RETRY_TOKENS
+    cap = max(1, min(cap, MAX_PROVIDER_OUTPUT_TOKENS))
+    return max(1, min(int(max_tokens), cap))
+
+
+def _provider_retry_delay(attempt: int, retry_base: float, retry_max: float) -> float:
+    return min(retry_max, retry_base * (2 ** attempt) + random.uniform(0, retry_base))
+
+
+def _is_transient_transport_error(requests_module: Any, exc: BaseException) -> bool:
+    # Connection drops and timeouts may clear up; bad URLs, headers or payloads never will.
+    try:
+        transient_types = (
+            requests_module.ConnectionError,
+            requests_module.Timeout,
+            requests_module.exceptions.ChunkedEncodingError,
+        )
+    except (AttributeError, ProviderError):
+        return False
+    return isinstance(exc, transient_types)
+
+
+def _retry_after_seconds(response: Any) -> Optional[float]:
+    headers = getattr(response, "headers", None) or {}
+    value = str(headers.get("Retry-After", "") or "").strip()
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        seconds = (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+    if seconds != seconds:
+        return None
+    return max(0.0, min(seconds, MAX_PROVIDER_RETRY_AFTER_SECONDS))
+
+
+def _post_openai_compatible_chat_with_backoff(
+        provider_name: str,
+        endpoint: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        *,
+        prompt_metadata: Optional[Dict[str, Any]] = None,
+        retry_policy: Optional[Tuple[int, float, float]] = None,
+        timeout: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    max_retries, retry_base, retry_max = retry_policy or _provider_retry_policy(None)
+    attempt = 0
+    while True:
+        try:
+            return _post_openai_compatible_chat_detailed(
+                provider_name,
+                endpoint,
+                headers,
+                payload,
+                prompt_metadata=prompt_metadata,
+                timeout=timeout,
+            )
+        except ProviderTransientError as exc:
+            if attempt >= max_retries:
+                raise
+            delay = exc.retry_after
+        if delay is None:
+            delay = _provider_retry_delay(attempt, retry_base, retry_max)
+        time.sleep(delay)
+        attempt += 1
+
+
 def _post_openai_compatible_chat(
         provider_name: str,
         endpoint: str,
@@ -2167,6 +2559,7 @@ def _post_openai_compatible_chat(
         payload: Dict[str, Any],
         *,
         prompt_metadata: Optional[Dict[str, Any]] = None,
+        timeout: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
 ) -> str:
     result = _post_openai_compatible_chat_detailed(
         provider_name,
@@ -2174,6 +2567,7 @@ def _post_openai_compatible_chat(
         headers,
         payload,
         prompt_metadata=prompt_metadata,
+        timeout=timeout,
     )
     return str(result.get("content", "") or "")
 
@@ -2185,13 +2579,14 @@ def _post_openai_compatible_chat_detailed(
         payload: Dict[str, Any],
         *,
         prompt_metadata: Optional[Dict[str, Any]] = None,
+        timeout: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
 ) -> Dict[str, Any]:
     requests_module = _get_requests_module()
     auth_state = _auth_state_text(headers)
     request_headers = dict(headers or {})
     request_payload = dict(payload or {})
     try:
-        response = requests_module.post(endpoint, headers=headers, json=payload, timeout=25)
+        response = requests_module.post(endpoint, headers=headers, json=payload, timeout=timeout)
     except Exception as exc:
         _record_provider_log(
             provider=provider_name,
@@ -2205,7 +2600,10 @@ def _post_openai_compatible_chat_detailed(
             api_style="openai_compatible",
             prompt_metadata=prompt_metadata,
         )
-        raise ProviderError(f"{provider_name} request failed ({auth_state}): {exc}") from exc
+        message = f"{provider_name} request failed ({auth_state}): {exc}"
+        if _is_transient_transport_error(requests_module, exc):
+            raise ProviderTransientError(message) from exc
+        raise ProviderError(message) from exc
 
     _record_provider_log(
         provider=provider_name,
@@ -2220,11 +2618,16 @@ def _post_openai_compatible_chat_detailed(
         prompt_metadata=prompt_metadata,
     )
 
+    if response.status_code in PROVIDER_TRANSIENT_STATUS_CODES:
+        raise ProviderTransientError(
+            f"{provider_name} API error ({auth_state}): {response.status_code} {response.text}",
+            retry_after=_retry_after_seconds(response),
+        )
     if response.status_code >= 300:
         raise ProviderError(f"{provider_name} API error ({auth_state}): {response.status_code} {response.text}")
 
     try:
-        data = response.json()
+        data = _response_json(response)
     except Exception as exc:
         raise ProviderError(f"{provider_name} API returned non-JSON response: {exc}") from exc
 
@@ -2313,6 +2716,7 @@ def _post_lmstudio_chat_with_fallback(
         temperature: Optional[float],
         max_tokens: Optional[int],
         prompt_metadata: Optional[Dict[str, Any]] = None,
+        timeout: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
 ) -> Dict[str, str]:
     errors = []
 
@@ -2339,6 +2743,7 @@ def _post_lmstudio_chat_with_fallback(
                         headers,
                         payload,
                         prompt_metadata=prompt_metadata,
+                        timeout=timeout,
                     )
                     return {
                         "content": content,
@@ -2362,6 +2767,7 @@ def _post_lmstudio_chat_with_fallback(
                         headers,
                         payload,
                         prompt_metadata=prompt_metadata,
+                        timeout=timeout,
                     )
                     return {
                         "content": content,
@@ -2382,13 +2788,14 @@ def _post_lmstudio_native_chat(
         payload: Dict[str, Any],
         *,
         prompt_metadata: Optional[Dict[str, Any]] = None,
+        timeout: float = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
 ) -> str:
     requests_module = _get_requests_module()
     auth_state = _auth_state_text(headers)
     request_headers = dict(headers or {})
     request_payload = dict(payload or {})
     try:
-        response = requests_module.post(endpoint, headers=headers, json=payload, timeout=25)
+        response = requests_module.post(endpoint, headers=headers, json=payload, timeout=timeout)
     except Exception as exc:
         _record_provider_log(
             provider="lm_studio",
@@ -2421,7 +2828,7 @@ def _post_lmstudio_native_chat(
         raise ProviderError(f"lm_studio API error ({auth_state}): {response.status_code} {response.text}")
 
     try:
-        data = response.json()
+        data = _response_json(response)
     except Exception as exc:
         raise ProviderError(f"lm_studio API returned non-JSON response: {exc}") from exc
 
@@ -2465,7 +2872,7 @@ def _call_claude(
     return _parse_provider_payload(
         content,
         allowed_tool_ids=allowed_tool_ids,
-        unavailable_tool_ids=_collect_unavailable_tool_ids(normalized_context),
+        unavailable_tool_ids=_prompt_package_unavailable_tool_ids(prompt_package, normalized_context),
         current_phase=str(prompt_metadata.get("current_phase", "") or "").strip().lower() if normalized_context else "",
     )
 
@@ -2507,7 +2914,7 @@ def _request_claude_content(
         user_prompt = str(prompt_package or "")
     payload = {
         "model": model,
-        "max_tokens": max(1, int(max_tokens or 1)),
+        "max_tokens": _provider_output_token_limit(provider_cfg, max(1, int(max_tokens or 1))),
         "temperature": float(temperature),
         "messages": [
             {"role": "user", "content": user_prompt},
@@ -2517,7 +2924,12 @@ def _request_claude_content(
         payload["system"] = system_prompt
 
     try:
-        response = requests_module.post(endpoint, headers=headers, json=payload, timeout=25)
+        response = requests_module.post(
+            endpoint,
+            headers=headers,
+            json=payload,
+            timeout=_provider_timeout_seconds(provider_cfg),
+        )
     except Exception as exc:
         _record_provider_log(
             provider="claude",
@@ -2549,7 +2961,7 @@ def _request_claude_content(
     if response.status_code >= 300:
         raise ProviderError(f"claude API error: {response.status_code} {response.text}")
 
-    data = response.json()
+    data = _response_json(response)
     parts = data.get("content", [])
     text_chunks = []
     for part in parts:
@@ -2807,26 +3219,45 @@ def _normalize_manual_tests(
     return rows
 
 
-def _extract_json(text: str) -> Dict[str, Any]:
-    raw = str(text or "").strip()
-    if not raw:
-        raise ProviderError("Provider response was empty.")
+_FENCED_JSON_PATTERN = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL | re.IGNORECASE)
 
-    candidates = [raw]
-    fenced = re.findall(r"```(?:json)?\s*(\{.*?\})\s*```", raw, flags=re.DOTALL | re.IGNORECASE)
-    candidates.extend(fenced)
 
+def _loads_json_object(text: str) -> Optional[Dict[str, Any]]:
+    if orjson is not None:
+        try:
+            parsed = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # stdlib json also accepts NaN/Infinity and arbitrarily large integers.
+            parsed = None
+        if isinstance(parsed, dict):
+            return parsed
+    try:
+        parsed = json.loads(text)
+    except Exception:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _iter_json_candidates(raw: str):
+    # Only a text starting with "{" can decode to an object; skip parses that cannot succeed.
+    if raw.startswith("{"):
+        yield raw
+    for match in _FENCED_JSON_PATTERN.finditer(raw):
+        yield match.group(1)
     first_brace = raw.find("{")
     last_brace = raw.rfind("}")
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        candidates.append(raw[first_brace:last_brace + 1])
+    if first_brace != -1 and last_brace > first_brace and (first_brace, last_brace) != (0, len(raw) - 1):
+        yield raw[first_brace:last_brace + 1]
 
-    for candidate in candidates:
-        try:
-            parsed = json.loads(candidate)
-        except Exception:
-            continue
-        if isinstance(parsed, dict):
+
+def _extract_json(text: str) -> Dict[str, Any]:
+    raw = str(text or "").strip()
+    if not raw:
+        raise ProviderError("Provider response was empty.")
+
+    for candidate in _iter_json_candidates(raw):
+        parsed = _loads_json_object(candidate)
+        if parsed is not None:
             return parsed
     raise ProviderError("Provider returned non-JSON payload.")
 
@@ -2889,12 +3320,20 @@ def _truncate_block_text(value: str, max_chars: int) -> str:
     return text[:max_chars].rstrip() + "\n...[truncated]"
 
 
-def _build_context_block(context: Dict[str, Any], *, current_phase_override: str = "", include_summary: bool = True) -> str:
+def _build_context_block(
+        context: Dict[str, Any],
+        *,
+        current_phase_override: str = "",
+        include_summary: bool = True,
+        unavailable_tool_ids: Optional[List[str]] = None,
+) -> str:
     if not isinstance(context, dict) or not context:
         return ""
 
     lines = []
-    unavailable_tool_ids = set(_collect_unavailable_tool_ids(context))
+    if unavailable_tool_ids is None:
+        unavailable_tool_ids = _collect_unavailable_tool_ids(context)
+    unavailable_tool_ids = set(unavailable_tool_ids)
     context_summary = context.get("context_summary", {})
     if include_summary and isinstance(context_summary, dict) and context_summary:
         summary_payload: Dict[str, Any] = {}
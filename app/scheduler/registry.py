@@ -1,3 +1,4 @@
+import sys
 from typing import Any, Dict, List, Optional
 
 from app.scheduler.family import build_command_family_id
@@ -16,6 +17,8 @@ def _normalize_list(values: Any) -> List[str]:
         text = str(item or "").strip()
         if not text or text in seen:
             continue
+        # Scope tokens are compared against the planner's service/protocol constants on every plan.
+        text = sys.intern(text)
         seen.add(text)
         result.append(text)
     return result
@@ -184,7 +187,7 @@ class ActionRegistry:
         dangerous = list(dangerous_categories or [])
         port_actions = {}
         for row in list(getattr(settings, "portActions", []) or []):
-            tool_id = str(row[1])
+            tool_id = sys.intern(str(row[1]))
             port_actions[tool_id] = {
                 "label": str(row[0]),
                 "command_template": str(row[2]),
@@ -193,7 +196,7 @@ class ActionRegistry:
 
         scheduler_actions = {}
         for row in list(getattr(settings, "automatedAttacks", []) or []):
-            tool_id = str(row[0])
+            tool_id = sys.intern(str(row[0]))
             scheduler_actions[tool_id] = {
                 "service_scope": _normalize_list(str(row[1] if len(row) > 1 else "")),
                 "protocol_scope": _normalize_list(str(row[2] if len(row) > 2 else "tcp")) or ["tcp"],
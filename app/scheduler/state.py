@@ -15,6 +15,11 @@ from sqlalchemy import text
 from app.scheduler.policy import preset_from_legacy_goal_profile
 from app.url_normalization import normalize_discovered_url
 
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency path
+    orjson = None
+
 
 WEB_SERVICE_IDS = {"http", "https", "ssl", "soap", "http-proxy", "http-alt", "https-alt"}
 TARGET_SOURCE_KINDS = {"observed", "inferred", "ai_suggested", "user_entered"}
@@ -118,6 +123,12 @@ def _from_json(value: Any, fallback: Any):
     raw = str(value or "").strip()
     if not raw:
         return fallback
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # stdlib json also accepts NaN/Infinity and arbitrarily large integers.
+            pass
     try:
         return json.loads(raw)
     except Exception:
@@ -30,6 +30,15 @@ from app.paths import (
     get_legion_backup_dir,
     get_legion_conf_path,
 )
+from app.settings_migrations import (
+    LEGACY_WEB_CONTENT_DISCOVERY_COMMAND,
+    WEB_CONTENT_DISCOVERY_COMMAND,
+    WEB_CONTENT_GOBUSTER_COMMAND,
+    ensure_nuclei_auto_scan,
+    ensure_nuclei_command,
+    ensure_wapiti_command,
+    ensure_web_content_discovery_command,
+)
 
 
 # this class reads and writes application settings
@@ -37,6 +46,7 @@ from app.timing import getTimestamp
 
 log = getAppLogger()
 
+
 class AppSettings():
     WEB_SERVICE_SCOPE = "http,https,ssl,soap,http-proxy,http-alt,https-alt"
     HOST_SERVICE_SCOPE = "host"
@@ -58,28 +68,9 @@ class AppSettings():
         "https-wapiti",
         "sslyze",
     }
-    WEB_CONTENT_GOBUSTER_COMMAND = (
-        "(command -v gobuster >/dev/null 2>&1 && "
-        "((gobuster -m dir -k -q -u https://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt || "
-        "gobuster -m dir -q -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt) || "
-        "(gobuster dir -k -q -u https://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt || "
-        "gobuster dir -q -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt)))"
-    )
-    LEGACY_WEB_CONTENT_DISCOVERY_COMMAND = (
-        "(command -v feroxbuster >/dev/null 2>&1 && "
-        "(feroxbuster -u https://[IP]:[PORT] -k --silent -o [OUTPUT].txt || "
-        "feroxbuster -u http://[IP]:[PORT] --silent -o [OUTPUT].txt)) || "
-        "(command -v gobuster >/dev/null 2>&1 && "
-        "gobuster dir -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt) || "
-        "echo feroxbuster/gobuster not found"
-    )
-    WEB_CONTENT_DISCOVERY_COMMAND = (
-        "(command -v feroxbuster >/dev/null 2>&1 && "
-        "(feroxbuster -u https://[IP]:[PORT] -k --silent -o [OUTPUT].txt || "
-        "feroxbuster -u http://[IP]:[PORT] --silent -o [OUTPUT].txt)) || "
-        f"{WEB_CONTENT_GOBUSTER_COMMAND} || "
-        "echo feroxbuster/gobuster not found"
-    )
+    WEB_CONTENT_GOBUSTER_COMMAND = WEB_CONTENT_GOBUSTER_COMMAND
+    LEGACY_WEB_CONTENT_DISCOVERY_COMMAND = LEGACY_WEB_CONTENT_DISCOVERY_COMMAND
+    WEB_CONTENT_DISCOVERY_COMMAND = WEB_CONTENT_DISCOVERY_COMMAND
     NMAP_VULN_COMMAND = (
         "(nmap -Pn -n -sV -p [PORT] --script=vuln,vulners --stats-every 15s [IP] -oA [OUTPUT] || "
         "nmap -Pn -n -sV -p [PORT] --script=vuln --stats-every 15s [IP] -oA [OUTPUT])"
@@ -693,48 +684,11 @@ class AppSettings():
             self.actions.endGroup()
         return changed
 
-    @staticmethod
-    def _ensure_nuclei_command(command: str, automatic_scan: bool = False) -> str:
-        raw = str(command or "")
-        if "nuclei" not in raw.lower():
-            return raw
-        probe_marker = "__LEGION_NUCLEI_PROBE__"
-        normalized = re.sub(r"(?i)command\s+-v\s+nuclei", f"command -v {probe_marker}", raw)
-        if automatic_scan:
-            # Only patch direct scan invocations (`nuclei -u ...`), not probe checks
-            # like `command -v nuclei` and not tokens embedded in output filenames.
-            normalized = re.sub(
-                r"(?i)\bnuclei\b(?!\s+-as\b)(?=[^|;&()\n]*\s+-u\b)",
-                "nuclei -as",
-                normalized,
-            )
-        normalized = re.sub(
-            r"(?i)\bnuclei(?:\s+-as)?(?![^|;&()\n]*\s+-stats\b)(?=[^|;&()\n]*\s+-u\b)",
-            lambda match: f"{match.group(0)} -stats",
-            normalized,
-        )
-        normalized = re.sub(
-            r"(?i)(\s(?:-si|--stats-interval)\b(?:\s+|=))\S+",
-            lambda match: f"{match.group(1)}15",
-            normalized,
-        )
-        normalized = re.sub(
-            r"(?i)\bnuclei(?:\s+-as)?(?:\s+-stats)?(?![^|;&()\n]*\s+(?:-si|--stats-interval)(?:\s+|=))(?=[^|;&()\n]*\s+-u\b)",
-            lambda match: f"{match.group(0)} -si 15",
-            normalized,
-        )
-        normalized = re.sub(
-            r"(?i)\bnuclei(?:\s+-as)?(?:\s+-stats)?(?:\s+-si\s+15)?(?![^|;&()\n]*\s+(?:-silent|--silent)\b)(?=[^|;&()\n]*\s+-u\b)",
-            lambda match: f"{match.group(0)} -silent",
-            normalized,
-        )
-        normalized = re.sub(r"(?i)(?<!\S)--?no-color\b", "", normalized)
-        normalized = re.sub(r"[ \t]{2,}", " ", normalized)
-        return normalized.replace(probe_marker, "nuclei")
-
-    @staticmethod
-    def _ensure_nuclei_auto_scan(command: str) -> str:
-        return AppSettings._ensure_nuclei_command(command, automatic_scan=True)
+    # The pure command rewrites live in app.settings_migrations; keep the historical names on the class.
+    _ensure_nuclei_command = staticmethod(ensure_nuclei_command)
+    _ensure_nuclei_auto_scan = staticmethod(ensure_nuclei_auto_scan)
+    _ensure_web_content_discovery_command = staticmethod(ensure_web_content_discovery_command)
+    _ensure_wapiti_command = staticmethod(ensure_wapiti_command)
 
     @staticmethod
     def _ensure_banner_command(command: str) -> str:
@@ -990,21 +944,6 @@ class AppSettings():
         normalized = normalized.strip()
         return f"if command -v {tool} >/dev/null 2>&1; then {normalized}; else echo {tool} not found; fi"
 
-    @classmethod
-    def _ensure_web_content_discovery_command(cls, command: str) -> str:
-        raw = str(command or "")
-        if "gobuster" not in raw.lower():
-            return raw
-        if cls.LEGACY_WEB_CONTENT_DISCOVERY_COMMAND == raw:
-            return cls.WEB_CONTENT_DISCOVERY_COMMAND
-        legacy_gobuster_block = (
-            "(command -v gobuster >/dev/null 2>&1 && "
-            "gobuster dir -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt)"
-        )
-        if legacy_gobuster_block in raw:
-            return raw.replace(legacy_gobuster_block, cls.WEB_CONTENT_GOBUSTER_COMMAND)
-        return raw
-
     @classmethod
     def _ensure_httpx_command(cls, command: str) -> str:
         raw = cls._canonicalize_web_target_placeholders(str(command or ""))
@@ -1390,43 +1329,6 @@ class AppSettings():
         normalized_tool = str(tool_id or "").strip().lower()
         return {int(value) for value in cls.ALLOWED_NONZERO_EXIT_CODES.get(normalized_tool, set())}
 
-    @staticmethod
-    def _ensure_wapiti_command(command: str, scheme: str = "http") -> str:
-        raw = str(command or "")
-        if "wapiti" not in raw.lower():
-            return raw
-
-        selected_scheme = "https" if str(scheme or "").strip().lower() == "https" else "http"
-        url_target = f"{selected_scheme}://[IP]:[PORT]"
-
-        # Keep tool-presence probe fragments untouched, for example:
-        # `command -v wapiti >/dev/null 2>&1 && ...`
-        probe_marker = "__LEGION_WAPITI_PROBE__"
-        normalized = re.sub(
-            r"(?i)command\s+-v\s+wapiti",
-            f"command -v {probe_marker}",
-            raw,
-        )
-
-        # Already valid command templates do not need further mutation.
-        if re.search(r"(?i)\bwapiti\s+-u\s+https?://\[IP\](?::\[PORT\])?", normalized):
-            return normalized.replace(probe_marker, "wapiti")
-
-        # Remove positional URL argument after `wapiti` (legacy format).
-        normalized = re.sub(
-            r"(?i)\bwapiti\s+https?://\[IP\](?::\[PORT\])?",
-            "wapiti",
-            normalized,
-            count=1,
-        )
-        # Remove explicit --url/-u usages so we can insert one canonical URL.
-        normalized = re.sub(r"(?i)(?:--url|-u)\s+(?!-)\S+", "", normalized)
-        normalized = re.sub(r"(?i)(?:^|\s)(?:--url|-u)(?=\s|$)", " ", normalized)
-        # Insert canonical URL argument.
-        normalized = re.sub(r"(?i)\bwapiti\b", f"wapiti -u {url_target}", normalized, count=1)
-        normalized = re.sub(r"\s{2,}", " ", normalized).strip()
-        return normalized.replace(probe_marker, "wapiti")
-
     def getGeneralSettings(self):
         return self.getSettingsByGroup("GeneralSettings")
 
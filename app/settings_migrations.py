@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Pure command rewrites applied when legacy legion.conf actions are migrated.
+
+These helpers only transform command strings, so they are kept apart from
+AppSettings and its config file handling.
+"""
+
+import re
+
+WEB_CONTENT_GOBUSTER_COMMAND = (
+    "(command -v gobuster >/dev/null 2>&1 && "
+    "((gobuster -m dir -k -q -u https://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt || "
+    "gobuster -m dir -q -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt) || "
+    "(gobuster dir -k -q -u https://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt || "
+    "gobuster dir -q -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt)))"
+)
+LEGACY_WEB_CONTENT_DISCOVERY_COMMAND = (
+    "(command -v feroxbuster >/dev/null 2>&1 && "
+    "(feroxbuster -u https://[IP]:[PORT] -k --silent -o [OUTPUT].txt || "
+    "feroxbuster -u http://[IP]:[PORT] --silent -o [OUTPUT].txt)) || "
+    "(command -v gobuster >/dev/null 2>&1 && "
+    "gobuster dir -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt) || "
+    "echo feroxbuster/gobuster not found"
+)
+WEB_CONTENT_DISCOVERY_COMMAND = (
+    "(command -v feroxbuster >/dev/null 2>&1 && "
+    "(feroxbuster -u https://[IP]:[PORT] -k --silent -o [OUTPUT].txt || "
+    "feroxbuster -u http://[IP]:[PORT] --silent -o [OUTPUT].txt)) || "
+    f"{WEB_CONTENT_GOBUSTER_COMMAND} || "
+    "echo feroxbuster/gobuster not found"
+)
+_LEGACY_GOBUSTER_BLOCK = (
+    "(command -v gobuster >/dev/null 2>&1 && "
+    "gobuster dir -u http://[IP]:[PORT]/ -w /usr/share/wordlists/dirb/common.txt -o [OUTPUT].txt)"
+)
+
+# Patterns used by the per-action migration normalizers, which run for every legacy action on each load.
+_NUCLEI_PROBE_PATTERN = re.compile(r"(?i)command\s+-v\s+nuclei")
+_NUCLEI_AUTO_SCAN_PATTERN = re.compile(r"(?i)\bnuclei\b(?!\s+-as\b)(?=[^|;&()\n]*\s+-u\b)")
+_NUCLEI_STATS_PATTERN = re.compile(r"(?i)\bnuclei(?:\s+-as)?(?![^|;&()\n]*\s+-stats\b)(?=[^|;&()\n]*\s+-u\b)")
+_NUCLEI_STATS_INTERVAL_VALUE_PATTERN = re.compile(r"(?i)(\s(?:-si|--stats-interval)\b(?:\s+|=))\S+")
+_NUCLEI_STATS_INTERVAL_PATTERN = re.compile(
+    r"(?i)\bnuclei(?:\s+-as)?(?:\s+-stats)?(?![^|;&()\n]*\s+(?:-si|--stats-interval)(?:\s+|=))(?=[^|;&()\n]*\s+-u\b)"
+)
+_NUCLEI_SILENT_PATTERN = re.compile(
+    r"(?i)\bnuclei(?:\s+-as)?(?:\s+-stats)?(?:\s+-si\s+15)?(?![^|;&()\n]*\s+(?:-silent|--silent)\b)"
+    r"(?=[^|;&()\n]*\s+-u\b)"
+)
+_NO_COLOR_FLAG_PATTERN = re.compile(r"(?i)(?<!\S)--?no-color\b")
+_REPEATED_BLANKS_PATTERN = re.compile(r"[ \t]{2,}")
+_WAPITI_PROBE_PATTERN = re.compile(r"(?i)command\s+-v\s+wapiti")
+_WAPITI_URL_OPTION_PATTERN = re.compile(r"(?i)\bwapiti\s+-u\s+https?://\[IP\](?::\[PORT\])?")
+_WAPITI_POSITIONAL_URL_PATTERN = re.compile(r"(?i)\bwapiti\s+https?://\[IP\](?::\[PORT\])?")
+_WAPITI_URL_ARGUMENT_PATTERN = re.compile(r"(?i)(?:--url|-u)\s+(?!-)\S+")
+_WAPITI_BARE_URL_FLAG_PATTERN = re.compile(r"(?i)(?:^|\s)(?:--url|-u)(?=\s|$)")
+_WAPITI_TOOL_PATTERN = re.compile(r"(?i)\bwapiti\b")
+_REPEATED_WHITESPACE_PATTERN = re.compile(r"\s{2,}")
+
+
+def ensure_nuclei_command(command: str, automatic_scan: bool = False) -> str:
+    raw = str(command or "")
+    if "nuclei" not in raw.lower():
+        return raw
+    probe_marker = "__LEGION_NUCLEI_PROBE__"
+    normalized = _NUCLEI_PROBE_PATTERN.sub(f"command -v {probe_marker}", raw)
+    if automatic_scan:
+        # Only patch direct scan invocations (`nuclei -u ...`), not probe checks
+        # like `command -v nuclei` and not tokens embedded in output filenames.
+        normalized = _NUCLEI_AUTO_SCAN_PATTERN.sub("nuclei -as", normalized)
+    normalized = _NUCLEI_STATS_PATTERN.sub(lambda match: f"{match.group(0)} -stats", normalized)
+    normalized = _NUCLEI_STATS_INTERVAL_VALUE_PATTERN.sub(lambda match: f"{match.group(1)}15", normalized)
+    normalized = _NUCLEI_STATS_INTERVAL_PATTERN.sub(lambda match: f"{match.group(0)} -si 15", normalized)
+    normalized = _NUCLEI_SILENT_PATTERN.sub(lambda match: f"{match.group(0)} -silent", normalized)
+    normalized = _NO_COLOR_FLAG_PATTERN.sub("", normalized)
+    normalized = _REPEATED_BLANKS_PATTERN.sub(" ", normalized)
+    return normalized.replace(probe_marker, "nuclei")
+
+
+def ensure_nuclei_auto_scan(command: str) -> str:
+    return ensure_nuclei_command(command, automatic_scan=True)
+
+
+def ensure_web_content_discovery_command(command: str) -> str:
+    raw = str(command or "")
+    if "gobuster" not in raw.lower():
+        return raw
+    if LEGACY_WEB_CONTENT_DISCOVERY_COMMAND == raw:
+        return WEB_CONTENT_DISCOVERY_COMMAND
+    if _LEGACY_GOBUSTER_BLOCK in raw:
+        return raw.replace(_LEGACY_GOBUSTER_BLOCK, WEB_CONTENT_GOBUSTER_COMMAND)
+    return raw
+
+
+def ensure_wapiti_command(command: str, scheme: str = "http") -> str:
+    raw = str(command or "")
+    if "wapiti" not in raw.lower():
+        return raw
+
+    selected_scheme = "https" if str(scheme or "").strip().lower() == "https" else "http"
+    url_target = f"{selected_scheme}://[IP]:[PORT]"
+
+    # Keep tool-presence probe fragments untouched, for example:
+    # `command -v wapiti >/dev/null 2>&1 && ...`
+    probe_marker = "__LEGION_WAPITI_PROBE__"
+    normalized = _WAPITI_PROBE_PATTERN.sub(f"command -v {probe_marker}", raw)
+
+    # Already valid command templates do not need further mutation.
+    if _WAPITI_URL_OPTION_PATTERN.search(normalized):
+        return normalized.replace(probe_marker, "wapiti")
+
+    # Remove positional URL argument after `wapiti` (legacy format).
+    normalized = _WAPITI_POSITIONAL_URL_PATTERN.sub("wapiti", normalized, count=1)
+    # Remove explicit --url/-u usages so we can insert one canonical URL.
+    normalized = _WAPITI_URL_ARGUMENT_PATTERN.sub("", normalized)
+    normalized = _WAPITI_BARE_URL_FLAG_PATTERN.sub(" ", normalized)
+    # Insert canonical URL argument.
+    normalized = _WAPITI_TOOL_PATTERN.sub(f"wapiti -u {url_target}", normalized, count=1)
+    normalized = _REPEATED_WHITESPACE_PATTERN.sub(" ", normalized).strip()
+    return normalized.replace(probe_marker, "wapiti")
@@ -17,7 +17,7 @@ Author(s): Shane Scott (sscott@shanewilliamscott.com), Dmitriy Dubson (d.dubson@
 """
 
 from app.core.common import Filters
-from sqlalchemy import text
+from sqlalchemy import or_, text
 from sqlalchemy.exc import DatabaseError as SADatabaseError
 from sqlalchemy.exc import OperationalError
 from db.SqliteDbAdapter import Database, DatabaseIntegrityError
@@ -25,6 +25,9 @@ from db.entities.host import hostObj
 from app.osclassification import classify_os, ORDERED_OS_CATEGORIES
 from db.filters import applyFilters, applyHostsFilters
 
+# Rows per multi-row statement; keeps IN lists/executemany batches well under SQLite's variable limit.
+BULK_BATCH_SIZE = 500
+
 
 class HostRepository:
     def __init__(self, dbAdapter: Database):
@@ -143,6 +146,49 @@ class HostRepository:
             session.close()
         return host
 
+    def getExistingHostKeys(self, keys):
+        """
+        Return the subset of keys that already match a host ip or hostname.
+        """
+        candidates = [str(key) for key in dict.fromkeys(keys or [])]
+        if not candidates:
+            return set()
+        session = self.dbAdapter.session()
+        try:
+            existing = set()
+            for start in range(0, len(candidates), BULK_BATCH_SIZE):
+                batch = candidates[start:start + BULK_BATCH_SIZE]
+                rows = session.query(hostObj.ip, hostObj.hostname).filter(
+                    or_(hostObj.ip.in_(batch), hostObj.hostname.in_(batch))
+                ).all()
+                for ip, hostname in rows:
+                    existing.add(ip)
+                    existing.add(hostname)
+            return existing.intersection(candidates)
+        finally:
+            session.close()
+
+    def addHostsBulk(self, rows):
+        """
+        Insert host rows (dicts keyed by hostObj column name) with one executemany per batch
+        and a single commit. Returns the number of rows inserted.
+        """
+        rows = list(rows or [])
+        if not rows:
+            return 0
+        session = self.dbAdapter.session()
+        try:
+            statement = hostObj.__table__.insert()
+            for start in range(0, len(rows), BULK_BATCH_SIZE):
+                session.execute(statement, rows[start:start + BULK_BATCH_SIZE])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        return len(rows)
+
     def getAllHostObjs(self):
         """
         Return all hostObj ORM objects in the database.
@@ -19,7 +19,6 @@ Author(s): Shane Scott (sscott@shanewilliamscott.com), Dmitriy Dubson (d.dubson@
 import os
 import re
 import shutil
-import subprocess
 import sys
 from typing import Optional
 
@@ -217,12 +216,35 @@ def doPathSetup():
         shutil.copy('./legion.conf', conf_path)
 
 
+
+def build_core():
+    """Wire up the shell, project manager and logic shared by the headless and GUI modes."""
+    from app.ProjectManager import ProjectManager
+    from app.shell.DefaultShell import DefaultShell
+    from app.tools.nmap.DefaultNmapExporter import DefaultNmapExporter
+    from db.RepositoryFactory import RepositoryFactory
+    from app.tools.ToolCoordinator import ToolCoordinator
+    from app.logic import Logic
+    from app.logging.legionLog import getAppLogger, getDbLogger
+
+    shell = DefaultShell()
+    appLogger = getAppLogger()
+    projectManager = ProjectManager(shell, RepositoryFactory(getDbLogger()), appLogger)
+    toolCoordinator = ToolCoordinator(shell, DefaultNmapExporter(shell, appLogger))
+    logic = Logic(shell, projectManager, toolCoordinator)
+    return shell, projectManager, logic
+
 def build_arg_parser():
     import argparse
 
     parser = argparse.ArgumentParser(description="Start Legion")
     audit_group = parser.add_mutually_exclusive_group()
     parser.add_argument("--mcp-server", action="store_true", help="Start MCP server for AI integration")
+    parser.add_argument(
+        "--mcp-socket",
+        default="",
+        help="Serve MCP on a user-only (0600) unix socket at this path instead of stdio",
+    )
     parser.add_argument("--headless", action="store_true", help="Run Legion in headless (CLI) mode")
     parser.add_argument("--web", action="store_true", help="Run Legion with the local Flask web interface")
     audit_group.add_argument("--tool-audit", action="store_true", help="Print a tool availability audit and exit")
@@ -287,30 +309,25 @@ if __name__ == "__main__":
     parser = build_arg_parser()
     args = parser.parse_args()
 
-    from app.ApplicationInfo import getConsoleLogo
-    from app.ProjectManager import ProjectManager
-    from app.logging.legionLog import getStartupLogger, getDbLogger, getAppLogger
-    from app.shell.DefaultShell import DefaultShell
-    from app.tools.nmap.DefaultNmapExporter import DefaultNmapExporter
-    from db.RepositoryFactory import RepositoryFactory
-    from app.tools.ToolCoordinator import ToolCoordinator
-    from app.logic import Logic
+    from app.ApplicationInfo import getConsoleLogo, getPlainConsoleLogo
+    from app.logging.legionLog import getStartupLogger
 
     startupLog = getStartupLogger()
 
-    if args.mcp_server:
-        # Start MCP server as a subprocess (separate stdio)
-        mcp_proc = subprocess.Popen(
-            [sys.executable, "app/mcpServer.py"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            stdin=subprocess.DEVNULL,
-        )
+    mcp_output = None
+    if args.mcp_server and not args.mcp_socket:
+        # MCP over stdio owns stdout; everything else Legion prints goes to stderr from here on.
+        from app.mcpServer import claim_stdout
+        mcp_output = claim_stdout()
+    mcp_transport = f"unix socket {args.mcp_socket}" if args.mcp_socket else "stdio"
 
-    from colorama import init
-    from termcolor import cprint
-    init(strip=not sys.stdout.isatty())
-    cprint(getConsoleLogo())
+    if os.environ.get("NO_COLOR") or not sys.stdout.isatty():
+        print(getPlainConsoleLogo())
+    else:
+        from colorama import init
+        from termcolor import cprint
+        init(strip=False)
+        cprint(getConsoleLogo())
 
     doPathSetup()
 
@@ -381,55 +398,66 @@ if __name__ == "__main__":
         web_app.config["LEGION_WEB_BIND_HOST"] = web_bind_host
         web_app.config["LEGION_WEB_BIND_LABEL"] = describe_web_bind_host(web_bind_host)
         web_app.config["LEGION_UI_OPAQUE"] = resolve_web_opaque_ui(args)
+        if args.mcp_server:
+            from app.mcpServer import start_in_thread as start_mcp_server_thread
+            startupLog.info("Starting MCP server on %s", mcp_transport)
+            start_mcp_server_thread(runtime=runtime, socket_path=args.mcp_socket, output=mcp_output)
         web_app.run(host=web_bind_host, port=args.web_port, debug=False, use_reloader=False)
         sys.exit(0)
 
     if args.headless:
         # --- HEADLESS CLI MODE ---
-        from app.cli_utils import import_targets_from_textfile, run_nmap_scan
+        from app.cli_utils import import_targets, read_targets_from_textfile, start_nmap_scan
         from app.importers.nmap_runner import import_nmap_xml_into_project
         import time
 
-        shell = DefaultShell()
-        dbLog = getDbLogger()
-        appLogger = getAppLogger()
-        repositoryFactory = RepositoryFactory(dbLog)
-        projectManager = ProjectManager(shell, repositoryFactory, appLogger)
-        nmapExporter = DefaultNmapExporter(shell, appLogger)
-        toolCoordinator = ToolCoordinator(shell, nmapExporter)
-        logic = Logic(shell, projectManager, toolCoordinator)
+        shell, projectManager, logic = build_core()
         startupLog.info("Creating temporary project for headless mode...")
         logic.createNewTemporaryProject()
+        mcp_thread = None
+        if args.mcp_server:
+            from app.mcpServer import start_in_thread as start_mcp_server_thread
+            from app.web.runtime import WebRuntime
+            startupLog.info("Starting MCP server on %s", mcp_transport)
+            mcp_thread = start_mcp_server_thread(
+                runtime=WebRuntime(logic),
+                socket_path=args.mcp_socket,
+                output=mcp_output,
+            )
 
         # Import targets from input file
         if not args.input_file or not os.path.isfile(args.input_file):
             print("Error: --input-file is required and must exist in headless mode.", file=sys.stderr)
             sys.exit(1)
-        session = logic.activeProject.database.session()
-        hostRepository = logic.activeProject.repositoryContainer.hostRepository
-        import_targets_from_textfile(session, hostRepository, args.input_file)
+        project = logic.activeProject
+        session = project.database.session()
+        hostRepository = project.repositoryContainer.hostRepository
+
+        targets = read_targets_from_textfile(args.input_file)
+        if targets is None:
+            sys.exit(1)
 
-        # Run nmap scan if requested
+        # Start the nmap scan first so it runs while targets are ingested into the project
         nmap_xml = None
+        nmap_scan = None
         if args.staged_scan or args.discovery:
             # Build targets string for nmap (space-separated)
-            targets = []
-            with open(args.input_file, "r") as f:
-                for line in f:
-                    t = line.strip()
-                    if t and not t.startswith("#"):
-                        targets.append(t)
             targets_str = " ".join(targets)
-            output_prefix = os.path.join(logic.activeProject.properties.runningFolder, f"cli-nmap-{int(time.time())}")
-            nmap_xml = run_nmap_scan(
+            output_prefix = os.path.join(project.properties.runningFolder, f"cli-nmap-{int(time.time())}")
+            nmap_scan = start_nmap_scan(
                 targets_str,
                 output_prefix,
                 discovery=args.discovery,
                 staged=args.staged_scan
             )
+
+        import_targets(session, hostRepository, targets)
+
+        if nmap_scan is not None:
+            nmap_xml = nmap_scan.result()
             # Import nmap XML results into the project
             import_nmap_xml_into_project(
-                project=logic.activeProject,
+                project=project,
                 xml_path=nmap_xml,
                 output="",
                 update_progress_observable=None,
@@ -446,94 +474,13 @@ if __name__ == "__main__":
         if args.output_file:
             if args.output_file.endswith(".json"):
                 # Export directly from the current activeProject (no temp .legion file)
-                import json
-                import base64
-                hostRepository = logic.activeProject.repositoryContainer.hostRepository
-                hosts = hostRepository.getAllHostObjs()
-                hosts_data = []
-                for host in hosts:
-                    host_dict = host.__dict__.copy()
-                    host_dict.pop('_sa_instance_state', None)
-                    # Ports/services for this host
-                    try:
-                        ports = logic.activeProject.repositoryContainer.portRepository.getPortsByHostId(host.id)
-                    except Exception:
-                        ports = []
-                    ports_data = []
-                    for port in ports:
-                        port_dict = port.__dict__.copy()
-                        port_dict.pop('_sa_instance_state', None)
-                        # Service for this port
-                        try:
-                            service = (
-                                logic.activeProject.repositoryContainer.serviceRepository.getServiceById(port.serviceId)
-                                if hasattr(port, 'serviceId') and port.serviceId
-                                else None
-                            )
-                        except Exception:
-                            service = None
-                        if service:
-                            service_dict = service.__dict__.copy()
-                            service_dict.pop('_sa_instance_state', None)
-                            port_dict['service'] = service_dict
-                        # Scripts for this port
-                        try:
-                            scripts = (
-                                logic.activeProject.repositoryContainer.scriptRepository.getScriptsByPortId(port.id)
-                                if hasattr(logic.activeProject.repositoryContainer, 'scriptRepository')
-                                else []
-                            )
-                        except Exception:
-                            scripts = []
-                        scripts_data = []
-                        for script in scripts:
-                            script_dict = script.__dict__.copy()
-                            script_dict.pop('_sa_instance_state', None)
-                            scripts_data.append(script_dict)
-                        port_dict['scripts'] = scripts_data
-                        ports_data.append(port_dict)
-                    host_dict['ports'] = ports_data
-                    # Notes for this host
-                    try:
-                        note = logic.activeProject.repositoryContainer.noteRepository.getNoteByHostId(host.id)
-                        host_dict['note'] = note.text if note else ""
-                    except Exception:
-                        host_dict['note'] = ""
-                    # CVEs for this host
-                    try:
-                        cves = logic.activeProject.repositoryContainer.cveRepository.getCVEsByHostIP(host.ip)
-                    except Exception:
-                        cves = []
-                    cves_data = []
-                    for cve in cves:
-                        cve_dict = cve.__dict__.copy()
-                        cve_dict.pop('_sa_instance_state', None)
-                        cves_data.append(cve_dict)
-                    host_dict['cves'] = cves_data
-                    hosts_data.append(host_dict)
-                # Gather screenshots
-                screenshots_dir = os.path.join(logic.activeProject.properties.outputFolder, "screenshots")
-                screenshots_data = {}
-                if os.path.isdir(screenshots_dir):
-                    for fname in os.listdir(screenshots_dir):
-                        if fname.lower().endswith(".png"):
-                            fpath = os.path.join(screenshots_dir, fname)
-                            try:
-                                with open(fpath, "rb") as f:
-                                    b64 = base64.b64encode(f.read()).decode("utf-8")
-                                screenshots_data[fname] = b64
-                            except Exception as e:
-                                screenshots_data[fname] = f"ERROR: {e}"
-                export = {
-                    "hosts": hosts_data,
-                    "screenshots": screenshots_data
-                }
-                with open(args.output_file, "w", encoding="utf-8") as f:
-                    json.dump(export, f, indent=2)
+                from app.headless_export import export_project_json
+                export_project_json(project, args.output_file)
                 print(f"Exported results as JSON to {args.output_file}")
             elif args.output_file.endswith(".legion"):
-                # Save project as .legion file
-                projectManager.saveProjectAs(logic.activeProject, args.output_file, replace=1, projectType="legion")
+                # Save project as .legion file; a rename avoids copying the database when possible
+                from app.headless_export import export_project_legion
+                export_project_legion(logic, args.output_file, keep_open=mcp_thread is not None)
                 print(f"Exported project as .legion to {args.output_file}")
             else:
                 print("Error: --output-file must end with .json or .legion", file=sys.stderr)
@@ -542,6 +489,14 @@ if __name__ == "__main__":
             print("No --output-file specified, skipping export.")
 
         print("Headless Legion run complete.")
+        if mcp_thread is not None:
+            # Keep the project (reopened from a .legion export) available to the MCP client until it
+            # disconnects (or Ctrl-C on a socket).
+            print(f"MCP server still serving on {mcp_transport}.")
+            try:
+                mcp_thread.join()
+            except KeyboardInterrupt:
+                pass
         sys.exit(0)
 
     # --- GUI MODE ---
@@ -585,14 +540,7 @@ if __name__ == "__main__":
         notice.exec()
 
 
-    shell = DefaultShell()
-    dbLog = getDbLogger()
-    appLogger = getAppLogger()
-    repositoryFactory = RepositoryFactory(dbLog)
-    projectManager = ProjectManager(shell, repositoryFactory, appLogger)
-    nmapExporter = DefaultNmapExporter(shell, appLogger)
-    toolCoordinator = ToolCoordinator(shell, nmapExporter)
-    logic = Logic(shell, projectManager, toolCoordinator)
+    shell, projectManager, logic = build_core()
 
     startupLog.info("Creating temporary project at application start...")
     logic.createNewTemporaryProject()
@@ -610,30 +558,59 @@ if __name__ == "__main__":
 
     import signal
 
+    # Resolve the shutdown steps once so the signal handler only has to schedule them.
+    shutdown_hooks = []
+    screenshooter = getattr(controller, "screenshooter", None)
+    if screenshooter is not None:
+        def stop_screenshooter():
+            if screenshooter.isRunning():
+                screenshooter.quit()
+                # Bounded, so a hung capture cannot block exit.
+                screenshooter.wait(3000)
+
+        shutdown_hooks.append(stop_screenshooter)
+    from app.scheduler.providers import close_provider_sessions
+    shutdown_hooks.append(close_provider_sessions)
+    shutdown_hooks.append(app.quit)
+    shutdown_hooks = tuple(shutdown_hooks)
+
+    def run_shutdown_hooks():
+        for hook in shutdown_hooks:
+            try:
+                hook()
+            except Exception as e:
+                startupLog.error(f"Error during shutdown: {e}")
+        loop.stop()
+
     def graceful_shutdown(*args):
         startupLog.info("Graceful shutdown initiated.")
-        try:
-            # Attempt to stop QThreads (e.g., Screenshooter)
-            if hasattr(controller, "screenshooter") and controller.screenshooter.isRunning():
-                controller.screenshooter.quit()
-                controller.screenshooter.wait(3000)
-        except Exception as e:
-            startupLog.error(f"Error during QThread shutdown: {e}")
-        try:
-            loop.stop()
-        except Exception:
-            pass
-        try:
-            app.quit()
-        except Exception:
-            pass
-        sys.exit(0)
+        loop.call_soon_threadsafe(run_shutdown_hooks)
 
     signal.signal(signal.SIGINT, graceful_shutdown)
     signal.signal(signal.SIGTERM, graceful_shutdown)
 
+    mcp_server_task = None
+    if args.mcp_server:
+        from app.mcpServer import main as mcp_server_main
+        from app.web.runtime import WebRuntime
+
+        def report_mcp_server_exit(task):
+            if task.cancelled():
+                return
+            error = task.exception()
+            if error is not None:
+                startupLog.error(f"MCP server stopped: {error}")
+
+        startupLog.info("Starting MCP server on %s", mcp_transport)
+        # Serve the GUI's live logic, and keep the task referenced so failures like a busy socket get logged.
+        mcp_server_task = loop.create_task(
+            mcp_server_main(runtime=WebRuntime(logic), socket_path=args.mcp_socket, output=mcp_output)
+        )
+        mcp_server_task.add_done_callback(report_mcp_server_exit)
+
     startupLog.info("Legion started successfully.")
     try:
         sys.exit(loop.run_forever())
     except KeyboardInterrupt:
-        graceful_shutdown()
+        startupLog.info("Graceful shutdown initiated.")
+        run_shutdown_hooks()
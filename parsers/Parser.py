@@ -5,8 +5,9 @@
 __author__ = 'yunshu(wustyunshu@hotmail.com)'
 __version__ = '0.2'
 
-from typing import Optional
-from xml.dom.minidom import parse, Document
+from typing import Dict, List, Optional
+from xml.dom import pulldom
+from xml.dom.minidom import Document, Element
 
 __modified_by = 'ketchup'
 __modified_by = 'SECFORCE'
@@ -19,10 +20,27 @@ class MalformedXmlDocumentException(BaseException):
     pass
 
 
+class StreamedNmapDocument:
+    '''Subset of an nmap report collected while streaming; answers getElementsByTagName like a Document'''
+
+    # Elements Parser reads; everything else (verbose/debugging/output/etc.) is discarded as it streams past.
+    EXPANDED_TAGS = ('host', 'taskprogress', 'hosts', 'finished')
+    ATTRIBUTE_ONLY_TAGS = ('nmaprun',)
+
+    def __init__(self):
+        self.__elements: Dict[str, List[Element]] = {}
+
+    def add(self, node: Element):
+        self.__elements.setdefault(node.tagName, []).append(node)
+
+    def getElementsByTagName(self, tagName: str) -> List[Element]:
+        return list(self.__elements.get(tagName, []))
+
+
 class Parser:
     '''Parser class, parse a xml format nmap report'''
 
-    def __init__(self, dom: Document):
+    def __init__(self, dom: Document | StreamedNmapDocument):
         self.__dom = dom
         self.__session = None
         self.__hosts = {}
@@ -128,8 +146,23 @@ class Parser:
         return __tmp_ips
 
 
+def streamNmapReport(nmapXmlReportFileName: str) -> StreamedNmapDocument:
+    '''Stream the report with pulldom, expanding only the top-level elements Parser needs'''
+    document = StreamedNmapDocument()
+    events = pulldom.parse(nmapXmlReportFileName)
+    for event, node in events:
+        if event != pulldom.START_ELEMENT:
+            continue
+        if node.tagName in StreamedNmapDocument.EXPANDED_TAGS:
+            events.expandNode(node)
+            document.add(node)
+        elif node.tagName in StreamedNmapDocument.ATTRIBUTE_ONLY_TAGS:
+            document.add(node)
+    return document
+
+
 def parseNmapReport(nmapXmlReportFileName: str) -> Parser:
     try:
-        return Parser(parse(nmapXmlReportFileName))
+        return Parser(streamNmapReport(nmapXmlReportFileName))
     except Exception as e:
         raise MalformedXmlDocumentException(e)
@@ -1,274 +1,395 @@
+import itertools
+import json
 import os
+import shutil
 import tempfile
 import unittest
 from unittest.mock import patch
 
 
 class SchedulerConfigManagerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One scratch directory per class; each test gets uniquely named files inside it.
+        cls._tmpdir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls._tmpdir, ignore_errors=True)
+
+    def setUp(self):
+        self._config_serial = itertools.count()
+
+    def _config_path(self, name: str) -> str:
+        return os.path.join(self._tmpdir, f"{self._testMethodName}-{next(self._config_serial)}-{name}")
+
     def test_default_config_path_uses_legion_home_override(self):
         from app.scheduler.config import get_default_scheduler_config_path
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            legion_home = os.path.join(tmpdir, "legion-dev-home")
-            with patch.dict(os.environ, {"LEGION_HOME": legion_home}, clear=False):
-                path = get_default_scheduler_config_path()
+        legion_home = self._config_path("legion-dev-home")
+        with patch.dict(os.environ, {"LEGION_HOME": legion_home}, clear=False):
+            path = get_default_scheduler_config_path()
+
+        self.assertEqual(os.path.join(legion_home, "scheduler-ai.json"), path)
+        self.assertTrue(os.path.isdir(legion_home))
+
+    def test_default_config_path_is_memoized_per_legion_home(self):
+        from app.scheduler.config import get_default_scheduler_config_path
+
+        legion_home = self._config_path("legion-cached-home")
+        with patch.dict(os.environ, {"LEGION_HOME": legion_home}, clear=False):
+            first = get_default_scheduler_config_path()
+            with patch("app.scheduler.config.ensure_legion_home") as ensure_home:
+                second = get_default_scheduler_config_path()
 
-            self.assertEqual(os.path.join(legion_home, "scheduler-ai.json"), path)
-            self.assertTrue(os.path.isdir(legion_home))
+        self.assertEqual(first, second)
+        ensure_home.assert_not_called()
+
+    def test_save_recreates_missing_legion_home_for_memoized_path(self):
+        from app.scheduler.config import SchedulerConfigManager, get_default_scheduler_config_path
+
+        legion_home = self._config_path("legion-removed-home")
+        with patch.dict(os.environ, {"LEGION_HOME": legion_home}, clear=False):
+            get_default_scheduler_config_path()
+            shutil.rmtree(legion_home)
+            SchedulerConfigManager().update_preferences({"mode": "ai"})
+
+        with open(os.path.join(legion_home, "scheduler-ai.json"), "r", encoding="utf-8") as handle:
+            self.assertEqual("ai", json.load(handle)["mode"])
 
     def test_load_update_and_approve_family(self):
         from app.scheduler.config import SchedulerConfigManager
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            path = os.path.join(tmpdir, "scheduler-ai.json")
-            manager = SchedulerConfigManager(config_path=path)
-
-            defaults = manager.load()
-            self.assertEqual("deterministic", defaults["mode"])
-            self.assertEqual("internal_asset_discovery", defaults["goal_profile"])
-            self.assertEqual("internal_recon", defaults["engagement_policy"]["preset"])
-            self.assertEqual(1, int(defaults["max_concurrency"]))
-            self.assertEqual(1, int(defaults["max_host_concurrency"]))
-            self.assertEqual(200, int(defaults["max_jobs"]))
-            self.assertIn("ai_feedback", defaults)
-            self.assertTrue(defaults["ai_feedback"]["enabled"])
-            self.assertEqual(5, int(defaults["ai_feedback"]["max_rounds_per_target"]))
-            self.assertEqual(6, int(defaults["ai_feedback"]["max_actions_per_round"]))
-            self.assertTrue(defaults["ai_feedback"]["reflection_enabled"])
-            self.assertEqual(2, int(defaults["ai_feedback"]["stall_rounds_without_progress"]))
-            self.assertEqual(2, int(defaults["ai_feedback"]["stall_repeat_selection_threshold"]))
-            self.assertEqual(1, int(defaults["ai_feedback"]["max_reflections_per_target"]))
-            self.assertEqual("gpt-4.1-mini", defaults["providers"]["openai"]["model"])
-            self.assertFalse(defaults["providers"]["openai"]["structured_outputs"])
-            self.assertIn("integrations", defaults)
-            self.assertIn("grayhatwarfare", defaults["integrations"])
-            self.assertEqual("", defaults["integrations"]["grayhatwarfare"]["api_key"])
-            self.assertIn("shodan", defaults["integrations"])
-            self.assertEqual("", defaults["integrations"]["shodan"]["api_key"])
-            self.assertIn("device_categories", defaults)
-            self.assertEqual([], defaults["device_categories"])
-            self.assertIn("feature_flags", defaults)
-            self.assertFalse(defaults["feature_flags"]["graph_workspace"])
-            self.assertTrue(defaults["feature_flags"]["optional_runners"])
-            self.assertTrue(defaults["feature_flags"]["context_summary_enabled"])
-            self.assertTrue(defaults["feature_flags"]["scheduler_prompt_profiles"])
-            self.assertFalse(defaults["feature_flags"]["scheduler_web_followup_sidecar"])
-            self.assertIn("disabled_tool_ids", defaults)
-            self.assertIn("http-drupal-modules.nse", defaults["disabled_tool_ids"])
-            self.assertIn("http-vuln-zimbra-lfi.nse", defaults["disabled_tool_ids"])
-            self.assertIn("http-drupal-modules.nse", manager.get_disabled_tool_ids())
-            self.assertIn("tool_execution_profiles", defaults)
-            self.assertTrue(defaults["tool_execution_profiles"]["nikto"]["quiet_long_running"])
-            self.assertEqual(1800, int(defaults["tool_execution_profiles"]["nikto"]["activity_timeout_seconds"]))
-            self.assertEqual(3600, int(defaults["tool_execution_profiles"]["nikto"]["hard_timeout_seconds"]))
-            self.assertTrue(defaults["tool_execution_profiles"]["dirsearch"]["quiet_long_running"])
-            self.assertEqual(900, int(defaults["tool_execution_profiles"]["dirsearch"]["activity_timeout_seconds"]))
-            self.assertEqual(2400, int(defaults["tool_execution_profiles"]["dirsearch"]["hard_timeout_seconds"]))
-            self.assertTrue(defaults["tool_execution_profiles"]["ffuf"]["quiet_long_running"])
-            self.assertEqual(1800, int(defaults["tool_execution_profiles"]["ffuf"]["hard_timeout_seconds"]))
-            self.assertTrue(defaults["tool_execution_profiles"]["katana"]["quiet_long_running"])
-            self.assertEqual(1800, int(defaults["tool_execution_profiles"]["katana"]["hard_timeout_seconds"]))
-            self.assertIn("runners", defaults)
-            self.assertFalse(defaults["runners"]["container"]["enabled"])
-            self.assertTrue(defaults["runners"]["browser"]["enabled"])
-            self.assertIn("project_report_delivery", defaults)
-            self.assertEqual("POST", defaults["project_report_delivery"]["method"])
-            self.assertEqual("json", defaults["project_report_delivery"]["format"])
-
-            updated = manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "external_pentest",
-                "provider": "openai",
-                "providers": {
-                    "openai": {
-                        "enabled": True,
-                        "model": "gpt-5-mini",
-                        "api_key": "test-key",
-                        "structured_outputs": True,
-                    }
-                },
-                "integrations": {
-                    "grayhatwarfare": {
-                        "api_key": "test-grayhat-key",
-                    },
-                    "shodan": {
-                        "api_key": "test-shodan-key",
-                    }
-                },
-                "device_categories": [
-                    {
-                        "name": "OT",
-                        "ports": ["502", "20000"],
-                        "fingerprint_fragments": ["modbus", "dnp3"],
-                        "cpe": ["schneider"],
-                    }
-                ],
-            })
-            self.assertEqual("ai", updated["mode"])
-            self.assertEqual("external_pentest", updated["goal_profile"])
-            self.assertEqual("external_pentest", updated["engagement_policy"]["preset"])
-            self.assertEqual("openai", updated["provider"])
-            self.assertEqual(1, int(updated["max_concurrency"]))
-            self.assertEqual(1, int(updated["max_host_concurrency"]))
-            self.assertEqual("gpt-5-mini", updated["providers"]["openai"]["model"])
-            self.assertTrue(updated["providers"]["openai"]["structured_outputs"])
-            self.assertEqual("test-grayhat-key", updated["integrations"]["grayhatwarfare"]["api_key"])
-            self.assertEqual("test-shodan-key", updated["integrations"]["shodan"]["api_key"])
-            self.assertEqual("OT", updated["device_categories"][0]["name"])
-            self.assertEqual([502, 20000], updated["device_categories"][0]["ports"])
-            self.assertEqual(5, int(updated["ai_feedback"]["max_rounds_per_target"]))
-
-            normalized_openai_model = manager.update_preferences({
-                "providers": {
-                    "openai": {
-                        "model": "",
-                    }
-                },
-            })
-            self.assertEqual("gpt-4.1-mini", normalized_openai_model["providers"]["openai"]["model"])
-
-            updated_concurrency = manager.update_preferences({
-                "max_concurrency": 99,
-            })
-            self.assertEqual(16, int(updated_concurrency["max_concurrency"]))
-
-            updated_host_concurrency = manager.update_preferences({
-                "max_host_concurrency": 99,
-            })
-            self.assertEqual(8, int(updated_host_concurrency["max_host_concurrency"]))
-
-            updated_jobs = manager.update_preferences({
-                "max_jobs": 99999,
-            })
-            self.assertEqual(2000, int(updated_jobs["max_jobs"]))
-
-            updated_delivery = manager.update_preferences({
-                "project_report_delivery": {
-                    "provider_name": "siem-prod",
-                    "endpoint": "https://example.local/report",
-                    "method": "delete",
-                    "format": "markdown",
-                    "headers": {"Authorization": "Bearer token"},
-                    "timeout_seconds": 999,
-                    "mtls": {
-                        "enabled": True,
-                        "client_cert_path": "/tmp/client.crt",
-                        "client_key_path": "/tmp/client.key",
-                        "ca_cert_path": "/tmp/ca.crt",
-                    },
-                }
-            })
-            delivery = updated_delivery["project_report_delivery"]
-            self.assertEqual("siem-prod", delivery["provider_name"])
-            self.assertEqual("https://example.local/report", delivery["endpoint"])
-            self.assertEqual("POST", delivery["method"])
-            self.assertEqual("md", delivery["format"])
-            self.assertEqual("Bearer token", delivery["headers"]["Authorization"])
-            self.assertEqual(300, int(delivery["timeout_seconds"]))
-            self.assertTrue(delivery["mtls"]["enabled"])
-
-            normalized = manager.update_preferences({
-                "ai_feedback": {
+        path = self._config_path("scheduler-ai.json")
+        manager = SchedulerConfigManager(config_path=path)
+
+        defaults = manager.load()
+        self.assertEqual("deterministic", defaults["mode"])
+        self.assertEqual("internal_asset_discovery", defaults["goal_profile"])
+        self.assertEqual("internal_recon", defaults["engagement_policy"]["preset"])
+        self.assertEqual(1, int(defaults["max_concurrency"]))
+        self.assertEqual(1, int(defaults["max_host_concurrency"]))
+        self.assertEqual(200, int(defaults["max_jobs"]))
+        self.assertIn("ai_feedback", defaults)
+        self.assertTrue(defaults["ai_feedback"]["enabled"])
+        self.assertEqual(5, int(defaults["ai_feedback"]["max_rounds_per_target"]))
+        self.assertEqual(6, int(defaults["ai_feedback"]["max_actions_per_round"]))
+        self.assertTrue(defaults["ai_feedback"]["reflection_enabled"])
+        self.assertEqual(2, int(defaults["ai_feedback"]["stall_rounds_without_progress"]))
+        self.assertEqual(2, int(defaults["ai_feedback"]["stall_repeat_selection_threshold"]))
+        self.assertEqual(1, int(defaults["ai_feedback"]["max_reflections_per_target"]))
+        self.assertEqual("gpt-4.1-mini", defaults["providers"]["openai"]["model"])
+        self.assertFalse(defaults["providers"]["openai"]["structured_outputs"])
+        self.assertIn("integrations", defaults)
+        self.assertIn("grayhatwarfare", defaults["integrations"])
+        self.assertEqual("", defaults["integrations"]["grayhatwarfare"]["api_key"])
+        self.assertIn("shodan", defaults["integrations"])
+        self.assertEqual("", defaults["integrations"]["shodan"]["api_key"])
+        self.assertIn("device_categories", defaults)
+        self.assertEqual([], defaults["device_categories"])
+        self.assertIn("feature_flags", defaults)
+        self.assertFalse(defaults["feature_flags"]["graph_workspace"])
+        self.assertTrue(defaults["feature_flags"]["optional_runners"])
+        self.assertTrue(defaults["feature_flags"]["context_summary_enabled"])
+        self.assertTrue(defaults["feature_flags"]["scheduler_prompt_profiles"])
+        self.assertFalse(defaults["feature_flags"]["scheduler_web_followup_sidecar"])
+        self.assertIn("disabled_tool_ids", defaults)
+        self.assertIn("http-drupal-modules.nse", defaults["disabled_tool_ids"])
+        self.assertIn("http-vuln-zimbra-lfi.nse", defaults["disabled_tool_ids"])
+        self.assertIn("http-drupal-modules.nse", manager.get_disabled_tool_ids())
+        self.assertIn("tool_execution_profiles", defaults)
+        self.assertTrue(defaults["tool_execution_profiles"]["nikto"]["quiet_long_running"])
+        self.assertEqual(1800, int(defaults["tool_execution_profiles"]["nikto"]["activity_timeout_seconds"]))
+        self.assertEqual(3600, int(defaults["tool_execution_profiles"]["nikto"]["hard_timeout_seconds"]))
+        self.assertTrue(defaults["tool_execution_profiles"]["dirsearch"]["quiet_long_running"])
+        self.assertEqual(900, int(defaults["tool_execution_profiles"]["dirsearch"]["activity_timeout_seconds"]))
+        self.assertEqual(2400, int(defaults["tool_execution_profiles"]["dirsearch"]["hard_timeout_seconds"]))
+        self.assertTrue(defaults["tool_execution_profiles"]["ffuf"]["quiet_long_running"])
+        self.assertEqual(1800, int(defaults["tool_execution_profiles"]["ffuf"]["hard_timeout_seconds"]))
+        self.assertTrue(defaults["tool_execution_profiles"]["katana"]["quiet_long_running"])
+        self.assertEqual(1800, int(defaults["tool_execution_profiles"]["katana"]["hard_timeout_seconds"]))
+        self.assertIn("runners", defaults)
+        self.assertFalse(defaults["runners"]["container"]["enabled"])
+        self.assertTrue(defaults["runners"]["browser"]["enabled"])
+        self.assertIn("project_report_delivery", defaults)
+        self.assertEqual("POST", defaults["project_report_delivery"]["method"])
+        self.assertEqual("json", defaults["project_report_delivery"]["format"])
+
+        updated = manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "external_pentest",
+            "provider": "openai",
+            "providers": {
+                "openai": {
                     "enabled": True,
-                    "max_rounds_per_target": 99,
-                    "max_actions_per_round": 0,
-                    "recent_output_chars": 10,
-                    "reflection_enabled": False,
-                    "stall_rounds_without_progress": 99,
-                    "stall_repeat_selection_threshold": 0,
-                    "max_reflections_per_target": 99,
+                    "model": "gpt-5-mini",
+                    "api_key": "test-key",
+                    "structured_outputs": True,
                 }
-            })
-            self.assertEqual(12, int(normalized["ai_feedback"]["max_rounds_per_target"]))
-            self.assertEqual(1, int(normalized["ai_feedback"]["max_actions_per_round"]))
-            self.assertEqual(320, int(normalized["ai_feedback"]["recent_output_chars"]))
-            self.assertFalse(normalized["ai_feedback"]["reflection_enabled"])
-            self.assertEqual(6, int(normalized["ai_feedback"]["stall_rounds_without_progress"]))
-            self.assertEqual(1, int(normalized["ai_feedback"]["stall_repeat_selection_threshold"]))
-            self.assertEqual(4, int(normalized["ai_feedback"]["max_reflections_per_target"]))
-
-            updated_runners = manager.update_preferences({
-                "runners": {
-                    "container": {
-                        "enabled": True,
-                        "runtime": "podman",
-                        "image": "kalilinux/kali-rolling",
-                    },
-                    "browser": {
-                        "enabled": False,
-                        "timeout": 9999,
-                    },
-                }
-            })
-            self.assertTrue(updated_runners["runners"]["container"]["enabled"])
-            self.assertEqual("podman", updated_runners["runners"]["container"]["runtime"])
-            self.assertEqual("kalilinux/kali-rolling", updated_runners["runners"]["container"]["image"])
-            self.assertFalse(updated_runners["runners"]["browser"]["enabled"])
-            self.assertEqual(900, int(updated_runners["runners"]["browser"]["timeout"]))
-
-            updated_flags = manager.update_preferences({
-                "feature_flags": {
-                    "graph_workspace": False,
-                    "optional_runners": False,
-                    "context_summary_enabled": False,
-                    "scheduler_prompt_profiles": False,
-                    "scheduler_web_followup_sidecar": True,
+            },
+            "integrations": {
+                "grayhatwarfare": {
+                    "api_key": "test-grayhat-key",
+                },
+                "shodan": {
+                    "api_key": "test-shodan-key",
                 }
-            })
-            self.assertFalse(updated_flags["feature_flags"]["graph_workspace"])
-            self.assertFalse(updated_flags["feature_flags"]["optional_runners"])
-            self.assertFalse(updated_flags["feature_flags"]["context_summary_enabled"])
-            self.assertFalse(updated_flags["feature_flags"]["scheduler_prompt_profiles"])
-            self.assertTrue(updated_flags["feature_flags"]["scheduler_web_followup_sidecar"])
-            self.assertFalse(manager.is_feature_enabled("graph_workspace"))
-            self.assertFalse(manager.is_feature_enabled("optional_runners"))
-            self.assertFalse(manager.is_feature_enabled("context_summary_enabled"))
-            self.assertFalse(manager.is_feature_enabled("scheduler_prompt_profiles"))
-            self.assertTrue(manager.is_feature_enabled("scheduler_web_followup_sidecar"))
-
-            updated_profiles = manager.update_preferences({
-                "tool_execution_profiles": {
-                    "nikto": {
-                        "activity_timeout_seconds": 2400,
-                    },
-                    "feroxbuster": {
-                        "quiet_long_running": True,
-                        "activity_timeout_seconds": 900,
-                        "hard_timeout_seconds": 7200,
-                    },
+            },
+            "device_categories": [
+                {
+                    "name": "OT",
+                    "ports": ["502", "20000"],
+                    "fingerprint_fragments": ["modbus", "dnp3"],
+                    "cpe": ["schneider"],
                 }
-            })
-            self.assertEqual(2400, int(updated_profiles["tool_execution_profiles"]["nikto"]["activity_timeout_seconds"]))
-            self.assertTrue(updated_profiles["tool_execution_profiles"]["feroxbuster"]["quiet_long_running"])
-            self.assertEqual(900, int(updated_profiles["tool_execution_profiles"]["feroxbuster"]["activity_timeout_seconds"]))
-            self.assertEqual(7200, int(updated_profiles["tool_execution_profiles"]["feroxbuster"]["hard_timeout_seconds"]))
-
-            updated_policy = manager.update_preferences({
-                "engagement_policy": {
-                    "preset": "internal_pentest",
-                    "intent": "pentest",
-                    "allow_exploitation": True,
-                    "allow_lateral_movement": True,
+            ],
+        })
+        self.assertEqual("ai", updated["mode"])
+        self.assertEqual("external_pentest", updated["goal_profile"])
+        self.assertEqual("external_pentest", updated["engagement_policy"]["preset"])
+        self.assertEqual("openai", updated["provider"])
+        self.assertEqual(1, int(updated["max_concurrency"]))
+        self.assertEqual(1, int(updated["max_host_concurrency"]))
+        self.assertEqual("gpt-5-mini", updated["providers"]["openai"]["model"])
+        self.assertTrue(updated["providers"]["openai"]["structured_outputs"])
+        self.assertEqual("test-grayhat-key", updated["integrations"]["grayhatwarfare"]["api_key"])
+        self.assertEqual("test-shodan-key", updated["integrations"]["shodan"]["api_key"])
+        self.assertEqual("OT", updated["device_categories"][0]["name"])
+        self.assertEqual([502, 20000], updated["device_categories"][0]["ports"])
+        self.assertEqual(5, int(updated["ai_feedback"]["max_rounds_per_target"]))
+
+        normalized_openai_model = manager.update_preferences({
+            "providers": {
+                "openai": {
+                    "model": "",
                 }
-            })
-            self.assertEqual("internal_pentest", updated_policy["engagement_policy"]["preset"])
-            self.assertEqual("internal_asset_discovery", updated_policy["goal_profile"])
-            self.assertTrue(updated_policy["engagement_policy"]["allow_exploitation"])
+            },
+        })
+        self.assertEqual("gpt-4.1-mini", normalized_openai_model["providers"]["openai"]["model"])
+
+        updated_concurrency = manager.update_preferences({
+            "max_concurrency": 99,
+        })
+        self.assertEqual(16, int(updated_concurrency["max_concurrency"]))
+
+        updated_host_concurrency = manager.update_preferences({
+            "max_host_concurrency": 99,
+        })
+        self.assertEqual(8, int(updated_host_concurrency["max_host_concurrency"]))
 
-            self.assertFalse(manager.is_family_preapproved("abc123"))
-            manager.approve_family("abc123", {"tool_id": "hydra", "label": "Hydra", "danger_categories": []})
-            self.assertTrue(manager.is_family_preapproved("abc123"))
-            self.assertEqual("allowed", manager.get_family_policy_state("abc123"))
+        updated_jobs = manager.update_preferences({
+            "max_jobs": 99999,
+        })
+        self.assertEqual(2000, int(updated_jobs["max_jobs"]))
 
-            manager.require_family_approval("abc123", {"tool_id": "hydra", "label": "Hydra"}, reason="manual review")
-            self.assertEqual("approval_required", manager.get_family_policy_state("abc123"))
-            self.assertFalse(manager.is_family_preapproved("abc123"))
+        updated_delivery = manager.update_preferences({
+            "project_report_delivery": {
+                "provider_name": "siem-prod",
+                "endpoint": "https://example.local/report",
+                "method": "delete",
+                "format": "markdown",
+                "headers": {"Authorization": "Bearer token"},
+                "timeout_seconds": 999,
+                "mtls": {
+                    "enabled": True,
+                    "client_cert_path": "/tmp/client.crt",
+                    "client_key_path": "/tmp/client.key",
+                    "ca_cert_path": "/tmp/ca.crt",
+                },
+            }
+        })
+        delivery = updated_delivery["project_report_delivery"]
+        self.assertEqual("siem-prod", delivery["provider_name"])
+        self.assertEqual("https://example.local/report", delivery["endpoint"])
+        self.assertEqual("POST", delivery["method"])
+        self.assertEqual("md", delivery["format"])
+        self.assertEqual("Bearer token", delivery["headers"]["Authorization"])
+        self.assertEqual(300, int(delivery["timeout_seconds"]))
+        self.assertTrue(delivery["mtls"]["enabled"])
+
+        normalized = manager.update_preferences({
+            "ai_feedback": {
+                "enabled": True,
+                "max_rounds_per_target": 99,
+                "max_actions_per_round": 0,
+                "recent_output_chars": 10,
+                "reflection_enabled": False,
+                "stall_rounds_without_progress": 99,
+                "stall_repeat_selection_threshold": 0,
+                "max_reflections_per_target": 99,
+            }
+        })
+        self.assertEqual(12, int(normalized["ai_feedback"]["max_rounds_per_target"]))
+        self.assertEqual(1, int(normalized["ai_feedback"]["max_actions_per_round"]))
+        self.assertEqual(320, int(normalized["ai_feedback"]["recent_output_chars"]))
+        self.assertFalse(normalized["ai_feedback"]["reflection_enabled"])
+        self.assertEqual(6, int(normalized["ai_feedback"]["stall_rounds_without_progress"]))
+        self.assertEqual(1, int(normalized["ai_feedback"]["stall_repeat_selection_threshold"]))
+        self.assertEqual(4, int(normalized["ai_feedback"]["max_reflections_per_target"]))
+
+        updated_runners = manager.update_preferences({
+            "runners": {
+                "container": {
+                    "enabled": True,
+                    "runtime": "podman",
+                    "image": "kalilinux/kali-rolling",
+                },
+                "browser": {
+                    "enabled": False,
+                    "timeout": 9999,
+                },
+            }
+        })
+        self.assertTrue(updated_runners["runners"]["container"]["enabled"])
+        self.assertEqual("podman", updated_runners["runners"]["container"]["runtime"])
+        self.assertEqual("kalilinux/kali-rolling", updated_runners["runners"]["container"]["image"])
+        self.assertFalse(updated_runners["runners"]["browser"]["enabled"])
+        self.assertEqual(900, int(updated_runners["runners"]["browser"]["timeout"]))
+
+        updated_flags = manager.update_preferences({
+            "feature_flags": {
+                "graph_workspace": False,
+                "optional_runners": False,
+                "context_summary_enabled": False,
+                "scheduler_prompt_profiles": False,
+                "scheduler_web_followup_sidecar": True,
+            }
+        })
+        self.assertFalse(updated_flags["feature_flags"]["graph_workspace"])
+        self.assertFalse(updated_flags["feature_flags"]["optional_runners"])
+        self.assertFalse(updated_flags["feature_flags"]["context_summary_enabled"])
+        self.assertFalse(updated_flags["feature_flags"]["scheduler_prompt_profiles"])
+        self.assertTrue(updated_flags["feature_flags"]["scheduler_web_followup_sidecar"])
+        self.assertFalse(manager.is_feature_enabled("graph_workspace"))
+        self.assertFalse(manager.is_feature_enabled("optional_runners"))
+        self.assertFalse(manager.is_feature_enabled("context_summary_enabled"))
+        self.assertFalse(manager.is_feature_enabled("scheduler_prompt_profiles"))
+        self.assertTrue(manager.is_feature_enabled("scheduler_web_followup_sidecar"))
+
+        updated_profiles = manager.update_preferences({
+            "tool_execution_profiles": {
+                "nikto": {
+                    "activity_timeout_seconds": 2400,
+                },
+                "feroxbuster": {
+                    "quiet_long_running": True,
+                    "activity_timeout_seconds": 900,
+                    "hard_timeout_seconds": 7200,
+                },
+            }
+        })
+        self.assertEqual(2400, int(updated_profiles["tool_execution_profiles"]["nikto"]["activity_timeout_seconds"]))
+        self.assertTrue(updated_profiles["tool_execution_profiles"]["feroxbuster"]["quiet_long_running"])
+        self.assertEqual(900, int(updated_profiles["tool_execution_profiles"]["feroxbuster"]["activity_timeout_seconds"]))
+        self.assertEqual(7200, int(updated_profiles["tool_execution_profiles"]["feroxbuster"]["hard_timeout_seconds"]))
+
+        updated_policy = manager.update_preferences({
+            "engagement_policy": {
+                "preset": "internal_pentest",
+                "intent": "pentest",
+                "allow_exploitation": True,
+                "allow_lateral_movement": True,
+            }
+        })
+        self.assertEqual("internal_pentest", updated_policy["engagement_policy"]["preset"])
+        self.assertEqual("internal_asset_discovery", updated_policy["goal_profile"])
+        self.assertTrue(updated_policy["engagement_policy"]["allow_exploitation"])
+
+        self.assertFalse(manager.is_family_preapproved("abc123"))
+        manager.approve_family("abc123", {"tool_id": "hydra", "label": "Hydra", "danger_categories": []})
+        self.assertTrue(manager.is_family_preapproved("abc123"))
+        self.assertEqual("allowed", manager.get_family_policy_state("abc123"))
+
+        manager.require_family_approval("abc123", {"tool_id": "hydra", "label": "Hydra"}, reason="manual review")
+        self.assertEqual("approval_required", manager.get_family_policy_state("abc123"))
+        self.assertFalse(manager.is_family_preapproved("abc123"))
+
+        manager.suppress_family("abc123", {"tool_id": "hydra", "label": "Hydra"}, reason="too noisy")
+        self.assertEqual("suppressed", manager.get_family_policy_state("abc123"))
+
+        manager.block_family("abc123", {"tool_id": "hydra", "label": "Hydra"}, reason="out of scope")
+        self.assertEqual("blocked", manager.get_family_policy_state("abc123"))
+
+    def test_loaded_defaults_do_not_share_state_with_template(self):
+        from app.scheduler.config import DEFAULT_SCHEDULER_CONFIG, SchedulerConfigManager
+
+        path = self._config_path("scheduler-ai.json")
+        config = SchedulerConfigManager(config_path=path).load()
+        config["providers"]["openai"]["model"] = "mutated"
+        config["dangerous_categories"].append("mutated")
+
+        with self.assertRaises(TypeError):
+            DEFAULT_SCHEDULER_CONFIG["mode"] = "ai"
+        self.assertEqual("gpt-4.1-mini", DEFAULT_SCHEDULER_CONFIG["providers"]["openai"]["model"])
+        self.assertNotIn("mutated", DEFAULT_SCHEDULER_CONFIG["dangerous_categories"])
+        with open(path, "r", encoding="utf-8") as handle:
+            self.assertEqual("gpt-4.1-mini", json.load(handle)["providers"]["openai"]["model"])
+
+    def test_save_replaces_config_atomically_with_and_without_orjson(self):
+        from app.scheduler.config import SchedulerConfigManager
+
+        path = self._config_path("scheduler-ai.json")
+        manager = SchedulerConfigManager(config_path=path)
+        manager.update_preferences({"mode": "ai"})
+        with patch("app.scheduler.config.orjson", None):
+            manager.update_preferences({"max_jobs": 300})
+
+        with open(path, "r", encoding="utf-8") as handle:
+            saved = json.load(handle)
+        self.assertEqual("ai", saved["mode"])
+        self.assertEqual(300, saved["max_jobs"])
+        directory = os.path.dirname(path)
+        self.assertEqual([], [name for name in os.listdir(directory) if name.endswith(".tmp")])
+
+    def test_first_load_writes_defaults_atomically(self):
+        from app.scheduler import config as config_module
+
+        path = self._config_path("scheduler-ai.json")
+        with patch.object(
+            config_module, "_write_config_atomically", wraps=config_module._write_config_atomically
+        ) as write_atomically:
+            defaults = config_module.SchedulerConfigManager(config_path=path).load()
+
+        write_atomically.assert_called_once_with(path, config_module._default_config_json())
+        with open(path, "r", encoding="utf-8") as handle:
+            self.assertEqual(defaults, json.load(handle))
+        directory = os.path.dirname(path)
+        self.assertEqual([], [name for name in os.listdir(directory) if name.endswith(".tmp")])
+
+    def test_new_manager_reuses_cached_config_until_file_changes(self):
+        from app.scheduler.config import SchedulerConfigManager
+
+        path = self._config_path("scheduler-ai.json")
+        SchedulerConfigManager(config_path=path).update_preferences({"mode": "ai"})
+
+        with patch("app.scheduler.config.json.load") as json_load:
+            cached = SchedulerConfigManager(config_path=path).load()
+        json_load.assert_not_called()
+        self.assertEqual("ai", cached["mode"])
+
+        cached["mode"] = "mutated"
+        self.assertEqual("ai", SchedulerConfigManager(config_path=path).load()["mode"])
+
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write('{"mode": "deterministic", "max_jobs": 400}')
+        reloaded = SchedulerConfigManager(config_path=path).load()
+        self.assertEqual("deterministic", reloaded["mode"])
+        self.assertEqual(400, int(reloaded["max_jobs"]))
+
+    def test_update_preferences_normalizes_merged_config_once(self):
+        from app.scheduler.config import SchedulerConfigManager
 
-            manager.suppress_family("abc123", {"tool_id": "hydra", "label": "Hydra"}, reason="too noisy")
-            self.assertEqual("suppressed", manager.get_family_policy_state("abc123"))
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.load()
+        with patch.object(
+                SchedulerConfigManager,
+                "_normalize_config",
+                wraps=SchedulerConfigManager._normalize_config,
+        ) as normalize:
+            updated = manager.update_preferences({"mode": "ai", "providers": {"openai": {"model": "gpt-test"}}})
 
-            manager.block_family("abc123", {"tool_id": "hydra", "label": "Hydra"}, reason="out of scope")
-            self.assertEqual("blocked", manager.get_family_policy_state("abc123"))
+        self.assertEqual(1, normalize.call_count)
+        self.assertEqual("ai", updated["mode"])
+        self.assertEqual("gpt-test", updated["providers"]["openai"]["model"])
+        with open(manager.config_path, "r", encoding="utf-8") as handle:
+            self.assertEqual(updated, SchedulerConfigManager._normalize_config(json.load(handle)))
 
 
 if __name__ == "__main__":
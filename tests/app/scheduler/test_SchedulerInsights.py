@@ -1,29 +1,20 @@
 import unittest
 
-from app.ProjectManager import ProjectManager
-from app.logging.legionLog import getAppLogger, getDbLogger
-from app.scheduler.insights import (
-    delete_host_ai_state,
-    ensure_scheduler_ai_state_table,
-    get_host_ai_state,
-    upsert_host_ai_state,
-)
-from app.shell.DefaultShell import DefaultShell
-from app.tools.ToolCoordinator import ToolCoordinator
-from app.tools.nmap.DefaultNmapExporter import DefaultNmapExporter
-from db.RepositoryFactory import RepositoryFactory
-
 
 class SchedulerInsightsStoreTest(unittest.TestCase):
     def test_upsert_get_delete_host_ai_state(self):
-        shell = DefaultShell()
-        db_log = getDbLogger()
-        app_log = getAppLogger()
-        repository_factory = RepositoryFactory(db_log)
-        project_manager = ProjectManager(shell, repository_factory, app_log)
-        nmap_exporter = DefaultNmapExporter(shell, app_log)
-        _tool_coordinator = ToolCoordinator(shell, nmap_exporter)
+        from app.ProjectManager import ProjectManager
+        from app.logging.legionLog import getAppLogger, getDbLogger
+        from app.scheduler.insights import (
+            delete_host_ai_state,
+            ensure_scheduler_ai_state_table,
+            get_host_ai_state,
+            upsert_host_ai_state,
+        )
+        from app.shell.DefaultShell import DefaultShell
+        from db.RepositoryFactory import RepositoryFactory
 
+        project_manager = ProjectManager(DefaultShell(), RepositoryFactory(getDbLogger()), getAppLogger())
         project = project_manager.createNewProject(projectType="legion", isTemp=True)
         try:
             ensure_scheduler_ai_state_table(project.database)
@@ -60,6 +51,51 @@ class SchedulerInsightsStoreTest(unittest.TestCase):
         finally:
             project_manager.closeProject(project)
 
+    def test_bulk_upsert_inserts_and_updates_host_ai_states(self):
+        from app.ProjectManager import ProjectManager
+        from app.logging.legionLog import getAppLogger, getDbLogger
+        from app.scheduler.insights import get_host_ai_state, upsert_host_ai_state, upsert_host_ai_states_bulk
+        from app.shell.DefaultShell import DefaultShell
+        from db.RepositoryFactory import RepositoryFactory
+
+        project_manager = ProjectManager(DefaultShell(), RepositoryFactory(getDbLogger()), getAppLogger())
+        project = project_manager.createNewProject(projectType="legion", isTemp=True)
+        try:
+            upsert_host_ai_state(project.database, 21, {
+                "host_ip": "10.0.0.21",
+                "provider": "openai",
+                "hostname": "old-name",
+                "_sync_target_state": False,
+            })
+            rows = upsert_host_ai_states_bulk(project.database, [
+                (21, {"host_ip": "10.0.0.21", "provider": "lm_studio", "hostname": "new-name", "_sync_target_state": False}),
+                (22, {
+                    "host_ip": "10.0.0.22",
+                    "provider": "openai",
+                    "findings": [{"title": "Weak TLS", "severity": "low"}],
+                    "_sync_target_state": False,
+                }),
+            ])
+
+            self.assertEqual([21, 22], [row["host_id"] for row in rows])
+            updated = get_host_ai_state(project.database, 21)
+            self.assertEqual("new-name", updated["hostname"])
+            self.assertEqual("lm_studio", updated["provider"])
+            inserted = get_host_ai_state(project.database, 22)
+            self.assertEqual("Weak TLS", inserted["findings"][0]["title"])
+            self.assertEqual([], upsert_host_ai_states_bulk(project.database, []))
+        finally:
+            project_manager.closeProject(project)
+
+    def test_json_columns_decode_values_outside_strict_json(self):
+        from app.scheduler.insights import _from_json
+
+        self.assertEqual([{"name": "nginx"}], _from_json('[{"name": "nginx"}]', []))
+        decoded = _from_json('{"cvss": NaN, "id": 123456789012345678901234567890}', {})
+        self.assertNotEqual(decoded["cvss"], decoded["cvss"])
+        self.assertEqual(123456789012345678901234567890, decoded["id"])
+        self.assertEqual({}, _from_json("{not json", {}))
+
 
 if __name__ == "__main__":
     unittest.main()
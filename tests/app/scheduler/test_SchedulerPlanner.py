@@ -1,4 +1,6 @@
+import itertools
 import os
+import shutil
 import tempfile
 import unittest
 from types import SimpleNamespace
@@ -6,29 +8,73 @@ from unittest.mock import patch
 
 
 class SchedulerPlannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One scratch directory per class; each test gets uniquely named files inside it.
+        cls._tmpdir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls._tmpdir, ignore_errors=True)
+
+    def setUp(self):
+        self._config_serial = itertools.count()
+
+    def _config_path(self, name: str) -> str:
+        return os.path.join(self._tmpdir, f"{self._testMethodName}-{next(self._config_serial)}-{name}")
+
     def test_deterministic_mode_follows_scheduler_mapping(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.models import ActionSpec, PlanStep
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({"mode": "deterministic"})
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({"mode": "deterministic"})
+        planner = SchedulerPlanner(manager)
 
-            settings = SimpleNamespace(
-                automatedAttacks=[["smb-enum-users.nse", "smb", "tcp"]],
-                portActions=[["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP] -p [PORT]", "smb"]],
-            )
+        settings = SimpleNamespace(
+            automatedAttacks=[["smb-enum-users.nse", "smb", "tcp"]],
+            portActions=[["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP] -p [PORT]", "smb"]],
+        )
+
+        actions = planner.plan_actions("smb", "tcp", settings)
+        self.assertEqual(1, len(actions))
+        self.assertIsInstance(actions[0], PlanStep)
+        self.assertIsInstance(actions[0].action, ActionSpec)
+        self.assertEqual("smb-enum-users.nse", actions[0].tool_id)
+        self.assertFalse(actions[0].requires_approval)
+        self.assertEqual("smb-enum-users.nse", actions[0].action.action_id)
+        self.assertTrue(actions[0].action.supports_deterministic)
+
+    def test_plan_actions_reuses_action_registry_until_action_rows_change(self):
+        from app.scheduler.config import SchedulerConfigManager
+        from app.scheduler.planner import SchedulerPlanner
+
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({"mode": "deterministic"})
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[["smb-enum-users.nse", "smb", "tcp"]],
+            portActions=[["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP] -p [PORT]", "smb"]],
+        )
+
+        with patch.object(SchedulerPlanner, "build_action_registry", wraps=SchedulerPlanner.build_action_registry) as build:
+            planner.plan_actions("smb", "tcp", settings)
+            planner.plan_actions("smb", "tcp", settings)
+            self.assertEqual(1, build.call_count)
 
+            settings.automatedAttacks.append(["smb-os-discovery", "smb", "tcp"])
             actions = planner.plan_actions("smb", "tcp", settings)
-            self.assertEqual(1, len(actions))
-            self.assertIsInstance(actions[0], PlanStep)
-            self.assertIsInstance(actions[0].action, ActionSpec)
-            self.assertEqual("smb-enum-users.nse", actions[0].tool_id)
-            self.assertFalse(actions[0].requires_approval)
-            self.assertEqual("smb-enum-users.nse", actions[0].action.action_id)
-            self.assertTrue(actions[0].action.supports_deterministic)
+            self.assertEqual(2, build.call_count)
+            self.assertIn("smb-os-discovery", [item.tool_id for item in actions])
+
+            # The settings dialog edits rows in place on the live Settings object.
+            settings.portActions[0][2] = "nmap -sV --script=smb-enum-users [IP] -p [PORT]"
+            actions = planner.plan_actions("smb", "tcp", settings)
+            self.assertEqual(3, build.call_count)
+
+            settings.portActions = [list(row) for row in settings.portActions]
+            planner.plan_actions("smb", "tcp", settings)
+            self.assertEqual(3, build.call_count)
+        edited = next(item for item in actions if item.tool_id == "smb-enum-users.nse")
+        self.assertEqual("nmap -sV --script=smb-enum-users [IP] -p [PORT]", edited.action.command_template)
 
     def test_plan_actions_returns_shared_plan_step_shape_for_both_modes(self):
         from app.scheduler.config import SchedulerConfigManager
@@ -42,25 +88,24 @@ class SchedulerPlannerTest(unittest.TestCase):
             ],
         )
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            path = os.path.join(tmpdir, "scheduler-ai.json")
-            manager = SchedulerConfigManager(config_path=path)
-            planner = SchedulerPlanner(manager)
+        path = self._config_path("scheduler-ai.json")
+        manager = SchedulerConfigManager(config_path=path)
+        planner = SchedulerPlanner(manager)
 
-            manager.update_preferences({"mode": "deterministic", "goal_profile": "internal_asset_discovery"})
-            det_actions = planner.plan_actions("http", "tcp", settings)
+        manager.update_preferences({"mode": "deterministic", "goal_profile": "internal_asset_discovery"})
+        det_actions = planner.plan_actions("http", "tcp", settings)
 
-            manager.update_preferences({"mode": "ai", "goal_profile": "external_pentest", "provider": "none"})
-            ai_actions = planner.plan_actions("http", "tcp", settings)
+        manager.update_preferences({"mode": "ai", "goal_profile": "external_pentest", "provider": "none"})
+        ai_actions = planner.plan_actions("http", "tcp", settings)
 
-            self.assertTrue(det_actions)
-            self.assertTrue(ai_actions)
-            self.assertIsInstance(det_actions[0], PlanStep)
-            self.assertIsInstance(ai_actions[0], PlanStep)
-            self.assertEqual("nuclei-web", det_actions[0].action_id)
-            self.assertEqual("nuclei-web", ai_actions[0].action_id)
-            self.assertEqual("scheduler_deterministic", det_actions[0].origin_planner)
-            self.assertEqual("scheduler_ai", ai_actions[0].origin_planner)
+        self.assertTrue(det_actions)
+        self.assertTrue(ai_actions)
+        self.assertIsInstance(det_actions[0], PlanStep)
+        self.assertIsInstance(ai_actions[0], PlanStep)
+        self.assertEqual("nuclei-web", det_actions[0].action_id)
+        self.assertEqual("nuclei-web", ai_actions[0].action_id)
+        self.assertEqual("scheduler_deterministic", det_actions[0].origin_planner)
+        self.assertEqual("scheduler_ai", ai_actions[0].origin_planner)
 
     def test_planner_uses_normalized_engagement_policy_preset_for_plan_steps(self):
         from app.scheduler.config import SchedulerConfigManager
@@ -73,24 +118,23 @@ class SchedulerPlannerTest(unittest.TestCase):
             ],
         )
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "deterministic",
-                "engagement_policy": {
-                    "preset": "external_recon",
-                    "scope": "external",
-                    "intent": "recon",
-                    "noise_budget": "low",
-                },
-            })
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "deterministic",
+            "engagement_policy": {
+                "preset": "external_recon",
+                "scope": "external",
+                "intent": "recon",
+                "noise_budget": "low",
+            },
+        })
+        planner = SchedulerPlanner(manager)
 
-            actions = planner.plan_actions("http", "tcp", settings)
+        actions = planner.plan_actions("http", "tcp", settings)
 
-            self.assertEqual(1, len(actions))
-            self.assertEqual("external_recon", actions[0].engagement_preset)
-            self.assertEqual("external_pentest", actions[0].goal_profile)
+        self.assertEqual(1, len(actions))
+        self.assertEqual("external_recon", actions[0].engagement_preset)
+        self.assertEqual("external_pentest", actions[0].goal_profile)
 
     def test_plan_actions_mode_override_does_not_mutate_saved_preferences(self):
         from app.scheduler.config import SchedulerConfigManager
@@ -103,16 +147,15 @@ class SchedulerPlannerTest(unittest.TestCase):
             ],
         )
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({"mode": "deterministic", "provider": "none"})
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({"mode": "deterministic", "provider": "none"})
+        planner = SchedulerPlanner(manager)
 
-            actions = planner.plan_actions("http", "tcp", settings, mode_override="ai")
+        actions = planner.plan_actions("http", "tcp", settings, mode_override="ai")
 
-            self.assertEqual(1, len(actions))
-            self.assertEqual("deterministic", manager.load()["mode"])
-            self.assertIn(actions[0].origin_mode, {"ai", "deterministic"})
+        self.assertEqual(1, len(actions))
+        self.assertEqual("deterministic", manager.load()["mode"])
+        self.assertIn(actions[0].origin_mode, {"ai", "deterministic"})
 
     @patch.object(__import__("app.scheduler.planner", fromlist=["SchedulerPlanner"]).SchedulerPlanner, "_plan_ai")
     def test_ai_empty_result_falls_back_to_deterministic_plan_step(self, mock_plan_ai):
@@ -122,169 +165,164 @@ class SchedulerPlannerTest(unittest.TestCase):
 
         mock_plan_ai.return_value = []
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({"mode": "ai"})
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[["smb-enum-users.nse", "smb", "tcp"]],
-                portActions=[["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP]", "smb"]],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({"mode": "ai"})
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[["smb-enum-users.nse", "smb", "tcp"]],
+            portActions=[["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP]", "smb"]],
+        )
 
-            actions = planner.plan_actions("smb", "tcp", settings)
+        actions = planner.plan_actions("smb", "tcp", settings)
 
-            self.assertEqual(1, len(actions))
-            self.assertIsInstance(actions[0], PlanStep)
-            self.assertEqual("deterministic", actions[0].origin_mode)
-            self.assertEqual("scheduler_deterministic", actions[0].origin_planner)
+        self.assertEqual(1, len(actions))
+        self.assertIsInstance(actions[0], PlanStep)
+        self.assertEqual("deterministic", actions[0].origin_mode)
+        self.assertEqual("scheduler_deterministic", actions[0].origin_planner)
 
     def test_ai_mode_marks_dangerous_actions_for_approval(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "internal_asset_discovery",
-                "dangerous_categories": ["credential_bruteforce"],
-                "engagement_policy": {
-                    "preset": "internal_pentest",
-                    "intent": "pentest",
-                    "credential_attack_mode": "approval",
-                    "lockout_risk_mode": "approval",
-                },
-            })
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "internal_asset_discovery",
+            "dangerous_categories": ["credential_bruteforce"],
+            "engagement_policy": {
+                "preset": "internal_pentest",
+                "intent": "pentest",
+                "credential_attack_mode": "approval",
+                "lockout_risk_mode": "approval",
+            },
+        })
+        planner = SchedulerPlanner(manager)
 
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP] -p [PORT]", "smb"],
-                    ["SMB Hydra", "smb-default", "hydra -s [PORT] -u root -P pass.txt [IP] smb", "smb"],
-                ],
-            )
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["SMB Users", "smb-enum-users.nse", "nmap --script=smb-enum-users [IP] -p [PORT]", "smb"],
+                ["SMB Hydra", "smb-default", "hydra -s [PORT] -u root -P pass.txt [IP] smb", "smb"],
+            ],
+        )
 
-            actions = planner.plan_actions("smb", "tcp", settings)
-            hydra = [item for item in actions if item.tool_id == "smb-default"][0]
-            self.assertTrue(hydra.requires_approval)
-            self.assertIn("credential_bruteforce", hydra.danger_categories)
+        actions = planner.plan_actions("smb", "tcp", settings)
+        hydra = [item for item in actions if item.tool_id == "smb-default"][0]
+        self.assertTrue(hydra.requires_approval)
+        self.assertIn("credential_bruteforce", hydra.danger_categories)
 
-            manager.approve_family(
-                hydra.family_id,
-                {"tool_id": hydra.tool_id, "label": hydra.label, "danger_categories": hydra.danger_categories}
-            )
-            actions_after_approval = planner.plan_actions("smb", "tcp", settings)
-            hydra_after = [item for item in actions_after_approval if item.tool_id == "smb-default"][0]
-            self.assertFalse(hydra_after.requires_approval)
+        manager.approve_family(
+            hydra.family_id,
+            {"tool_id": hydra.tool_id, "label": hydra.label, "danger_categories": hydra.danger_categories}
+        )
+        actions_after_approval = planner.plan_actions("smb", "tcp", settings)
+        hydra_after = [item for item in actions_after_approval if item.tool_id == "smb-default"][0]
+        self.assertFalse(hydra_after.requires_approval)
 
     def test_internal_recon_blocks_credential_attack_actions(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "deterministic",
-                "engagement_policy": {"preset": "internal_recon"},
-            })
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "deterministic",
+            "engagement_policy": {"preset": "internal_recon"},
+        })
+        planner = SchedulerPlanner(manager)
 
-            settings = SimpleNamespace(
-                automatedAttacks=[["smb-default", "smb", "tcp"]],
-                portActions=[
-                    ["SMB Default", "smb-default", "hydra -s [PORT] -u root -P pass.txt [IP] smb", "smb"],
-                ],
-            )
+        settings = SimpleNamespace(
+            automatedAttacks=[["smb-default", "smb", "tcp"]],
+            portActions=[
+                ["SMB Default", "smb-default", "hydra -s [PORT] -u root -P pass.txt [IP] smb", "smb"],
+            ],
+        )
 
-            actions = planner.plan_actions("smb", "tcp", settings)
+        actions = planner.plan_actions("smb", "tcp", settings)
 
-            self.assertEqual(1, len(actions))
-            self.assertTrue(actions[0].is_blocked)
-            self.assertEqual("blocked", actions[0].policy_decision)
-            self.assertIn("credential_bruteforce", actions[0].danger_categories)
+        self.assertEqual(1, len(actions))
+        self.assertTrue(actions[0].is_blocked)
+        self.assertEqual("blocked", actions[0].policy_decision)
+        self.assertIn("credential_bruteforce", actions[0].danger_categories)
 
     def test_internal_quick_recon_suppresses_deep_web_discovery_tools(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "deterministic",
-                "engagement_policy": {"preset": "internal_quick_recon"},
-            })
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "deterministic",
+            "engagement_policy": {"preset": "internal_quick_recon"},
+        })
+        planner = SchedulerPlanner(manager)
 
-            settings = SimpleNamespace(
-                automatedAttacks=[["banner", "http", "tcp"], ["whatweb", "http", "tcp"], ["dirsearch", "http", "tcp"]],
-                portActions=[
-                    ["Grab banner", "banner", "python3 -m app.banner_probe", "http"],
-                    ["Run whatweb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                    ["Run dirsearch", "dirsearch", "dirsearch -u http://[IP]:[PORT]", "http"],
-                ],
-            )
+        settings = SimpleNamespace(
+            automatedAttacks=[["banner", "http", "tcp"], ["whatweb", "http", "tcp"], ["dirsearch", "http", "tcp"]],
+            portActions=[
+                ["Grab banner", "banner", "python3 -m app.banner_probe", "http"],
+                ["Run whatweb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+                ["Run dirsearch", "dirsearch", "dirsearch -u http://[IP]:[PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "engagement_preset": "internal_quick_recon",
-                    "target": {"service": "http"},
-                    "signals": {"web_service": True},
-                },
-            )
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "engagement_preset": "internal_quick_recon",
+                "target": {"service": "http"},
+                "signals": {"web_service": True},
+            },
+        )
 
-            tool_ids = [item.tool_id for item in actions]
-            self.assertIn("banner", tool_ids)
-            self.assertIn("whatweb", tool_ids)
-            self.assertNotIn("dirsearch", tool_ids)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("banner", tool_ids)
+        self.assertIn("whatweb", tool_ids)
+        self.assertNotIn("dirsearch", tool_ids)
 
     def test_ai_mode_surfaces_manual_relay_workflows_as_approval_gated_actions(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "none",
-                "engagement_policy": {
-                    "preset": "internal_pentest",
-                    "scope": "internal",
-                    "intent": "pentest",
-                    "allow_exploitation": True,
-                    "allow_lateral_movement": True,
-                    "credential_attack_mode": "approval",
-                    "lockout_risk_mode": "approval",
-                },
-            })
-            planner = SchedulerPlanner(manager)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "none",
+            "engagement_policy": {
+                "preset": "internal_pentest",
+                "scope": "internal",
+                "intent": "pentest",
+                "allow_exploitation": True,
+                "allow_lateral_movement": True,
+                "credential_attack_mode": "approval",
+                "lockout_risk_mode": "approval",
+            },
+        })
+        planner = SchedulerPlanner(manager)
 
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Prepare Responder capture workflow", "responder", "responder -I <interface> -w -F", "smb,ldap,kerberos"],
-                    ["Prepare ntlmrelayx relay workflow", "ntlmrelayx", "impacket-ntlmrelayx -t smb://[IP] -smb2support", "smb,ldap,kerberos"],
-                    ["Run netexec", "netexec", "netexec smb [IP] --port [PORT] -u '' -p '' --shares --users --pass-pol", "smb"],
-                ],
-            )
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Prepare Responder capture workflow", "responder", "responder -I <interface> -w -F", "smb,ldap,kerberos"],
+                ["Prepare ntlmrelayx relay workflow", "ntlmrelayx", "impacket-ntlmrelayx -t smb://[IP] -smb2support", "smb,ldap,kerberos"],
+                ["Run netexec", "netexec", "netexec smb [IP] --port [PORT] -u '' -p '' --shares --users --pass-pol", "smb"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "smb",
-                "tcp",
-                settings,
-                context={"signals": {"smb_signing_disabled": True}},
-            )
+        actions = planner.plan_actions(
+            "smb",
+            "tcp",
+            settings,
+            context={"signals": {"smb_signing_disabled": True}},
+        )
 
-            by_tool = {item.tool_id: item for item in actions}
-            self.assertIn("responder", by_tool)
-            self.assertIn("ntlmrelayx", by_tool)
-            self.assertTrue(by_tool["responder"].requires_approval)
-            self.assertTrue(by_tool["ntlmrelayx"].requires_approval)
-            self.assertEqual("manual", by_tool["responder"].action.runner_type)
-            self.assertEqual("manual", by_tool["ntlmrelayx"].action.runner_type)
+        by_tool = {item.tool_id: item for item in actions}
+        self.assertIn("responder", by_tool)
+        self.assertIn("ntlmrelayx", by_tool)
+        self.assertTrue(by_tool["responder"].requires_approval)
+        self.assertTrue(by_tool["ntlmrelayx"].requires_approval)
+        self.assertEqual("manual", by_tool["responder"].action.runner_type)
+        self.assertEqual("manual", by_tool["ntlmrelayx"].action.runner_type)
 
     @patch("app.scheduler.planner.rank_actions_with_provider")
     def test_ai_mode_uses_provider_scores_when_available(self, mock_rank_actions):
@@ -296,31 +334,30 @@ class SchedulerPlannerTest(unittest.TestCase):
             {"tool_id": "lower-signal", "score": 40, "rationale": "Lower confidence."},
         ]
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "openai",
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Lower Signal", "lower-signal", "echo low [IP]", "smb"],
-                    ["High Signal", "high-signal", "echo high [IP]", "smb"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "openai",
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Lower Signal", "lower-signal", "echo low [IP]", "smb"],
+                ["High Signal", "high-signal", "echo high [IP]", "smb"],
+            ],
+        )
 
-            actions = planner.plan_actions("smb", "tcp", settings)
-            self.assertEqual("high-signal", actions[0].tool_id)
-            self.assertEqual(99, actions[0].score)
-            self.assertIn("Provider selected", actions[0].rationale)
-            _, kwargs = mock_rank_actions.call_args
-            self.assertIn("context", kwargs)
-            self.assertEqual({}, kwargs["context"])
+        actions = planner.plan_actions("smb", "tcp", settings)
+        self.assertEqual("high-signal", actions[0].tool_id)
+        self.assertEqual(99, actions[0].score)
+        self.assertIn("Provider selected", actions[0].rationale)
+        _, kwargs = mock_rank_actions.call_args
+        self.assertIn("context", kwargs)
+        self.assertEqual({}, kwargs["context"])
 
     @patch("app.scheduler.planner.rank_actions_with_provider")
     def test_ai_mode_rationale_includes_provider_failure(self, mock_rank_actions):
@@ -330,304 +367,295 @@ class SchedulerPlannerTest(unittest.TestCase):
 
         mock_rank_actions.side_effect = ProviderError("connection refused")
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "lm_studio",
-                "providers": {
-                    "lm_studio": {
-                        "enabled": True,
-                        "base_url": "http://127.0.0.1:1234/v1",
-                        "model": "o3-7b",
-                    }
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["SMB Enum", "smb-enum-users.nse", "nmap --script smb-enum-users [IP]", "smb"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "lm_studio",
+            "providers": {
+                "lm_studio": {
+                    "enabled": True,
+                    "base_url": "http://127.0.0.1:1234/v1",
+                    "model": "o3-7b",
+                }
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["SMB Enum", "smb-enum-users.nse", "nmap --script smb-enum-users [IP]", "smb"],
+            ],
+        )
 
-            actions = planner.plan_actions("smb", "tcp", settings)
-            self.assertEqual(1, len(actions))
-            self.assertIn("Provider 'lm_studio' failed", actions[0].rationale)
+        actions = planner.plan_actions("smb", "tcp", settings)
+        self.assertEqual(1, len(actions))
+        self.assertIn("Provider 'lm_studio' failed", actions[0].rationale)
 
     def test_ai_mode_prioritizes_nuclei_and_nmap_vuln_for_http(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "external_pentest",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["HTTP Headers", "http-headers.nse", "nmap -Pn -p [PORT] --script=http-headers [IP]", "http"],
+                ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
+                ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
+                ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
+                ["nmap-vuln.nse", "nmap-vuln.nse", "nmap -Pn -n -sV -p [PORT] --script=vuln [IP]", "http"],
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
+            ],
+        )
+
+        actions = planner.plan_actions("http", "tcp", settings)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("nmap-vuln.nse", tool_ids)
+        self.assertIn("nuclei-web", tool_ids)
+
+    def test_ai_mode_web_baseline_includes_nuclei_vuln_and_screenshooter_for_both_profiles(self):
+        from app.scheduler.config import SchedulerConfigManager
+        from app.scheduler.planner import SchedulerPlanner
+
+        for goal_profile in ["internal_asset_discovery", "external_pentest"]:
+            manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
             manager.update_preferences({
                 "mode": "ai",
-                "goal_profile": "external_pentest",
+                "goal_profile": goal_profile,
                 "provider": "none",
             })
             planner = SchedulerPlanner(manager)
             settings = SimpleNamespace(
-                automatedAttacks=[],
+                automatedAttacks=[
+                    ["screenshooter", "http,https,ssl,http-proxy,http-alt,https-alt", "tcp"],
+                ],
                 portActions=[
-                    ["HTTP Headers", "http-headers.nse", "nmap -Pn -p [PORT] --script=http-headers [IP]", "http"],
-                    ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
-                    ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
                     ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                    ["nmap-vuln.nse", "nmap-vuln.nse", "nmap -Pn -n -sV -p [PORT] --script=vuln [IP]", "http"],
                     ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
+                    ["nmap-vuln.nse", "nmap-vuln.nse", "nmap -Pn -n -sV -p [PORT] --script=vuln [IP]", "http"],
+                    ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
                 ],
             )
 
             actions = planner.plan_actions("http", "tcp", settings)
             tool_ids = [item.tool_id for item in actions]
-            self.assertIn("nmap-vuln.nse", tool_ids)
             self.assertIn("nuclei-web", tool_ids)
-
-    def test_ai_mode_web_baseline_includes_nuclei_vuln_and_screenshooter_for_both_profiles(self):
-        from app.scheduler.config import SchedulerConfigManager
-        from app.scheduler.planner import SchedulerPlanner
-
-        for goal_profile in ["internal_asset_discovery", "external_pentest"]:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-                manager.update_preferences({
-                    "mode": "ai",
-                    "goal_profile": goal_profile,
-                    "provider": "none",
-                })
-                planner = SchedulerPlanner(manager)
-                settings = SimpleNamespace(
-                    automatedAttacks=[
-                        ["screenshooter", "http,https,ssl,http-proxy,http-alt,https-alt", "tcp"],
-                    ],
-                    portActions=[
-                        ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                        ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
-                        ["nmap-vuln.nse", "nmap-vuln.nse", "nmap -Pn -n -sV -p [PORT] --script=vuln [IP]", "http"],
-                        ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
-                    ],
-                )
-
-                actions = planner.plan_actions("http", "tcp", settings)
-                tool_ids = [item.tool_id for item in actions]
-                self.assertIn("nuclei-web", tool_ids)
-                self.assertIn("nmap-vuln.nse", tool_ids)
-                self.assertIn("screenshooter", tool_ids)
+            self.assertIn("nmap-vuln.nse", tool_ids)
+            self.assertIn("screenshooter", tool_ids)
 
     def test_ai_mode_filters_candidates_whose_binary_is_known_missing(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "internal_asset_discovery",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
-                    ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "internal_asset_discovery",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
+                ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {
-                        "web_service": True,
-                        "missing_tools": ["whatweb-http"],
-                    },
-                    "coverage": {
-                        "missing": ["missing_whatweb"],
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {
+                    "web_service": True,
+                    "missing_tools": ["whatweb-http"],
                 },
-            )
+                "coverage": {
+                    "missing": ["missing_whatweb"],
+                },
+            },
+        )
 
-            tool_ids = [item.tool_id for item in actions]
-            self.assertIn("banner", tool_ids)
-            self.assertNotIn("whatweb-http", tool_ids)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("banner", tool_ids)
+        self.assertNotIn("whatweb-http", tool_ids)
 
     def test_deterministic_mode_filters_candidates_whose_binary_is_not_available_in_tool_audit(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "deterministic",
-                "goal_profile": "internal_asset_discovery",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[
-                    ["whatweb-http", "http", "tcp"],
-                    ["nikto", "http", "tcp"],
-                    ["banner", "http", "tcp"],
-                ],
-                portActions=[
-                    ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
-                    ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
-                    ["Banner", "banner", "LEGION_BANNER_TARGET=[IP] python3 -m app.banner_probe", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "deterministic",
+            "goal_profile": "internal_asset_discovery",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[
+                ["whatweb-http", "http", "tcp"],
+                ["nikto", "http", "tcp"],
+                ["banner", "http", "tcp"],
+            ],
+            portActions=[
+                ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
+                ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
+                ["Banner", "banner", "LEGION_BANNER_TARGET=[IP] python3 -m app.banner_probe", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "tool_audit": {
-                        "available_tool_ids": [],
-                        "unavailable_tool_ids": ["whatweb", "nikto"],
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "tool_audit": {
+                    "available_tool_ids": [],
+                    "unavailable_tool_ids": ["whatweb", "nikto"],
                 },
-            )
+            },
+        )
 
-            tool_ids = [item.tool_id for item in actions]
-            self.assertIn("banner", tool_ids)
-            self.assertNotIn("whatweb-http", tool_ids)
-            self.assertNotIn("nikto", tool_ids)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("banner", tool_ids)
+        self.assertNotIn("whatweb-http", tool_ids)
+        self.assertNotIn("nikto", tool_ids)
 
     def test_context_recent_failures_do_not_mark_tools_unavailable_without_explicit_missing_signals(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "deterministic",
-                "goal_profile": "internal_asset_discovery",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[
-                    ["whatweb-http", "http", "tcp"],
-                    ["banner", "http", "tcp"],
-                ],
-                portActions=[
-                    ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
-                    ["Banner", "banner", "LEGION_BANNER_TARGET=[IP] python3 -m app.banner_probe", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "deterministic",
+            "goal_profile": "internal_asset_discovery",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[
+                ["whatweb-http", "http", "tcp"],
+                ["banner", "http", "tcp"],
+            ],
+            portActions=[
+                ["WhatWeb", "whatweb-http", "whatweb http://[IP]:[PORT]", "http"],
+                ["Banner", "banner", "LEGION_BANNER_TARGET=[IP] python3 -m app.banner_probe", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "context_summary": {
-                        "recent_failures": ["whatweb-http: command not found"],
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "context_summary": {
+                    "recent_failures": ["whatweb-http: command not found"],
                 },
-            )
+            },
+        )
 
-            tool_ids = [item.tool_id for item in actions]
-            self.assertIn("whatweb-http", tool_ids)
-            self.assertIn("banner", tool_ids)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("whatweb-http", tool_ids)
+        self.assertIn("banner", tool_ids)
 
     def test_ai_mode_excludes_already_attempted_tools(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "external_pentest",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[
-                    ["screenshooter", "http", "tcp"],
-                ],
-                portActions=[
-                    ["Banner", "banner", "echo | nc -v [IP] [PORT]", "http"],
-                    ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
-                    ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "external_pentest",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[
+                ["screenshooter", "http", "tcp"],
+            ],
+            portActions=[
+                ["Banner", "banner", "echo | nc -v [IP] [PORT]", "http"],
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
+                ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                excluded_tool_ids=["banner", "nuclei-web"],
-                limit=6,
-            )
-            tool_ids = [item.tool_id for item in actions]
-            self.assertNotIn("banner", tool_ids)
-            self.assertNotIn("nuclei-web", tool_ids)
-            self.assertIn("nmap-vuln.nse", tool_ids)
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            excluded_tool_ids=["banner", "nuclei-web"],
+            limit=6,
+        )
+        tool_ids = [item.tool_id for item in actions]
+        self.assertNotIn("banner", tool_ids)
+        self.assertNotIn("nuclei-web", tool_ids)
+        self.assertIn("nmap-vuln.nse", tool_ids)
 
     def test_planner_excludes_blacklisted_tool_ids_from_config(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "none",
-                "disabled_tool_ids": ["http-drupal-modules.nse", "http-vuln-zimbra-lfi.nse"],
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Drupal Modules", "http-drupal-modules.nse", "nmap --script http-drupal-modules.nse [IP]", "http"],
-                    ["Zimbra LFI", "http-vuln-zimbra-lfi.nse", "nmap --script http-vuln-zimbra-lfi.nse [IP]", "http"],
-                    ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "none",
+            "disabled_tool_ids": ["http-drupal-modules.nse", "http-vuln-zimbra-lfi.nse"],
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Drupal Modules", "http-drupal-modules.nse", "nmap --script http-drupal-modules.nse [IP]", "http"],
+                ["Zimbra LFI", "http-vuln-zimbra-lfi.nse", "nmap --script http-vuln-zimbra-lfi.nse [IP]", "http"],
+                ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions("http", "tcp", settings, limit=6)
-            tool_ids = {item.tool_id for item in actions}
-            self.assertNotIn("http-drupal-modules.nse", tool_ids)
-            self.assertNotIn("http-vuln-zimbra-lfi.nse", tool_ids)
-            self.assertIn("whatweb", tool_ids)
+        actions = planner.plan_actions("http", "tcp", settings, limit=6)
+        tool_ids = {item.tool_id for item in actions}
+        self.assertNotIn("http-drupal-modules.nse", tool_ids)
+        self.assertNotIn("http-vuln-zimbra-lfi.nse", tool_ids)
+        self.assertIn("whatweb", tool_ids)
 
     def test_ai_mode_excludes_already_attempted_family_and_command_signature(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "external_pentest",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
-                    ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                ],
-            )
-            signature = SchedulerPlanner._command_signature("tcp", "nuclei -u http://[IP]:[PORT] -silent")
-
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                excluded_family_ids=["nuclei-web"],
-                excluded_command_signatures=[signature],
-                limit=6,
-            )
-            tool_ids = [item.tool_id for item in actions]
-            self.assertNotIn("nuclei-web", tool_ids)
-            self.assertIn("whatweb", tool_ids)
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "external_pentest",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
+                ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+            ],
+        )
+        signature = SchedulerPlanner._command_signature("tcp", "nuclei -u http://[IP]:[PORT] -silent")
+
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            excluded_family_ids=["nuclei-web"],
+            excluded_command_signatures=[signature],
+            limit=6,
+        )
+        tool_ids = [item.tool_id for item in actions]
+        self.assertNotIn("nuclei-web", tool_ids)
+        self.assertIn("whatweb", tool_ids)
 
     @patch("app.scheduler.planner.rank_actions_with_provider")
     def test_ai_mode_forwards_context_to_provider(self, mock_rank_actions):
@@ -636,29 +664,28 @@ class SchedulerPlannerTest(unittest.TestCase):
 
         mock_rank_actions.return_value = []
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "openai",
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["SMB Enum", "smb-enum-users.nse", "nmap --script smb-enum-users [IP]", "smb"],
-                ],
-            )
-            context = {
-                "target": {"host_ip": "10.0.0.5", "service": "smb"},
-                "signals": {"smb_signing_disabled": True},
-            }
-            planner.plan_actions("smb", "tcp", settings, context=context)
-            _, kwargs = mock_rank_actions.call_args
-            self.assertEqual(context, kwargs["context"])
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "openai",
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["SMB Enum", "smb-enum-users.nse", "nmap --script smb-enum-users [IP]", "smb"],
+            ],
+        )
+        context = {
+            "target": {"host_ip": "10.0.0.5", "service": "smb"},
+            "signals": {"smb_signing_disabled": True},
+        }
+        planner.plan_actions("smb", "tcp", settings, context=context)
+        _, kwargs = mock_rank_actions.call_args
+        self.assertEqual(context, kwargs["context"])
 
     def test_ai_candidate_filter_prunes_specialized_web_tools_without_signals(self):
         from app.scheduler.planner import SchedulerPlanner
@@ -1060,282 +1087,275 @@ class SchedulerPlannerTest(unittest.TestCase):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "internal_asset_discovery",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[["screenshooter", "http", "tcp"]],
-                portActions=[
-                    ["Banner", "banner", "echo | nc -v [IP] [PORT]", "http"],
-                    ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "http"],
-                    ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
-                    ["whatweb", "whatweb", "whatweb [IP]:[PORT]", "http"],
-                    ["nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
-                    ["web-content-discovery", "web-content-discovery", "gobuster dir -u http://[IP]:[PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "internal_asset_discovery",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[["screenshooter", "http", "tcp"]],
+            portActions=[
+                ["Banner", "banner", "echo | nc -v [IP] [PORT]", "http"],
+                ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "http"],
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
+                ["whatweb", "whatweb", "whatweb [IP]:[PORT]", "http"],
+                ["nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
+                ["web-content-discovery", "web-content-discovery", "gobuster dir -u http://[IP]:[PORT]", "http"],
+            ],
+        )
 
-            context = {
-                "signals": {"web_service": True},
-                "coverage": {
-                    "analysis_mode": "standard",
-                    "stage": "baseline",
-                    "missing": ["missing_screenshot", "missing_nmap_vuln", "missing_nuclei_auto"],
-                    "recommended_tool_ids": ["screenshooter", "nmap-vuln.nse", "nuclei-web"],
-                },
-            }
-            actions = planner.plan_actions("http", "tcp", settings, context=context, limit=4)
-            tool_ids = [item.tool_id for item in actions]
-            self.assertIn("screenshooter", tool_ids)
-            self.assertIn("nmap-vuln.nse", tool_ids)
-            self.assertIn("nuclei-web", tool_ids)
+        context = {
+            "signals": {"web_service": True},
+            "coverage": {
+                "analysis_mode": "standard",
+                "stage": "baseline",
+                "missing": ["missing_screenshot", "missing_nmap_vuln", "missing_nuclei_auto"],
+                "recommended_tool_ids": ["screenshooter", "nmap-vuln.nse", "nuclei-web"],
+            },
+        }
+        actions = planner.plan_actions("http", "tcp", settings, context=context, limit=4)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("screenshooter", tool_ids)
+        self.assertIn("nmap-vuln.nse", tool_ids)
+        self.assertIn("nuclei-web", tool_ids)
 
     def test_ai_mode_coverage_gap_prioritizes_cpe_cve_enrichment(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-cpe.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "goal_profile": "internal_asset_discovery",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Banner", "banner", "echo | nc -v [IP] [PORT]", "https"],
-                    ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "https"],
-                    ["Run nuclei web scan", "nuclei-web", "nuclei -u https://[IP]:[PORT] -silent", "https"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-cpe.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "goal_profile": "internal_asset_discovery",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Banner", "banner", "echo | nc -v [IP] [PORT]", "https"],
+                ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "https"],
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u https://[IP]:[PORT] -silent", "https"],
+            ],
+        )
 
-            context = {
-                "signals": {"web_service": True},
-                "coverage": {
-                    "analysis_mode": "standard",
-                    "stage": "baseline",
-                    "missing": ["missing_cpe_cve_enrichment"],
-                    "recommended_tool_ids": ["nmap-vuln.nse", "nuclei-web"],
-                },
-            }
-            actions = planner.plan_actions("https", "tcp", settings, context=context, limit=2)
-            tool_ids = [item.tool_id for item in actions]
-            self.assertIn("nmap-vuln.nse", tool_ids)
-            self.assertIn("nuclei-web", tool_ids)
+        context = {
+            "signals": {"web_service": True},
+            "coverage": {
+                "analysis_mode": "standard",
+                "stage": "baseline",
+                "missing": ["missing_cpe_cve_enrichment"],
+                "recommended_tool_ids": ["nmap-vuln.nse", "nuclei-web"],
+            },
+        }
+        actions = planner.plan_actions("https", "tcp", settings, context=context, limit=2)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertIn("nmap-vuln.nse", tool_ids)
+        self.assertIn("nuclei-web", tool_ids)
 
     def test_ai_mode_dig_deeper_promotes_targeted_nuclei_and_generic_http_follow_up(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-dig-deeper.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "engagement_policy": {"preset": "external_pentest"},
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[["screenshooter", "http", "tcp"]],
-                portActions=[
-                    ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
-                    ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "http"],
-                    ["Run nuclei CVE follow-up", "nuclei-cves", "nuclei -tags cve -u http://[IP]:[PORT] -silent", "http"],
-                    ["Run nuclei exposure follow-up", "nuclei-exposures", "nuclei -tags exposure,panel -u http://[IP]:[PORT] -silent", "http"],
-                    ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                    ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
-                    ["Web Discovery", "web-content-discovery", "gobuster dir -u http://[IP]:[PORT]", "http"],
-                    ["HTTP Headers", "curl-headers", "curl -I http://[IP]:[PORT] > [OUTPUT].txt", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-dig-deeper.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "engagement_policy": {"preset": "external_pentest"},
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[["screenshooter", "http", "tcp"]],
+            portActions=[
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u http://[IP]:[PORT] -silent", "http"],
+                ["nmap-vuln.nse", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "http"],
+                ["Run nuclei CVE follow-up", "nuclei-cves", "nuclei -tags cve -u http://[IP]:[PORT] -silent", "http"],
+                ["Run nuclei exposure follow-up", "nuclei-exposures", "nuclei -tags exposure,panel -u http://[IP]:[PORT] -silent", "http"],
+                ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+                ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
+                ["Web Discovery", "web-content-discovery", "gobuster dir -u http://[IP]:[PORT]", "http"],
+                ["HTTP Headers", "curl-headers", "curl -I http://[IP]:[PORT] > [OUTPUT].txt", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True, "vuln_hits": 2},
-                    "host_cves": [{"cve": "CVE-2025-1111"}],
-                    "coverage": {
-                        "analysis_mode": "dig_deeper",
-                        "missing": ["missing_followup_after_vuln", "missing_cpe_cve_enrichment"],
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True, "vuln_hits": 2},
+                "host_cves": [{"cve": "CVE-2025-1111"}],
+                "coverage": {
+                    "analysis_mode": "dig_deeper",
+                    "missing": ["missing_followup_after_vuln", "missing_cpe_cve_enrichment"],
                 },
-            )
+            },
+        )
 
-            tool_ids = {item.tool_id for item in actions}
-            self.assertIn("nmap-vuln.nse", tool_ids)
-            self.assertIn("nuclei-web", tool_ids)
-            self.assertIn("nuclei-cves", tool_ids)
-            self.assertIn("nuclei-exposures", tool_ids)
-            self.assertIn("nikto", tool_ids)
-            self.assertTrue({"whatweb", "web-content-discovery", "curl-headers"} & tool_ids)
+        tool_ids = {item.tool_id for item in actions}
+        self.assertIn("nmap-vuln.nse", tool_ids)
+        self.assertIn("nuclei-web", tool_ids)
+        self.assertIn("nuclei-cves", tool_ids)
+        self.assertIn("nuclei-exposures", tool_ids)
+        self.assertIn("nikto", tool_ids)
+        self.assertTrue({"whatweb", "web-content-discovery", "curl-headers"} & tool_ids)
 
     def test_ai_mode_dig_deeper_promotes_dirsearch_and_ffuf_for_missing_web_content_gap(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-dir-content.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "engagement_policy": {"preset": "external_pentest"},
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[["screenshooter", "http", "tcp"]],
-                portActions=[
-                    ["Run nuclei web scan", "nuclei-web", "nuclei -u [WEB_URL] -silent", "http"],
-                    ["WhatWeb", "whatweb", "whatweb [WEB_URL]", "http"],
-                    ["Run dirsearch", "dirsearch", "dirsearch -u [WEB_URL]/ --format=json --output=[OUTPUT].json", "http"],
-                    ["Run ffuf", "ffuf", "ffuf -u [WEB_URL]/FUZZ -w /usr/share/wordlists/dirb/common.txt -s -of json -o [OUTPUT].json", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-dir-content.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "engagement_policy": {"preset": "external_pentest"},
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[["screenshooter", "http", "tcp"]],
+            portActions=[
+                ["Run nuclei web scan", "nuclei-web", "nuclei -u [WEB_URL] -silent", "http"],
+                ["WhatWeb", "whatweb", "whatweb [WEB_URL]", "http"],
+                ["Run dirsearch", "dirsearch", "dirsearch -u [WEB_URL]/ --format=json --output=[OUTPUT].json", "http"],
+                ["Run ffuf", "ffuf", "ffuf -u [WEB_URL]/FUZZ -w /usr/share/wordlists/dirb/common.txt -s -of json -o [OUTPUT].json", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True, "vuln_hits": 1},
-                    "coverage": {
-                        "analysis_mode": "dig_deeper",
-                        "missing": ["missing_web_content_discovery", "missing_followup_after_vuln"],
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True, "vuln_hits": 1},
+                "coverage": {
+                    "analysis_mode": "dig_deeper",
+                    "missing": ["missing_web_content_discovery", "missing_followup_after_vuln"],
                 },
-            )
+            },
+        )
 
-            tool_ids = {item.tool_id for item in actions}
-            self.assertTrue({"dirsearch", "ffuf"} & tool_ids)
+        tool_ids = {item.tool_id for item in actions}
+        self.assertTrue({"dirsearch", "ffuf"} & tool_ids)
 
     def test_ai_mode_internal_safe_enum_gap_prioritizes_supported_smb_safe_enum_tools(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-internal-gap.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "engagement_policy": {"preset": "internal_recon"},
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[
-                    ["enum4linux-ng", "smb", "tcp"],
-                    ["smbmap", "smb", "tcp"],
-                    ["rpcclient-enum", "smb", "tcp"],
-                    ["netexec", "smb", "tcp"],
-                ],
-                portActions=[
-                    ["Run enum4linux-ng", "enum4linux-ng", "enum4linux-ng -A -oJ [OUTPUT] [IP]", "smb"],
-                    ["Run smbmap", "smbmap", "smbmap -H [IP] -P [PORT] -q --no-write-check | tee [OUTPUT].txt", "smb"],
-                    ["Run rpcclient enum", "rpcclient-enum", "rpcclient [IP] -p [PORT] -U '%' -c 'srvinfo;enumdomusers' > [OUTPUT].txt", "smb"],
-                    ["Run netexec", "netexec", "netexec smb [IP] --port [PORT] -u '' -p '' --shares --users --pass-pol > [OUTPUT].txt", "smb"],
-                    ["Banner", "banner", "echo | nc -v [IP] [PORT]", "smb"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-internal-gap.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "engagement_policy": {"preset": "internal_recon"},
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[
+                ["enum4linux-ng", "smb", "tcp"],
+                ["smbmap", "smb", "tcp"],
+                ["rpcclient-enum", "smb", "tcp"],
+                ["netexec", "smb", "tcp"],
+            ],
+            portActions=[
+                ["Run enum4linux-ng", "enum4linux-ng", "enum4linux-ng -A -oJ [OUTPUT] [IP]", "smb"],
+                ["Run smbmap", "smbmap", "smbmap -H [IP] -P [PORT] -q --no-write-check | tee [OUTPUT].txt", "smb"],
+                ["Run rpcclient enum", "rpcclient-enum", "rpcclient [IP] -p [PORT] -U '%' -c 'srvinfo;enumdomusers' > [OUTPUT].txt", "smb"],
+                ["Run netexec", "netexec", "netexec smb [IP] --port [PORT] -u '' -p '' --shares --users --pass-pol > [OUTPUT].txt", "smb"],
+                ["Banner", "banner", "echo | nc -v [IP] [PORT]", "smb"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "smb",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"smb_signing_disabled": True},
-                    "coverage": {
-                        "analysis_mode": "standard",
-                        "missing": ["missing_internal_safe_enum"],
-                    },
+        actions = planner.plan_actions(
+            "smb",
+            "tcp",
+            settings,
+            context={
+                "signals": {"smb_signing_disabled": True},
+                "coverage": {
+                    "analysis_mode": "standard",
+                    "missing": ["missing_internal_safe_enum"],
                 },
-                limit=3,
-            )
+            },
+            limit=3,
+        )
 
-            tool_ids = {item.tool_id for item in actions}
-            self.assertTrue({"enum4linux-ng", "smbmap", "rpcclient-enum", "netexec"} & tool_ids)
+        tool_ids = {item.tool_id for item in actions}
+        self.assertTrue({"enum4linux-ng", "smbmap", "rpcclient-enum", "netexec"} & tool_ids)
 
     def test_deterministic_mode_uses_strategy_packs_to_close_explicit_gap_when_context_exists(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-det-gap.json"))
-            manager.update_preferences({
-                "mode": "deterministic",
-                "engagement_policy": {"preset": "external_pentest"},
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[
-                    ["nikto", "http", "tcp"],
-                    ["whatweb", "http", "tcp"],
-                ],
-                portActions=[
-                    ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
-                    ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-det-gap.json"))
+        manager.update_preferences({
+            "mode": "deterministic",
+            "engagement_policy": {"preset": "external_pentest"},
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[
+                ["nikto", "http", "tcp"],
+                ["whatweb", "http", "tcp"],
+            ],
+            portActions=[
+                ["Nikto", "nikto", "nikto -h [IP] -p [PORT]", "http"],
+                ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True, "tls_detected": False},
-                    "coverage": {"missing": ["missing_whatweb"]},
-                },
-            )
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True, "tls_detected": False},
+                "coverage": {"missing": ["missing_whatweb"]},
+            },
+        )
 
-            self.assertEqual("whatweb", actions[0].tool_id)
-            self.assertIn("web_app_api", actions[0].pack_ids)
-            self.assertEqual("missing_whatweb", actions[0].coverage_gap)
-            self.assertIn("web_app_api", actions[0].rationale)
+        self.assertEqual("whatweb", actions[0].tool_id)
+        self.assertIn("web_app_api", actions[0].pack_ids)
+        self.assertEqual("missing_whatweb", actions[0].coverage_gap)
+        self.assertIn("web_app_api", actions[0].rationale)
 
     def test_ai_mode_wordpress_signal_prefers_wordpress_follow_up_and_carries_pack_metadata(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-wordpress.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "engagement_policy": {"preset": "external_pentest"},
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                    ["WPScan", "wpscan", "wpscan --url http://[IP]:[PORT] --no-update", "http"],
-                    ["Banner", "banner", "echo | nc -v [IP] [PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-wordpress.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "engagement_policy": {"preset": "external_pentest"},
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+                ["WPScan", "wpscan", "wpscan --url http://[IP]:[PORT] --no-update", "http"],
+                ["Banner", "banner", "echo | nc -v [IP] [PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {
-                        "web_service": True,
-                        "wordpress_detected": True,
-                        "observed_technologies": ["wordpress"],
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {
+                    "web_service": True,
+                    "wordpress_detected": True,
+                    "observed_technologies": ["wordpress"],
                 },
-                limit=3,
-            )
+            },
+            limit=3,
+        )
 
-            self.assertEqual("wpscan", actions[0].tool_id)
-            self.assertIn("web_app_api", actions[0].pack_ids)
-            self.assertIn("strategy packs web_app_api", actions[0].rationale)
+        self.assertEqual("wpscan", actions[0].tool_id)
+        self.assertIn("web_app_api", actions[0].pack_ids)
+        self.assertIn("strategy packs web_app_api", actions[0].rationale)
 
     @patch("app.scheduler.planner.rank_actions_with_provider")
     def test_ai_mode_appends_strategy_pack_and_gap_context_to_provider_rationale(self, mock_rank_actions):
@@ -1346,38 +1366,37 @@ class SchedulerPlannerTest(unittest.TestCase):
             {"tool_id": "sslscan", "score": 91, "rationale": "Provider selected TLS posture validation."},
         ]
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-tls-pack.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "engagement_policy": {"preset": "external_pentest"},
-                "provider": "openai",
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["SSLScan", "sslscan", "sslscan [IP]:[PORT]", "https"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-tls-pack.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "engagement_policy": {"preset": "external_pentest"},
+            "provider": "openai",
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["SSLScan", "sslscan", "sslscan [IP]:[PORT]", "https"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "https",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True, "tls_detected": True},
-                    "coverage": {"missing": ["missing_deep_tls_waf_checks"]},
-                },
-            )
+        actions = planner.plan_actions(
+            "https",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True, "tls_detected": True},
+                "coverage": {"missing": ["missing_deep_tls_waf_checks"]},
+            },
+        )
 
-            self.assertEqual("sslscan", actions[0].tool_id)
-            self.assertIn("Provider selected TLS posture validation.", actions[0].rationale)
-            self.assertIn("tls_and_exposure", actions[0].rationale)
-            self.assertEqual("missing_deep_tls_waf_checks", actions[0].coverage_gap)
+        self.assertEqual("sslscan", actions[0].tool_id)
+        self.assertIn("Provider selected TLS posture validation.", actions[0].rationale)
+        self.assertIn("tls_and_exposure", actions[0].rationale)
+        self.assertEqual("missing_deep_tls_waf_checks", actions[0].coverage_gap)
 
     @patch("app.scheduler.planner.select_web_followup_with_provider")
     @patch("app.scheduler.planner.rank_actions_with_provider")
@@ -1402,53 +1421,52 @@ class SchedulerPlannerTest(unittest.TestCase):
             "prompt_type": "web_followup",
         }
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-web-sidecar.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "openai",
-                "feature_flags": {
-                    "scheduler_web_followup_sidecar": True,
-                },
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                    ["HTTP Headers", "curl-headers", "curl -k -I https://[IP]:[PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-web-sidecar.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "openai",
+            "feature_flags": {
+                "scheduler_web_followup_sidecar": True,
+            },
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
+                ["HTTP Headers", "curl-headers", "curl -k -I https://[IP]:[PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True},
-                    "coverage": {"missing": []},
-                    "context_summary": {
-                        "reflection_posture": {
-                            "state": "stalled",
-                            "priority_shift": "targeted_followup",
-                            "reason": "Repeated generic picks are no longer moving coverage.",
-                        }
-                    },
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True},
+                "coverage": {"missing": []},
+                "context_summary": {
+                    "reflection_posture": {
+                        "state": "stalled",
+                        "priority_shift": "targeted_followup",
+                        "reason": "Repeated generic picks are no longer moving coverage.",
+                    }
                 },
-                limit=2,
-            )
+            },
+            limit=2,
+        )
 
-            self.assertEqual("curl-headers", actions[0].tool_id)
-            self.assertGreater(actions[0].score, 78)
-            self.assertIn("Web follow-up specialist favored curl-headers", actions[0].rationale)
-            _, kwargs = mock_sidecar.call_args
-            self.assertEqual(["curl-headers"], [item["tool_id"] for item in kwargs["candidates"]])
-            payload = planner.get_last_provider_payload(clear=True)
-            self.assertEqual("curl-headers", payload["specialist_sidecars"][0]["selected_tool_ids"][0])
-            self.assertIn("curl -k -I", payload["manual_tests"][0]["command"])
+        self.assertEqual("curl-headers", actions[0].tool_id)
+        self.assertGreater(actions[0].score, 78)
+        self.assertIn("Web follow-up specialist favored curl-headers", actions[0].rationale)
+        _, kwargs = mock_sidecar.call_args
+        self.assertEqual(["curl-headers"], [item["tool_id"] for item in kwargs["candidates"]])
+        payload = planner.get_last_provider_payload(clear=True)
+        self.assertEqual("curl-headers", payload["specialist_sidecars"][0]["selected_tool_ids"][0])
+        self.assertIn("curl -k -I", payload["manual_tests"][0]["command"])
 
     @patch("app.scheduler.planner.select_web_followup_with_provider")
     @patch("app.scheduler.planner.rank_actions_with_provider")
@@ -1465,90 +1483,88 @@ class SchedulerPlannerTest(unittest.TestCase):
             {"tool_id": "whatweb", "score": 76, "rationale": "Re-run technology fingerprinting."},
         ]
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-web-covered.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "openai",
-                "feature_flags": {
-                    "scheduler_web_followup_sidecar": True,
-                },
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                    ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-web-covered.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "openai",
+            "feature_flags": {
+                "scheduler_web_followup_sidecar": True,
+            },
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"}
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
+                ["WhatWeb", "whatweb", "whatweb http://[IP]:[PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True},
-                    "coverage": {
-                        "missing": [],
-                        "has": {
-                            "whatweb": True,
-                            "nikto": True,
-                            "web_content_discovery": True,
-                        },
-                    },
-                    "context_summary": {
-                        "reflection_posture": {
-                            "state": "continue",
-                            "priority_shift": "targeted_followup",
-                            "reason": "Prefer bounded follow-up only if a concrete gap remains.",
-                        }
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True},
+                "coverage": {
+                    "missing": [],
+                    "has": {
+                        "whatweb": True,
+                        "nikto": True,
+                        "web_content_discovery": True,
                     },
                 },
-                limit=2,
-            )
+                "context_summary": {
+                    "reflection_posture": {
+                        "state": "continue",
+                        "priority_shift": "targeted_followup",
+                        "reason": "Prefer bounded follow-up only if a concrete gap remains.",
+                    }
+                },
+            },
+            limit=2,
+        )
 
-            self.assertEqual("banner", actions[0].tool_id)
-            mock_sidecar.assert_not_called()
+        self.assertEqual("banner", actions[0].tool_id)
+        mock_sidecar.assert_not_called()
 
     def test_ai_mode_abstains_when_only_remaining_strict_gap_has_no_matching_candidates(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-abstain-gap.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "openai",
-                "engagement_policy": {"preset": "external_pentest"},
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"},
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["HTTP Headers", "curl-headers", "curl -I http://[IP]:[PORT]", "http"],
-                    ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-abstain-gap.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "openai",
+            "engagement_policy": {"preset": "external_pentest"},
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"},
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["HTTP Headers", "curl-headers", "curl -I http://[IP]:[PORT]", "http"],
+                ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True},
-                    "coverage": {"missing": ["missing_nikto"]},
-                },
-                limit=3,
-            )
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True},
+                "coverage": {"missing": ["missing_nikto"]},
+            },
+            limit=3,
+        )
 
-            self.assertEqual([], actions)
+        self.assertEqual([], actions)
 
     @patch("app.scheduler.planner.rank_actions_with_provider")
     def test_ai_mode_discards_provider_rankings_that_skip_visible_gap_closer(self, mock_rank_actions):
@@ -1559,81 +1575,79 @@ class SchedulerPlannerTest(unittest.TestCase):
             {"tool_id": "banner", "score": 99, "rationale": "Provider drifted toward a generic refresh."},
         ]
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-gap-fallback.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "openai",
-                "engagement_policy": {"preset": "external_pentest"},
-                "providers": {
-                    "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"},
-                },
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[["screenshooter", "http", "tcp"]],
-                portActions=[
-                    ["Capture screenshot", "screenshooter", "screenshooter [WEB_URL]", "http"],
-                    ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-gap-fallback.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "openai",
+            "engagement_policy": {"preset": "external_pentest"},
+            "providers": {
+                "openai": {"enabled": True, "model": "gpt-5-mini", "api_key": "x"},
+            },
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[["screenshooter", "http", "tcp"]],
+            portActions=[
+                ["Capture screenshot", "screenshooter", "screenshooter [WEB_URL]", "http"],
+                ["Banner", "banner", "echo | nc -v -n [IP] [PORT]", "http"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "http",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True},
-                    "coverage": {"missing": ["missing_screenshot"]},
-                },
-                limit=2,
-            )
+        actions = planner.plan_actions(
+            "http",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True},
+                "coverage": {"missing": ["missing_screenshot"]},
+            },
+            limit=2,
+        )
 
-            self.assertTrue(actions)
-            self.assertEqual("screenshooter", actions[0].tool_id)
+        self.assertTrue(actions)
+        self.assertEqual("screenshooter", actions[0].tool_id)
 
     def test_ai_mode_reflection_suppression_filters_web_candidates(self):
         from app.scheduler.config import SchedulerConfigManager
         from app.scheduler.planner import SchedulerPlanner
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = SchedulerConfigManager(config_path=os.path.join(tmpdir, "scheduler-ai-reflection-suppress.json"))
-            manager.update_preferences({
-                "mode": "ai",
-                "provider": "none",
-            })
-            planner = SchedulerPlanner(manager)
-            settings = SimpleNamespace(
-                automatedAttacks=[],
-                portActions=[
-                    ["HTTP Vulns", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "https-alt"],
-                    ["WAFW00F", "wafw00f", "wafw00f https://[IP]:[PORT]", "https-alt"],
-                    ["HTTP Headers", "curl-headers", "curl -k -I https://[IP]:[PORT]", "https-alt"],
-                ],
-            )
+        manager = SchedulerConfigManager(config_path=self._config_path("scheduler-ai-reflection-suppress.json"))
+        manager.update_preferences({
+            "mode": "ai",
+            "provider": "none",
+        })
+        planner = SchedulerPlanner(manager)
+        settings = SimpleNamespace(
+            automatedAttacks=[],
+            portActions=[
+                ["HTTP Vulns", "nmap-vuln.nse", "nmap --script vuln [IP] -p [PORT]", "https-alt"],
+                ["WAFW00F", "wafw00f", "wafw00f https://[IP]:[PORT]", "https-alt"],
+                ["HTTP Headers", "curl-headers", "curl -k -I https://[IP]:[PORT]", "https-alt"],
+            ],
+        )
 
-            actions = planner.plan_actions(
-                "https-alt",
-                "tcp",
-                settings,
-                context={
-                    "signals": {"web_service": True, "waf_detected": True},
-                    "coverage": {"missing": ["missing_nikto"]},
-                    "context_summary": {
-                        "reflection_posture": {
-                            "state": "continue",
-                            "priority_shift": "coverage_first",
-                            "reason": "Broad vuln coverage already ran; avoid repeating it.",
-                            "suppress_tool_ids": ["nmap-vuln.nse"],
-                        }
-                    },
+        actions = planner.plan_actions(
+            "https-alt",
+            "tcp",
+            settings,
+            context={
+                "signals": {"web_service": True, "waf_detected": True},
+                "coverage": {"missing": ["missing_nikto"]},
+                "context_summary": {
+                    "reflection_posture": {
+                        "state": "continue",
+                        "priority_shift": "coverage_first",
+                        "reason": "Broad vuln coverage already ran; avoid repeating it.",
+                        "suppress_tool_ids": ["nmap-vuln.nse"],
+                    }
                 },
-                limit=3,
-            )
+            },
+            limit=3,
+        )
 
-            tool_ids = [item.tool_id for item in actions]
-            self.assertNotIn("nmap-vuln.nse", tool_ids)
-            self.assertIn("curl-headers", tool_ids)
+        tool_ids = [item.tool_id for item in actions]
+        self.assertNotIn("nmap-vuln.nse", tool_ids)
+        self.assertIn("curl-headers", tool_ids)
 
 
 if __name__ == "__main__":
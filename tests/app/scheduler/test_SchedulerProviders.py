@@ -1,16 +1,69 @@
+import json
+import math
 import unittest
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import app.scheduler.providers as providers_module
+from app.scheduler.providers import (
+    ProviderError,
+    ProviderTransientError,
+    _build_candidate_block,
+    _build_ranking_prompt_package,
+    _determine_scheduler_phase,
+    _extract_json,
+    _provider_session,
+    _record_provider_log,
+    _redact_log_text,
+    clear_provider_logs,
+    clear_provider_response_cache,
+    close_provider_sessions,
+    get_last_provider_payload,
+    get_provider_logs,
+    rank_actions_batch,
+    rank_actions_with_provider,
+    reflect_on_scheduler_progress,
+    requests,
+    select_web_followup_with_provider,
+    test_provider_connection as check_provider_connection,
+)
+
+_WHATWEB_CANDIDATE = {"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}
+
+# Oversized candidate list for the prompt-budget tests; the providers treat candidates as read-only.
+_BOUNDED_CANDIDATES = [
+    {
+        "tool_id": f"tool-{i}",
+        "label": f"Tool Label {i}",
+        "command_template": "very-long-command " + ("x" * 500),
+        "service_scope": "http",
+    }
+    for i in range(200)
+]
+
+
+def _fake_response(status_code=200, payload=None, text=None, headers=None):
+    # Plain stand-in for requests.Response; the providers only read status_code, text, content, headers and json().
+    # content is only set when it is derived from payload, so explicit text never disagrees with json().
+    content = None
+    if text is None:
+        text = json.dumps(payload) if payload is not None else ""
+        content = text.encode("utf-8") if payload is not None else None
+    return SimpleNamespace(
+        status_code=status_code,
+        text=text,
+        content=content,
+        headers=dict(headers or {}),
+        json=lambda: payload,
+    )
 
 
 class SchedulerProvidersTest(unittest.TestCase):
     def setUp(self):
-        from app.scheduler.providers import clear_provider_logs
-
         clear_provider_logs()
+        clear_provider_response_cache()
 
     def test_rank_actions_returns_empty_when_provider_disabled(self):
-        from app.scheduler.providers import rank_actions_with_provider
-
         config = {
             "provider": "openai",
             "providers": {
@@ -26,8 +79,6 @@ class SchedulerProvidersTest(unittest.TestCase):
         self.assertEqual([], ranked)
 
     def test_ranking_prompt_prioritizes_screenshooter_when_screenshot_gap_is_open(self):
-        from app.scheduler.providers import _build_ranking_prompt_package
-
         candidates = [
             {"tool_id": "banner", "label": "Banner", "command_template": "nc [IP] [PORT]", "service_scope": "http"},
             {"tool_id": "nmap-vuln.nse", "label": "nmap-vuln.nse", "command_template": "nmap --script vuln [IP] -p [PORT]", "service_scope": "http"},
@@ -59,8 +110,6 @@ class SchedulerProvidersTest(unittest.TestCase):
         )
 
     def test_ranking_prompt_treats_netexec_as_internal_safe_enum_gap_closer(self):
-        from app.scheduler.providers import _build_ranking_prompt_package
-
         candidates = [
             {"tool_id": "banner", "label": "Banner", "command_template": "nc [IP] [PORT]", "service_scope": "smb"},
             {
@@ -90,16 +139,12 @@ class SchedulerProvidersTest(unittest.TestCase):
         self.assertEqual("netexec", metadata["visible_candidate_tool_ids"][0])
 
     def test_ranking_prompt_prefers_engagement_preset_for_external_recon_text_and_phase(self):
-        from app.scheduler.providers import _build_ranking_prompt_package
-
         prompt_package = _build_ranking_prompt_package(
             goal_profile="external_pentest",
             engagement_preset="external_recon",
             service="http",
             protocol="tcp",
-            candidates=[
-                {"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"},
-            ],
+            candidates=[_WHATWEB_CANDIDATE],
             context={
                 "signals": {"web_service": True, "shodan_enabled": True},
                 "attempted_tool_ids": [
@@ -121,11 +166,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_ranking_prompt_can_disable_context_summary(self, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -137,7 +178,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -175,11 +216,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_openai_provider_parses_response(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -196,7 +233,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -210,9 +247,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                 }
             },
         }
-        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [
-            {"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}
-        ])
+        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
         self.assertEqual(1, len(ranked))
         self.assertEqual("whatweb", ranked[0]["tool_id"])
         self.assertEqual(88, ranked[0]["score"])
@@ -233,23 +268,215 @@ class SchedulerProvidersTest(unittest.TestCase):
         self.assertIn("max_completion_tokens", payload)
         self.assertNotIn("max_tokens", payload)
         self.assertNotIn("temperature", payload)
+        self.assertEqual(25.0, mock_post.call_args.kwargs["timeout"])
 
     @patch("app.scheduler.providers.requests.post")
-    def test_provider_logs_capture_sanitized_request_and_response(self, mock_post):
-        from app.scheduler.providers import get_provider_logs, rank_actions_with_provider
+    def test_openai_request_honours_configured_timeout_and_output_token_bounds(self, mock_post):
+        mock_post.return_value = _fake_response(200, payload={
+            "choices": [
+                {"message": {"content": '{"actions":[{"tool_id":"whatweb","score":70,"rationale":"bounded"}]}'}}
+            ]
+        })
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                    "timeout_seconds": 10,
+                    "max_output_tokens": 256,
+                }
+            },
+        }
 
-        response = MagicMock()
-        response.status_code = 200
-        response.text = '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",\\"score\\":80}]}"}}]}'
-        response.json.return_value = {
+        rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        self.assertEqual(10.0, mock_post.call_args.kwargs["timeout"])
+        self.assertEqual(256, mock_post.call_args.kwargs["json"]["max_completion_tokens"])
+
+        config["providers"]["openai"].update({"timeout_seconds": 0, "max_output_tokens": 1000000})
+        rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        self.assertEqual(25.0, mock_post.call_args.kwargs["timeout"])
+        self.assertEqual(1000, mock_post.call_args.kwargs["json"]["max_completion_tokens"])
+
+    def test_requests_proxy_reuses_one_session_per_host(self):
+        close_provider_sessions()
+        self.addCleanup(close_provider_sessions)
+        with patch("requests.Session.post", return_value=_fake_response(200, payload={})) as mock_session_post:
+            requests.post("https://api.openai.com/v1/chat/completions", json={}, timeout=5)
+            requests.post("https://api.openai.com/v1/chat/completions", json={}, timeout=5)
+            requests.post("http://127.0.0.1:1234/v1/chat/completions", json={}, timeout=5)
+
+        self.assertEqual(3, mock_session_post.call_count)
+        first_session = _provider_session("https://api.openai.com/v1/models")
+        self.assertIs(first_session, _provider_session("https://API.OPENAI.COM/v1/chat/completions"))
+        self.assertIsNot(first_session, _provider_session("http://127.0.0.1:1234/v1/models"))
+        self.assertEqual(0, first_session.get_adapter("https://api.openai.com").max_retries.total)
+
+    def test_provider_sessions_reject_cookies(self):
+        import requests as requests_lib
+
+        close_provider_sessions()
+        self.addCleanup(close_provider_sessions)
+        url = "https://api.openai.com/v1/chat/completions"
+        session = _provider_session(url)
+        request = requests_lib.cookies.MockRequest(requests_lib.Request("POST", url).prepare())
+
+        session.cookies.set_cookie_if_ok(
+            requests_lib.cookies.create_cookie("__cf_bm", "token", domain="api.openai.com"),
+            request,
+        )
+
+        self.assertEqual({}, session.cookies.get_dict())
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_rank_actions_scans_context_for_unavailable_tools_once(self, mock_post):
+        mock_post.return_value = _fake_response(200, payload={
             "choices": [
-                {
-                    "message": {
-                        "content": '{"actions":[{"tool_id":"whatweb","score":80,"rationale":"ok"}]}'
-                    }
+                {"message": {"content": '{"actions":[{"tool_id":"whatweb","score":80,"rationale":"ok"}]}'}}
+            ]
+        })
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                    "cache_enabled": True,
                 }
+            },
+        }
+        context = {
+            "signals": {"missing_tools": ["nikto"]},
+            "recent_processes": [{"tool_id": "feroxbuster", "status": "failed", "output_excerpt": "feroxbuster: command not found"}],
+        }
+
+        with patch(
+                "app.scheduler.providers._collect_unavailable_tool_ids",
+                wraps=providers_module._collect_unavailable_tool_ids,
+        ) as mock_collect:
+            ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE], context)
+
+        self.assertEqual("whatweb", ranked[0]["tool_id"])
+        self.assertEqual(1, mock_collect.call_count)
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_rank_actions_batch_returns_payloads_in_item_order(self, mock_post):
+        def side_effect(url, headers=None, json=None, timeout=0):
+            _ = url, headers, timeout
+            if "ssh" in json["messages"][1]["content"]:
+                return _fake_response(400, text="bad request")
+            return _fake_response(200, payload={
+                "choices": [
+                    {"message": {"content": '{"actions":[{"tool_id":"whatweb","score":80,"rationale":"web"}]}'}}
+                ]
+            })
+
+        mock_post.side_effect = side_effect
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                    "max_concurrency": 3,
+                }
+            },
+        }
+        ssh_candidate = {"tool_id": "ssh-audit", "label": "ssh-audit", "command_template": "ssh-audit [IP]", "service_scope": "ssh"}
+        items = [
+            {"goal_profile": "external_pentest", "service": "http", "protocol": "tcp", "candidates": [_WHATWEB_CANDIDATE]},
+            {"goal_profile": "external_pentest", "service": "ssh", "protocol": "tcp", "candidates": [ssh_candidate]},
+            {"goal_profile": "external_pentest", "service": "https", "protocol": "tcp", "candidates": [_WHATWEB_CANDIDATE]},
+        ]
+
+        results = rank_actions_batch(config, items)
+
+        self.assertEqual(3, len(results))
+        self.assertEqual(3, mock_post.call_count)
+        self.assertEqual("whatweb", results[0]["actions"][0]["tool_id"])
+        self.assertEqual("", results[0]["error"])
+        self.assertEqual("ranking", results[0]["prompt_type"])
+        self.assertEqual([], results[1]["actions"])
+        self.assertIn("400", results[1]["error"])
+        self.assertEqual("whatweb", results[2]["actions"][0]["tool_id"])
+
+    def test_rank_actions_batch_reports_unexpected_errors_per_item(self):
+        def side_effect(config, goal_profile, service, protocol, candidates, context, engagement_preset=""):
+            _ = config, goal_profile, protocol, candidates, context, engagement_preset
+            if service == "ssh":
+                raise ValueError("malformed candidate")
+            return [{"tool_id": "whatweb", "score": 80}]
+
+        config = {"provider": "openai", "providers": {"openai": {"enabled": True, "max_concurrency": 2}}}
+        items = [
+            {"goal_profile": "external_pentest", "service": "ssh", "protocol": "tcp", "candidates": []},
+            {"goal_profile": "external_pentest", "service": "http", "protocol": "tcp", "candidates": []},
+        ]
+
+        with patch("app.scheduler.providers.rank_actions_with_provider", side_effect=side_effect):
+            results = rank_actions_batch(config, items)
+
+        self.assertEqual([], results[0]["actions"])
+        self.assertEqual("malformed candidate", results[0]["error"])
+        self.assertEqual("whatweb", results[1]["actions"][0]["tool_id"])
+        self.assertEqual("", results[1]["error"])
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_rank_actions_reuses_cached_response_when_cache_is_enabled(self, mock_post):
+        mock_post.return_value = _fake_response(200, payload={
+            "choices": [
+                {"message": {"content": '{"actions":[{"tool_id":"whatweb","score":77,"rationale":"ok"}],"next_phase":"deep_web"}'}}
             ]
+        })
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-5-mini",
+                    "api_key": "x",
+                    "cache_enabled": True,
+                }
+            },
         }
+
+        first = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        first[0]["score"] = 1
+        second = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual(77, second[0]["score"])
+        self.assertEqual("deep_web", get_last_provider_payload(clear=True)["next_phase"])
+
+        rank_actions_with_provider(config, "external_pentest", "https", "tcp", [_WHATWEB_CANDIDATE])
+        self.assertEqual(2, mock_post.call_count)
+
+        config["providers"]["openai"]["cache_enabled"] = False
+        rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        self.assertEqual(3, mock_post.call_count)
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_provider_logs_capture_sanitized_request_and_response(self, mock_post):
+        response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",\\"score\\":80}]}"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": '{"actions":[{"tool_id":"whatweb","score":80,"rationale":"ok"}]}'
+                        }
+                    }
+                ]
+            },
+        )
         mock_post.return_value = response
 
         config = {
@@ -268,7 +495,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
         )
 
         logs = get_provider_logs(limit=10)
@@ -283,13 +510,76 @@ class SchedulerProvidersTest(unittest.TestCase):
         self.assertEqual("ranking", entry["prompt_metadata"].get("prompt_type"))
         self.assertEqual("web", entry["prompt_metadata"].get("prompt_profile"))
 
+    def test_get_provider_logs_returns_newest_entries_in_chronological_order(self):
+        for index in range(5):
+            _record_provider_log(provider="openai", method="POST", endpoint=f"https://example.test/{index}")
+
+        logs = get_provider_logs(limit=2)
+
+        self.assertEqual(["https://example.test/3", "https://example.test/4"], [row["endpoint"] for row in logs])
+
     @patch("app.scheduler.providers.requests.post")
-    def test_openai_provider_uses_structured_outputs_when_enabled(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
+    def test_provider_logs_scrub_credentials_echoed_in_error_bodies(self, mock_post):
+        mock_post.return_value = _fake_response(
+            401,
+            text='{"error":{"message":"Incorrect API key provided: Bearer super-secret-token"}}',
+        )
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-5-mini",
+                    "api_key": "super-secret-token",
+                }
+            },
+        }
+        with self.assertRaises(ProviderError):
+            rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
 
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        entry = get_provider_logs(limit=1)[-1]
+        self.assertEqual(401, entry["response_status"])
+        self.assertNotIn("super-secret-token", entry["response_body"])
+        self.assertIn("Bearer ***redacted***", entry["response_body"])
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_provider_logs_scrub_openai_incorrect_api_key_message(self, mock_post):
+        mock_post.return_value = _fake_response(
+            401,
+            text=(
+                '{"error":{"message":"Incorrect API key provided: sk-abc123def456ghi789. '
+                'You can find your API key at https://platform.openai.com/account/api-keys.",'
+                '"type":"invalid_request_error","param":null,"code":"invalid_api_key"}}'
+            ),
+        )
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-5-mini",
+                    "api_key": "sk-abc123def456ghi789",
+                }
+            },
+        }
+        with self.assertRaises(ProviderError):
+            rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+
+        entry = get_provider_logs(limit=1)[-1]
+        self.assertNotIn("sk-abc123def456ghi789", entry["response_body"])
+        self.assertNotIn("sk-abc123def456ghi789", entry["error"])
+        self.assertIn("API key provided: ***redacted***", entry["response_body"])
+
+    def test_redact_log_text_scrubs_bare_openai_keys(self):
+        redacted = _redact_log_text("retrying with key sk-proj_AbC123-xyz789 after 401")
+
+        self.assertEqual("retrying with key ***redacted*** after 401", redacted)
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_openai_provider_uses_structured_outputs_when_enabled(self, mock_post):
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -301,7 +591,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -321,7 +611,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
         )
 
         self.assertEqual(1, len(ranked))
@@ -335,11 +625,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_prompt_profiles_can_be_disabled_via_feature_flag(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -347,7 +633,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -369,7 +655,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
             context={"coverage": {"missing": ["missing_nmap_vuln"]}},
         )
 
@@ -382,15 +668,9 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_openai_structured_outputs_fall_back_on_unsupported_parameter(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
+        first_response = _fake_response(400, text="unsupported response_format json_schema")
 
-        first_response = MagicMock()
-        first_response.status_code = 400
-        first_response.text = "unsupported response_format json_schema"
-
-        second_response = MagicMock()
-        second_response.status_code = 200
-        second_response.json.return_value = {
+        second_response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -398,7 +678,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.side_effect = [first_response, second_response]
 
         config = {
@@ -418,7 +698,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
         )
 
         self.assertEqual(1, len(ranked))
@@ -434,45 +714,46 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_openai_retries_when_response_is_empty_and_length_limited(self, mock_post):
-        import copy
-
-        from app.scheduler.providers import rank_actions_with_provider
-
-        first_response = MagicMock()
-        first_response.status_code = 200
-        first_response.text = '{"choices":[{"message":{"content":""},"finish_reason":"length"}]}'
-        first_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {"content": ""},
-                    "finish_reason": "length",
-                }
-            ]
-        }
-
-        second_response = MagicMock()
-        second_response.status_code = 200
-        second_response.text = (
-            '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",\\"score\\":90}]}"}}]}'
+        first_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":""},"finish_reason":"length"}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {"content": ""},
+                        "finish_reason": "length",
+                    }
+                ]
+            },
         )
-        second_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": (
-                            '{"actions":[{"tool_id":"whatweb","score":90,'
-                            '"rationale":"retry returned usable JSON."}]}'
-                        )
+
+        second_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",\\"score\\":90}]}"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": (
+                                '{"actions":[{"tool_id":"whatweb","score":90,'
+                                '"rationale":"retry returned usable JSON."}]}'
+                            )
+                        }
                     }
-                }
-            ]
-        }
+                ]
+            },
+        )
 
         captured_payloads = []
 
         def side_effect(url, headers=None, json=None, timeout=0):
             _ = url, headers, timeout
-            captured_payloads.append(copy.deepcopy(json or {}))
+            payload = json or {}
+            # Only the token budget and the prompt messages are asserted on; snapshot just those.
+            captured_payloads.append({
+                "max_completion_tokens": payload.get("max_completion_tokens"),
+                "messages": [dict(message) for message in payload.get("messages", [])],
+            })
             if len(captured_payloads) == 1:
                 return first_response
             return second_response
@@ -495,7 +776,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
         )
 
         self.assertEqual(1, len(ranked))
@@ -507,53 +788,211 @@ class SchedulerProvidersTest(unittest.TestCase):
         )
         self.assertIn("IMPORTANT RETRY:", captured_payloads[1]["messages"][1]["content"])
 
+    @patch("app.scheduler.providers.time.sleep")
     @patch("app.scheduler.providers.requests.post")
-    def test_openai_retries_when_response_is_truncated_and_length_limited(self, mock_post):
-        import copy
+    def test_openai_backs_off_and_retries_transient_errors(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            _fake_response(429, text="rate limited"),
+            _fake_response(503, text="unavailable"),
+            _fake_response(
+                200,
+                payload={
+                    "choices": [
+                        {
+                            "message": {
+                                "content": (
+                                    '{"actions":[{"tool_id":"whatweb","score":90,'
+                                    '"rationale":"recovered after backoff."}]}'
+                                )
+                            }
+                        }
+                    ]
+                },
+            ),
+        ]
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                    "max_retries": 2,
+                    "retry_base": 0.5,
+                    "retry_max": 8.0,
+                }
+            },
+        }
 
-        from app.scheduler.providers import get_provider_logs, rank_actions_with_provider
+        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
 
-        first_response = MagicMock()
-        first_response.status_code = 200
-        first_response.text = (
-            '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",'
-            '\\"score\\":90,\\"rationale\\":\\"partial"},"finish_reason":"length"}]}'
-        )
-        first_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": '{"actions":[{"tool_id":"whatweb","score":90,"rationale":"partial'
-                    },
-                    "finish_reason": "length",
+        self.assertEqual("whatweb", ranked[0]["tool_id"])
+        self.assertEqual(3, mock_post.call_count)
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(2, len(delays))
+        self.assertTrue(0.5 <= delays[0] <= 1.0)
+        self.assertTrue(1.0 <= delays[1] <= 1.5)
+
+        mock_post.reset_mock()
+        mock_post.side_effect = None
+        mock_post.return_value = _fake_response(502, text="bad gateway")
+        with self.assertRaises(ProviderError):
+            rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        self.assertEqual(3, mock_post.call_count)
+
+    @patch("app.scheduler.providers.time.sleep")
+    @patch("app.scheduler.providers.requests.post")
+    def test_openai_backoff_honors_retry_after_header(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            _fake_response(429, text="rate limited", headers={"Retry-After": "7"}),
+            _fake_response(
+                200,
+                payload={
+                    "choices": [
+                        {"message": {"content": '{"actions":[{"tool_id":"whatweb","score":90,"rationale":"ok"}]}'}}
+                    ]
+                },
+            ),
+        ]
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                    "retry_max": 1.0,
                 }
-            ]
+            },
         }
 
-        second_response = MagicMock()
-        second_response.status_code = 200
-        second_response.text = (
-            '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",'
-            '\\"score\\":91,\\"rationale\\":\\"retried\\"}]}"}}]}'
-        )
-        second_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": (
-                            '{"actions":[{"tool_id":"whatweb","score":91,'
-                            '"rationale":"retried after truncated response."}]}'
-                        )
-                    }
+        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+
+        self.assertEqual("whatweb", ranked[0]["tool_id"])
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch("app.scheduler.providers.time.sleep")
+    def test_openai_does_not_retry_invalid_base_url(self, mock_sleep):
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
                 }
-            ]
+            },
+        }
+
+        with self.assertRaises(ProviderError) as raised:
+            rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+
+        self.assertNotIsInstance(raised.exception, ProviderTransientError)
+        mock_sleep.assert_not_called()
+
+    @patch("app.scheduler.providers.time.sleep")
+    @patch("app.scheduler.providers.requests.post")
+    def test_openai_retries_connection_errors(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            requests.ConnectionError("connection reset"),
+            _fake_response(
+                200,
+                payload={
+                    "choices": [
+                        {"message": {"content": '{"actions":[{"tool_id":"whatweb","score":90,"rationale":"ok"}]}'}}
+                    ]
+                },
+            ),
+        ]
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                }
+            },
         }
 
+        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+
+        self.assertEqual("whatweb", ranked[0]["tool_id"])
+        self.assertEqual(2, mock_post.call_count)
+        self.assertEqual(1, mock_sleep.call_count)
+
+    @patch("app.scheduler.providers.time.sleep")
+    @patch("app.scheduler.providers.requests.post")
+    def test_test_provider_connection_does_not_retry_transient_errors(self, mock_post, mock_sleep):
+        mock_post.return_value = _fake_response(429, text="rate limited", headers={"Retry-After": "30"})
+        config = {
+            "provider": "openai",
+            "providers": {
+                "openai": {
+                    "enabled": True,
+                    "base_url": "https://api.openai.com/v1",
+                    "model": "gpt-4.1-mini",
+                    "api_key": "x",
+                }
+            },
+        }
+
+        result = check_provider_connection(config)
+
+        self.assertFalse(result["ok"])
+        self.assertIn("429", result["error"])
+        self.assertEqual(1, mock_post.call_count)
+        mock_sleep.assert_not_called()
+
+    @patch("app.scheduler.providers.requests.post")
+    def test_openai_retries_when_response_is_truncated_and_length_limited(self, mock_post):
+        first_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",'
+                '\\"score\\":90,\\"rationale\\":\\"partial"},"finish_reason":"length"}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": '{"actions":[{"tool_id":"whatweb","score":90,"rationale":"partial'
+                        },
+                        "finish_reason": "length",
+                    }
+                ]
+            },
+        )
+
+        second_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"whatweb\\",'
+                '\\"score\\":91,\\"rationale\\":\\"retried\\"}]}"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": (
+                                '{"actions":[{"tool_id":"whatweb","score":91,'
+                                '"rationale":"retried after truncated response."}]}'
+                            )
+                        }
+                    }
+                ]
+            },
+        )
+
         captured_payloads = []
 
         def side_effect(url, headers=None, json=None, timeout=0):
             _ = url, headers, timeout
-            captured_payloads.append(copy.deepcopy(json or {}))
+            payload = json or {}
+            captured_payloads.append({
+                "max_completion_tokens": payload.get("max_completion_tokens"),
+                "messages": [dict(message) for message in payload.get("messages", [])],
+            })
             if len(captured_payloads) == 1:
                 return first_response
             return second_response
@@ -576,7 +1015,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
         )
 
         self.assertEqual(1, len(ranked))
@@ -606,11 +1045,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_ranking_prompt_overrides_stale_context_summary_phase(self, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -622,7 +1057,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -661,11 +1096,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_provider_payload_filters_missing_tool_manual_tests_sanitizes_versions_and_clamps_next_phase(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -686,7 +1117,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -736,40 +1167,37 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_provider_payload_filters_manual_tests_for_audited_missing_tools(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.text = (
-            '{"choices":[{"message":{"content":"'
-            '{\\"actions\\":[{\\"tool_id\\":\\"banner\\",\\"score\\":82,\\"rationale\\":\\"ok\\"}],'
-            '\\"host_updates\\":{\\"hostname\\":\\"unifi.local\\",\\"hostname_confidence\\":90,\\"os\\":\\"unknown\\",\\"os_confidence\\":20,\\"technologies\\":[]},'
-            '\\"findings\\":[],'
-            '\\"manual_tests\\":['
-            '{\\"why\\":\\"scan\\",\\"command\\":\\"nikto -host https://192.168.3.1:443\\",\\"scope_note\\":\\"skip\\"},'
-            '{\\"why\\":\\"headers\\",\\"command\\":\\"curl -k -I https://192.168.3.1:443\\",\\"scope_note\\":\\"keep\\"}'
-            '],'
-            '\\"next_phase\\":\\"deep_web\\"'
-            '"}}]}'
-        )
-        response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": (
-                            '{"actions":[{"tool_id":"banner","score":82,"rationale":"ok"}],'
-                            '"host_updates":{"hostname":"unifi.local","hostname_confidence":90,"os":"unknown","os_confidence":20,"technologies":[]},'
-                            '"findings":[],'
-                            '"manual_tests":['
-                            '{"why":"scan","command":"nikto -host https://192.168.3.1:443","scope_note":"skip"},'
-                            '{"why":"headers","command":"curl -k -I https://192.168.3.1:443","scope_note":"keep"}'
-                            '],'
-                            '"next_phase":"deep_web"}'
-                        )
+        response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"'
+                '{\\"actions\\":[{\\"tool_id\\":\\"banner\\",\\"score\\":82,\\"rationale\\":\\"ok\\"}],'
+                '\\"host_updates\\":{\\"hostname\\":\\"unifi.local\\",\\"hostname_confidence\\":90,\\"os\\":\\"unknown\\",\\"os_confidence\\":20,\\"technologies\\":[]},'
+                '\\"findings\\":[],'
+                '\\"manual_tests\\":['
+                '{\\"why\\":\\"scan\\",\\"command\\":\\"nikto -host https://192.168.3.1:443\\",\\"scope_note\\":\\"skip\\"},'
+                '{\\"why\\":\\"headers\\",\\"command\\":\\"curl -k -I https://192.168.3.1:443\\",\\"scope_note\\":\\"keep\\"}'
+                '],'
+                '\\"next_phase\\":\\"deep_web\\"'
+                '"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": (
+                                '{"actions":[{"tool_id":"banner","score":82,"rationale":"ok"}],'
+                                '"host_updates":{"hostname":"unifi.local","hostname_confidence":90,"os":"unknown","os_confidence":20,"technologies":[]},'
+                                '"findings":[],'
+                                '"manual_tests":['
+                                '{"why":"scan","command":"nikto -host https://192.168.3.1:443","scope_note":"skip"},'
+                                '{"why":"headers","command":"curl -k -I https://192.168.3.1:443","scope_note":"keep"}'
+                                '],'
+                                '"next_phase":"deep_web"}'
+                            )
+                        }
                     }
-                }
-            ]
-        }
+                ]
+            },
+        )
         mock_post.return_value = response
 
         config = {
@@ -807,36 +1235,33 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_provider_payload_does_not_treat_finished_wrapper_commands_as_unavailable(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.text = (
-            '{"choices":[{"message":{"content":"'
-            '{\\"actions\\":[{\\"tool_id\\":\\"banner\\",\\"score\\":80,\\"rationale\\":\\"ok\\"}],'
-            '\\"host_updates\\":{\\"hostname\\":\\"unifi.local\\",\\"hostname_confidence\\":90,\\"os\\":\\"unknown\\",\\"os_confidence\\":20,\\"technologies\\":[]},'
-            '\\"findings\\":[],'
-            '\\"manual_tests\\":['
-            '{\\"why\\":\\"fingerprint\\",\\"command\\":\\"whatweb http://192.168.3.1:80\\",\\"scope_note\\":\\"keep\\"}'
-            '],'
-            '\\"next_phase\\":\\"deep_web\\"'
-            '"}}]}'
-        )
-        response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": (
-                            '{"actions":[{"tool_id":"banner","score":80,"rationale":"ok"}],'
-                            '"host_updates":{"hostname":"unifi.local","hostname_confidence":90,"os":"unknown","os_confidence":20,"technologies":[]},'
-                            '"findings":[],'
-                            '"manual_tests":[{"why":"fingerprint","command":"whatweb http://192.168.3.1:80","scope_note":"keep"}],'
-                            '"next_phase":"deep_web"}'
-                        )
+        response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"'
+                '{\\"actions\\":[{\\"tool_id\\":\\"banner\\",\\"score\\":80,\\"rationale\\":\\"ok\\"}],'
+                '\\"host_updates\\":{\\"hostname\\":\\"unifi.local\\",\\"hostname_confidence\\":90,\\"os\\":\\"unknown\\",\\"os_confidence\\":20,\\"technologies\\":[]},'
+                '\\"findings\\":[],'
+                '\\"manual_tests\\":['
+                '{\\"why\\":\\"fingerprint\\",\\"command\\":\\"whatweb http://192.168.3.1:80\\",\\"scope_note\\":\\"keep\\"}'
+                '],'
+                '\\"next_phase\\":\\"deep_web\\"'
+                '"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": (
+                                '{"actions":[{"tool_id":"banner","score":80,"rationale":"ok"}],'
+                                '"host_updates":{"hostname":"unifi.local","hostname_confidence":90,"os":"unknown","os_confidence":20,"technologies":[]},'
+                                '"findings":[],'
+                                '"manual_tests":[{"why":"fingerprint","command":"whatweb http://192.168.3.1:80","scope_note":"keep"}],'
+                                '"next_phase":"deep_web"}'
+                            )
+                        }
                     }
-                }
-            ]
-        }
+                ]
+            },
+        )
         mock_post.return_value = response
 
         config = {
@@ -875,37 +1300,35 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_test_provider_connection_retries_on_openai_length_empty(self, mock_post):
-        from app.scheduler.providers import test_provider_connection
-
-        first_response = MagicMock()
-        first_response.status_code = 200
-        first_response.text = '{"choices":[{"message":{"content":""},"finish_reason":"length"}]}'
-        first_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {"content": ""},
-                    "finish_reason": "length",
-                }
-            ]
-        }
-
-        second_response = MagicMock()
-        second_response.status_code = 200
-        second_response.text = (
-            '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"healthcheck\\",\\"score\\":100}]}"}}]}'
+        first_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":""},"finish_reason":"length"}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {"content": ""},
+                        "finish_reason": "length",
+                    }
+                ]
+            },
         )
-        second_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": (
-                            '{"actions":[{"tool_id":"healthcheck","score":100,'
-                            '"rationale":"ok"}]}'
-                        )
+
+        second_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"healthcheck\\",\\"score\\":100}]}"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": (
+                                '{"actions":[{"tool_id":"healthcheck","score":100,'
+                                '"rationale":"ok"}]}'
+                            )
+                        }
                     }
-                }
-            ]
-        }
+                ]
+            },
+        )
 
         mock_post.side_effect = [first_response, second_response]
 
@@ -920,7 +1343,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                 }
             },
         }
-        result = test_provider_connection(config)
+        result = check_provider_connection(config)
         self.assertTrue(result["ok"])
         self.assertEqual("openai", result["provider"])
         self.assertEqual(2, mock_post.call_count)
@@ -930,22 +1353,19 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_test_provider_connection_uses_structured_outputs_when_enabled(self, mock_post):
-        from app.scheduler.providers import test_provider_connection
-
-        response = MagicMock()
-        response.status_code = 200
-        response.text = (
-            '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"healthcheck\\",\\"score\\":100}]}"}}]}'
-        )
-        response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": '{"actions":[{"tool_id":"healthcheck","score":100,"rationale":"ok"}]}'
+        response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"healthcheck\\",\\"score\\":100}]}"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": '{"actions":[{"tool_id":"healthcheck","score":100,"rationale":"ok"}]}'
+                        }
                     }
-                }
-            ]
-        }
+                ]
+            },
+        )
         mock_post.return_value = response
 
         config = {
@@ -960,7 +1380,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                 }
             },
         }
-        result = test_provider_connection(config)
+        result = check_provider_connection(config)
         self.assertTrue(result["ok"])
         payload = mock_post.call_args.kwargs["json"]
         self.assertIn("response_format", payload)
@@ -971,26 +1391,21 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_test_provider_connection_falls_back_when_structured_outputs_are_rejected(self, mock_post):
-        from app.scheduler.providers import test_provider_connection
+        first_response = _fake_response(400, text="unsupported response_format json_schema")
 
-        first_response = MagicMock()
-        first_response.status_code = 400
-        first_response.text = "unsupported response_format json_schema"
-
-        second_response = MagicMock()
-        second_response.status_code = 200
-        second_response.text = (
-            '{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"healthcheck\\",\\"score\\":100}]}"}}]}'
-        )
-        second_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": '{"actions":[{"tool_id":"healthcheck","score":100,"rationale":"ok"}]}'
+        second_response = _fake_response(
+            200,
+            text='{"choices":[{"message":{"content":"{\\"actions\\":[{\\"tool_id\\":\\"healthcheck\\",\\"score\\":100}]}"}}]}',
+            payload={
+                "choices": [
+                    {
+                        "message": {
+                            "content": '{"actions":[{"tool_id":"healthcheck","score":100,"rationale":"ok"}]}'
+                        }
                     }
-                }
-            ]
-        }
+                ]
+            },
+        )
         mock_post.side_effect = [first_response, second_response]
 
         config = {
@@ -1005,7 +1420,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                 }
             },
         }
-        result = test_provider_connection(config)
+        result = check_provider_connection(config)
         self.assertTrue(result["ok"])
         self.assertEqual(2, mock_post.call_count)
         first_payload = mock_post.call_args_list[0].kwargs["json"]
@@ -1018,18 +1433,14 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_claude_provider_parses_text_block(self, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "content": [
                 {
                     "type": "text",
                     "text": '{"actions":[{"tool_id":"nikto","score":73,"rationale":"Useful web baseline."}]}',
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -1055,11 +1466,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_openai_reflection_provider_parses_response(self, mock_post):
-        from app.scheduler.providers import get_provider_logs, reflect_on_scheduler_progress
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1073,7 +1480,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -1128,11 +1535,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_openai_web_followup_sidecar_parses_response(self, mock_post):
-        from app.scheduler.providers import select_web_followup_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1145,7 +1548,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -1196,11 +1599,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_web_followup_prompt_prefers_engagement_preset_for_display(self, mock_post):
-        from app.scheduler.providers import select_web_followup_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1213,7 +1612,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -1244,11 +1643,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_claude_web_followup_sidecar_parses_text_block(self, mock_post):
-        from app.scheduler.providers import select_web_followup_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "content": [
                 {
                     "type": "text",
@@ -1260,7 +1655,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     ),
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -1293,21 +1688,15 @@ class SchedulerProvidersTest(unittest.TestCase):
     @patch("app.scheduler.providers.requests.post")
     @patch("app.scheduler.providers.requests.get")
     def test_lm_studio_provider_auto_discovers_model(self, mock_get, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
-        models_response = MagicMock()
-        models_response.status_code = 200
-        models_response.json.return_value = {
+        models_response = _fake_response(200, payload={
             "data": [
                 {"id": "tinyllama-1.1b"},
                 {"id": "o3-7b-instruct"},
             ]
-        }
+        })
         mock_get.return_value = models_response
 
-        completion_response = MagicMock()
-        completion_response.status_code = 200
-        completion_response.json.return_value = {
+        completion_response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1318,7 +1707,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = completion_response
 
         config = {
@@ -1332,30 +1721,29 @@ class SchedulerProvidersTest(unittest.TestCase):
                 }
             },
         }
-        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [
-            {"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}
-        ])
+        ranked = rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
         self.assertEqual(1, len(ranked))
         self.assertEqual("whatweb", ranked[0]["tool_id"])
         self.assertEqual(91, ranked[0]["score"])
 
         payload = mock_post.call_args.kwargs["json"]
         self.assertEqual("o3-7b-instruct", payload["model"])
+        self.assertEqual(1, mock_get.call_count)
+
+        config["providers"]["lm_studio"]["model_cache_enabled"] = True
+        rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        rank_actions_with_provider(config, "external_pentest", "http", "tcp", [_WHATWEB_CANDIDATE])
+        self.assertEqual(2, mock_get.call_count)
+        self.assertEqual("o3-7b-instruct", mock_post.call_args.kwargs["json"]["model"])
 
     @patch("app.scheduler.providers.requests.post")
     def test_lm_studio_falls_back_to_native_chat_endpoint(self, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
         def post_side_effect(url, headers=None, json=None, timeout=0):
             if url.endswith("/chat/completions"):
-                response = MagicMock()
-                response.status_code = 404
-                response.text = "not found"
+                response = _fake_response(404, text="not found")
                 return response
             if url.endswith("/api/v1/chat"):
-                response = MagicMock()
-                response.status_code = 200
-                response.json.return_value = {
+                response = _fake_response(200, payload={
                     "output": [
                         {"type": "reasoning", "content": "thinking"},
                         {
@@ -1366,7 +1754,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                             ),
                         },
                     ]
-                }
+                })
                 return response
             raise AssertionError(f"Unexpected URL: {url}")
 
@@ -1389,7 +1777,7 @@ class SchedulerProvidersTest(unittest.TestCase):
             "external_pentest",
             "http",
             "tcp",
-            [{"tool_id": "whatweb", "label": "whatweb", "command_template": "whatweb [IP]", "service_scope": "http"}],
+            [_WHATWEB_CANDIDATE],
         )
         self.assertEqual(1, len(ranked))
         self.assertEqual("whatweb", ranked[0]["tool_id"])
@@ -1397,11 +1785,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_prompt_is_bounded_for_context_limited_models(self, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1412,17 +1796,10 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
-        candidates = []
-        for i in range(200):
-            candidates.append({
-                "tool_id": f"tool-{i}",
-                "label": f"Tool Label {i}",
-                "command_template": "very-long-command " + ("x" * 500),
-                "service_scope": "http",
-            })
+        candidates = _BOUNDED_CANDIDATES
 
         config = {
             "provider": "openai",
@@ -1444,11 +1821,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_ranking_schema_and_parser_stay_with_visible_candidates_only(self, mock_post):
-        from app.scheduler.providers import get_last_provider_payload, rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1462,17 +1835,10 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
-        candidates = []
-        for i in range(40):
-            candidates.append({
-                "tool_id": f"tool-{i}",
-                "label": f"Tool Label {i}",
-                "command_template": "very-long-command " + ("x" * 500),
-                "service_scope": "http",
-            })
+        candidates = _BOUNDED_CANDIDATES[:40]
 
         config = {
             "provider": "openai",
@@ -1500,11 +1866,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_prompt_includes_context_signals(self, mock_post):
-        from app.scheduler.providers import rank_actions_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1515,7 +1877,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         config = {
@@ -1651,8 +2013,6 @@ class SchedulerProvidersTest(unittest.TestCase):
         self.assertIn("Prefer closing baseline coverage gaps", metadata)
 
     def test_ranking_prompt_keeps_multiple_visible_candidates_under_large_context(self):
-        from app.scheduler.providers import _build_candidate_block
-
         candidates = []
         for i in range(12):
             candidates.append({
@@ -1682,11 +2042,7 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.post")
     def test_web_followup_filters_selected_tools_to_visible_candidates_under_budget_pressure(self, mock_post):
-        from app.scheduler.providers import select_web_followup_with_provider
-
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1699,7 +2055,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = response
 
         candidates = []
@@ -1747,8 +2103,6 @@ class SchedulerProvidersTest(unittest.TestCase):
         self.assertEqual(["tool-0"], payload["selected_tool_ids"])
 
     def test_determine_phase_uses_cpe_cve_enrichment_gap(self):
-        from app.scheduler.providers import _determine_scheduler_phase
-
         phase = _determine_scheduler_phase(
             goal_profile="internal_asset_discovery",
             service="https",
@@ -1760,24 +2114,47 @@ class SchedulerProvidersTest(unittest.TestCase):
         )
         self.assertEqual("broad_vuln", phase)
 
+    def test_determine_phase_maps_each_coverage_gap_in_priority_order(self):
+        expectations = {
+            "missing_discovery": "initial_discovery",
+            "missing_remote_screenshot": "service_fingerprint",
+            "missing_nuclei_auto": "broad_vuln",
+            "missing_smb_signing_checks": "protocol_checks",
+            "missing_web_content_discovery": "deep_web",
+            "missing_followup_after_vuln": "targeted_checks",
+        }
+        for gap_id, phase in expectations.items():
+            with self.subTest(gap_id=gap_id):
+                self.assertEqual(phase, _determine_scheduler_phase(
+                    goal_profile="internal_asset_discovery",
+                    service="https",
+                    context={"coverage": {"missing": [gap_id]}},
+                ))
+        self.assertEqual("initial_discovery", _determine_scheduler_phase(
+            goal_profile="internal_asset_discovery",
+            service="https",
+            context={"coverage": {"missing": list(expectations)}},
+        ))
+
+    def test_extract_json_accepts_prose_fenced_and_non_standard_payloads(self):
+        self.assertEqual({"actions": []}, _extract_json('Here you go: {"actions": []} Hope that helps.'))
+        self.assertEqual({"actions": [1]}, _extract_json('```json\n{"actions": [1]}\n```'))
+        self.assertTrue(math.isnan(_extract_json('{"score": NaN}')["score"]))
+        with self.assertRaises(ProviderError):
+            _extract_json("no json here")
+
     @patch("app.scheduler.providers.requests.post")
     @patch("app.scheduler.providers.requests.get")
     def test_test_provider_connection_lm_studio(self, mock_get, mock_post):
-        from app.scheduler.providers import test_provider_connection
-
-        models_response = MagicMock()
-        models_response.status_code = 200
-        models_response.json.return_value = {
+        models_response = _fake_response(200, payload={
             "data": [
                 {"id": "qwen-7b"},
                 {"id": "o3-7b-local"},
             ]
-        }
+        })
         mock_get.return_value = models_response
 
-        completion_response = MagicMock()
-        completion_response.status_code = 200
-        completion_response.json.return_value = {
+        completion_response = _fake_response(200, payload={
             "choices": [
                 {
                     "message": {
@@ -1788,7 +2165,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_post.return_value = completion_response
 
         config = {
@@ -1802,7 +2179,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                 }
             },
         }
-        result = test_provider_connection(config)
+        result = check_provider_connection(config)
         self.assertTrue(result["ok"])
         self.assertEqual("lm_studio", result["provider"])
         self.assertEqual("o3-7b-local", result["model"])
@@ -1810,34 +2187,24 @@ class SchedulerProvidersTest(unittest.TestCase):
 
     @patch("app.scheduler.providers.requests.get")
     def test_lm_studio_model_listing_supports_legacy_models_shape(self, mock_get):
-        from app.scheduler.providers import test_provider_connection
-
         def get_side_effect(url, headers=None, timeout=0):
-            response = MagicMock()
-            response.status_code = 200
             if url.endswith("/api/v1/models"):
-                response.json.return_value = {
+                return _fake_response(200, payload={
                     "models": [
                         {"key": "openai/gpt-oss-20b"},
                         {"key": "openai/gpt-oss-120b"},
                     ]
-                }
-            elif url.endswith("/v1/models"):
-                response.json.return_value = {"data": []}
-            else:
-                response.json.return_value = {"data": []}
-            return response
+                })
+            return _fake_response(200, payload={"data": []})
 
         mock_get.side_effect = get_side_effect
 
         with patch("app.scheduler.providers.requests.post") as mock_post:
-            completion_response = MagicMock()
-            completion_response.status_code = 200
-            completion_response.json.return_value = {
+            completion_response = _fake_response(200, payload={
                 "choices": [
                     {"message": {"content": '{"actions":[{"tool_id":"healthcheck","score":100,"rationale":"ok"}]}'}}
                 ]
-            }
+            })
             mock_post.return_value = completion_response
 
             config = {
@@ -1851,7 +2218,7 @@ class SchedulerProvidersTest(unittest.TestCase):
                     }
                 },
             }
-            result = test_provider_connection(config)
+            result = check_provider_connection(config)
             self.assertTrue(result["ok"])
             self.assertEqual("openai/gpt-oss-20b", result["model"])
 
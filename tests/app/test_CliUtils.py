@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import app.ProjectManager as pm_module
+import app.cli_utils as cli_utils
+from app.ProjectManager import ProjectManager
+from app.logging.legionLog import getAppLogger, getDbLogger
+from app.shell.DefaultShell import DefaultShell
+from db.RepositoryFactory import RepositoryFactory
+
+
+class CliUtilsTest(unittest.TestCase):
+    def _create_project(self):
+        tempdir_obj = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir_obj.cleanup)
+        original_temp_dir = pm_module.tempDirectory
+        pm_module.tempDirectory = tempdir_obj.name
+        self.addCleanup(setattr, pm_module, "tempDirectory", original_temp_dir)
+        project_manager = ProjectManager(DefaultShell(), RepositoryFactory(getDbLogger()), getAppLogger())
+        project = project_manager.createNewProject(projectType="legion", isTemp=True)
+        self.addCleanup(project.database.dispose)
+        return project
+
+    def test_read_targets_from_textfile_skips_blank_lines_and_comments(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+            handle.write("10.0.0.1\n\n# lab range\n  10.0.0.0/24  \nexample.com\n")
+        self.addCleanup(os.remove, handle.name)
+
+        self.assertEqual(
+            ["10.0.0.1", "10.0.0.0/24", "example.com"],
+            cli_utils.read_targets_from_textfile(handle.name),
+        )
+        self.assertIsNone(cli_utils.read_targets_from_textfile(handle.name + ".missing"))
+
+    def test_import_targets_bulk_inserts_new_targets_and_skips_existing(self):
+        project = self._create_project()
+        session = project.database.session()
+        host_repo = project.repositoryContainer.hostRepository
+
+        first = cli_utils.import_targets(session, host_repo, ["10.0.0.1", "# comment", "", "example.com"])
+        second = cli_utils.import_targets(
+            session,
+            host_repo,
+            ["10.0.0.1", "https://example.com/login", "10.0.0.2", "10.0.0.2"],
+        )
+
+        self.assertEqual(["10.0.0.1", "example.com"], first)
+        self.assertEqual(["10.0.0.2"], second)
+        hosts = sorted(host_repo.getAllHostObjs(), key=lambda item: item.ip)
+        self.assertEqual(["10.0.0.1", "10.0.0.2", "example.com"], [host.ip for host in hosts])
+        self.assertEqual("False", hosts[0].checked)
+        self.assertEqual("unknown", hosts[0].osMatch)
+
+    def test_start_nmap_scan_runs_in_background_and_returns_xml_path(self):
+        release = threading.Event()
+
+        def fake_run_nmap_scan(targets, output_prefix, **kwargs):
+            release.wait(5)
+            return output_prefix + ".xml"
+
+        with patch.object(cli_utils, "run_nmap_scan", side_effect=fake_run_nmap_scan) as run_mock:
+            future = cli_utils.start_nmap_scan("10.0.0.1 10.0.0.2", "/tmp/cli-nmap", discovery=False)
+            self.assertFalse(future.done())
+            release.set()
+            self.assertEqual("/tmp/cli-nmap.xml", future.result(timeout=5))
+
+        run_mock.assert_called_once_with(
+            "10.0.0.1 10.0.0.2",
+            "/tmp/cli-nmap",
+            discovery=False,
+            staged=False,
+            nmap_path="nmap",
+        )
+
+    def test_start_nmap_scan_propagates_errors(self):
+        with patch.object(cli_utils, "run_nmap_scan", side_effect=RuntimeError("boom")):
+            future = cli_utils.start_nmap_scan("10.0.0.1", "/tmp/cli-nmap")
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
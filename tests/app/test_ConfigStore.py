@@ -0,0 +1,109 @@
+import configparser
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import app.core.config_store as config_store_module
+from app.core.config_store import IniSettingsStore, _parse_simple_ini
+
+REPO_CONF = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "legion.conf")
+
+
+def _configparser_sections(text):
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    parser.read_string(text)
+    return {section: dict(parser[section]) for section in parser.sections()}
+
+
+class SimpleIniParserTest(unittest.TestCase):
+    def test_matches_configparser_for_shipped_legion_conf(self):
+        text = Path(REPO_CONF).read_text(encoding="utf-8")
+        self.assertEqual(_configparser_sections(text), _parse_simple_ini(text))
+
+    def test_splits_on_first_delimiter_and_skips_comments(self):
+        text = "# comment\n[Group]\n; note\nfirst: a=b\nsecond = c:d\nempty=\n"
+        parsed = _parse_simple_ini(text)
+        self.assertEqual(_configparser_sections(text), parsed)
+        self.assertEqual({"first": "a=b", "second": "c:d", "empty": ""}, parsed["Group"])
+
+    def test_defers_to_configparser_outside_flat_subset(self):
+        for text in (
+            "key=value\n",
+            "[Group]\nkey=value\n  continued\n",
+            "[Group]\nkey=1\nkey=2\n",
+            "[Group]\n[Group]\n",
+            "[DEFAULT]\nkey=value\n",
+            "[Group]=value\n",
+            "[Group]\nno-delimiter\n",
+        ):
+            with self.subTest(text=text):
+                self.assertIsNone(_parse_simple_ini(text))
+
+    def test_store_reads_continuation_values_through_fallback(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "legion.conf")
+            Path(path).write_text("[GeneralSettings]\nbanner=first\n  second\n", encoding="utf-8")
+
+            store = IniSettingsStore(path)
+            store.beginGroup("GeneralSettings")
+            self.assertEqual("first\nsecond", store.value("banner"))
+
+
+class IniSettingsStoreParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        config_store_module._PARSED_FILE_CACHE.clear()
+        self.addCleanup(config_store_module._PARSED_FILE_CACHE.clear)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "legion.conf")
+        Path(self.path).write_text("[GeneralSettings]\nmax-fast-processes=5\n", encoding="utf-8")
+
+    @staticmethod
+    def _general_value(store, key):
+        store.beginGroup("GeneralSettings")
+        try:
+            return store.value(key)
+        finally:
+            store.endGroup()
+
+    def test_unchanged_file_is_parsed_once(self):
+        with patch.object(config_store_module, "_parse_simple_ini", wraps=_parse_simple_ini) as parse:
+            first = IniSettingsStore(self.path)
+            second = IniSettingsStore(self.path)
+
+        self.assertEqual(1, parse.call_count)
+        self.assertEqual("5", self._general_value(first, "max-fast-processes"))
+        self.assertEqual("5", self._general_value(second, "max-fast-processes"))
+
+    def test_external_rewrite_and_sync_invalidate_cached_parse(self):
+        IniSettingsStore(self.path)
+        Path(self.path).write_text("[GeneralSettings]\nmax-fast-processes=10\n", encoding="utf-8")
+        rewritten = IniSettingsStore(self.path)
+        self.assertEqual("10", self._general_value(rewritten, "max-fast-processes"))
+
+        rewritten.beginGroup("GeneralSettings")
+        rewritten.setValue("max-fast-processes", "7")
+        rewritten.endGroup()
+        rewritten.sync()
+        self.assertNotIn(self.path, config_store_module._PARSED_FILE_CACHE)
+        self.assertEqual("7", self._general_value(IniSettingsStore(self.path), "max-fast-processes"))
+
+    def test_file_removed_after_exists_check_loads_as_empty_store(self):
+        missing_path = self.path + ".removed"
+        with patch("app.core.config_store.os.path.exists", return_value=True):
+            store = IniSettingsStore(missing_path)
+
+        self.assertIsNone(self._general_value(store, "max-fast-processes"))
+
+    def test_unreadable_file_loads_as_empty_store(self):
+        with patch("builtins.open", side_effect=PermissionError(self.path)):
+            store = IniSettingsStore(self.path)
+
+        self.assertIsNone(self._general_value(store, "max-fast-processes"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,62 @@
 import os
+import shutil
 import tempfile
+import time
 import unittest
+from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import DEFAULT, patch
+
+from app.eyewitness import (
+    _browser_tls_bypass_flags,
+    _run_browser_cli_fallback_capture,
+    _run_selenium_chromium_fallback_capture,
+    _run_selenium_fallback_capture,
+    build_eyewitness_command,
+    build_eyewitness_env,
+    find_eyewitness_screenshot,
+    run_eyewitness_capture,
+    summarize_eyewitness_failure,
+)
+
+_PNG = b"png"
+_FAKE_SCREENSHOT = "/fake/screens/capture.png"
+_OK = SimpleNamespace(returncode=0, stdout="ok", stderr="")
+_OK_EMPTY = SimpleNamespace(returncode=0, stdout="", stderr="")
+_BROWSER_FAIL_RESULT = {
+    "ok": False,
+    "executable": "chromium",
+    "output_dir": "",
+    "command": [],
+    "error": "browser fallback timeout",
+    "returncode": 124,
+    "stdout": "",
+    "stderr": "",
+    "screenshot_path": None,
+}
+_SELENIUM_CHROMIUM_FAIL_RESULT = dict(
+    _BROWSER_FAIL_RESULT,
+    executable="selenium-chromium-direct",
+    error="selenium chromium fallback timeout",
+)
 
 
 class EyeWitnessHelpersTest(unittest.TestCase):
-    def test_build_env_disables_cert_validation_helpers(self):
-        from app.eyewitness import build_eyewitness_env
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_root = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_root.cleanup()
 
+    def _make_temp_dir(self):
+        # Each test gets an isolated directory under the shared class-level root.
+        temp_dir = tempfile.mkdtemp(dir=self._temp_root.name)
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        return temp_dir
+
+    def test_build_env_disables_cert_validation_helpers(self):
         env = build_eyewitness_env({})
         self.assertEqual("0", env.get("PYTHONHTTPSVERIFY"))
         self.assertEqual("", env.get("REQUESTS_CA_BUNDLE"))
@@ -16,8 +64,6 @@ class EyeWitnessHelpersTest(unittest.TestCase):
         self.assertEqual("0", env.get("WDM_SSL_VERIFY"))
 
     def test_browser_tls_bypass_flags_cover_common_tls_warnings(self):
-        from app.eyewitness import _browser_tls_bypass_flags
-
         flags = _browser_tls_bypass_flags()
         self.assertIn("--ignore-certificate-errors", flags)
         self.assertIn("--ignore-ssl-errors=yes", flags)
@@ -27,21 +73,18 @@ class EyeWitnessHelpersTest(unittest.TestCase):
         self.assertIn("--test-type", flags)
 
     def test_build_command_wraps_text_script_without_shebang(self):
-        from app.eyewitness import build_eyewitness_command
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            wrapper = os.path.join(temp_dir, "eyewitness")
-            with open(wrapper, "w", encoding="utf-8") as handle:
-                handle.write("python3 /opt/EyeWitness/Python/EyeWitness.py $@\n")
-            os.chmod(wrapper, 0o755)
-
-            command, resolved = build_eyewitness_command(
-                url="http://127.0.0.1:8080",
-                output_dir=os.path.join(temp_dir, "out"),
-                delay=1,
-                use_xvfb=False,
-                executable=wrapper,
-            )
+        temp_dir = self._make_temp_dir()
+        wrapper = os.path.join(temp_dir, "eyewitness")
+        Path(wrapper).write_text("python3 /opt/EyeWitness/Python/EyeWitness.py $@\n", encoding="utf-8")
+        os.chmod(wrapper, 0o755)
+
+        command, resolved = build_eyewitness_command(
+            url="http://127.0.0.1:8080",
+            output_dir=os.path.join(temp_dir, "out"),
+            delay=1,
+            use_xvfb=False,
+            executable=wrapper,
+        )
 
         self.assertEqual(wrapper, resolved)
         self.assertTrue(command)
@@ -49,29 +92,25 @@ class EyeWitnessHelpersTest(unittest.TestCase):
         self.assertTrue(command[0].endswith("sh"))
 
     def test_find_eyewitness_screenshot_returns_png(self):
-        from app.eyewitness import find_eyewitness_screenshot
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            screens_dir = os.path.join(temp_dir, "screens")
-            nested_dir = os.path.join(temp_dir, "source")
-            os.makedirs(screens_dir, exist_ok=True)
-            os.makedirs(nested_dir, exist_ok=True)
-
-            first = os.path.join(screens_dir, "first.png")
-            second = os.path.join(nested_dir, "second.png")
-            with open(first, "wb") as handle:
-                handle.write(b"first")
-            with open(second, "wb") as handle:
-                handle.write(b"second")
-            os.utime(second, (os.path.getatime(second), os.path.getmtime(second) + 1))
-
-            found = find_eyewitness_screenshot(temp_dir)
-            self.assertTrue(found.endswith(".png"))
-            self.assertTrue(os.path.isfile(found))
+        temp_dir = self._make_temp_dir()
+        screens_dir = Path(temp_dir, "screens")
+        source_dir = Path(temp_dir, "source")
+        screens_dir.mkdir()
+        source_dir.mkdir()
+
+        # The newer PNG sits outside screens/, so the lookup has to search both roots.
+        first = screens_dir / "first.png"
+        second = source_dir / "second.png"
+        first.write_bytes(b"first")
+        second.write_bytes(b"second")
+        now = time.time()
+        os.utime(first, (now, now))
+        os.utime(second, (now, now + 1))
+
+        found = find_eyewitness_screenshot(temp_dir)
+        self.assertEqual(str(second), found)
 
     def test_summarize_failure_uses_last_stdout_line(self):
-        from app.eyewitness import summarize_eyewitness_failure
-
         summary = summarize_eyewitness_failure([{
             "executable": "/usr/bin/eyewitness",
             "stdout": "banner line\nWebDriver.__init__() got an unexpected keyword argument 'capabilities'\n",
@@ -80,138 +119,110 @@ class EyeWitnessHelpersTest(unittest.TestCase):
         }])
         self.assertIn("unexpected keyword argument", summary)
 
+    @patch("app.eyewitness.find_eyewitness_screenshot", return_value=_FAKE_SCREENSHOT)
     @patch("app.eyewitness.resolve_eyewitness_executables")
     @patch("app.eyewitness.subprocess.run")
-    def test_run_eyewitness_capture_success(self, mock_run, mock_resolve):
-        from app.eyewitness import run_eyewitness_capture
-
+    def test_run_eyewitness_capture_success(self, mock_run, mock_resolve, mock_find):
         mock_resolve.return_value = ["/usr/bin/eyewitness"]
-
-        def _run_side_effect(command, **_kwargs):
-            output_dir = command[command.index("-d") + 1]
-            screens = os.path.join(output_dir, "screens")
-            os.makedirs(screens, exist_ok=True)
-            with open(os.path.join(screens, "capture.png"), "wb") as handle:
-                handle.write(b"png")
-            return SimpleNamespace(returncode=0, stdout="ok", stderr="")
-
-        mock_run.side_effect = _run_side_effect
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = run_eyewitness_capture(
-                url="http://127.0.0.1:8080",
-                output_parent_dir=temp_dir,
-                delay=1,
-                use_xvfb=False,
-                timeout=10,
-            )
-            self.assertTrue(result.get("ok"))
-            self.assertTrue(os.path.isfile(result.get("screenshot_path", "")))
+        mock_run.return_value = _OK
+
+        temp_dir = self._make_temp_dir()
+        result = run_eyewitness_capture(
+            url="http://127.0.0.1:8080",
+            output_parent_dir=temp_dir,
+            delay=1,
+            use_xvfb=False,
+            timeout=10,
+        )
+        self.assertTrue(result.get("ok"))
+        self.assertEqual(_FAKE_SCREENSHOT, result.get("screenshot_path"))
+        command = mock_run.call_args[0][0]
+        mock_find.assert_called_once_with(command[command.index("-d") + 1])
 
         self.assertEqual("completed", result.get("reason"))
 
+    @patch("app.eyewitness.find_eyewitness_screenshot", side_effect=[None, _FAKE_SCREENSHOT])
     @patch("app.eyewitness.resolve_eyewitness_executables")
     @patch("app.eyewitness.subprocess.run")
-    def test_run_eyewitness_capture_tries_next_executable_on_failure(self, mock_run, mock_resolve):
-        from app.eyewitness import run_eyewitness_capture
-
+    def test_run_eyewitness_capture_tries_next_executable_on_failure(self, mock_run, mock_resolve, _mock_find):
         mock_resolve.return_value = ["/usr/local/bin/eyewitness", "/usr/bin/eyewitness"]
-        call_count = {"n": 0}
-
-        def _run_side_effect(command, **_kwargs):
-            call_count["n"] += 1
-            output_dir = command[command.index("-d") + 1]
-            os.makedirs(output_dir, exist_ok=True)
-            if call_count["n"] == 2:
-                screens = os.path.join(output_dir, "screens")
-                os.makedirs(screens, exist_ok=True)
-                with open(os.path.join(screens, "capture.png"), "wb") as handle:
-                    handle.write(b"png")
-                return SimpleNamespace(returncode=0, stdout="ok", stderr="")
-            return SimpleNamespace(returncode=1, stdout="", stderr="driver init failed")
-
-        mock_run.side_effect = _run_side_effect
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = run_eyewitness_capture(
-                url="http://127.0.0.1:8080",
-                output_parent_dir=temp_dir,
-                delay=1,
-                use_xvfb=False,
-                timeout=10,
-            )
+        mock_run.side_effect = [
+            SimpleNamespace(returncode=1, stdout="", stderr="driver init failed"),
+            _OK,
+        ]
+
+        temp_dir = self._make_temp_dir()
+        result = run_eyewitness_capture(
+            url="http://127.0.0.1:8080",
+            output_parent_dir=temp_dir,
+            delay=1,
+            use_xvfb=False,
+            timeout=10,
+        )
 
         self.assertTrue(result.get("ok"))
         self.assertEqual(2, len(result.get("attempts", [])))
         self.assertEqual("/usr/bin/eyewitness", result.get("executable"))
+        self.assertEqual(_FAKE_SCREENSHOT, result.get("screenshot_path"))
+
+    def _start_patch(self, patcher):
+        mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        return mock
+
+    def _patch_capture_pipeline(self):
+        # The capture pipeline tests stub the same five collaborators; the four module-level ones share a
+        # single patch.multiple, while subprocess.run stays separate so subprocess exception types remain real.
+        mocks = self._start_patch(patch.multiple(
+            "app.eyewitness",
+            resolve_eyewitness_executables=DEFAULT,
+            _run_browser_cli_fallback_capture=DEFAULT,
+            _run_selenium_chromium_fallback_capture=DEFAULT,
+            _run_selenium_fallback_capture=DEFAULT,
+        ))
+        return (
+            self._start_patch(patch("app.eyewitness.subprocess.run")),
+            mocks["resolve_eyewitness_executables"],
+            mocks["_run_browser_cli_fallback_capture"],
+            mocks["_run_selenium_chromium_fallback_capture"],
+            mocks["_run_selenium_fallback_capture"],
+        )
 
-    @patch("app.eyewitness._run_selenium_fallback_capture")
-    @patch("app.eyewitness._run_selenium_chromium_fallback_capture")
-    @patch("app.eyewitness._run_browser_cli_fallback_capture")
-    @patch("app.eyewitness.resolve_eyewitness_executables")
-    @patch("app.eyewitness.subprocess.run")
-    def test_run_eyewitness_capture_uses_selenium_fallback(
-            self,
-            mock_run,
-            mock_resolve,
-            mock_browser_fallback,
-            mock_chromium_fallback,
-            mock_fallback,
-    ):
-        from app.eyewitness import run_eyewitness_capture
-
+    def test_run_eyewitness_capture_uses_selenium_fallback(self):
+        mock_run, mock_resolve, mock_browser_fallback, mock_chromium_fallback, mock_fallback = \
+            self._patch_capture_pipeline()
         mock_resolve.return_value = ["/usr/local/bin/eyewitness"]
         mock_run.return_value = SimpleNamespace(
             returncode=0,
             stdout="WebDriver.__init__() got an unexpected keyword argument 'capabilities'",
             stderr="",
         )
-        mock_browser_fallback.return_value = {
-            "ok": False,
-            "executable": "chromium",
-            "output_dir": "",
-            "command": [],
-            "error": "browser fallback timeout",
-            "returncode": 124,
-            "stdout": "",
-            "stderr": "",
-            "screenshot_path": None,
-        }
-        mock_chromium_fallback.return_value = {
-            "ok": False,
-            "executable": "selenium-chromium-direct",
-            "output_dir": "",
-            "command": [],
-            "error": "selenium chromium fallback timeout",
-            "returncode": 124,
+        mock_browser_fallback.return_value = dict(_BROWSER_FAIL_RESULT)
+        mock_chromium_fallback.return_value = dict(_SELENIUM_CHROMIUM_FAIL_RESULT)
+
+        temp_dir = self._make_temp_dir()
+        fallback_dir = Path(temp_dir, "selenium-fallback")
+        (fallback_dir / "screens").mkdir(parents=True)
+        fallback_png = str(fallback_dir / "screens" / "capture.png")
+        Path(fallback_png).write_bytes(_PNG)
+        mock_fallback.return_value = {
+            "ok": True,
+            "executable": "selenium-firefox-direct",
+            "output_dir": str(fallback_dir),
+            "command": ["selenium-firefox-direct", "http://127.0.0.1:8080"],
+            "returncode": 0,
             "stdout": "",
             "stderr": "",
-            "screenshot_path": None,
+            "screenshot_path": fallback_png,
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            fallback_png = os.path.join(temp_dir, "selenium-fallback", "screens", "capture.png")
-            os.makedirs(os.path.dirname(fallback_png), exist_ok=True)
-            with open(fallback_png, "wb") as handle:
-                handle.write(b"png")
-            mock_fallback.return_value = {
-                "ok": True,
-                "executable": "selenium-firefox-direct",
-                "output_dir": os.path.dirname(os.path.dirname(fallback_png)),
-                "command": ["selenium-firefox-direct", "http://127.0.0.1:8080"],
-                "returncode": 0,
-                "stdout": "",
-                "stderr": "",
-                "screenshot_path": fallback_png,
-            }
-
-            result = run_eyewitness_capture(
-                url="http://127.0.0.1:8080",
-                output_parent_dir=temp_dir,
-                delay=1,
-                use_xvfb=False,
-                timeout=10,
-            )
+        result = run_eyewitness_capture(
+            url="http://127.0.0.1:8080",
+            output_parent_dir=temp_dir,
+            delay=1,
+            use_xvfb=False,
+            timeout=10,
+        )
 
         self.assertTrue(result.get("ok"))
         self.assertEqual("selenium-firefox-direct", result.get("executable"))
@@ -219,58 +230,36 @@ class EyeWitnessHelpersTest(unittest.TestCase):
         self.assertTrue(mock_fallback.called)
         self.assertTrue(mock_chromium_fallback.called)
 
-    @patch("app.eyewitness._run_selenium_fallback_capture")
-    @patch("app.eyewitness._run_selenium_chromium_fallback_capture")
-    @patch("app.eyewitness._run_browser_cli_fallback_capture")
-    @patch("app.eyewitness.resolve_eyewitness_executables")
-    @patch("app.eyewitness.subprocess.run")
-    def test_run_eyewitness_capture_uses_browser_fallback_after_selenium_chromium_failure(
-            self,
-            mock_run,
-            mock_resolve,
-            mock_browser_fallback,
-            mock_chromium_fallback,
-            mock_selenium_fallback,
-    ):
-        from app.eyewitness import run_eyewitness_capture
-
+    def test_run_eyewitness_capture_uses_browser_fallback_after_selenium_chromium_failure(self):
+        mock_run, mock_resolve, mock_browser_fallback, mock_chromium_fallback, mock_selenium_fallback = \
+            self._patch_capture_pipeline()
         mock_resolve.return_value = ["/usr/local/bin/eyewitness"]
         mock_run.return_value = SimpleNamespace(returncode=1, stdout="", stderr="eyewitness failed")
-        mock_chromium_fallback.return_value = {
-            "ok": False,
-            "executable": "selenium-chromium-direct",
-            "output_dir": "",
-            "command": [],
-            "error": "selenium chromium fallback timeout",
-            "returncode": 124,
+        mock_chromium_fallback.return_value = dict(_SELENIUM_CHROMIUM_FAIL_RESULT)
+
+        temp_dir = self._make_temp_dir()
+        fallback_dir = Path(temp_dir, "browser-fallback")
+        (fallback_dir / "screens").mkdir(parents=True)
+        fallback_png = str(fallback_dir / "screens" / "capture.png")
+        Path(fallback_png).write_bytes(_PNG)
+        mock_browser_fallback.return_value = {
+            "ok": True,
+            "executable": "/usr/bin/chromium",
+            "output_dir": str(fallback_dir),
+            "command": ["/usr/bin/chromium", "--headless"],
+            "returncode": 0,
             "stdout": "",
             "stderr": "",
-            "screenshot_path": None,
+            "screenshot_path": fallback_png,
         }
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            fallback_png = os.path.join(temp_dir, "browser-fallback", "screens", "capture.png")
-            os.makedirs(os.path.dirname(fallback_png), exist_ok=True)
-            with open(fallback_png, "wb") as handle:
-                handle.write(b"png")
-            mock_browser_fallback.return_value = {
-                "ok": True,
-                "executable": "/usr/bin/chromium",
-                "output_dir": os.path.dirname(os.path.dirname(fallback_png)),
-                "command": ["/usr/bin/chromium", "--headless"],
-                "returncode": 0,
-                "stdout": "",
-                "stderr": "",
-                "screenshot_path": fallback_png,
-            }
-
-            result = run_eyewitness_capture(
-                url="http://127.0.0.1:8080",
-                output_parent_dir=temp_dir,
-                delay=1,
-                use_xvfb=False,
-                timeout=10,
-            )
+        result = run_eyewitness_capture(
+            url="http://127.0.0.1:8080",
+            output_parent_dir=temp_dir,
+            delay=1,
+            use_xvfb=False,
+            timeout=10,
+        )
 
         self.assertTrue(result.get("ok"))
         self.assertEqual("/usr/bin/chromium", result.get("executable"))
@@ -288,8 +277,6 @@ class EyeWitnessHelpersTest(unittest.TestCase):
             mock_resolve_path,
             mock_resolve_execs,
     ):
-        from app.eyewitness import _run_browser_cli_fallback_capture
-
         mock_resolve_execs.return_value = ["/usr/bin/chromium"]
         mock_resolve_path.return_value = None
         commands = []
@@ -300,12 +287,12 @@ class EyeWitnessHelpersTest(unittest.TestCase):
 
         mock_run.side_effect = _run_side_effect
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = _run_browser_cli_fallback_capture(
-                url="https://127.0.0.1:8443",
-                output_parent_dir=temp_dir,
-                timeout=10,
-            )
+        temp_dir = self._make_temp_dir()
+        result = _run_browser_cli_fallback_capture(
+            url="https://127.0.0.1:8443",
+            output_parent_dir=temp_dir,
+            timeout=10,
+        )
 
         self.assertFalse(result.get("ok"))
         self.assertTrue(commands)
@@ -318,8 +305,6 @@ class EyeWitnessHelpersTest(unittest.TestCase):
 
     @patch("app.eyewitness.subprocess.run")
     def test_selenium_chromium_fallback_script_tries_to_bypass_tls_interstitials(self, mock_run):
-        from app.eyewitness import _run_selenium_chromium_fallback_capture
-
         captured = {}
 
         def _run_side_effect(command, **_kwargs):
@@ -328,13 +313,13 @@ class EyeWitnessHelpersTest(unittest.TestCase):
 
         mock_run.side_effect = _run_side_effect
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = _run_selenium_chromium_fallback_capture(
-                url="https://127.0.0.1:8443",
-                output_parent_dir=temp_dir,
-                delay=1,
-                timeout=10,
-            )
+        temp_dir = self._make_temp_dir()
+        result = _run_selenium_chromium_fallback_capture(
+            url="https://127.0.0.1:8443",
+            output_parent_dir=temp_dir,
+            delay=1,
+            timeout=10,
+        )
 
         self.assertFalse(result.get("ok"))
         script = captured["command"][2]
@@ -346,8 +331,6 @@ class EyeWitnessHelpersTest(unittest.TestCase):
 
     @patch("app.eyewitness.subprocess.run")
     def test_selenium_firefox_fallback_script_tries_to_bypass_tls_interstitials(self, mock_run):
-        from app.eyewitness import _run_selenium_fallback_capture
-
         captured = {}
 
         def _run_side_effect(command, **_kwargs):
@@ -356,13 +339,13 @@ class EyeWitnessHelpersTest(unittest.TestCase):
 
         mock_run.side_effect = _run_side_effect
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = _run_selenium_fallback_capture(
-                url="https://127.0.0.1:8443",
-                output_parent_dir=temp_dir,
-                delay=1,
-                timeout=10,
-            )
+        temp_dir = self._make_temp_dir()
+        result = _run_selenium_fallback_capture(
+            url="https://127.0.0.1:8443",
+            output_parent_dir=temp_dir,
+            delay=1,
+            timeout=10,
+        )
 
         self.assertFalse(result.get("ok"))
         script = captured["command"][2]
@@ -379,28 +362,25 @@ class EyeWitnessHelpersTest(unittest.TestCase):
             mock_run,
             mock_resolve,
     ):
-        from app.eyewitness import _run_browser_cli_fallback_capture
-
         mock_resolve.return_value = ["/usr/bin/chromium-browser"]
 
         def _run_side_effect(_command, **kwargs):
             cwd = str(kwargs.get("cwd", ""))
-            with open(os.path.join(cwd, "screenshot.png"), "wb") as handle:
-                handle.write(b"png")
-            return SimpleNamespace(returncode=0, stdout="", stderr="")
+            Path(cwd, "screenshot.png").write_bytes(_PNG)
+            return _OK_EMPTY
 
         mock_run.side_effect = _run_side_effect
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = _run_browser_cli_fallback_capture(
-                url="https://127.0.0.1:8443",
-                output_parent_dir=temp_dir,
-                timeout=10,
-            )
-            self.assertTrue(result.get("ok"))
-            screenshot_path = str(result.get("screenshot_path", ""))
-            self.assertTrue(screenshot_path.endswith("capture.png"))
-            self.assertTrue(os.path.isfile(screenshot_path))
+        temp_dir = self._make_temp_dir()
+        result = _run_browser_cli_fallback_capture(
+            url="https://127.0.0.1:8443",
+            output_parent_dir=temp_dir,
+            timeout=10,
+        )
+        self.assertTrue(result.get("ok"))
+        screenshot_path = str(result.get("screenshot_path", ""))
+        self.assertTrue(screenshot_path.endswith("capture.png"))
+        self.assertTrue(os.path.isfile(screenshot_path))
 
 
 if __name__ == "__main__":
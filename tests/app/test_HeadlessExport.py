@@ -0,0 +1,174 @@
+import base64
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+
+import app.ProjectManager as pm_module
+from app.ProjectManager import ProjectManager
+from app.headless_export import (
+    HOST_EXPORT_COLUMNS,
+    build_host_payload,
+    encode_file_base64,
+    entity_to_export_dict,
+    export_project_json,
+    export_project_legion,
+    iter_export_hosts,
+)
+from app.importers.nmap_runner import import_nmap_xml_into_project
+from app.logic import Logic
+from app.logging.legionLog import getAppLogger, getDbLogger
+from app.shell.DefaultShell import DefaultShell
+from db.RepositoryFactory import RepositoryFactory
+
+
+class HeadlessExportTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir_obj = tempfile.TemporaryDirectory()
+        self.tempdir = self.tempdir_obj.name
+        self._original_pm_temp_dir = pm_module.tempDirectory
+        pm_module.tempDirectory = self.tempdir
+
+        project_manager = ProjectManager(DefaultShell(), RepositoryFactory(getDbLogger()), getAppLogger())
+        self.project = project_manager.createNewProject(projectType="legion", isTemp=True)
+        xml_path = os.path.join("tests", "parsers", "nmap-fixtures", "valid-nmap-report.xml")
+        import_nmap_xml_into_project(project=self.project, xml_path=xml_path)
+
+        self.project_manager = project_manager
+
+    def tearDown(self):
+        self.project.database.dispose()
+        pm_module.tempDirectory = self._original_pm_temp_dir
+        self.tempdir_obj.cleanup()
+
+    def test_entity_to_export_dict_uses_table_columns_only(self):
+        host = self.project.repositoryContainer.hostRepository.getAllHostObjs()[0]
+        exported = entity_to_export_dict(host, HOST_EXPORT_COLUMNS)
+
+        self.assertEqual(list(HOST_EXPORT_COLUMNS), list(exported.keys()))
+        self.assertEqual("192.168.1.1", exported["ip"])
+        self.assertNotIn("_sa_instance_state", exported)
+        self.assertNotIn("ports", exported)
+
+    def test_iter_export_hosts_includes_ports_services_and_scripts(self):
+        hosts = list(iter_export_hosts(self.project.database))
+
+        self.assertEqual(1, len(hosts))
+        host = hosts[0]
+        self.assertEqual("192.168.1.1", host["ip"])
+        self.assertIn("note", host)
+        self.assertEqual([], host["cves"])
+        self.assertTrue(host["ports"])
+        self.assertTrue(all("scripts" in port for port in host["ports"]))
+        self.assertTrue(any(port.get("service", {}).get("name") for port in host["ports"]))
+
+    def test_build_host_payload_joins_prefetched_rows_by_key(self):
+        payload = build_host_payload(
+            {"id": 3, "ip": "10.0.0.3"},
+            ports_by_host={
+                "3": [{"id": 9, "portId": "443", "serviceId": "5"}, {"id": 10, "portId": "22", "serviceId": ""}],
+            },
+            services_by_id={"5": {"id": 5, "name": "https"}},
+            scripts_by_port={"9": [{"id": 1, "scriptId": "ssl-cert", "portId": "9"}]},
+            notes_by_host={"3": "web tier"},
+            cves_by_ip={"10.0.0.3": [{"name": "CVE-2024-0001"}]},
+        )
+
+        self.assertEqual("web tier", payload["note"])
+        self.assertEqual([{"name": "CVE-2024-0001"}], payload["cves"])
+        self.assertEqual("https", payload["ports"][0]["service"]["name"])
+        self.assertEqual("ssl-cert", payload["ports"][0]["scripts"][0]["scriptId"])
+        self.assertNotIn("service", payload["ports"][1])
+        self.assertEqual([], payload["ports"][1]["scripts"])
+
+    def test_encode_file_base64_matches_single_shot_encoding_across_chunks(self):
+        payload = bytes(range(256)) * 1000 + b"tail"
+        path = os.path.join(self.tempdir, "large.png")
+        with open(path, "wb") as handle:
+            handle.write(payload)
+
+        self.assertEqual(base64.b64encode(payload).decode("ascii"), encode_file_base64(path))
+
+    def test_export_project_json_skips_screenshot_directories(self):
+        screenshots_dir = os.path.join(self.project.properties.outputFolder, "screenshots")
+        os.makedirs(os.path.join(screenshots_dir, "nested.png"))
+        with open(os.path.join(screenshots_dir, "host.png"), "wb") as handle:
+            handle.write(b"png")
+        output_file = os.path.join(self.tempdir, "export-nested.json")
+
+        export_project_json(self.project, output_file)
+
+        with open(output_file, "r", encoding="utf-8") as handle:
+            exported = json.load(handle)
+        self.assertEqual({"host.png": "cG5n"}, exported["screenshots"])
+
+    def test_export_project_json_writes_one_compact_entry_per_line(self):
+        screenshots_dir = os.path.join(self.project.properties.outputFolder, "screenshots")
+        os.makedirs(screenshots_dir, exist_ok=True)
+        with open(os.path.join(screenshots_dir, "host.png"), "wb") as handle:
+            handle.write(b"png")
+        output_file = os.path.join(self.tempdir, "export-lines.json")
+
+        export_project_json(self.project, output_file)
+
+        with open(output_file, "r", encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+        self.assertEqual(['{', '"hosts": ['], lines[:2])
+        self.assertEqual("192.168.1.1", json.loads(lines[2])["ip"])
+        self.assertEqual(['],', '"screenshots": {', '"host.png": "cG5n"', '}', '}'], lines[3:])
+
+    def test_export_project_json_writes_hosts_and_screenshots(self):
+        screenshots_dir = os.path.join(self.project.properties.outputFolder, "screenshots")
+        os.makedirs(screenshots_dir, exist_ok=True)
+        with open(os.path.join(screenshots_dir, "192.168.1.1-80.png"), "wb") as handle:
+            handle.write(b"\x89PNG-data")
+        with open(os.path.join(screenshots_dir, "notes.txt"), "w") as handle:
+            handle.write("ignored")
+        output_file = os.path.join(self.tempdir, "export.json")
+
+        export_project_json(self.project, output_file)
+
+        with open(output_file, "r", encoding="utf-8") as handle:
+            exported = json.load(handle)
+        self.assertEqual(["192.168.1.1"], [host["ip"] for host in exported["hosts"]])
+        self.assertEqual({"192.168.1.1-80.png": "iVBORy1kYXRh"}, exported["screenshots"])
+
+    def test_export_project_json_falls_back_to_stdlib_json_without_orjson(self):
+        output_file = os.path.join(self.tempdir, "export-stdlib.json")
+
+        with mock.patch("app.headless_export.orjson", None):
+            export_project_json(self.project, output_file)
+
+        with open(output_file, "r", encoding="utf-8") as handle:
+            exported = json.load(handle)
+        self.assertEqual(["192.168.1.1"], [host["ip"] for host in exported["hosts"]])
+        self.assertEqual({}, exported["screenshots"])
+
+    def test_export_project_json_reraises_producer_errors(self):
+        output_file = os.path.join(self.tempdir, "export-error.json")
+
+        with mock.patch("app.headless_export.iter_export_hosts", side_effect=RuntimeError("db gone")):
+            with self.assertRaisesRegex(RuntimeError, "db gone"):
+                export_project_json(self.project, output_file)
+
+    def test_export_project_legion_keeps_runtime_on_saved_project(self):
+        from app.web.runtime import WebRuntime
+
+        logic = Logic(DefaultShell(), self.project_manager, MagicMock())
+        logic.activeProject = self.project
+        runtime = WebRuntime(logic)
+        output_file = os.path.join(self.tempdir, "saved", "export.legion")
+
+        export_project_legion(logic, output_file, keep_open=True)
+        self.addCleanup(logic.activeProject.database.dispose)
+
+        self.assertEqual(output_file, logic.activeProject.properties.projectName)
+        self.assertFalse(os.path.exists(self.project.properties.projectName))
+        hosts = runtime.get_workspace_hosts(include_down=True)
+        self.assertEqual(["192.168.1.1"], [host["ip"] for host in hosts])
+
+
+if __name__ == "__main__":
+    unittest.main()
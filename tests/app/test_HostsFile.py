@@ -1,58 +1,67 @@
-import os
 import tempfile
 import unittest
+from pathlib import Path
 
 from app.hostsfile import LEGION_TEMP_BEGIN, LEGION_TEMP_END, add_temporary_host_alias
 
 
 class HostsFileTest(unittest.TestCase):
+    _BEGIN = LEGION_TEMP_BEGIN.encode("utf-8")
+    _END = LEGION_TEMP_END.encode("utf-8")
+    _TARGET = b"192.168.3.1\tunifi.local"
+
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_root = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_root.cleanup()
+
+    def setUp(self):
+        # The alias helper only rewrites the file in place, so one shared root with a per-test file is enough.
+        self.hosts_path = Path(self._temp_root.name, f"{self._testMethodName}.hosts")
+
     def test_adds_entry_in_legion_block(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            hosts_path = os.path.join(tmpdir, "hosts")
-            with open(hosts_path, "w", encoding="utf-8") as handle:
-                handle.write("127.0.0.1 localhost\n")
+        hosts_path = str(self.hosts_path)
+        self.hosts_path.write_text("127.0.0.1 localhost\n", encoding="utf-8")
 
-            ok, reason = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
-            self.assertTrue(ok)
-            self.assertEqual("added", reason)
+        ok, reason = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
+        self.assertTrue(ok)
+        self.assertEqual("added", reason)
 
-            text = self._read_file(hosts_path)
-            self.assertIn(LEGION_TEMP_BEGIN, text)
-            self.assertIn(LEGION_TEMP_END, text)
-            self.assertIn("192.168.3.1\tunifi.local", text)
+        text = self._read_file(hosts_path)
+        self.assertIn(self._BEGIN, text)
+        self.assertIn(self._END, text)
+        self.assertIn(self._TARGET, text)
 
     def test_does_not_duplicate_existing_alias(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            hosts_path = os.path.join(tmpdir, "hosts")
-            with open(hosts_path, "w", encoding="utf-8") as handle:
-                handle.write("127.0.0.1 localhost\n")
+        hosts_path = str(self.hosts_path)
+        self.hosts_path.write_text("127.0.0.1 localhost\n", encoding="utf-8")
 
-            first_ok, _ = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
-            second_ok, second_reason = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
-            self.assertTrue(first_ok)
-            self.assertTrue(second_ok)
-            self.assertEqual("already-present", second_reason)
+        first_ok, _ = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
+        second_ok, second_reason = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
+        self.assertTrue(first_ok)
+        self.assertTrue(second_ok)
+        self.assertEqual("already-present", second_reason)
 
-            text = self._read_file(hosts_path)
-            self.assertEqual(1, text.count("192.168.3.1\tunifi.local"))
+        text = self._read_file(hosts_path)
+        self.assertEqual(1, text.count(self._TARGET))
 
     def test_rejects_collision_with_existing_hostname(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            hosts_path = os.path.join(tmpdir, "hosts")
-            with open(hosts_path, "w", encoding="utf-8") as handle:
-                handle.write("10.0.0.9 unifi.local\n")
+        hosts_path = str(self.hosts_path)
+        self.hosts_path.write_text("10.0.0.9 unifi.local\n", encoding="utf-8")
 
-            ok, reason = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
-            self.assertFalse(ok)
-            self.assertEqual("hostname-collision", reason)
+        ok, reason = add_temporary_host_alias("192.168.3.1", "unifi.local", hosts_path=hosts_path)
+        self.assertFalse(ok)
+        self.assertEqual("hostname-collision", reason)
 
-            text = self._read_file(hosts_path)
-            self.assertNotIn(LEGION_TEMP_BEGIN, text)
+        text = self._read_file(hosts_path)
+        self.assertNotIn(self._BEGIN, text)
 
     @staticmethod
     def _read_file(path):
-        with open(path, "r", encoding="utf-8") as handle:
-            return handle.read()
+        return Path(path).read_bytes()
 
 
 if __name__ == "__main__":
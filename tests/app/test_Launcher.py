@@ -44,6 +44,12 @@ class LegionLauncherTest(unittest.TestCase):
         self.assertTrue(args.web_transparent_ui)
         self.assertFalse(legion.resolve_web_opaque_ui(args))
 
+    def test_build_core_shares_shell_and_project_manager_with_logic(self):
+        shell, project_manager, logic = legion.build_core()
+        self.assertIs(shell, logic.shell)
+        self.assertIs(project_manager, logic.projectManager)
+        self.assertIsNone(logic.activeProject)
+
     def test_supported_python_runtime_accepts_python_312(self):
         self.assertTrue(legion.is_supported_python_runtime((3, 12, 0)))
         self.assertTrue(legion.is_supported_python_runtime((3, 13, 1)))
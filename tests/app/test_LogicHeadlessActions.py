@@ -1,20 +1,27 @@
 import unittest
+from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+
+_EMPTY_COMPLETED = SimpleNamespace(returncode=0, stdout="", stderr="")
 
 
 class LogicHeadlessActionsTest(unittest.TestCase):
+    def _start_patch(self, patcher):
+        mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        return mock
+
+    def setUp(self):
+        self.mock_settings_cls = self._start_patch(patch("app.settings.Settings"))
+        mock_app_settings_cls = self._start_patch(patch("app.settings.AppSettings"))
+        mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
+        mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
+        mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
+        self.mock_subprocess_run = self._start_patch(patch("subprocess.run"))
+
     @patch("app.screenshot_targets.socket.getaddrinfo")
-    @patch("subprocess.run")
-    @patch("app.settings.AppSettings")
-    @patch("app.settings.Settings")
-    def test_run_scripted_actions_uses_port_id_and_service_lookup(
-            self,
-            mock_settings_cls,
-            _mock_app_settings_cls,
-            mock_subprocess_run,
-            mock_getaddrinfo,
-    ):
+    def test_run_scripted_actions_uses_port_id_and_service_lookup(self, mock_getaddrinfo):
         from app.logic import Logic
         from app.screenshot_targets import resolve_hostname_addresses
 
@@ -40,13 +47,10 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                 "smb"
             ]]
         )
-        _mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
-        _mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
-        _mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
-        mock_settings_cls.return_value = settings
-        mock_subprocess_run.return_value = SimpleNamespace(stdout="", stderr="")
+        self.mock_settings_cls.return_value = settings
+        self.mock_subprocess_run.return_value = _EMPTY_COMPLETED
 
-        logic = Logic(MagicMock(), MagicMock(), MagicMock())
+        logic = Logic(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())
         logic.activeProject = SimpleNamespace(
             repositoryContainer=repo_container,
             properties=SimpleNamespace(outputFolder="/tmp", runningFolder="/tmp"),
@@ -54,19 +58,11 @@ class LogicHeadlessActionsTest(unittest.TestCase):
 
         logic.run_scripted_actions()
 
-        self.assertTrue(mock_subprocess_run.called)
-        command = mock_subprocess_run.call_args[0][0]
+        self.assertTrue(self.mock_subprocess_run.called)
+        command = self.mock_subprocess_run.call_args[0][0]
         self.assertIn("dc01.local:445", command)
 
-    @patch("subprocess.run")
-    @patch("app.settings.AppSettings")
-    @patch("app.settings.Settings")
-    def test_run_scripted_actions_persists_execution_record_for_real_project(
-            self,
-            mock_settings_cls,
-            _mock_app_settings_cls,
-            mock_subprocess_run,
-    ):
+    def test_run_scripted_actions_persists_execution_record_for_real_project(self):
         from app.ProjectManager import ProjectManager
         from app.logic import Logic
         from app.logging.legionLog import getAppLogger, getDbLogger
@@ -107,13 +103,10 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                     "smb",
                 ]],
             )
-            _mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
-            _mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
-            _mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
-            mock_settings_cls.return_value = settings
-            mock_subprocess_run.return_value = SimpleNamespace(stdout="ok", stderr="", returncode=0)
+            self.mock_settings_cls.return_value = settings
+            self.mock_subprocess_run.return_value = SimpleNamespace(stdout="ok", stderr="", returncode=0)
 
-            logic = Logic(MagicMock(), MagicMock(), MagicMock())
+            logic = Logic(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())
             logic.activeProject = project
 
             logic.run_scripted_actions()
@@ -135,15 +128,7 @@ class LogicHeadlessActionsTest(unittest.TestCase):
         finally:
             project_manager.closeProject(project)
 
-    @patch("subprocess.run")
-    @patch("app.settings.AppSettings")
-    @patch("app.settings.Settings")
-    def test_run_scripted_actions_parses_tool_output_into_target_state(
-            self,
-            mock_settings_cls,
-            _mock_app_settings_cls,
-            mock_subprocess_run,
-    ):
+    def test_run_scripted_actions_parses_tool_output_into_target_state(self):
         from app.ProjectManager import ProjectManager
         from app.logic import Logic
         from app.logging.legionLog import getAppLogger, getDbLogger
@@ -183,17 +168,14 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                     "https",
                 ]],
             )
-            _mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
-            _mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
-            _mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
-            mock_settings_cls.return_value = settings
-            mock_subprocess_run.return_value = SimpleNamespace(
+            self.mock_settings_cls.return_value = settings
+            self.mock_subprocess_run.return_value = SimpleNamespace(
                 stdout="[CVE-2025-1111] [critical] https://10.0.0.5:443/admin authenticated admin panel exposure\n",
                 stderr="",
                 returncode=0,
             )
 
-            logic = Logic(MagicMock(), MagicMock(), MagicMock())
+            logic = Logic(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())
             logic.activeProject = project
 
             logic.run_scripted_actions()
@@ -207,15 +189,7 @@ class LogicHeadlessActionsTest(unittest.TestCase):
         finally:
             project_manager.closeProject(project)
 
-    @patch("subprocess.run")
-    @patch("app.settings.AppSettings")
-    @patch("app.settings.Settings")
-    def test_run_scripted_actions_imports_discovered_subdomains(
-            self,
-            mock_settings_cls,
-            _mock_app_settings_cls,
-            mock_subprocess_run,
-    ):
+    def test_run_scripted_actions_imports_discovered_subdomains(self):
         from app.ProjectManager import ProjectManager
         from app.logic import Logic
         from app.logging.legionLog import getAppLogger, getDbLogger
@@ -254,13 +228,10 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                     "host",
                 ]],
             )
-            _mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
-            _mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
-            _mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
-            mock_settings_cls.return_value = settings
-            mock_subprocess_run.return_value = SimpleNamespace(stdout="api.example.com\nadmin.example.com\n", stderr="", returncode=0)
+            self.mock_settings_cls.return_value = settings
+            self.mock_subprocess_run.return_value = SimpleNamespace(stdout="api.example.com\nadmin.example.com\n", stderr="", returncode=0)
 
-            logic = Logic(MagicMock(), MagicMock(), MagicMock())
+            logic = Logic(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())
             logic.activeProject = project
 
             logic.run_scripted_actions()
@@ -275,15 +246,7 @@ class LogicHeadlessActionsTest(unittest.TestCase):
         finally:
             project_manager.closeProject(project)
 
-    @patch("subprocess.run")
-    @patch("app.settings.AppSettings")
-    @patch("app.settings.Settings")
-    def test_run_scripted_actions_bootstraps_discovered_hosts_with_httpx_and_runs_bounded_followup(
-            self,
-            mock_settings_cls,
-            _mock_app_settings_cls,
-            mock_subprocess_run,
-    ):
+    def test_run_scripted_actions_bootstraps_discovered_hosts_with_httpx_and_runs_bounded_followup(self):
         from app.ProjectManager import ProjectManager
         from app.logic import Logic
         from app.logging.legionLog import getAppLogger, getDbLogger
@@ -341,10 +304,7 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                     ],
                 ],
             )
-            _mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
-            _mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
-            _mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
-            mock_settings_cls.return_value = settings
+            self.mock_settings_cls.return_value = settings
 
             commands_seen = []
 
@@ -358,23 +318,23 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                     if match:
                         output_path = next((group for group in match.groups()[1:] if group), "") or str(match.group(1) or "").strip("'\"")
                     if output_path:
-                        with open(output_path, "w", encoding="utf-8") as handle:
-                            handle.write(
-                                '{"url":"https://api.example.com","host":"api.example.com","scheme":"https",'
-                                '"port":"443","status-code":200,"title":"Portal","webserver":"nginx/1.25.3"}\n'
-                            )
-                    return SimpleNamespace(stdout="", stderr="", returncode=0)
+                        Path(output_path).write_text(
+                            '{"url":"https://api.example.com","host":"api.example.com","scheme":"https",'
+                            '"port":"443","status-code":200,"title":"Portal","webserver":"nginx/1.25.3"}\n',
+                            encoding="utf-8",
+                        )
+                    return _EMPTY_COMPLETED
                 if "whatweb" in str(command):
                     return SimpleNamespace(
                         stdout="https://api.example.com [200 OK] HTTPServer[Apache/2.4.57 (Ubuntu)]\n",
                         stderr="",
                         returncode=0,
                     )
-                return SimpleNamespace(stdout="", stderr="", returncode=0)
+                return _EMPTY_COMPLETED
 
-            mock_subprocess_run.side_effect = fake_subprocess_run
+            self.mock_subprocess_run.side_effect = fake_subprocess_run
 
-            logic = Logic(MagicMock(), MagicMock(), MagicMock())
+            logic = Logic(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())
             logic.activeProject = project
 
             with patch("app.scheduler.config.SchedulerConfigManager.load", return_value={
@@ -419,16 +379,7 @@ class LogicHeadlessActionsTest(unittest.TestCase):
             project_manager.closeProject(project)
 
     @patch("app.scheduler.runners.shutil.which", return_value="/usr/bin/docker")
-    @patch("subprocess.run")
-    @patch("app.settings.AppSettings")
-    @patch("app.settings.Settings")
-    def test_run_scripted_actions_can_use_container_runner_when_enabled(
-            self,
-            mock_settings_cls,
-            _mock_app_settings_cls,
-            mock_subprocess_run,
-            _mock_which,
-    ):
+    def test_run_scripted_actions_can_use_container_runner_when_enabled(self, _mock_which):
         from app.ProjectManager import ProjectManager
         from app.logic import Logic
         from app.logging.legionLog import getAppLogger, getDbLogger
@@ -486,13 +437,10 @@ class LogicHeadlessActionsTest(unittest.TestCase):
                     "smb",
                 ]],
             )
-            _mock_app_settings_cls._ensure_nmap_hostname_target_support.side_effect = lambda command, _target: command
-            _mock_app_settings_cls._canonicalize_web_target_placeholders.side_effect = lambda command: command
-            _mock_app_settings_cls._collapse_redundant_fallbacks.side_effect = lambda command: command
-            mock_settings_cls.return_value = settings
-            mock_subprocess_run.return_value = SimpleNamespace(stdout="ok", stderr="", returncode=0)
+            self.mock_settings_cls.return_value = settings
+            self.mock_subprocess_run.return_value = SimpleNamespace(stdout="ok", stderr="", returncode=0)
 
-            logic = Logic(MagicMock(), MagicMock(), MagicMock())
+            logic = Logic(SimpleNamespace(), SimpleNamespace(), SimpleNamespace())
             logic.activeProject = project
 
             with patch("app.scheduler.config.SchedulerConfigManager.load", return_value={
@@ -517,8 +465,8 @@ class LogicHeadlessActionsTest(unittest.TestCase):
             }):
                 logic.run_scripted_actions()
 
-            self.assertTrue(mock_subprocess_run.called)
-            command = mock_subprocess_run.call_args[0][0]
+            self.assertTrue(self.mock_subprocess_run.called)
+            command = self.mock_subprocess_run.call_args[0][0]
             self.assertIn("docker run --rm", command)
             self.assertIn("kalilinux/kali-rolling", command)
 
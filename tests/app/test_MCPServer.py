@@ -1,4 +1,9 @@
 import asyncio
+import json
+import os
+import socket
+import stat
+import tempfile
 import unittest
 
 
@@ -151,6 +156,37 @@ class MCPServerTest(unittest.TestCase):
         self.assertNotIn("error", response)
         return response["result"]
 
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "unix sockets unavailable")
+    def test_unix_socket_is_user_only_and_answers_json_lines(self):
+        async def exchange(path):
+            serving = asyncio.create_task(self.server.serve_unix_socket(path))
+            while not os.path.exists(path):
+                await asyncio.sleep(0.01)
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"jsonrpc": "2.0", "id": 7, "method": "list_tools"}\n')
+            writer.write(b"not-json\n")
+            await writer.drain()
+            first = json.loads(await reader.readline())
+            second = json.loads(await reader.readline())
+            writer.close()
+            await writer.wait_closed()
+            serving.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await serving
+            return mode, first, second
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "mcp", "legion.sock")
+            mode, first, second = asyncio.run(exchange(path))
+            self.assertFalse(os.path.exists(path))
+
+        self.assertEqual(0o600, mode)
+        self.assertEqual(7, first["id"])
+        self.assertIn("open_project", {item["name"] for item in first["result"]})
+        self.assertIsNone(second["id"])
+        self.assertEqual(-32000, second["error"]["code"])
+
     def test_list_tools_exposes_phase10_tools(self):
         response = asyncio.run(self.server.handle_request({
             "jsonrpc": "2.0",
@@ -7,44 +7,61 @@ from app.nmap_enrichment import (
     is_unknown_hostname,
 )
 
-
-class NmapEnrichmentTest(unittest.TestCase):
-    def test_infer_hostname_from_ssl_cert_script(self):
-        scripts = [
-            (
+_INFERENCE_CASES = (
+    (
+        "hostname-from-ssl-cert-script",
+        infer_hostname_from_nmap_data,
+        (
+            "unknown",
+            [(
                 "ssl-cert",
                 "Subject: commonName=unifi.local\n"
                 "Subject Alternative Name: DNS:unifi.local, DNS:localhost\n",
-            )
-        ]
-        inferred = infer_hostname_from_nmap_data("unknown", scripts)
-        self.assertEqual("unifi.local", inferred)
-
-    def test_prefers_primary_hostname_when_valid(self):
-        scripts = [("ssl-cert", "Subject: commonName=printer.local")]
-        inferred = infer_hostname_from_nmap_data("gateway.local", scripts)
-        self.assertEqual("gateway.local", inferred)
-
-    def test_infer_os_from_script_output(self):
-        scripts = [
-            ("smb-os-discovery.nse", "OS: Microsoft Windows Server 2019 Standard"),
-        ]
-        inferred = infer_os_from_nmap_scripts(scripts)
-        self.assertEqual("Windows", inferred)
-
-    def test_infer_os_from_service_inventory(self):
-        services = [
+            )],
+        ),
+        "unifi.local",
+    ),
+    (
+        "prefers-primary-hostname-when-valid",
+        infer_hostname_from_nmap_data,
+        ("gateway.local", [("ssl-cert", "Subject: commonName=printer.local")]),
+        "gateway.local",
+    ),
+    (
+        "os-from-script-output",
+        infer_os_from_nmap_scripts,
+        ([("smb-os-discovery.nse", "OS: Microsoft Windows Server 2019 Standard")],),
+        "Windows",
+    ),
+    (
+        "os-from-service-inventory",
+        infer_os_from_service_inventory,
+        ([
             ("msrpc", "Microsoft Windows RPC", "", ""),
             ("vmrdp", "", "", ""),
             ("x11", "VcXsrv X server", "", ""),
-        ]
-        inferred = infer_os_from_service_inventory(services)
-        self.assertEqual("Windows", inferred)
+        ],),
+        "Windows",
+    ),
+)
+
+_UNKNOWN_HOSTNAME_CASES = (
+    ("unknown", True),
+    ("", True),
+    ("host.local", False),
+)
+
+
+class NmapEnrichmentTest(unittest.TestCase):
+    def test_inference_helpers(self):
+        for case_id, func, args, expected in _INFERENCE_CASES:
+            with self.subTest(case=case_id):
+                self.assertEqual(expected, func(*args))
 
     def test_unknown_hostname_helper(self):
-        self.assertTrue(is_unknown_hostname("unknown"))
-        self.assertTrue(is_unknown_hostname(""))
-        self.assertFalse(is_unknown_hostname("host.local"))
+        for hostname, expected in _UNKNOWN_HOSTNAME_CASES:
+            with self.subTest(hostname=hostname):
+                self.assertIs(expected, is_unknown_hostname(hostname))
 
 
 if __name__ == "__main__":
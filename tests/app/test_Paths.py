@@ -5,6 +5,26 @@ from unittest.mock import patch
 
 
 class PathsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._temp_root = tempfile.TemporaryDirectory()
+        cls._app_settings = None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_root.cleanup()
+
+    @classmethod
+    def _legion_home_settings(cls):
+        # AppSettings seeds and migrates legion.conf on disk, so build it once per class and share it.
+        custom_home = os.path.join(cls._temp_root.name, "legion-side-by-side")
+        if cls._app_settings is None:
+            from app.settings import AppSettings
+
+            with patch.dict(os.environ, {"LEGION_HOME": custom_home}, clear=False):
+                cls._app_settings = AppSettings()
+        return custom_home, cls._app_settings
+
     def test_legion_home_functions_honor_override(self):
         from app.paths import (
             get_legion_home,
@@ -14,26 +34,27 @@ class PathsTest(unittest.TestCase):
             get_scheduler_config_path,
         )
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            custom_home = os.path.join(tmpdir, "legion-side-by-side")
-            with patch.dict(os.environ, {"LEGION_HOME": custom_home}, clear=False):
-                self.assertEqual(custom_home, get_legion_home())
-                self.assertEqual(os.path.join(custom_home, "legion.conf"), get_legion_conf_path())
-                self.assertEqual(os.path.join(custom_home, "backup"), get_legion_backup_dir())
-                self.assertEqual(os.path.join(custom_home, "autosave"), get_legion_autosave_dir())
-                self.assertEqual(os.path.join(custom_home, "scheduler-ai.json"), get_scheduler_config_path())
+        custom_home = os.path.join(self._temp_root.name, "legion-path-override")
+        with patch.dict(os.environ, {"LEGION_HOME": custom_home}, clear=False):
+            self.assertEqual(custom_home, get_legion_home())
+            self.assertEqual(os.path.join(custom_home, "legion.conf"), get_legion_conf_path())
+            self.assertEqual(os.path.join(custom_home, "backup"), get_legion_backup_dir())
+            self.assertEqual(os.path.join(custom_home, "autosave"), get_legion_autosave_dir())
+            self.assertEqual(os.path.join(custom_home, "scheduler-ai.json"), get_scheduler_config_path())
 
     def test_app_settings_uses_legion_home_override(self):
-        from app.settings import AppSettings
+        custom_home, settings = self._legion_home_settings()
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            custom_home = os.path.join(tmpdir, "legion-side-by-side")
-            with patch.dict(os.environ, {"LEGION_HOME": custom_home}, clear=False):
-                settings = AppSettings()
+        conf_path = str(settings.actions.fileName() or "")
+        self.assertEqual(os.path.join(custom_home, "legion.conf"), conf_path)
+        self.assertTrue(os.path.isfile(conf_path))
+
+    def test_app_settings_seeds_conf_from_repo_default(self):
+        _custom_home, settings = self._legion_home_settings()
 
-            conf_path = str(settings.actions.fileName() or "")
-            self.assertEqual(os.path.join(custom_home, "legion.conf"), conf_path)
-            self.assertTrue(os.path.isfile(conf_path))
+        general = settings.getGeneralSettings()
+        self.assertIn("default-terminal", general)
+        self.assertIn("enable-scheduler-on-import", general)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import app.ProjectManager as pm_module
+from app.ProjectManager import ProjectManager, tempDirectory as PROJECT_MANAGER_TEMP
+from app.logging.legionLog import getAppLogger, getDbLogger
+from app.shell.DefaultShell import DefaultShell
+from db.RepositoryFactory import RepositoryFactory
+
+
+class ProjectManagerMoveTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir_obj = tempfile.TemporaryDirectory()
+        self.tempdir = self.tempdir_obj.name
+        self._original_pm_temp_dir = PROJECT_MANAGER_TEMP
+        pm_module.tempDirectory = self.tempdir
+
+        shell = DefaultShell()
+        repository_factory = RepositoryFactory(getDbLogger())
+        self.project_manager = ProjectManager(shell, repository_factory, getAppLogger())
+
+    def tearDown(self):
+        pm_module.tempDirectory = self._original_pm_temp_dir
+        self.tempdir_obj.cleanup()
+
+    def test_move_temporary_project_renames_database_and_output_folder(self):
+        project = self.project_manager.createNewProject(projectType="legion", isTemp=True)
+        source_db = project.properties.projectName
+        source_output = project.properties.outputFolder
+        with open(os.path.join(source_output, "marker.txt"), "w") as handle:
+            handle.write("scan output")
+        project.repositoryContainer.hostRepository.addHostsBulk([{"ip": "10.0.0.1", "hostname": ""}])
+
+        destination = os.path.join(self.tempdir, "saved", "result.legion")
+        moved = self.project_manager.moveTemporaryProjectTo(project, destination)
+
+        self.assertTrue(moved)
+        self.assertFalse(os.path.exists(source_db))
+        self.assertFalse(os.path.exists(source_output))
+        self.assertTrue(os.path.isfile(os.path.join(self.tempdir, "saved", "result-tool-output", "marker.txt")))
+        with sqlite3.connect(destination) as conn:
+            rows = conn.execute("SELECT ip FROM hostObj").fetchall()
+        self.assertEqual([("10.0.0.1",)], rows)
+
+    def test_move_refuses_non_temporary_project(self):
+        project = SimpleNamespace(
+            properties=SimpleNamespace(
+                projectName="/tmp/demo.legion",
+                outputFolder="/tmp/demo-tool-output",
+                isTemporary=False,
+            ),
+            database=MagicMock(),
+        )
+
+        self.assertFalse(self.project_manager.moveTemporaryProjectTo(project, "/tmp/other.legion"))
+        project.database.dispose.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,9 +7,10 @@ class ProjectManagerSaveSamePathTest(unittest.TestCase):
     def test_save_project_as_same_path_is_noop(self):
         from app.ProjectManager import ProjectManager
 
-        shell = MagicMock()
-        repo_factory = MagicMock()
-        logger = MagicMock()
+        # Only the project database and openExistingProject need call recording; the collaborators are inert.
+        shell = SimpleNamespace()
+        repo_factory = SimpleNamespace()
+        logger = SimpleNamespace(info=lambda *_args, **_kwargs: None, error=lambda *_args, **_kwargs: None)
         manager = ProjectManager(shell, repo_factory, logger)
 
         project = SimpleNamespace(
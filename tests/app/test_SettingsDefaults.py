@@ -2,13 +2,27 @@ import unittest
 
 
 class SettingsDefaultsTest(unittest.TestCase):
-    def test_scheduler_on_import_has_default(self):
+    @classmethod
+    def setUpClass(cls):
         from app.settings import Settings
 
-        settings = Settings()
+        # Defaults are read-only here, so every assertion can share one instance.
+        cls.settings = Settings()
+
+    def test_scheduler_on_import_has_default(self):
+        self.assertTrue(hasattr(self.settings, "general_enable_scheduler_on_import"))
+        self.assertEqual("False", self.settings.general_enable_scheduler_on_import)
+
+    def test_scheduler_has_default(self):
+        self.assertEqual("True", self.settings.general_enable_scheduler)
+
+    def test_notes_autosave_has_default(self):
+        self.assertEqual("2", self.settings.general_notes_autosave_minutes)
 
-        self.assertTrue(hasattr(settings, "general_enable_scheduler_on_import"))
-        self.assertEqual("False", settings.general_enable_scheduler_on_import)
+    def test_action_lists_default_empty(self):
+        self.assertEqual([], self.settings.hostActions)
+        self.assertEqual([], self.settings.portActions)
+        self.assertEqual([], self.settings.automatedAttacks)
 
 
 if __name__ == "__main__":
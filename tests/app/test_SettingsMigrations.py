@@ -1,8 +1,19 @@
 import os
+import re
 import tempfile
 import unittest
+from operator import itemgetter
+from pathlib import Path
 from unittest.mock import patch
 
+from app.settings import AppSettings
+from app.settings_migrations import (
+    LEGACY_WEB_CONTENT_DISCOVERY_COMMAND,
+    ensure_nuclei_auto_scan,
+    ensure_wapiti_command,
+    ensure_web_content_discovery_command,
+)
+
 
 LEGACY_CONFIG = """[GeneralSettings]
 default-terminal=xterm
@@ -76,135 +87,57 @@ rpcclient=Open with rpcclient (NULL session), [term] rpcclient [IP] -p [PORT] -U
 """
 
 
-class SettingsMigrationTest(unittest.TestCase):
-    def test_legacy_dirbuster_is_replaced_with_headless_tools(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-
-                port_action_ids = {row[1] for row in app_settings.getPortActions()}
-                self.assertNotIn("dirbuster", port_action_ids)
-                self.assertIn("web-content-discovery", port_action_ids)
-                self.assertIn("nmap-vuln.nse", port_action_ids)
-                self.assertIn("nuclei-web", port_action_ids)
-                self.assertIn("nuclei-cves", port_action_ids)
-                self.assertIn("nuclei-exposures", port_action_ids)
-                self.assertIn("curl-headers", port_action_ids)
-                self.assertIn("curl-options", port_action_ids)
-                self.assertIn("curl-robots", port_action_ids)
-                self.assertIn("nikto", port_action_ids)
-                self.assertIn("wafw00f", port_action_ids)
-                self.assertIn("sslscan", port_action_ids)
-                self.assertIn("testssl.sh", port_action_ids)
-                self.assertIn("wpscan", port_action_ids)
-                self.assertIn("httpx", port_action_ids)
-                self.assertIn("subfinder", port_action_ids)
-                self.assertIn("grayhatwarfare", port_action_ids)
-                self.assertIn("shodan-enrichment", port_action_ids)
-                self.assertIn("nuclei-cloud", port_action_ids)
-                self.assertIn("nuclei-aws-storage", port_action_ids)
-                self.assertIn("nuclei-azure-storage", port_action_ids)
-                self.assertIn("nuclei-gcp-storage", port_action_ids)
-                self.assertIn("nuclei-aws-rds", port_action_ids)
-                self.assertIn("nuclei-aws-aurora", port_action_ids)
-                self.assertIn("nuclei-azure-cosmos", port_action_ids)
-                self.assertIn("nuclei-gcp-cloudsql", port_action_ids)
-                self.assertIn("whatweb", port_action_ids)
-                self.assertIn("whatweb-http", port_action_ids)
-                self.assertIn("whatweb-https", port_action_ids)
-                self.assertIn("dirsearch", port_action_ids)
-                self.assertIn("ffuf", port_action_ids)
-                self.assertIn("enum4linux-ng", port_action_ids)
-                self.assertIn("smbmap", port_action_ids)
-                self.assertIn("rpcclient-enum", port_action_ids)
-                self.assertIn("netexec", port_action_ids)
-                self.assertIn("mysql-info.nse", port_action_ids)
-                self.assertIn("pgsql-info.nse", port_action_ids)
-                self.assertIn("ms-sql-info.nse", port_action_ids)
-                self.assertIn("responder", port_action_ids)
-                self.assertIn("ntlmrelayx", port_action_ids)
-                self.assertNotIn("sslyze", port_action_ids)
-                self.assertNotIn("http-wapiti", port_action_ids)
-                self.assertNotIn("https-wapiti", port_action_ids)
-
-                port_actions = {row[1]: row for row in app_settings.getPortActions()}
-                nuclei_cmd = str(port_actions["nuclei-web"][2])
-                nuclei_cloud_cmd = str(port_actions["nuclei-cloud"][2])
-                nuclei_aws_rds_cmd = str(port_actions["nuclei-aws-rds"][2])
-                ffuf_cmd = str(port_actions["ffuf"][2])
-                mysql_info_cmd = str(port_actions["mysql-info.nse"][2])
-                grayhat_cmd = str(port_actions["grayhatwarfare"][2])
-                shodan_cmd = str(port_actions["shodan-enrichment"][2])
-                self.assertIn("nuclei -as", nuclei_cmd)
-                self.assertIn("-stats -si 15", nuclei_cmd)
-                self.assertIn("-silent", nuclei_cmd)
-                self.assertNotIn("-no-color", nuclei_cmd)
-                self.assertIn("-tags cloud,aws,azure,gcp", nuclei_cloud_cmd)
-                self.assertIn("-tags aws,rds,database", nuclei_aws_rds_cmd)
-                self.assertIn("ffuf -s -of json -o [OUTPUT].json -u [WEB_URL]/FUZZ", ffuf_cmd)
-                self.assertNotIn("-json", ffuf_cmd)
-                self.assertNotIn("-noninteractive", ffuf_cmd)
-                self.assertIn("--script=mysql-info.nse", mysql_info_cmd)
-                self.assertIn("--stats-every 15s", mysql_info_cmd)
-                self.assertIn("if test -n [GRAYHAT_API_KEY]; then", grayhat_cmd)
-                self.assertIn("else echo grayhatwarfare not configured; fi", grayhat_cmd)
-                self.assertIn("if test -n [SHODAN_API_KEY]; then", shodan_cmd)
-                self.assertIn("else echo shodan not configured; fi", shodan_cmd)
-                self.assertEqual("host", str(port_actions["subfinder"][3]))
-                self.assertEqual("host", str(port_actions["grayhatwarfare"][3]))
-                self.assertEqual("host", str(port_actions["shodan-enrichment"][3]))
-                self.assertEqual(
-                    "LEGION_BANNER_TARGET=[IP] LEGION_BANNER_PORT=[PORT] "
-                    "LEGION_BANNER_PROTOCOL=tcp python3 -m app.banner_probe",
-                    str(port_actions["banner"][2]),
-                )
-
-                scheduler_ids = {row[0] for row in app_settings.getSchedulerSettings()}
-                self.assertIn("web-content-discovery", scheduler_ids)
-                self.assertIn("nmap-vuln.nse", scheduler_ids)
-                self.assertIn("nuclei-web", scheduler_ids)
-                self.assertIn("screenshooter", scheduler_ids)
-                self.assertIn("httpx", scheduler_ids)
-                self.assertIn("whatweb", scheduler_ids)
-                self.assertIn("dirsearch", scheduler_ids)
-                self.assertIn("ffuf", scheduler_ids)
-                self.assertIn("enum4linux-ng", scheduler_ids)
-                self.assertIn("smbmap", scheduler_ids)
-                self.assertIn("rpcclient-enum", scheduler_ids)
-                self.assertIn("netexec", scheduler_ids)
-                self.assertIn("mysql-info.nse", scheduler_ids)
-                self.assertIn("pgsql-info.nse", scheduler_ids)
-                self.assertIn("ms-sql-info.nse", scheduler_ids)
-                self.assertNotIn("subfinder", scheduler_ids)
-                self.assertNotIn("grayhatwarfare", scheduler_ids)
-                self.assertNotIn("shodan-enrichment", scheduler_ids)
-                self.assertNotIn("nuclei-cloud", scheduler_ids)
-                self.assertNotIn("nuclei-aws-storage", scheduler_ids)
-                self.assertNotIn("nuclei-azure-storage", scheduler_ids)
-                self.assertNotIn("nuclei-gcp-storage", scheduler_ids)
-                self.assertNotIn("nuclei-aws-rds", scheduler_ids)
-                self.assertNotIn("nuclei-aws-aurora", scheduler_ids)
-                self.assertNotIn("nuclei-azure-cosmos", scheduler_ids)
-                self.assertNotIn("nuclei-gcp-cloudsql", scheduler_ids)
-                self.assertNotIn("responder", scheduler_ids)
-                self.assertNotIn("ntlmrelayx", scheduler_ids)
+# Legacy wapiti arguments that must not survive normalization, checked in one scan per command.
+_WAPITI_LEGACY_ARGUMENTS = re.compile(r" -u -v |wapiti https?://\[IP\] ")
+
+_SHARED_TMP = None
+
+
+def setUpModule():
+    # One temp tree for the whole module; each legacy fixture gets its own LEGION_HOME beneath it.
+    global _SHARED_TMP
+    _SHARED_TMP = tempfile.TemporaryDirectory()
+
+
+def tearDownModule():
+    _SHARED_TMP.cleanup()
 
-    def test_nuclei_normalization_does_not_mutate_probe_or_output_tokens(self):
-        from app.settings import AppSettings
 
+def _load_legacy_settings(name, config_text):
+    legion_home = os.path.join(_SHARED_TMP.name, name)
+    os.mkdir(legion_home)
+    Path(legion_home, "legion.conf").write_text(config_text, encoding="utf-8")
+
+    # Only construction resolves LEGION_HOME; the action lookups are read after the environment is restored.
+    with patch.dict(os.environ, {"LEGION_HOME": legion_home}, clear=False):
+        app_settings = AppSettings()
+    port_rows = app_settings.getPortActions()
+    scheduler_rows = app_settings.getSchedulerSettings()
+    return (
+        app_settings,
+        dict(zip(map(itemgetter(1), port_rows), port_rows)),
+        dict(zip(map(itemgetter(0), scheduler_rows), scheduler_rows)),
+    )
+
+
+class _LegacyConfigTestCase(unittest.TestCase):
+    LEGACY_CONFIG_TEXT = ""
+
+    @classmethod
+    def setUpClass(cls):
+        # Loading AppSettings parses and migrates legion.conf, so each legacy fixture is loaded once per class.
+        cls.app_settings, cls.port_actions, cls.scheduler_actions = _load_legacy_settings(
+            cls.__name__, cls.LEGACY_CONFIG_TEXT
+        )
+
+
+class SettingsMigrationTest(unittest.TestCase):
+    def test_nuclei_normalization_does_not_mutate_probe_or_output_tokens(self):
         command = (
             "(command -v nuclei >/dev/null 2>&1 && "
             "nuclei -u https://1.2.3.4:443 -silent -o /tmp/scan-nuclei-web-1.2.3.4.txt)"
         )
-        normalized = AppSettings._ensure_nuclei_auto_scan(command)
+        normalized = ensure_nuclei_auto_scan(command)
 
         self.assertIn("command -v nuclei >/dev/null 2>&1", normalized)
         self.assertIn("nuclei -as -stats -si 15 -u https://1.2.3.4:443", normalized)
@@ -215,8 +148,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn("-no-color", normalized)
 
     def test_subfinder_normalization_preserves_wrapped_probe_and_output_tokens(self):
-        from app.settings import AppSettings
-
         command = (
             "(command -v subfinder >/dev/null 2>&1 && "
             "subfinder -silent -recursive -duc -max-time 5 -oJ -d tantalumlabs.io -o /tmp/out.jsonl) || "
@@ -232,8 +163,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn("subfinder not found -o", normalized)
 
     def test_katana_normalization_preserves_wrapped_probe_and_output_tokens(self):
-        from app.settings import AppSettings
-
         command = (
             "(command -v katana >/dev/null 2>&1 && "
             "katana -silent -jsonl -u https://portal.example:443 -o /tmp/out.jsonl) || "
@@ -249,8 +178,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn("katana not found -o", normalized)
 
     def test_scheduler_target_input_error_requires_port_for_banner_and_port_placeholder_tools(self):
-        from app.settings import AppSettings
-
         self.assertEqual(
             "skipped: banner requires target port",
             AppSettings._scheduler_target_input_error("banner", AppSettings.BANNER_COMMAND, port=""),
@@ -265,9 +192,7 @@ class SettingsMigrationTest(unittest.TestCase):
         )
 
     def test_nuclei_normalization_rewrites_existing_stats_interval_to_15_seconds(self):
-        from app.settings import AppSettings
-
-        normalized = AppSettings._ensure_nuclei_auto_scan(
+        normalized = ensure_nuclei_auto_scan(
             "nuclei -as -stats -si 30 -u https://portal.example:443 -o /tmp/out.txt"
         )
 
@@ -275,8 +200,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn("-si 30", normalized)
 
     def test_targeted_nuclei_normalization_adds_stats_without_forcing_automatic_scan(self):
-        from app.settings import AppSettings
-
         normalized = AppSettings._ensure_nuclei_command(
             "nuclei -tags cve -u https://portal.example:443 -silent -o /tmp/out.txt",
             automatic_scan=False,
@@ -287,8 +210,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertIn("-silent", normalized)
 
     def test_nmap_hostname_target_support_removes_skip_dns_for_hostnames(self):
-        from app.settings import AppSettings
-
         normalized = AppSettings._ensure_nmap_hostname_target_support(
             "nmap -Pn -n -sV portal.example -p 443 --stats-every 15s",
             "portal.example",
@@ -298,8 +219,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn(" -n ", normalized)
 
     def test_ffuf_normalization_rewrites_legacy_flags_to_supported_output_syntax(self):
-        from app.settings import AppSettings
-
         normalized = AppSettings._ensure_ffuf_command(
             "ffuf -u [WEB_URL]/FUZZ -w /usr/share/wordlists/dirb/common.txt -json -noninteractive -s > [OUTPUT].jsonl"
         )
@@ -310,8 +229,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn("> [OUTPUT].jsonl", normalized)
 
     def test_hydra_normalization_strips_escaped_output_quotes(self):
-        from app.settings import AppSettings
-
         normalized = AppSettings._ensure_hydra_command(
             'hydra -s [PORT] -C ./wordlists/routers-userpass.txt -u -t 4 -o \\"[OUTPUT].txt\\" -f [IP] ssh'
         )
@@ -320,8 +237,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn('\\"[OUTPUT].txt\\"', normalized)
 
     def test_netexec_normalization_rewrites_legacy_aliases_to_safe_default_command(self):
-        from app.settings import AppSettings
-
         for command in (
             "netexec smb [IP] -u guest -p guest --shares",
             "nxc smb [IP] -u '' -p '' --users",
@@ -334,42 +249,33 @@ class SettingsMigrationTest(unittest.TestCase):
                 self.assertIn("[OUTPUT].txt", normalized)
 
     def test_wapiti_normalization_fixes_missing_url_argument_and_inserts_port(self):
-        from app.settings import AppSettings
-
         legacy_http = "wapiti http://[IP] -n 10 -b folder -u -v 1 -f txt -o [OUTPUT]"
-        normalized_http = AppSettings._ensure_wapiti_command(legacy_http, scheme="http")
+        normalized_http = ensure_wapiti_command(legacy_http, scheme="http")
         self.assertIn("wapiti -u http://[IP]:[PORT]", normalized_http)
-        self.assertNotIn(" -u -v ", normalized_http)
-        self.assertNotIn("wapiti http://[IP] ", normalized_http)
+        self.assertNotRegex(normalized_http, _WAPITI_LEGACY_ARGUMENTS)
 
         legacy_https = "wapiti https://[IP] -n 10 -b folder -u -v 1 -f txt -o [OUTPUT]"
-        normalized_https = AppSettings._ensure_wapiti_command(legacy_https, scheme="https")
+        normalized_https = ensure_wapiti_command(legacy_https, scheme="https")
         self.assertIn("wapiti -u https://[IP]:[PORT]", normalized_https)
-        self.assertNotIn(" -u -v ", normalized_https)
-        self.assertNotIn("wapiti https://[IP] ", normalized_https)
+        self.assertNotRegex(normalized_https, _WAPITI_LEGACY_ARGUMENTS)
 
         wrapped = (
             "(command -v wapiti >/dev/null 2>&1 && "
             "wapiti https://[IP] -n 10 -b folder -u -v 1 -f txt -o [OUTPUT]) || "
             "echo wapiti not found"
         )
-        wrapped_normalized = AppSettings._ensure_wapiti_command(wrapped, scheme="https")
+        wrapped_normalized = ensure_wapiti_command(wrapped, scheme="https")
         self.assertIn("command -v wapiti >/dev/null 2>&1", wrapped_normalized)
         self.assertIn("wapiti -u https://[IP]:[PORT] -n 10 -b folder -v 1 -f txt -o [OUTPUT]", wrapped_normalized)
 
     def test_web_content_discovery_normalization_rewrites_legacy_gobuster_syntax(self):
-        from app.settings import AppSettings
-
-        legacy = AppSettings.LEGACY_WEB_CONTENT_DISCOVERY_COMMAND
-        normalized = AppSettings._ensure_web_content_discovery_command(legacy)
+        normalized = ensure_web_content_discovery_command(LEGACY_WEB_CONTENT_DISCOVERY_COMMAND)
 
         self.assertIn("gobuster -m dir", normalized)
         self.assertIn("gobuster dir -q -u http://[IP]:[PORT]/", normalized)
         self.assertIn("feroxbuster -u https://[IP]:[PORT] -k", normalized)
 
     def test_httpx_nikto_wpscan_and_smb_family_normalization_use_parser_friendly_output(self):
-        from app.settings import AppSettings
-
         httpx_normalized = AppSettings._ensure_httpx_command("httpx -u https://[IP]:[PORT]")
         httpx_wrapped_normalized = AppSettings._ensure_httpx_command(
             "(command -v httpx >/dev/null 2>&1 && httpx -silent -json -title -tech-detect "
@@ -442,86 +348,11 @@ class SettingsMigrationTest(unittest.TestCase):
         )
 
     def test_allowed_nonzero_exit_codes_include_cyberstrike_tool_metadata(self):
-        from app.settings import AppSettings
-
         self.assertEqual({1}, AppSettings.allowed_nonzero_exit_codes("nikto"))
         self.assertEqual({4}, AppSettings.allowed_nonzero_exit_codes("wpscan"))
         self.assertEqual(set(), AppSettings.allowed_nonzero_exit_codes("nmap"))
 
-    def test_existing_web_content_discovery_action_is_migrated_for_gobuster_v2(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_WEB_CONTENT_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-                port_actions = {row[1]: row for row in app_settings.getPortActions()}
-                command = str(port_actions["web-content-discovery"][2])
-
-                self.assertIn("gobuster -m dir", command)
-                self.assertNotIn(
-                    "command -v gobuster >/dev/null 2>&1 && gobuster dir -u http://[IP]:[PORT]/",
-                    command,
-                )
-
-    def test_deprecated_web_actions_are_removed_and_testssl_is_added(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_WAPITI_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-                port_actions = {row[1]: row for row in app_settings.getPortActions()}
-                self.assertNotIn("http-wapiti", port_actions)
-                self.assertNotIn("https-wapiti", port_actions)
-                self.assertNotIn("sslyze", port_actions)
-                self.assertNotIn("http-wordpress-plugins.nse", port_actions)
-                self.assertIn("testssl.sh", port_actions)
-
-                scheduler_settings = {row[0]: row for row in app_settings.getSchedulerSettings()}
-                self.assertNotIn("http-wapiti", scheduler_settings)
-                self.assertNotIn("https-wapiti", scheduler_settings)
-                self.assertNotIn("sslyze", scheduler_settings)
-                self.assertNotIn("http-wordpress-plugins.nse", scheduler_settings)
-                self.assertIn("testssl.sh", scheduler_settings)
-
-    def test_nmap_vuln_command_and_screenshooter_scope_are_migrated(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_VULN_AND_SCREENSHOT_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-                port_actions = {row[1]: row for row in app_settings.getPortActions()}
-                vuln_command = str(port_actions["nmap-vuln.nse"][2])
-                self.assertIn("--script=vuln,vulners", vuln_command)
-                self.assertIn("||", vuln_command)
-                self.assertEqual(vuln_command.count("-oA [OUTPUT]"), 2)
-
-                scheduler_actions = {row[0]: row for row in app_settings.getSchedulerSettings()}
-                screenshooter_scope = str(scheduler_actions["screenshooter"][1])
-                self.assertIn("ms-wbt-server", screenshooter_scope)
-                self.assertIn("vmrdp", screenshooter_scope)
-                self.assertIn("vnc", screenshooter_scope)
-
     def test_nmap_output_normalization_adds_output_to_grouped_commands_only(self):
-        from app.settings import AppSettings
-
         grouped = (
             "(nmap -Pn -n -sV -p [PORT] --script=vuln,vulners [IP] || "
             "nmap -Pn -n -sV -p [PORT] --script=vuln [IP])"
@@ -539,8 +370,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertNotIn("command -v nmap >/dev/null 2>&1 -oA [OUTPUT]", wrapped_normalized)
 
     def test_nmap_stats_normalization_adds_stats_every_once(self):
-        from app.settings import AppSettings
-
         command = "nmap -Pn -sV [IP] -p [PORT]"
         normalized = AppSettings._ensure_nmap_stats_every(command)
         self.assertIn("--stats-every 15s", normalized)
@@ -548,8 +377,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertEqual(1, normalized.count("--stats-every"))
 
     def test_nmap_stats_normalization_adds_verbose_when_stats_already_present(self):
-        from app.settings import AppSettings
-
         command = "nmap -Pn -sV [IP] -p [PORT] --stats-every 15s"
         normalized = AppSettings._ensure_nmap_stats_every(command)
         self.assertIn("--stats-every 15s", normalized)
@@ -558,8 +385,6 @@ class SettingsMigrationTest(unittest.TestCase):
         self.assertEqual(1, normalized.count("-vv"))
 
     def test_banner_normalization_replaces_broken_bash_wrapper(self):
-        from app.settings import AppSettings
-
         command = 'bash -c \\"echo \\"\\" | nc -v -n -w1 [IP] [PORT]\\"'
         normalized = AppSettings._ensure_banner_command(command)
         self.assertEqual(
@@ -568,78 +393,229 @@ class SettingsMigrationTest(unittest.TestCase):
             normalized,
         )
 
+
+class LegacyDirbusterMigrationTest(_LegacyConfigTestCase):
+    LEGACY_CONFIG_TEXT = LEGACY_CONFIG
+    EXPECTED_PORT_ACTION_IDS = frozenset({
+        "web-content-discovery",
+        "nmap-vuln.nse",
+        "nuclei-web",
+        "nuclei-cves",
+        "nuclei-exposures",
+        "curl-headers",
+        "curl-options",
+        "curl-robots",
+        "nikto",
+        "wafw00f",
+        "sslscan",
+        "testssl.sh",
+        "wpscan",
+        "httpx",
+        "subfinder",
+        "grayhatwarfare",
+        "shodan-enrichment",
+        "nuclei-cloud",
+        "nuclei-aws-storage",
+        "nuclei-azure-storage",
+        "nuclei-gcp-storage",
+        "nuclei-aws-rds",
+        "nuclei-aws-aurora",
+        "nuclei-azure-cosmos",
+        "nuclei-gcp-cloudsql",
+        "whatweb",
+        "whatweb-http",
+        "whatweb-https",
+        "dirsearch",
+        "ffuf",
+        "enum4linux-ng",
+        "smbmap",
+        "rpcclient-enum",
+        "netexec",
+        "mysql-info.nse",
+        "pgsql-info.nse",
+        "ms-sql-info.nse",
+        "responder",
+        "ntlmrelayx",
+    })
+    REMOVED_PORT_ACTION_IDS = frozenset({
+        "dirbuster",
+        "sslyze",
+        "http-wapiti",
+        "https-wapiti",
+    })
+    EXPECTED_SCHEDULER_IDS = frozenset({
+        "web-content-discovery",
+        "nmap-vuln.nse",
+        "nuclei-web",
+        "screenshooter",
+        "httpx",
+        "whatweb",
+        "dirsearch",
+        "ffuf",
+        "enum4linux-ng",
+        "smbmap",
+        "rpcclient-enum",
+        "netexec",
+        "mysql-info.nse",
+        "pgsql-info.nse",
+        "ms-sql-info.nse",
+    })
+    EXCLUDED_SCHEDULER_IDS = frozenset({
+        "subfinder",
+        "grayhatwarfare",
+        "shodan-enrichment",
+        "nuclei-cloud",
+        "nuclei-aws-storage",
+        "nuclei-azure-storage",
+        "nuclei-gcp-storage",
+        "nuclei-aws-rds",
+        "nuclei-aws-aurora",
+        "nuclei-azure-cosmos",
+        "nuclei-gcp-cloudsql",
+        "responder",
+        "ntlmrelayx",
+    })
+
+    def test_legacy_dirbuster_is_replaced_with_headless_tools(self):
+        port_actions = self.port_actions
+        port_action_ids = port_actions.keys()
+        # Rows come back fully decoded, so the assertions below compare the fields directly.
+        self.assertTrue(all(isinstance(field, str) for row in port_actions.values() for field in row))
+        self.assertEqual(set(), self.EXPECTED_PORT_ACTION_IDS - port_action_ids)
+        self.assertEqual(set(), self.REMOVED_PORT_ACTION_IDS & port_action_ids)
+
+        nuclei_cmd = port_actions["nuclei-web"][2]
+        nuclei_cloud_cmd = port_actions["nuclei-cloud"][2]
+        nuclei_aws_rds_cmd = port_actions["nuclei-aws-rds"][2]
+        ffuf_cmd = port_actions["ffuf"][2]
+        mysql_info_cmd = port_actions["mysql-info.nse"][2]
+        grayhat_cmd = port_actions["grayhatwarfare"][2]
+        shodan_cmd = port_actions["shodan-enrichment"][2]
+        self.assertIn("nuclei -as", nuclei_cmd)
+        self.assertIn("-stats -si 15", nuclei_cmd)
+        self.assertIn("-silent", nuclei_cmd)
+        self.assertNotIn("-no-color", nuclei_cmd)
+        self.assertIn("-tags cloud,aws,azure,gcp", nuclei_cloud_cmd)
+        self.assertIn("-tags aws,rds,database", nuclei_aws_rds_cmd)
+        self.assertIn("ffuf -s -of json -o [OUTPUT].json -u [WEB_URL]/FUZZ", ffuf_cmd)
+        self.assertNotIn("-json", ffuf_cmd)
+        self.assertNotIn("-noninteractive", ffuf_cmd)
+        self.assertIn("--script=mysql-info.nse", mysql_info_cmd)
+        self.assertIn("--stats-every 15s", mysql_info_cmd)
+        self.assertIn("if test -n [GRAYHAT_API_KEY]; then", grayhat_cmd)
+        self.assertIn("else echo grayhatwarfare not configured; fi", grayhat_cmd)
+        self.assertIn("if test -n [SHODAN_API_KEY]; then", shodan_cmd)
+        self.assertIn("else echo shodan not configured; fi", shodan_cmd)
+        self.assertEqual("host", port_actions["subfinder"][3])
+        self.assertEqual("host", port_actions["grayhatwarfare"][3])
+        self.assertEqual("host", port_actions["shodan-enrichment"][3])
+        self.assertEqual(
+            "LEGION_BANNER_TARGET=[IP] LEGION_BANNER_PORT=[PORT] "
+            "LEGION_BANNER_PROTOCOL=tcp python3 -m app.banner_probe",
+            port_actions["banner"][2],
+        )
+
+        scheduler_ids = self.scheduler_actions.keys()
+        self.assertEqual(set(), self.EXPECTED_SCHEDULER_IDS - scheduler_ids)
+        self.assertEqual(set(), self.EXCLUDED_SCHEDULER_IDS & scheduler_ids)
+
+
+class LegacyWebActionMigrationTest(unittest.TestCase):
+    DEPRECATED_ACTION_IDS = frozenset({"http-wapiti", "https-wapiti", "sslyze", "http-wordpress-plugins.nse"})
+    # (case, legacy legion.conf, check method) - each fixture is migrated once and checked against its lookups.
+    MIGRATION_CASES = (
+        ("web-content-discovery", LEGACY_WEB_CONTENT_CONFIG, "_check_web_content_discovery_migrated_for_gobuster_v2"),
+        ("wapiti", LEGACY_WAPITI_CONFIG, "_check_deprecated_web_actions_removed_and_testssl_added"),
+        ("vuln-and-screenshot", LEGACY_VULN_AND_SCREENSHOT_CONFIG, "_check_nmap_vuln_and_screenshooter_scope_migrated"),
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        cls.migrated = {
+            case: _load_legacy_settings(f"{cls.__name__}-{case}", config_text)[1:]
+            for case, config_text, _check in cls.MIGRATION_CASES
+        }
+
+    def test_legacy_web_actions_are_migrated(self):
+        for case, _config_text, check in self.MIGRATION_CASES:
+            with self.subTest(case=case):
+                getattr(self, check)(*self.migrated[case])
+
+    def _check_web_content_discovery_migrated_for_gobuster_v2(self, port_actions, scheduler_actions):
+        command = port_actions["web-content-discovery"][2]
+
+        self.assertIn("gobuster -m dir", command)
+        self.assertNotIn(
+            "command -v gobuster >/dev/null 2>&1 && gobuster dir -u http://[IP]:[PORT]/",
+            command,
+        )
+
+    def _check_deprecated_web_actions_removed_and_testssl_added(self, port_actions, scheduler_actions):
+        self.assertEqual(set(), self.DEPRECATED_ACTION_IDS & port_actions.keys())
+        self.assertIn("testssl.sh", port_actions)
+
+        self.assertEqual(set(), self.DEPRECATED_ACTION_IDS & scheduler_actions.keys())
+        self.assertIn("testssl.sh", scheduler_actions)
+
+    def _check_nmap_vuln_and_screenshooter_scope_migrated(self, port_actions, scheduler_actions):
+        vuln_command = port_actions["nmap-vuln.nse"][2]
+        self.assertIn("--script=vuln,vulners", vuln_command)
+        self.assertIn("||", vuln_command)
+        self.assertEqual(vuln_command.count("-oA [OUTPUT]"), 2)
+
+        screenshooter_scope = scheduler_actions["screenshooter"][1]
+        self.assertIn("ms-wbt-server", screenshooter_scope)
+        self.assertIn("vmrdp", screenshooter_scope)
+        self.assertIn("vnc", screenshooter_scope)
+
+
+class LegacySmbActionsMigrationTest(_LegacyConfigTestCase):
+    LEGACY_CONFIG_TEXT = LEGACY_SMB_ACTIONS_CONFIG
+
     def test_legacy_smb_action_migrations_replace_broken_quote_wrappers(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_SMB_ACTIONS_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-                port_actions = {row[1]: row for row in app_settings.getPortActions()}
-
-                self.assertEqual(
-                    "net rpc group members 'Domain Admins' -I [IP] -U '%'",
-                    str(port_actions["smb-enum-admins"][2]),
-                )
-                self.assertEqual(
-                    "rpcclient [IP] -U '%' -c 'enumdomusers'",
-                    str(port_actions["smb-enum-users-rpc"][2]),
-                )
-                self.assertEqual(
-                    "rpcclient [IP] -U '%' -c 'srvinfo'",
-                    str(port_actions["smb-null-sessions"][2]),
-                )
-                self.assertIn("rpcclient [IP] -p [PORT] -U '%'", str(port_actions["rpcclient-enum"][2]))
-                self.assertIn("impacket-samrdump -no-pass -port [PORT] [IP]", str(port_actions["samrdump"][2]))
+        port_actions = self.port_actions
+
+        self.assertEqual(
+            "net rpc group members 'Domain Admins' -I [IP] -U '%'",
+            port_actions["smb-enum-admins"][2],
+        )
+        self.assertEqual(
+            "rpcclient [IP] -U '%' -c 'enumdomusers'",
+            port_actions["smb-enum-users-rpc"][2],
+        )
+        self.assertEqual(
+            "rpcclient [IP] -U '%' -c 'srvinfo'",
+            port_actions["smb-null-sessions"][2],
+        )
+        self.assertIn("rpcclient [IP] -p [PORT] -U '%'", port_actions["rpcclient-enum"][2])
+        self.assertIn("impacket-samrdump -no-pass -port [PORT] [IP]", port_actions["samrdump"][2])
+
+
+class LegacyShellWrapperMigrationTest(_LegacyConfigTestCase):
+    LEGACY_CONFIG_TEXT = LEGACY_SHELL_WRAPPER_CONFIG
 
     def test_legacy_shell_wrapper_actions_are_normalized_for_port_and_terminal_actions(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_SHELL_WRAPPER_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-                port_actions = {row[1]: row for row in app_settings.getPortActions()}
-                terminal_actions = {row[1]: row for row in app_settings.getPortTerminalActions()}
-
-                self.assertEqual(
-                    "medusa -h [IP] -u root -P ./wordlists/snmp-default.txt -M snmp | grep SUCCESS",
-                    str(port_actions["snmp-brute"][2]),
-                )
-                self.assertEqual(
-                    "[term] rpcclient [IP] -p [PORT] -U '%'",
-                    str(terminal_actions["rpcclient"][2]),
-                )
+        port_actions = self.port_actions
+        terminal_rows = self.app_settings.getPortTerminalActions()
+        terminal_actions = dict(zip(map(itemgetter(1), terminal_rows), terminal_rows))
+
+        self.assertEqual(
+            "medusa -h [IP] -u root -P ./wordlists/snmp-default.txt -M snmp | grep SUCCESS",
+            port_actions["snmp-brute"][2],
+        )
+        self.assertEqual(
+            "[term] rpcclient [IP] -p [PORT] -U '%'",
+            terminal_actions["rpcclient"][2],
+        )
+
+
+class LegacyDisabledActionsMigrationTest(_LegacyConfigTestCase):
+    LEGACY_CONFIG_TEXT = LEGACY_DISABLED_ACTIONS_CONFIG
+    DISABLED_ACTION_IDS = frozenset({"http-drupal-modules.nse", "http-vuln-zimbra-lfi.nse"})
 
     def test_disabled_broken_nse_actions_are_pruned_from_settings(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            config_dir = os.path.join(tmpdir, ".local", "share", "legion")
-            os.makedirs(config_dir, exist_ok=True)
-            config_path = os.path.join(config_dir, "legion.conf")
-            with open(config_path, "w", encoding="utf-8") as handle:
-                handle.write(LEGACY_DISABLED_ACTIONS_CONFIG)
-
-            with patch.dict(os.environ, {"HOME": tmpdir}, clear=False):
-                from app.settings import AppSettings
-
-                app_settings = AppSettings()
-                port_action_ids = {row[1] for row in app_settings.getPortActions()}
-                scheduler_ids = {row[0] for row in app_settings.getSchedulerSettings()}
-
-                self.assertNotIn("http-drupal-modules.nse", port_action_ids)
-                self.assertNotIn("http-vuln-zimbra-lfi.nse", port_action_ids)
-                self.assertNotIn("http-drupal-modules.nse", scheduler_ids)
-                self.assertNotIn("http-vuln-zimbra-lfi.nse", scheduler_ids)
+        self.assertEqual(set(), self.DISABLED_ACTION_IDS & self.port_actions.keys())
+        self.assertEqual(set(), self.DISABLED_ACTION_IDS & self.scheduler_actions.keys())
 
 
 if __name__ == "__main__":
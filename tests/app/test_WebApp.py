@@ -1,11 +1,39 @@
+import copy
 import unittest
 import tempfile
 import io
 import json
 import os
 import zipfile
+from pathlib import Path
 from types import SimpleNamespace
 
+_GRAPH_TEXT = "Artifact preview line 1\nArtifact preview line 2\n"
+_GRAPH_PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    b"\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89"
+    b"\x00\x00\x00\rIDATx\x9cc```\xf8\x0f\x00\x01\x05\x01\x02\xa7m\xa4\x91"
+    b"\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+_ARTIFACT_DIR = None
+_GRAPH_TEXT_PATH = ""
+_GRAPH_IMAGE_PATH = ""
+
+
+def setUpModule():
+    # Graph artifacts are read-only, so they are written once; download bundles land in the same tree.
+    global _ARTIFACT_DIR, _GRAPH_TEXT_PATH, _GRAPH_IMAGE_PATH
+    _ARTIFACT_DIR = tempfile.TemporaryDirectory(prefix="legion-web-test-")
+    _GRAPH_TEXT_PATH = os.path.join(_ARTIFACT_DIR.name, "legion-graph-artifact.txt")
+    _GRAPH_IMAGE_PATH = os.path.join(_ARTIFACT_DIR.name, "legion-graph-shot.png")
+    Path(_GRAPH_TEXT_PATH).write_text(_GRAPH_TEXT, encoding="utf-8")
+    Path(_GRAPH_IMAGE_PATH).write_bytes(_GRAPH_PNG)
+
+
+def tearDownModule():
+    _ARTIFACT_DIR.cleanup()
+
 
 class DummySchedulerConfig:
     def __init__(self):
@@ -143,7 +171,312 @@ class DummySchedulerConfig:
         return self.state
 
 
+# Read-only fixture rows shared by every DummyRuntime; the web routes only serialize them.
+_JOBS = [
+    {
+        "id": 1,
+        "type": "import-targets",
+        "status": "completed",
+        "created_at": "2026-02-17T00:00:00Z",
+        "started_at": "2026-02-17T00:00:01Z",
+        "finished_at": "2026-02-17T00:00:02Z",
+        "payload": {"path": "/tmp/targets.txt"},
+        "result": {"added": 4},
+        "error": "",
+    }
+]
+
+_SCAN_HISTORY = [
+    {
+        "id": 1,
+        "submission_kind": "nmap_scan",
+        "status": "completed",
+        "target_summary": "10.0.0.0/24",
+        "scope_summary": "subnets: 10.0.0.0/24",
+        "targets": ["10.0.0.0/24", "10.0.0.5"],
+        "discovery": True,
+        "staged": False,
+        "run_actions": False,
+        "nmap_path": "nmap",
+        "nmap_args": "",
+        "scan_mode": "easy",
+        "scan_options": {"top_ports": 1000, "timing": "T3", "service_detection": True, "default_scripts": True},
+        "created_at": "2026-02-17T00:00:00Z",
+        "result_summary": "imported 4 hosts",
+    }
+]
+
+_WORKSPACE_HOSTS = [
+    {"id": 11, "ip": "10.0.0.5", "hostname": "dc01.local", "status": "up", "os": "windows", "open_ports": 2, "total_ports": 2, "services": ["kerberos", "smb"], "categories": ["Windows", "Server"]},
+    {"id": 12, "ip": "10.0.0.6", "hostname": "filesrv.local", "status": "down", "os": "windows", "open_ports": 0, "total_ports": 1, "services": [], "categories": ["Windows", "Storage"]},
+    {"id": 13, "ip": "10.0.0.7", "hostname": "web01.local", "status": "up", "os": "linux", "open_ports": 4, "total_ports": 5, "services": ["http", "https", "ssh"], "categories": ["Linux", "Server"]},
+]
+
+_WORKSPACE_SERVICES = [
+    {"service": "http", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Linux", "Server"]},
+    {"service": "https", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Linux", "Server"]},
+    {"service": "kerberos", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Windows", "Server"]},
+    {"service": "smb", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Windows", "Server"]},
+    {"service": "ssh", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Linux", "Server"]},
+]
+
+_WORKSPACE_TOOLS = [
+    {
+        "label": "Run smbmap",
+        "tool_id": "smbmap",
+        "command_template": "smbmap -H [IP] -P [PORT] -q --no-write-check | tee [OUTPUT].txt",
+        "service_scope": ["smb"],
+        "danger_categories": [],
+        "run_count": 1,
+        "last_status": "Finished",
+        "last_start": "2026-02-17T00:00:00Z",
+        "runnable": True,
+    },
+    {
+        "label": "Run whatweb (http)",
+        "tool_id": "whatweb-http",
+        "command_template": "whatweb http://[IP]:[PORT] --log-brief=[OUTPUT].txt",
+        "service_scope": ["http"],
+        "danger_categories": [],
+        "run_count": 0,
+        "last_status": "",
+        "last_start": "",
+        "runnable": True,
+    },
+]
+
+_SCHEDULER_APPROVALS = [
+    {
+        "id": 77,
+        "host_ip": "10.0.0.5",
+        "port": "445",
+        "protocol": "tcp",
+        "label": "SMB Bruteforce",
+        "tool_id": "smb-default",
+        "danger_categories": "credential_bruteforce",
+        "risk_tags": "credential_bruteforce,account_lockout_risk",
+        "policy_decision": "approval_required",
+        "policy_reason": "requires approval under internal pentest",
+        "risk_summary": "Could lock or throttle real user accounts.",
+        "safer_alternative": "Prefer credential validation against known accounts or low-impact enumeration first.",
+        "rationale": "validate weak SMB authentication controls",
+        "status": "pending",
+    }
+]
+
+_SCHEDULER_RATIONALE_FEED = [
+    {
+        "id": "provider:ranking:2026-02-17T00:00:00Z:10.0.0.5:445:smb-enum-users.nse",
+        "timestamp": "2026-02-17T00:00:00Z",
+        "host_ip": "10.0.0.5",
+        "port": "445",
+        "protocol": "tcp",
+        "service": "smb",
+        "kind": "ranking",
+        "headline": "smb-enum-users.nse, smbmap",
+        "summary": "Closed the safe SMB enumeration gap before deeper checks.",
+        "details": [
+            "Selected: smb-enum-users.nse, smbmap",
+            "Scores: smb-enum-users.nse 97, smbmap 84",
+            "Outcome: smb-enum-users.nse executed [exec-1, exit 0]",
+            "Next phase: service_fingerprint",
+        ],
+        "tags": ["Ranking", "Service Fingerprint", "SMB"],
+    }
+]
+
+_EXECUTION_TRACES = [
+    {
+        "execution_id": "exec-1",
+        "step_id": "step-1",
+        "action_id": "action-1",
+        "tool_id": "smb-enum-users.nse",
+        "label": "SMB Enum Users",
+        "scheduler_mode": "deterministic",
+        "goal_profile": "internal_asset_discovery",
+        "host_ip": "10.0.0.5",
+        "port": "445",
+        "protocol": "tcp",
+        "service": "smb",
+        "started_at": "2026-02-18T12:00:00Z",
+        "finished_at": "2026-02-18T12:00:10Z",
+        "runner_type": "local",
+        "exit_status": "0",
+        "stdout_ref": "/tmp/stdout.log",
+        "stderr_ref": "",
+        "artifact_refs": ["/tmp/evidence.txt"],
+        "approval_id": "",
+        "observations_created": ["script:smb-enum-users"],
+        "graph_mutations": ["node:graph-node-host"],
+        "operator_notes": "",
+        "stdout_excerpt": "sample trace",
+        "stderr_excerpt": "",
+    }
+]
+
+# Host detail and credential capture state are copied on first write, see DummyRuntime._writable().
+_HOST_DETAIL_TEMPLATE = {
+    "host": {"id": 11, "ip": "10.0.0.5", "hostname": "dc01.local", "status": "up", "os": "windows"},
+    "note": "host note",
+    "ports": [
+        {
+            "id": 1,
+            "port": "445",
+            "protocol": "tcp",
+            "state": "open",
+            "service": {"id": 1, "name": "smb", "product": "samba", "version": "4.x", "extrainfo": ""},
+            "scripts": [{
+                "id": 100,
+                "script_id": "nmap",
+                "output": "Starting Nmap 7.80\nNmap scan report for dc01.local\nHost is up.\n| smb-security-mode:\n|   message_signing: disabled\n|_  challenge_response: supported\nNmap done: 1 IP address",
+                "display_output": "| smb-security-mode: |   message_signing: disabled |_  challenge_response: supported",
+            }],
+        }
+    ],
+    "cves": [{"id": 50, "name": "CVE-2025-0001", "severity": "high", "product": "samba", "url": ""}],
+    "screenshots": [{"filename": "10.0.0.5-445-screenshot.png", "port": "445", "url": "/api/screenshots/10.0.0.5-445-screenshot.png"}],
+    "ai_analysis": {
+        "provider": "openai",
+        "goal_profile": "internal_asset_discovery",
+        "updated_at": "2026-02-18T12:00:00+00:00",
+        "next_phase": "targeted_checks",
+        "host_updates": {
+            "hostname": "dc01.local",
+            "hostname_confidence": 95,
+            "os": "windows",
+            "os_confidence": 92,
+        },
+        "technologies": [{"name": "samba", "version": "4.x", "cpe": "cpe:/a:samba:samba:4", "evidence": "nmap service"}],
+        "findings": [{"title": "SMB signing not required", "severity": "high", "cvss": 7.5, "cve": "", "evidence": "smb-security-mode"}],
+        "manual_tests": [{"why": "validate relay path", "command": "ntlmrelayx.py -tf targets.txt", "scope_note": "requires approval"}],
+    },
+    "target_state": {
+        "last_mode": "deterministic",
+        "engagement_preset": "internal_recon",
+        "attempted_actions": [{"tool_id": "smb-enum-users.nse", "status": "executed"}],
+        "coverage_gaps": [{"gap_id": "missing_smb_signing_checks"}],
+        "urls": [],
+        "credentials": [],
+        "sessions": [],
+    },
+}
+
+_CREDENTIAL_CAPTURE_TEMPLATE = {
+    "panel_enabled": True,
+    "capture_count": 3,
+    "unique_hash_count": 2,
+    "recent_captures": [
+        {
+            "id": 1,
+            "tool": "responder",
+            "source": "10.0.0.25",
+            "username": "CORP\\alice",
+            "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
+            "details": "NTLMv2-SSP hash",
+            "capturedAt": "2026-02-18 12:32:00 UTC",
+        },
+        {
+            "id": 2,
+            "tool": "ntlmrelayx",
+            "source": "10.0.0.25",
+            "username": "CORP\\alice",
+            "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
+            "details": "Relayed SMB auth",
+            "capturedAt": "2026-02-18 12:33:00 UTC",
+        },
+        {
+            "id": 3,
+            "tool": "responder",
+            "source": "10.0.0.31",
+            "username": "CORP\\bob",
+            "hash": "bob::CORP:8877665544332211:11112222333344445555666677778888:0101000000000000",
+            "details": "NTLMv2-SSP hash",
+            "capturedAt": "2026-02-18 12:34:00 UTC",
+        },
+    ],
+    "captures": [
+        {
+            "id": 1,
+            "tool": "responder",
+            "source": "10.0.0.25",
+            "username": "CORP\\alice",
+            "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
+            "details": "NTLMv2-SSP hash",
+            "capturedAt": "2026-02-18 12:32:00 UTC",
+        },
+        {
+            "id": 2,
+            "tool": "ntlmrelayx",
+            "source": "10.0.0.25",
+            "username": "CORP\\alice",
+            "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
+            "details": "Relayed SMB auth",
+            "capturedAt": "2026-02-18 12:33:00 UTC",
+        },
+        {
+            "id": 3,
+            "tool": "responder",
+            "source": "10.0.0.31",
+            "username": "CORP\\bob",
+            "hash": "bob::CORP:8877665544332211:11112222333344445555666677778888:0101000000000000",
+            "details": "NTLMv2-SSP hash",
+            "capturedAt": "2026-02-18 12:34:00 UTC",
+        },
+    ],
+    "deduped_hashes": [
+        "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
+        "bob::CORP:8877665544332211:11112222333344445555666677778888:0101000000000000",
+    ],
+    "responder": {
+        "config": {
+            "interface_name": "eth0",
+            "mode": "active",
+            "wpad": False,
+            "force_wpad_auth": False,
+            "proxy_auth": False,
+            "dhcp": False,
+            "dhcp_dns": False,
+            "basic_auth": False,
+            "extra_args": "",
+        },
+        "session": {
+            "running": False,
+            "status": "Idle",
+            "process_id": 0,
+        },
+    },
+    "ntlmrelayx": {
+        "config": {
+            "target": "smb://10.0.0.20",
+            "targets_file": "",
+            "interface_ip": "10.0.0.10",
+            "smb2support": True,
+            "interactive": False,
+            "socks": False,
+            "output_hashes": True,
+            "extra_args": "",
+        },
+        "session": {
+            "running": False,
+            "status": "Idle",
+            "process_id": 0,
+        },
+    },
+}
+
+
+def _is_id(value, expected):
+    # Routes pass ints from <int:...> converters; only other values go through int().
+    return value == expected or int(value) == expected
+
+
 class DummyRuntime:
+    _VALID_HOST_ID = 11
+    _VALID_JOB_ID = 1
+    _VALID_PROCESS_ID = 1
+    _VALID_SCRIPT_ID = 100
+    _VALID_APPROVAL_ID = 77
+
     def __init__(self):
         self.scheduler_config = DummySchedulerConfig()
         self.project = {
@@ -152,260 +485,16 @@ class DummyRuntime:
             "running_folder": "/tmp/demo-running",
             "is_temporary": False,
         }
-        self.jobs = [
-            {
-                "id": 1,
-                "type": "import-targets",
-                "status": "completed",
-                "created_at": "2026-02-17T00:00:00Z",
-                "started_at": "2026-02-17T00:00:01Z",
-                "finished_at": "2026-02-17T00:00:02Z",
-                "payload": {"path": "/tmp/targets.txt"},
-                "result": {"added": 4},
-                "error": "",
-            }
-        ]
-        self.scan_history = [
-            {
-                "id": 1,
-                "submission_kind": "nmap_scan",
-                "status": "completed",
-                "target_summary": "10.0.0.0/24",
-                "scope_summary": "subnets: 10.0.0.0/24",
-                "targets": ["10.0.0.0/24", "10.0.0.5"],
-                "discovery": True,
-                "staged": False,
-                "run_actions": False,
-                "nmap_path": "nmap",
-                "nmap_args": "",
-                "scan_mode": "easy",
-                "scan_options": {"top_ports": 1000, "timing": "T3", "service_detection": True, "default_scripts": True},
-                "created_at": "2026-02-17T00:00:00Z",
-                "result_summary": "imported 4 hosts",
-            }
-        ]
-        self.workspace_hosts = [
-            {"id": 11, "ip": "10.0.0.5", "hostname": "dc01.local", "status": "up", "os": "windows", "open_ports": 2, "total_ports": 2, "services": ["kerberos", "smb"], "categories": ["Windows", "Server"]},
-            {"id": 12, "ip": "10.0.0.6", "hostname": "filesrv.local", "status": "down", "os": "windows", "open_ports": 0, "total_ports": 1, "services": [], "categories": ["Windows", "Storage"]},
-            {"id": 13, "ip": "10.0.0.7", "hostname": "web01.local", "status": "up", "os": "linux", "open_ports": 4, "total_ports": 5, "services": ["http", "https", "ssh"], "categories": ["Linux", "Server"]},
-        ]
-        self.workspace_services = [
-            {"service": "http", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Linux", "Server"]},
-            {"service": "https", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Linux", "Server"]},
-            {"service": "kerberos", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Windows", "Server"]},
-            {"service": "smb", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Windows", "Server"]},
-            {"service": "ssh", "host_count": 1, "port_count": 1, "protocols": ["tcp"], "categories": ["Linux", "Server"]},
-        ]
+        self.jobs = _JOBS
+        self.scan_history = _SCAN_HISTORY
+        self.workspace_hosts = _WORKSPACE_HOSTS
+        self.workspace_services = _WORKSPACE_SERVICES
         self.tool_install_requests = []
-        self.workspace_tools = [
-            {
-                "label": "Run smbmap",
-                "tool_id": "smbmap",
-                "command_template": "smbmap -H [IP] -P [PORT] -q --no-write-check | tee [OUTPUT].txt",
-                "service_scope": ["smb"],
-                "danger_categories": [],
-                "run_count": 1,
-                "last_status": "Finished",
-                "last_start": "2026-02-17T00:00:00Z",
-                "runnable": True,
-            },
-            {
-                "label": "Run whatweb (http)",
-                "tool_id": "whatweb-http",
-                "command_template": "whatweb http://[IP]:[PORT] --log-brief=[OUTPUT].txt",
-                "service_scope": ["http"],
-                "danger_categories": [],
-                "run_count": 0,
-                "last_status": "",
-                "last_start": "",
-                "runnable": True,
-            },
-        ]
-        self.workspace_host_detail = {
-            "host": {"id": 11, "ip": "10.0.0.5", "hostname": "dc01.local", "status": "up", "os": "windows"},
-            "note": "host note",
-            "ports": [
-                {
-                    "id": 1,
-                    "port": "445",
-                    "protocol": "tcp",
-                    "state": "open",
-                    "service": {"id": 1, "name": "smb", "product": "samba", "version": "4.x", "extrainfo": ""},
-                    "scripts": [{
-                        "id": 100,
-                        "script_id": "nmap",
-                        "output": "Starting Nmap 7.80\nNmap scan report for dc01.local\nHost is up.\n| smb-security-mode:\n|   message_signing: disabled\n|_  challenge_response: supported\nNmap done: 1 IP address",
-                        "display_output": "| smb-security-mode: |   message_signing: disabled |_  challenge_response: supported",
-                    }],
-                }
-            ],
-            "cves": [{"id": 50, "name": "CVE-2025-0001", "severity": "high", "product": "samba", "url": ""}],
-            "screenshots": [{"filename": "10.0.0.5-445-screenshot.png", "port": "445", "url": "/api/screenshots/10.0.0.5-445-screenshot.png"}],
-            "ai_analysis": {
-                "provider": "openai",
-                "goal_profile": "internal_asset_discovery",
-                "updated_at": "2026-02-18T12:00:00+00:00",
-                "next_phase": "targeted_checks",
-                "host_updates": {
-                    "hostname": "dc01.local",
-                    "hostname_confidence": 95,
-                    "os": "windows",
-                    "os_confidence": 92,
-                },
-                "technologies": [{"name": "samba", "version": "4.x", "cpe": "cpe:/a:samba:samba:4", "evidence": "nmap service"}],
-                "findings": [{"title": "SMB signing not required", "severity": "high", "cvss": 7.5, "cve": "", "evidence": "smb-security-mode"}],
-                "manual_tests": [{"why": "validate relay path", "command": "ntlmrelayx.py -tf targets.txt", "scope_note": "requires approval"}],
-            },
-            "target_state": {
-                "last_mode": "deterministic",
-                "engagement_preset": "internal_recon",
-                "attempted_actions": [{"tool_id": "smb-enum-users.nse", "status": "executed"}],
-                "coverage_gaps": [{"gap_id": "missing_smb_signing_checks"}],
-                "urls": [],
-                "credentials": [],
-                "sessions": [],
-            },
-        }
-        self.scheduler_approvals = [
-            {
-                "id": 77,
-                "host_ip": "10.0.0.5",
-                "port": "445",
-                "protocol": "tcp",
-                "label": "SMB Bruteforce",
-                "tool_id": "smb-default",
-                "danger_categories": "credential_bruteforce",
-                "risk_tags": "credential_bruteforce,account_lockout_risk",
-                "policy_decision": "approval_required",
-                "policy_reason": "requires approval under internal pentest",
-                "risk_summary": "Could lock or throttle real user accounts.",
-                "safer_alternative": "Prefer credential validation against known accounts or low-impact enumeration first.",
-                "rationale": "validate weak SMB authentication controls",
-                "status": "pending",
-            }
-        ]
-        self.scheduler_rationale_feed = [
-            {
-                "id": "provider:ranking:2026-02-17T00:00:00Z:10.0.0.5:445:smb-enum-users.nse",
-                "timestamp": "2026-02-17T00:00:00Z",
-                "host_ip": "10.0.0.5",
-                "port": "445",
-                "protocol": "tcp",
-                "service": "smb",
-                "kind": "ranking",
-                "headline": "smb-enum-users.nse, smbmap",
-                "summary": "Closed the safe SMB enumeration gap before deeper checks.",
-                "details": [
-                    "Selected: smb-enum-users.nse, smbmap",
-                    "Scores: smb-enum-users.nse 97, smbmap 84",
-                    "Outcome: smb-enum-users.nse executed [exec-1, exit 0]",
-                    "Next phase: service_fingerprint",
-                ],
-                "tags": ["Ranking", "Service Fingerprint", "SMB"],
-            }
-        ]
-        self.credential_capture_state = {
-            "panel_enabled": True,
-            "capture_count": 3,
-            "unique_hash_count": 2,
-            "recent_captures": [
-                {
-                    "id": 1,
-                    "tool": "responder",
-                    "source": "10.0.0.25",
-                    "username": "CORP\\alice",
-                    "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
-                    "details": "NTLMv2-SSP hash",
-                    "capturedAt": "2026-02-18 12:32:00 UTC",
-                },
-                {
-                    "id": 2,
-                    "tool": "ntlmrelayx",
-                    "source": "10.0.0.25",
-                    "username": "CORP\\alice",
-                    "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
-                    "details": "Relayed SMB auth",
-                    "capturedAt": "2026-02-18 12:33:00 UTC",
-                },
-                {
-                    "id": 3,
-                    "tool": "responder",
-                    "source": "10.0.0.31",
-                    "username": "CORP\\bob",
-                    "hash": "bob::CORP:8877665544332211:11112222333344445555666677778888:0101000000000000",
-                    "details": "NTLMv2-SSP hash",
-                    "capturedAt": "2026-02-18 12:34:00 UTC",
-                },
-            ],
-            "captures": [
-                {
-                    "id": 1,
-                    "tool": "responder",
-                    "source": "10.0.0.25",
-                    "username": "CORP\\alice",
-                    "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
-                    "details": "NTLMv2-SSP hash",
-                    "capturedAt": "2026-02-18 12:32:00 UTC",
-                },
-                {
-                    "id": 2,
-                    "tool": "ntlmrelayx",
-                    "source": "10.0.0.25",
-                    "username": "CORP\\alice",
-                    "hash": "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
-                    "details": "Relayed SMB auth",
-                    "capturedAt": "2026-02-18 12:33:00 UTC",
-                },
-                {
-                    "id": 3,
-                    "tool": "responder",
-                    "source": "10.0.0.31",
-                    "username": "CORP\\bob",
-                    "hash": "bob::CORP:8877665544332211:11112222333344445555666677778888:0101000000000000",
-                    "details": "NTLMv2-SSP hash",
-                    "capturedAt": "2026-02-18 12:34:00 UTC",
-                },
-            ],
-            "deduped_hashes": [
-                "alice::CORP:1122334455667788:AAAABBBBCCCCDDDDEEEEFFFF00001111:0101000000000000",
-                "bob::CORP:8877665544332211:11112222333344445555666677778888:0101000000000000",
-            ],
-            "responder": {
-                "config": {
-                    "interface_name": "eth0",
-                    "mode": "active",
-                    "wpad": False,
-                    "force_wpad_auth": False,
-                    "proxy_auth": False,
-                    "dhcp": False,
-                    "dhcp_dns": False,
-                    "basic_auth": False,
-                    "extra_args": "",
-                },
-                "session": {
-                    "running": False,
-                    "status": "Idle",
-                    "process_id": 0,
-                },
-            },
-            "ntlmrelayx": {
-                "config": {
-                    "target": "smb://10.0.0.20",
-                    "targets_file": "",
-                    "interface_ip": "10.0.0.10",
-                    "smb2support": True,
-                    "interactive": False,
-                    "socks": False,
-                    "output_hashes": True,
-                    "extra_args": "",
-                },
-                "session": {
-                    "running": False,
-                    "status": "Idle",
-                    "process_id": 0,
-                },
-            },
-        }
+        self.workspace_tools = _WORKSPACE_TOOLS
+        self.workspace_host_detail = _HOST_DETAIL_TEMPLATE
+        self.scheduler_approvals = _SCHEDULER_APPROVALS
+        self.scheduler_rationale_feed = _SCHEDULER_RATIONALE_FEED
+        self.credential_capture_state = _CREDENTIAL_CAPTURE_TEMPLATE
         self.graph_snapshot = {
             "nodes": [
                 {
@@ -534,45 +623,17 @@ class DummyRuntime:
                 "source_ref": "unit:test",
             }
         ]
-        self.graph_text_path = tempfile.NamedTemporaryFile(prefix="legion-graph-artifact-", suffix=".txt", delete=False).name
-        with open(self.graph_text_path, "w", encoding="utf-8") as handle:
-            handle.write("Artifact preview line 1\nArtifact preview line 2\n")
-        self.graph_image_path = tempfile.NamedTemporaryFile(prefix="legion-graph-shot-", suffix=".png", delete=False).name
-        with open(self.graph_image_path, "wb") as handle:
-            handle.write(
-                b"\x89PNG\r\n\x1a\n"
-                b"\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89"
-                b"\x00\x00\x00\rIDATx\x9cc```\xf8\x0f\x00\x01\x05\x01\x02\xa7m\xa4\x91"
-                b"\x00\x00\x00\x00IEND\xaeB`\x82"
-            )
-        self.execution_traces = [
-            {
-                "execution_id": "exec-1",
-                "step_id": "step-1",
-                "action_id": "action-1",
-                "tool_id": "smb-enum-users.nse",
-                "label": "SMB Enum Users",
-                "scheduler_mode": "deterministic",
-                "goal_profile": "internal_asset_discovery",
-                "host_ip": "10.0.0.5",
-                "port": "445",
-                "protocol": "tcp",
-                "service": "smb",
-                "started_at": "2026-02-18T12:00:00Z",
-                "finished_at": "2026-02-18T12:00:10Z",
-                "runner_type": "local",
-                "exit_status": "0",
-                "stdout_ref": "/tmp/stdout.log",
-                "stderr_ref": "",
-                "artifact_refs": ["/tmp/evidence.txt"],
-                "approval_id": "",
-                "observations_created": ["script:smb-enum-users"],
-                "graph_mutations": ["node:graph-node-host"],
-                "operator_notes": "",
-                "stdout_excerpt": "sample trace",
-                "stderr_excerpt": "",
-            }
-        ]
+        self.graph_text_path = _GRAPH_TEXT_PATH
+        self.graph_image_path = _GRAPH_IMAGE_PATH
+        self.execution_traces = _EXECUTION_TRACES
+
+    def _writable(self, name, template):
+        # Shared templates are only deep-copied once a test actually writes to them.
+        value = getattr(self, name)
+        if value is template:
+            value = copy.deepcopy(template)
+            setattr(self, name, value)
+        return value
 
     def get_snapshot(self):
         return {
@@ -587,15 +648,15 @@ class DummyRuntime:
             },
             "host_filter": "hide_down",
             "hosts": self.get_workspace_hosts(),
-            "services": list(self.workspace_services),
-            "tools": list(self.workspace_tools),
+            "services": self.workspace_services,
+            "tools": self.workspace_tools,
             "processes": [],
             "scheduler": self.get_scheduler_preferences(),
             "scheduler_decisions": self.get_scheduler_decisions(),
             "scheduler_rationale_feed": self.get_scheduler_rationale_feed(),
-            "scheduler_approvals": list(self.scheduler_approvals),
-            "scan_history": list(self.scan_history),
-            "jobs": list(self.jobs),
+            "scheduler_approvals": self.scheduler_approvals,
+            "scan_history": self.scan_history,
+            "jobs": self.jobs,
             "credential_capture": self.get_credential_capture_state(include_captures=False),
         }
 
@@ -667,7 +728,9 @@ class DummyRuntime:
         }
 
     def build_project_bundle_zip(self):
-        temp = tempfile.NamedTemporaryFile(prefix="legion-test-bundle-", suffix=".zip", delete=False)
+        temp = tempfile.NamedTemporaryFile(
+            prefix="legion-test-bundle-", suffix=".zip", dir=_ARTIFACT_DIR.name, delete=False
+        )
         temp.close()
         with zipfile.ZipFile(temp.name, "w", compression=zipfile.ZIP_DEFLATED) as archive:
             archive.writestr(
@@ -783,7 +846,7 @@ class DummyRuntime:
         }
 
     def start_host_rescan_job(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "id": 10,
@@ -793,7 +856,7 @@ class DummyRuntime:
         }
 
     def start_host_dig_deeper_job(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "id": 11,
@@ -813,7 +876,7 @@ class DummyRuntime:
         }
 
     def start_host_screenshot_refresh_job(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "id": 12,
@@ -823,7 +886,7 @@ class DummyRuntime:
         }
 
     def start_graph_screenshot_refresh_job(self, host_id, port, protocol="tcp"):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "id": 112,
@@ -834,7 +897,7 @@ class DummyRuntime:
 
     def delete_graph_screenshot(self, *, host_id, artifact_ref="", filename="", port="", protocol="tcp"):
         _ = (artifact_ref, port, protocol)
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "deleted": True,
@@ -846,7 +909,7 @@ class DummyRuntime:
         }
 
     def delete_workspace_port(self, *, host_id, port, protocol="tcp"):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "deleted": True,
@@ -862,7 +925,7 @@ class DummyRuntime:
         }
 
     def delete_workspace_service(self, *, host_id, port, protocol="tcp", service=""):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "deleted": True,
@@ -878,7 +941,7 @@ class DummyRuntime:
         }
 
     def delete_host_workspace(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         self.workspace_hosts = []
         self.workspace_host_detail = {
@@ -947,17 +1010,19 @@ class DummyRuntime:
 
     def save_credential_capture_config(self, updates=None):
         updates = dict(updates or {})
+        state = self._writable("credential_capture_state", _CREDENTIAL_CAPTURE_TEMPLATE)
         if isinstance(updates.get("responder"), dict):
-            self.credential_capture_state["responder"]["config"].update(updates["responder"])
+            state["responder"]["config"].update(updates["responder"])
         if isinstance(updates.get("ntlmrelayx"), dict):
-            self.credential_capture_state["ntlmrelayx"]["config"].update(updates["ntlmrelayx"])
+            state["ntlmrelayx"]["config"].update(updates["ntlmrelayx"])
         return self.get_credential_capture_state(include_captures=False)
 
     def start_credential_capture_session_job(self, tool_id):
         normalized = str(tool_id or "").strip().lower()
         if normalized not in {"responder", "ntlmrelayx"}:
             raise ValueError("Unsupported credential capture tool.")
-        self.credential_capture_state[normalized]["session"] = {
+        state = self._writable("credential_capture_state", _CREDENTIAL_CAPTURE_TEMPLATE)
+        state[normalized]["session"] = {
             "running": True,
             "status": "Running",
             "process_id": 601 if normalized == "responder" else 602,
@@ -973,8 +1038,9 @@ class DummyRuntime:
         normalized = str(tool_id or "").strip().lower()
         if normalized not in {"responder", "ntlmrelayx"}:
             raise ValueError("Unsupported credential capture tool.")
-        running = bool(self.credential_capture_state[normalized]["session"].get("running"))
-        self.credential_capture_state[normalized]["session"] = {
+        state = self._writable("credential_capture_state", _CREDENTIAL_CAPTURE_TEMPLATE)
+        running = bool(state[normalized]["session"].get("running"))
+        state[normalized]["session"] = {
             "running": False,
             "status": "Stopped" if running else "Idle",
             "process_id": 0,
@@ -1015,7 +1081,7 @@ class DummyRuntime:
         return self.jobs[:limit]
 
     def get_job(self, job_id):
-        if int(job_id) == 1:
+        if _is_id(job_id, self._VALID_JOB_ID):
             return self.jobs[0]
         raise KeyError(job_id)
 
@@ -1034,7 +1100,7 @@ class DummyRuntime:
         }
 
     def stop_job(self, job_id):
-        if int(job_id) != 1:
+        if not _is_id(job_id, self._VALID_JOB_ID):
             raise KeyError(job_id)
         return {
             "stopped": True,
@@ -1232,7 +1298,7 @@ class DummyRuntime:
         return targets[: max(1, min(int(limit or 500), 5000))]
 
     def get_host_workspace(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return dict(self.workspace_host_detail)
 
@@ -1332,7 +1398,7 @@ class DummyRuntime:
         }
 
     def get_host_ai_report(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "generated_at": "2026-02-18T12:01:00+00:00",
@@ -1367,7 +1433,7 @@ class DummyRuntime:
         )
 
     def get_host_report(self, host_id):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {
             "generated_at": "2026-02-18T12:05:00+00:00",
@@ -1423,7 +1489,9 @@ class DummyRuntime:
         )
 
     def build_host_ai_reports_zip(self):
-        handle = tempfile.NamedTemporaryFile(prefix="test-host-ai-reports-", suffix=".zip", delete=False)
+        handle = tempfile.NamedTemporaryFile(
+            prefix="test-host-ai-reports-", suffix=".zip", dir=_ARTIFACT_DIR.name, delete=False
+        )
         path = handle.name
         handle.close()
         with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
@@ -1542,15 +1610,16 @@ class DummyRuntime:
         return result
 
     def update_host_note(self, host_id, text_value):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
-        self.workspace_host_detail["note"] = text_value
+        self._writable("workspace_host_detail", _HOST_DETAIL_TEMPLATE)["note"] = text_value
         return {"host_id": int(host_id), "saved": True}
 
     def create_script_entry(self, host_id, port, protocol, script_id, output):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
-        self.workspace_host_detail["ports"][0]["scripts"].append(
+        host_detail = self._writable("workspace_host_detail", _HOST_DETAIL_TEMPLATE)
+        host_detail["ports"][0]["scripts"].append(
             {"id": 101, "script_id": script_id, "output": output}
         )
         return {"id": 101, "script_id": script_id, "port_id": 1}
@@ -1559,7 +1628,7 @@ class DummyRuntime:
         return {"deleted": True, "id": int(script_db_id)}
 
     def create_cve_entry(self, host_id, name, **_kwargs):
-        if int(host_id) != 11:
+        if not _is_id(host_id, self._VALID_HOST_ID):
             raise KeyError(host_id)
         return {"id": 88, "name": name, "host_id": int(host_id), "created": True}
 
@@ -1568,7 +1637,7 @@ class DummyRuntime:
 
     def get_process_output(self, process_id, offset=0, max_chars=12000):
         _ = max_chars
-        if int(process_id) != 1:
+        if not _is_id(process_id, self._VALID_PROCESS_ID):
             raise KeyError(process_id)
         text = "sample output"
         offset_value = max(0, int(offset or 0))
@@ -1591,7 +1660,7 @@ class DummyRuntime:
 
     def get_script_output(self, script_db_id, offset=0, max_chars=12000):
         _ = max_chars
-        if int(script_db_id) != 100:
+        if not _is_id(script_db_id, self._VALID_SCRIPT_ID):
             raise KeyError(script_db_id)
         text = "script process output"
         offset_value = max(0, int(offset or 0))
@@ -1647,14 +1716,14 @@ class DummyRuntime:
         _ = approve_family
         _ = run_now
         _ = family_action
-        if int(approval_id) != 77:
+        if not _is_id(approval_id, self._VALID_APPROVAL_ID):
             raise KeyError(approval_id)
         return {"approval": {"id": 77, "status": "approved"}, "job": {"id": 99}}
 
     def reject_scheduler_approval(self, approval_id, reason="", family_action=""):
         _ = reason
         _ = family_action
-        if int(approval_id) != 77:
+        if not _is_id(approval_id, self._VALID_APPROVAL_ID):
             raise KeyError(approval_id)
         return {"id": 77, "status": "rejected"}
 
@@ -1885,7 +1954,7 @@ class DummyRuntime:
                         "ref": self.graph_text_path,
                         "kind": "text",
                         "available": True,
-                        "preview_text": "Artifact preview line 1\nArtifact preview line 2\n",
+                        "preview_text": _GRAPH_TEXT,
                         "preview_url": "",
                         "download_url": "/api/graph/content/graph-node-artifact?download=1",
                         "message": "",
@@ -1912,7 +1981,7 @@ class DummyRuntime:
         if str(node_id) == "graph-node-artifact":
             return {
                 "kind": "text",
-                "text": "Artifact preview line 1\nArtifact preview line 2\n",
+                "text": _GRAPH_TEXT,
                 "filename": "evidence.txt",
                 "mimetype": "text/plain; charset=utf-8",
                 "download": bool(download),
@@ -1929,11 +1998,20 @@ class DummyRuntime:
 
 
 class WebAppTest(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         from app.web import create_app
 
+        # Registering the blueprint and websocket routes dominates app creation, so build the app once per class.
+        cls.app = create_app(DummyRuntime())
+        cls._app_config = dict(cls.app.config)
+
+    def setUp(self):
+        # Each test still gets a fresh runtime and the config create_app() produced.
         self.runtime = DummyRuntime()
-        self.app = create_app(self.runtime)
+        self.app.extensions["legion_runtime"] = self.runtime
+        self.app.config.clear()
+        self.app.config.update(self._app_config)
         self.client = self.app.test_client()
 
     def test_health_endpoint(self):
@@ -21,7 +21,7 @@ from typing import Optional
 
 from parsers.Host import Host
 from parsers.OS import OS
-from parsers.Parser import Parser, parseNmapReport, MalformedXmlDocumentException
+from parsers.Parser import Parser, parseNmapReport, streamNmapReport, MalformedXmlDocumentException
 from parsers.Port import Port
 from parsers.Session import Session
 
@@ -110,6 +110,13 @@ class ParserTest(unittest.TestCase):
         self.assertEqual("1", session.upHosts)
         self.assertEqual("0", session.downHosts)
 
+    def test_streamNmapReport_givenAValidXml_KeepsOnlyElementsTheParserReads(self):
+        document = streamNmapReport(join(dirname(__file__), "nmap-fixtures/valid-nmap-report.xml"))
+        self.assertEqual(1, len(document.getElementsByTagName("host")))
+        self.assertEqual("7.80", document.getElementsByTagName("nmaprun")[0].getAttribute("version"))
+        self.assertEqual([], document.getElementsByTagName("verbose"))
+        self.assertEqual([], document.getElementsByTagName("scaninfo"))
+
     def test_parser_merges_duplicate_ip_hosts_without_dropping_ports(self):
         parser = givenAnXmlFile("nmap-fixtures/duplicate-ip-nmap-report.xml")
         hosts = list(parser.getAllHosts())